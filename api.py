@@ -592,6 +592,28 @@ try:
 except Exception as e:
     app.logger.warning(f"Error tracking initialization failed: {e}")
 
+# Preload static knowledge (static_data, static_blocks, domain_research) before
+# a pre-forking server forks, so workers share it copy-on-write
+try:
+    from app.services.knowledge_registry import knowledge_registry
+    with app.app_context():
+        knowledge_registry.preload()
+    entries = knowledge_registry.get_stats()["entries"]
+    print(f"✅ Knowledge registry preloaded: {entries}", flush=True)
+except Exception as e:
+    app.logger.warning(f"Knowledge registry preload failed: {e}")
+
+# Validation jobs live in process memory; fail rows whose job died with a
+# previous process so they don't stay pending forever
+try:
+    from app.routes.validation import expire_stale_validations
+    with app.app_context():
+        expired = expire_stale_validations()
+    if expired:
+        print(f"✅ Expired {expired} stale pending validation(s)", flush=True)
+except Exception as e:
+    app.logger.warning(f"Stale validation sweep failed: {e}")
+
 if __name__ == "__main__":
     
     port = int(os.environ.get("PORT", 8000))
@@ -38,6 +38,7 @@ DEFAULT_PAYMENT_STATUS = "trial"  # PaymentStatus uses string values, not enum a
 
 DEFAULT_PAGE_SIZE = 50
 MAX_PAGE_SIZE = 100
+PAGINATION_COUNT_CACHE_SECONDS = 30  # Lifetime of cached list totals (?total=cached)
 
 # ============================================================================
 # Query Limits
@@ -116,6 +117,7 @@ class ErrorMessages:
     INVALID_SUBSCRIPTION_DATA = "Invalid subscription data"
     INVALID_MFA_CODE = "Invalid MFA code"
     INVALID_OR_EXPIRED_TOKEN = "Invalid or expired reset token"
+    INVALID_CURSOR = "Invalid pagination cursor"
     
     # Field validation
     ACTION_TEXT_TOO_LONG = f"action_text must be {MAX_ACTION_TEXT_LENGTH} characters or less"
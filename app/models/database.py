@@ -4,11 +4,12 @@ Database models and setup for user authentication and subscriptions.
 from datetime import datetime, timedelta, timezone
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import Index, Enum as SQLEnum
+from sqlalchemy import Index, DDL, event, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.types import TypeDecorator, TEXT
 import json
 import secrets
+from typing import Optional
 
 db = SQLAlchemy()
 
@@ -69,10 +70,31 @@ class User(db.Model):
         server_default='{}'
     )
     
-    # Relationships - use selectinload for better performance than lazy loading
-    sessions = db.relationship("UserSession", backref="user", lazy="selectin", cascade="all, delete-orphan")
-    runs = db.relationship("UserRun", backref="user", lazy="selectin", cascade="all, delete-orphan")
-    validations = db.relationship("UserValidation", backref="user", lazy="selectin", cascade="all, delete-orphan")
+    # Relationships - dynamic (query objects), so loading a User never pulls its
+    # history (runs/validations carry large JSON blobs). Use the *_query helpers below.
+    sessions = db.relationship("UserSession", backref="user", lazy="dynamic", cascade="all, delete-orphan")
+    runs = db.relationship("UserRun", backref="user", lazy="dynamic", cascade="all, delete-orphan")
+    validations = db.relationship("UserValidation", backref="user", lazy="dynamic", cascade="all, delete-orphan")
+    
+    def runs_query(self, include_deleted: bool = False):
+        """Query for this user's runs, newest first."""
+        query = self.runs
+        if not include_deleted:
+            query = query.filter_by(is_deleted=False)
+        return query.order_by(UserRun.created_at.desc())
+    
+    def validations_query(self, include_deleted: bool = False, status: Optional[str] = None):
+        """Query for this user's validations, newest first (optionally one status only)."""
+        query = self.validations
+        if not include_deleted:
+            query = query.filter_by(is_deleted=False)
+        if status:
+            query = query.filter_by(status=status)
+        return query.order_by(UserValidation.created_at.desc())
+    
+    def sessions_query(self):
+        """Query for this user's sessions, newest first."""
+        return self.sessions.order_by(UserSession.created_at.desc())
     
     def set_password(self, password: str):
         """Hash and set password."""
@@ -341,6 +363,44 @@ class User(db.Model):
         
         db.session.commit()
     
+    def _validation_quota(self) -> tuple[Optional[str], int]:
+        """(usage column, limit) counting this user's validations; (None, 0) if unlimited."""
+        subscription_type = self.subscription_type or "free"
+        if subscription_type == "free_trial":
+            subscription_type = "free"
+        if subscription_type == "free":
+            return "free_validations_used", 2
+        if subscription_type == "starter":
+            return "monthly_validations_used", 20
+        return None, 0
+    
+    def reserve_validation_usage(self) -> bool:
+        """
+        Count one validation against the quota before it runs (queued jobs).
+        
+        A single conditional UPDATE, so parallel requests can't all pass the
+        limit check. Returns False if the quota is used up. Give the
+        reservation back with refund_validation_usage() if the job fails.
+        """
+        self.check_and_reset_monthly_usage()
+        column_name, limit = self._validation_quota()
+        if column_name is None:
+            return True
+        column = getattr(User, column_name)
+        result = db.session.execute(
+            db.update(User).where(User.id == self.id, column < limit).values({column: column + 1})
+        )
+        db.session.commit()
+        return result.rowcount == 1
+    
+    def refund_validation_usage(self) -> None:
+        """Give back a validation reserved by reserve_validation_usage() (caller commits)."""
+        column_name, _ = self._validation_quota()
+        if column_name is None:
+            return
+        column = getattr(User, column_name)
+        db.session.execute(db.update(User).where(User.id == self.id, column > 0).values({column: column - 1}))
+    
     def increment_connection_usage(self):
         """Increment connection request usage counter."""
         subscription_type = self.subscription_type or "free"
@@ -564,6 +624,13 @@ class UserRun(db.Model):
     run_id = db.Column(db.String(255), unique=True, nullable=False, index=True)
     inputs = db.Column(db.Text)  # JSON string
     reports = db.Column(db.Text)  # JSON string
+    enhancements = db.Column(db.Text, nullable=True)  # JSON string: stored /api/enhance-report sections
+    enhanced_at = db.Column(db.DateTime, nullable=True)
+    # Denormalized summary for dashboard lists (see app/services/report_summaries.py)
+    idea_count = db.Column(db.Integer, nullable=True)
+    top_idea_title = db.Column(db.String(255), nullable=True)
+    interest_area = db.Column(db.String(255), nullable=True)
+    top_ideas = db.Column(db.Text, nullable=True)  # JSON string: first few {index, title, summary}
     status = db.Column(db.String(50), default="pending", index=True)  # pending, processing, completed, failed
     created_at = db.Column(db.DateTime, default=utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
@@ -589,6 +656,10 @@ class UserValidation(db.Model):
     category_answers = db.Column(db.Text)  # JSON string
     idea_explanation = db.Column(db.Text)
     validation_result = db.Column(db.Text)  # JSON string
+    # Denormalized summary for dashboard lists (see app/services/report_summaries.py)
+    overall_score = db.Column(db.Float, nullable=True)
+    idea_title = db.Column(db.String(255), nullable=True)
+    interest_area = db.Column(db.String(255), nullable=True)
     status = db.Column(db.String(50), default="completed", index=True)  # pending, completed, failed
     created_at = db.Column(db.DateTime, default=utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
@@ -785,12 +856,14 @@ class Payment(db.Model):
     status = db.Column(db.String(50), default="pending", index=True)  # pending, completed, failed, refunded
     created_at = db.Column(db.DateTime, default=utcnow, index=True)
     completed_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
     
     # Composite indexes for common queries
     __table_args__ = (
         Index('idx_payment_user_created', 'user_id', 'created_at'),
         Index('idx_payment_user_status', 'user_id', 'status'),
         Index('idx_payment_status_created', 'status', 'created_at'),  # For admin reports
+        Index('idx_payment_updated_at', 'updated_at'),  # For incremental analytics rollups
         Index('idx_payment_stripe_id', 'stripe_payment_intent_id'),  # Already unique, but explicit for clarity
     )
 
@@ -891,6 +964,59 @@ class IdeaListing(db.Model):
     )
 
 
+class FounderProfileTag(db.Model):
+    """Normalized skill/industry tag of a founder profile (indexed matching, see app.services.founder_matching)."""
+    __tablename__ = "founder_profile_tags"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    founder_profile_id = db.Column(db.Integer, db.ForeignKey("founder_profiles.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # "skill" (primary_skills) or "industry" (industries_of_interest)
+    tag = db.Column(db.String(200), nullable=False)  # lower-cased, whitespace-collapsed
+    
+    __table_args__ = (
+        Index('idx_profile_tag_lookup', 'kind', 'tag', 'founder_profile_id'),
+    )
+
+
+class IdeaListingTag(db.Model):
+    """Normalized skill-needed tag of an idea listing."""
+    __tablename__ = "idea_listing_tags"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    idea_listing_id = db.Column(db.Integer, db.ForeignKey("idea_listings.id", ondelete="CASCADE"), nullable=False, index=True)
+    tag = db.Column(db.String(200), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_listing_tag_lookup', 'tag', 'idea_listing_id'),
+    )
+
+
+# Full-text search (see app.services.founder_search). On PostgreSQL each table
+# gets a generated, weighted tsvector column with a GIN index, so the index is
+# maintained by the database on every INSERT/UPDATE. SQLite uses FTS5 tables
+# that the search service keeps in sync instead.
+IDEA_LISTING_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(brief_description, '')), 'B')"
+)
+FOUNDER_PROFILE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(looking_for, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(bio, '')), 'B')"
+)
+
+for _table, _vector, _index in (
+    (IdeaListing.__table__, IDEA_LISTING_SEARCH_VECTOR, "idx_idea_listings_search"),
+    (FounderProfile.__table__, FOUNDER_PROFILE_SEARCH_VECTOR, "idx_founder_profiles_search"),
+):
+    event.listen(_table, "after_create", DDL(
+        f"ALTER TABLE {_table.name} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({_vector}) STORED"
+    ).execute_if(dialect="postgresql"))
+    event.listen(_table, "after_create", DDL(
+        f"CREATE INDEX IF NOT EXISTS {_index} ON {_table.name} USING GIN (search_vector)"
+    ).execute_if(dialect="postgresql"))
+
+
 class ConnectionRequest(db.Model):
     """Connection request between founders."""
     __tablename__ = "connection_requests"
@@ -998,6 +1124,14 @@ class ConnectionStatus(str):
     DECLINED = "declined"
 
 
+class EmailStatus(str):
+    """Email outbox status enum."""
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
 class StripeEvent(db.Model):
     """Stripe webhook events for idempotency."""
     __tablename__ = "stripe_events"
@@ -1034,3 +1168,53 @@ class AuditLog(db.Model):
         Index('idx_audit_resource', 'resource_type', 'resource_id', 'created_at'),
         Index('idx_audit_created', 'created_at'),  # For time-based queries
     )
+
+
+class AnalyticsRollup(db.Model):
+    """Pre-aggregated admin analytics (maintained by app.services.admin_analytics)."""
+    __tablename__ = "analytics_rollups"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    metric = db.Column(db.String(50), nullable=False)  # revenue, users, totals, refresh
+    bucket = db.Column(db.String(20), nullable=False, default="all")  # YYYY-MM for revenue, "all" otherwise
+    dimension = db.Column(db.String(50), nullable=False, default="")  # subscription_type, table name, etc.
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
+    
+    __table_args__ = (
+        Index('idx_rollup_metric_bucket_dim', 'metric', 'bucket', 'dimension', unique=True),
+    )
+
+
+class UsageCounter(db.Model):
+    """Incrementally maintained counters behind /api/public/usage-stats (see app.services.usage_stats)."""
+    __tablename__ = "usage_counters"
+    
+    name = db.Column(db.String(100), primary_key=True)  # e.g. total_validations, validations:2025-01
+    value = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=utcnow, onupdate=utcnow)
+
+
+class EmailOutbox(db.Model):
+    """Queued outgoing emails, delivered in the background by app.services.email_outbox."""
+    __tablename__ = "email_outbox"
+    
+    id = db.Column(db.Integer, primary_key=True)
+    dedupe_key = db.Column(db.String(255), unique=True, nullable=True)  # e.g. subscription_activated:<payment_intent_id>
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(500), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    text_content = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=utcnow)
+    claim_token = db.Column(db.String(32), nullable=True)  # Set by the sender that claimed the row
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=utcnow, index=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('idx_email_outbox_due', 'status', 'next_attempt_at'),
+    )
@@ -1,13 +1,12 @@
 """Admin routes blueprint - admin dashboard and management endpoints."""
-from flask import Blueprint, request, Response, current_app
+from flask import Blueprint, request, Response, current_app, stream_with_context
 from typing import Any, Dict
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import os
 import json
+import itertools
 import secrets
-import csv
-from io import StringIO
 
 from sqlalchemy import func, extract, delete
 from sqlalchemy.orm import joinedload
@@ -30,7 +29,9 @@ from app.constants import (
     MIN_PASSWORD_LENGTH, DEV_MFA_CODE,
     ErrorMessages,
 )
-from app.services.email_service import email_service
+from app.services.email_outbox import email_outbox
+from app.services.report_export import iter_report_rows, iter_csv, iter_gzip
+from app.services import admin_analytics
 from app.services.email_templates import (
     admin_password_reset_email,
     get_base_template,
@@ -105,40 +106,8 @@ def get_admin_stats() -> Any:
         return forbidden_response(ErrorMessages.UNAUTHORIZED)
     
     try:
-        # Get stats from database
-        total_users = User.query.count()
-        total_runs = UserRun.query.count()
-        total_validations = UserValidation.query.count()
-        total_payments = Payment.query.filter_by(status=PaymentStatus.COMPLETED).count()
-        total_revenue = db.session.query(func.sum(Payment.amount)).filter_by(status=PaymentStatus.COMPLETED).scalar() or 0
-        
-        # Subscription stats
-        # Compare directly - PostgreSQL handles timezone-aware datetime comparisons
-        now = utcnow()
-        active_subscriptions = User.query.filter(
-            User.payment_status == PaymentStatus.ACTIVE,
-            User.subscription_expires_at > now
-        ).count()
-        free_trial_users = User.query.filter_by(subscription_type=SubscriptionTier.FREE_TRIAL).count()
-        weekly_subscribers = User.query.filter_by(subscription_type="weekly").count()  # Legacy
-        starter_subscribers = User.query.filter_by(subscription_type=SubscriptionTier.STARTER).count()
-        pro_subscribers = User.query.filter_by(subscription_type=SubscriptionTier.PRO).count()
-        # Backward compatibility: monthly subscribers (migrated to pro)
-        monthly_subscribers = User.query.filter_by(subscription_type="monthly").count()  # Legacy
-        
-        stats = {
-            "total_users": total_users,
-            "total_runs": total_runs,
-            "total_validations": total_validations,
-            "total_payments": total_payments,
-            "total_revenue": float(total_revenue),
-            "active_subscriptions": active_subscriptions,
-            "free_trial_users": free_trial_users,
-            "weekly_subscribers": weekly_subscribers,
-            "starter_subscribers": starter_subscribers,
-            "pro_subscribers": pro_subscribers,
-            "monthly_subscribers": monthly_subscribers,  # Backward compatibility (migrated to pro)
-        }
+        # Grouped queries (or the rollup table when ADMIN_ANALYTICS_ROLLUP is on)
+        stats = admin_analytics.get_admin_stats()
         
         return success_response({"stats": stats})
     except Exception as exc:
@@ -146,6 +115,75 @@ def get_admin_stats() -> Any:
         return internal_error_response(str(exc))
 
 
+@bp.post("/api/admin/analytics/refresh")
+def refresh_admin_analytics() -> Any:
+    """Refresh the analytics rollup table; ``?full=true`` rebuilds every month (admin only)."""
+    if not check_admin_auth():
+        return forbidden_response(ErrorMessages.UNAUTHORIZED)
+    
+    try:
+        full = request.args.get("full", "false").lower() == "true"
+        return success_response({"refresh": admin_analytics.refresh_rollups(full=full)})
+    except Exception as exc:
+        current_app.logger.exception("Failed to refresh analytics rollups: %s", exc)
+        return internal_error_response(str(exc))
+
+
+@bp.get("/api/admin/cache-stats")
+def get_cache_stats() -> Any:
+    """Get per-tier hit/miss/latency stats for the tool cache (admin only)."""
+    if not check_admin_auth():
+        return forbidden_response(ErrorMessages.UNAUTHORIZED)
+    
+    try:
+        from app.utils.layered_cache import get_layered_cache
+        return success_response({"cache": get_layered_cache().get_stats()})
+    except Exception as exc:
+        current_app.logger.exception("Failed to get cache stats: %s", exc)
+        return internal_error_response(str(exc))
+
+
+@bp.get("/api/admin/llm-client-stats")
+def get_llm_client_stats() -> Any:
+    """Get pooled LLM client and connection reuse stats (admin only)."""
+    if not check_admin_auth():
+        return forbidden_response(ErrorMessages.UNAUTHORIZED)
+    
+    try:
+        from app.services.llm_clients import llm_client_registry
+        return success_response({"llm_clients": llm_client_registry.get_stats()})
+    except Exception as exc:
+        current_app.logger.exception("Failed to get LLM client stats: %s", exc)
+        return internal_error_response(str(exc))
+
+
+@bp.get("/api/admin/traces")
+def get_traces() -> Any:
+    """Get recently finished tracing spans, optionally for one trace_id (admin only)."""
+    if not check_admin_auth():
+        return forbidden_response(ErrorMessages.UNAUTHORIZED)
+    
+    from app.utils.tracing import tracer
+    exporter = tracer.memory_exporter()
+    spans = exporter.spans(request.args.get("trace_id")) if exporter else []
+    return success_response({
+        "enabled": tracer.enabled,
+        "buffered": exporter is not None,
+        "stats": dict(tracer.stats),
+        "spans": spans,
+    })
+
+
+@bp.get("/metrics")
+def get_metrics() -> Any:
+    """Expose process metrics in the Prometheus text format (admin only)."""
+    if not check_admin_auth():
+        return forbidden_response(ErrorMessages.UNAUTHORIZED)
+    
+    from app.utils.metrics import CONTENT_TYPE, metrics_registry
+    return Response(metrics_registry.render(), content_type=CONTENT_TYPE)
+
+
 @bp.get("/api/admin/users")
 def get_admin_users() -> Any:
     """Get all users (admin only)."""
@@ -245,10 +283,10 @@ def get_admin_user_detail(user_id: int) -> Any:
         user = User.query.get_or_404(user_id)
         
         # Batch load related data - these queries are already optimized with limits
-        runs = UserRun.query.filter_by(user_id=user_id, is_deleted=False).order_by(UserRun.created_at.desc()).limit(ADMIN_USER_DETAIL_LIMIT).all()
-        validations = UserValidation.query.filter_by(user_id=user_id, is_deleted=False).order_by(UserValidation.created_at.desc()).limit(ADMIN_USER_DETAIL_LIMIT).all()
+        runs = user.runs_query().limit(ADMIN_USER_DETAIL_LIMIT).all()
+        validations = user.validations_query().limit(ADMIN_USER_DETAIL_LIMIT).all()
         payments = Payment.query.filter_by(user_id=user_id).order_by(Payment.created_at.desc()).limit(ADMIN_PAYMENTS_LIMIT).all()
-        sessions = UserSession.query.filter_by(user_id=user_id).order_by(UserSession.created_at.desc()).limit(ADMIN_SESSIONS_LIMIT).all()
+        sessions = user.sessions_query().limit(ADMIN_SESSIONS_LIMIT).all()
         
         return success_response({
             "user": user.to_dict(),
@@ -504,7 +542,7 @@ def admin_forgot_password() -> Any:
     
     try:
         html_content, text_content = admin_password_reset_email(email, reset_link)
-        email_service.send_email(
+        email_outbox.enqueue(
             to_email=email,
             subject="Admin Password Reset - Startup Idea Advisor",
             html_content=html_content,
@@ -578,6 +616,10 @@ def clear_validations_and_runs() -> Any:
         # Commit the deletions
         db.session.commit()
         
+        # Drop cached token -> session snapshots for the deleted sessions
+        from app.utils.session_cache import session_token_cache
+        session_token_cache.clear()
+        
         current_app.logger.info(f"Admin cleared all data: {runs_count} runs, {validations_count} validations, and {sessions_count} sessions deleted")
         
         return success_response({
@@ -595,162 +637,51 @@ def clear_validations_and_runs() -> Any:
 
 @bp.get("/api/admin/reports/export")
 def export_report() -> Any:
-    """Export reports as CSV (admin only)."""
+    """
+    Export reports as CSV (admin only).
+    
+    Rows are streamed as they are read (keyset-paged, column projections
+    only). ``?gzip=true`` returns a gzip-compressed ``.csv.gz``.
+    """
     if not check_admin_auth():
         return forbidden_response(ErrorMessages.UNAUTHORIZED)
     
     report_type = request.args.get("type", "full")
+    use_gzip = request.args.get("gzip", "false").lower() == "true"
+    filename = f"{report_type}_report_{utcnow().strftime('%Y%m%d')}.csv"
     
+    chunks = iter_csv(iter_report_rows(report_type))
     try:
-        output = StringIO()
-        writer = csv.writer(output)
-        
-        if report_type == "users":
-            writer.writerow(["ID", "Email", "Subscription Type", "Payment Status", "Days Remaining", "Created At", "Subscription Started", "Subscription Expires"])
-            users = User.query.all()
-            for user in users:
-                writer.writerow([
-                    user.id,
-                    user.email,
-                    user.subscription_type or DEFAULT_SUBSCRIPTION_TYPE,
-                    user.payment_status or "inactive",
-                    user.days_remaining(),
-                    serialize_datetime(user.created_at) or "",
-                    serialize_datetime(user.subscription_started_at) or "",
-                    serialize_datetime(user.subscription_expires_at) or "",
-                ])
-        
-        elif report_type == "payments":
-            writer.writerow(["ID", "User Email", "Amount", "Currency", "Subscription Type", "Status", "Stripe Payment Intent ID", "Created At", "Completed At"])
-            # Use eager loading to prevent N+1 queries
-            payments = Payment.query.options(
-                joinedload(Payment.user)
-            ).order_by(Payment.created_at.desc()).all()
-            for payment in payments:
-                writer.writerow([
-                    payment.id,
-                    payment.user.email if payment.user else "N/A",
-                    payment.amount,
-                    payment.currency,
-                    payment.subscription_type,
-                    payment.status,
-                    payment.stripe_payment_intent_id or "",
-                    serialize_datetime(payment.created_at) or "",
-                    serialize_datetime(payment.completed_at) or "",
-                ])
-        
-        elif report_type == "activity":
-            writer.writerow(["Type", "ID", "User Email", "Run/Validation ID", "Created At"])
-            # Use eager loading to prevent N+1 queries
-            runs = UserRun.query.options(
-                joinedload(UserRun.user)
-            ).filter_by(is_deleted=False).order_by(UserRun.created_at.desc()).all()
-            for run in runs:
-                writer.writerow([
-                    "Run",
-                    run.id,
-                    run.user.email if run.user else "N/A",
-                    run.run_id,
-                    serialize_datetime(run.created_at) or "",
-                ])
-            validations = UserValidation.query.options(
-                joinedload(UserValidation.user)
-            ).filter_by(is_deleted=False).order_by(UserValidation.created_at.desc()).all()
-            for validation in validations:
-                writer.writerow([
-                    "Validation",
-                    validation.id,
-                    validation.user.email if validation.user else "N/A",
-                    validation.validation_id,
-                    serialize_datetime(validation.created_at) or "",
-                ])
-        
-        elif report_type == "subscriptions":
-            writer.writerow(["User Email", "Subscription Type", "Status", "Started At", "Expires At", "Days Remaining", "Monthly Validations Used", "Monthly Discoveries Used"])
-            # Filter deleted users and use index on subscription_type
-            users = User.query.filter(
-                User.subscription_type.in_(["starter", "pro", "weekly"]),
-                User.is_active == True
-            ).all()
-            for user in users:
-                writer.writerow([
-                    user.email,
-                    user.subscription_type,
-                    PaymentStatus.ACTIVE if user.is_subscription_active() else PaymentStatus.FAILED,  # Using FAILED as expired
-                    serialize_datetime(user.subscription_started_at) or "",
-                    serialize_datetime(user.subscription_expires_at) or "",
-                    user.days_remaining(),
-                    user.monthly_validations_used,
-                    user.monthly_discoveries_used,
-                ])
-        
-        elif report_type == "revenue":
-            writer.writerow(["Period", "Total Revenue", "Payment Count", "Average Payment", "Subscription Type Breakdown"])
-            # Group by month - use eager loading and filter efficiently
-            payments = Payment.query.filter_by(status="completed").order_by(Payment.created_at.desc()).all()
-            revenue_by_month = {}
-            for payment in payments:
-                if payment.created_at:
-                    month_key = payment.created_at.strftime("%Y-%m")
-                    if month_key not in revenue_by_month:
-                        revenue_by_month[month_key] = {"revenue": 0, "count": 0, "types": {}}
-                    revenue_by_month[month_key]["revenue"] += payment.amount
-                    revenue_by_month[month_key]["count"] += 1
-                    sub_type = payment.subscription_type or "unknown"
-                    revenue_by_month[month_key]["types"][sub_type] = revenue_by_month[month_key]["types"].get(sub_type, 0) + payment.amount
-            
-            for month, data in sorted(revenue_by_month.items()):
-                avg = data["revenue"] / data["count"] if data["count"] > 0 else 0
-                types_str = ", ".join([f"{k}: ${v:.2f}" for k, v in data["types"].items()])
-                writer.writerow([
-                    month,
-                    f"${data['revenue']:.2f}",
-                    data["count"],
-                    f"${avg:.2f}",
-                    types_str,
-                ])
-        
-        else:  # full report
-            writer.writerow(["Report Type", "Data"])
-            # Users
-            writer.writerow(["USERS", ""])
-            writer.writerow(["ID", "Email", "Subscription Type", "Payment Status", "Days Remaining", "Created At"])
-            users = User.query.all()
-            for user in users:
-                writer.writerow([
-                    user.id,
-                    user.email,
-                    user.subscription_type or DEFAULT_SUBSCRIPTION_TYPE,
-                    user.payment_status or "inactive",
-                    user.days_remaining(),
-                    serialize_datetime(user.created_at) or "",
-                ])
-            writer.writerow([])
-            # Payments
-            writer.writerow(["PAYMENTS", ""])
-            writer.writerow(["ID", "User Email", "Amount", "Currency", "Subscription Type", "Status", "Created At"])
-            # Use eager loading to prevent N+1 queries
-            payments = Payment.query.options(
-                joinedload(Payment.user)
-            ).order_by(Payment.created_at.desc()).all()
-            for payment in payments:
-                writer.writerow([
-                    payment.id,
-                    payment.user.email if payment.user else "N/A",
-                    payment.amount,
-                    payment.currency,
-                    payment.subscription_type,
-                    payment.status,
-                    serialize_datetime(payment.created_at) or "",
-                ])
-        
-        output.seek(0)
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-Disposition": f"attachment; filename={report_type}_report_{utcnow().strftime('%Y%m%d')}.csv"}
-        )
+        # Run the first page's query before committing to a 200 response
+        first_chunk = next(chunks, "")
     except Exception as exc:
+        db.session.rollback()
         current_app.logger.exception("Failed to export report: %s", exc)
         return internal_error_response(str(exc))
+    
+    def generate():
+        text = itertools.chain([first_chunk], chunks)
+        try:
+            if use_gzip:
+                yield from iter_gzip(text)
+            else:
+                for chunk in text:
+                    yield chunk.encode("utf-8")
+        except Exception as exc:
+            # Headers are already sent; abort the stream so a truncated file
+            # is never delivered as a complete one
+            current_app.logger.exception("Failed to export report: %s", exc)
+            raise
+    
+    if use_gzip:
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/gzip",
+            headers={"Content-Disposition": f"attachment; filename={filename}.gz"}
+        )
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
 
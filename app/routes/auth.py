@@ -7,7 +7,7 @@ import traceback
 
 from app.models.database import db, User, SubscriptionTier, PaymentStatus
 from app.models.database import utcnow, normalize_datetime
-from app.utils import create_user_session, get_current_session, require_auth
+from app.utils import create_user_session, get_current_session, require_auth, forget_session
 from app.utils.response_helpers import (
     success_response, error_response, not_found_response,
     unauthorized_response, internal_error_response
@@ -20,7 +20,7 @@ from app.constants import (
     ErrorMessages,
 )
 from app.services.audit_service import log_login, log_password_reset
-from app.services.email_service import email_service
+from app.services.email_outbox import email_outbox
 from app.services.email_templates import (
     welcome_email,
     password_reset_email,
@@ -123,7 +123,7 @@ def register() -> Any:
         # Send welcome email
         try:
             html_content, text_content = welcome_email(user.email)
-            email_service.send_email(
+            email_outbox.enqueue(
                 to_email=user.email,
                 subject="Welcome to Startup Idea Advisor! 🚀",
                 html_content=html_content,
@@ -143,7 +143,7 @@ def register() -> Any:
                 <p><strong>Subscription:</strong> {user.subscription_type} (Free Trial)</p>
                 <p><strong>Expires:</strong> {user.subscription_expires_at.strftime('%Y-%m-%d') if user.subscription_expires_at else 'N/A'}</p>
                 """
-                email_service.send_email(
+                email_outbox.enqueue(
                     to_email=admin_email,
                     subject=f"New User: {user.email}",
                     html_content=get_base_template(admin_html),
@@ -314,6 +314,7 @@ def logout() -> Any:
     """Logout user."""
     session = get_current_session()
     if session:
+        forget_session(session)
         db.session.delete(session)
         db.session.commit()
     
@@ -378,7 +379,7 @@ def forgot_password() -> Any:
     
     try:
         html_content, text_content = password_reset_email(user.email, reset_link)
-        email_service.send_email(
+        email_outbox.enqueue(
             to_email=user.email,
             subject="Reset Your Password - Idea Bunch",
             html_content=html_content,
@@ -435,7 +436,7 @@ def reset_password() -> Any:
     # Send confirmation email
     try:
         html_content, text_content = password_changed_email(user.email)
-        email_service.send_email(
+        email_outbox.enqueue(
             to_email=user.email,
             subject="Password Changed - Idea Bunch",
             html_content=html_content,
@@ -478,7 +479,7 @@ def change_password() -> Any:
     # Send confirmation email
     try:
         html_content, text_content = password_changed_email(user.email)
-        email_service.send_email(
+        email_outbox.enqueue(
             to_email=user.email,
             subject="Password Changed - Idea Bunch",
             html_content=html_content,
@@ -1,27 +1,30 @@
 """Discovery routes blueprint - idea discovery endpoints."""
 from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
-from typing import Any, Dict, Iterator, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 import json
 import time
 
-from openai import OpenAI
-
-from app.models.database import db, User, UserSession, UserRun, utcnow
+from app.models.database import db, User, UserSession, UserRun, RunStatus, utcnow
 from app.utils import (
     PROFILE_FIELDS,
     get_current_session,
     require_auth,
     _validate_discovery_inputs,
 )
+from app.utils import metrics
+from app.utils.json_helpers import json_dumps, sse_event
 from app.utils.validators import validate_text_field, sanitize_text
 from app.utils.performance_metrics import (
     start_metrics_collection,
     finalize_metrics,
 )
 from app.services.unified_discovery_service import run_unified_discovery
+from app.services.llm_clients import get_openai_client
+from app.services.report_summaries import apply_run_summary
+from app.services.usage_stats import usage_stats
 
 bp = Blueprint("discovery", __name__)
 
@@ -163,7 +166,7 @@ def run_crew() -> Any:
         # Initialize timing logger
         try:
             from app.utils.timing_logger import init_timing_logger
-            init_timing_logger()  # Uses default docs/timing_logs.json
+            init_timing_logger()  # Uses default docs/timing_logs/
         except ImportError:
             pass
         
@@ -312,15 +315,18 @@ def run_crew() -> Any:
             user_run = UserRun(
                 user_id=user.id,
                 run_id=run_id,
-                inputs=json.dumps(payload),
-                reports=json.dumps(outputs),
+                inputs=json_dumps(payload),
+                reports=json_dumps(outputs),
+                status=RunStatus.COMPLETED,
             )
+            apply_run_summary(user_run)
             db.session.add(user_run)
             # Increment usage counter
             user.increment_discovery_usage()
             # Refresh session activity after long operation completes
             if session:
                 session.last_activity = utcnow()
+            usage_stats.record_run_completed(user_run)
             db.session.commit()
 
         response = {
@@ -337,6 +343,8 @@ def run_crew() -> Any:
                 "tool_precompute_time": round(metadata.get("tool_precompute_time", 0), 2),
                 "llm_time": round(metadata.get("llm_time", 0), 2),
                 "cache_hit": metadata.get("cache_hit", False),
+                "input_tokens": metadata.get("input_tokens", 0),
+                "cached_input_tokens": metadata.get("cached_input_tokens", 0),
             }
         
         return jsonify(response)
@@ -411,7 +419,7 @@ def _stream_discovery_response_live(
         """Generate SSE stream chunks from live iterator - TRUE streaming."""
         # Send initial metadata
         run_id = f"run_{int(time.time())}_{user.id}" if user else None
-        yield f"data: {json.dumps({'event': 'start', 'run_id': run_id})}\n\n"
+        yield sse_event({'event': 'start', 'run_id': run_id})
         
         # Track full response for post-processing
         full_response = ""
@@ -430,12 +438,12 @@ def _stream_discovery_response_live(
                 
                 # Handle special events
                 if chunk == "__HEARTBEAT__":
-                    yield f"data: {json.dumps({'event': 'heartbeat', 'metadata': chunk_metadata})}\n\n"
+                    yield sse_event({'event': 'heartbeat', 'metadata': chunk_metadata})
                     continue
                 
                 if isinstance(chunk, str) and chunk.startswith("__TOOL_COMPLETE__:"):
                     tool_name = chunk.split(":", 1)[1]
-                    yield f"data: {json.dumps({'event': 'tool_complete', 'tool': tool_name})}\n\n"
+                    yield sse_event({'event': 'tool_complete', 'tool': tool_name})
                     continue
                 
                 # Regular chunk - accumulate and stream immediately
@@ -444,7 +452,7 @@ def _stream_discovery_response_live(
                     metadata = chunk_metadata
                     
                     # Yield chunk immediately as SSE event (TRUE streaming, no buffering > 200ms)
-                    yield f"data: {json.dumps({'event': 'delta', 'text': chunk})}\n\n"
+                    yield sse_event({'event': 'delta', 'text': chunk})
         
         except Exception as e:
             # Log structured error
@@ -458,7 +466,7 @@ def _stream_discovery_response_live(
                 exc_info=True
             )
             # Send SSE error event immediately
-            yield f"data: {json.dumps({'event': 'error', 'error': str(e), 'error_type': type(e).__name__})}\n\n"
+            yield sse_event({'event': 'error', 'error': str(e), 'error_type': type(e).__name__})
             return
         
         # Post-processing: Parse, save, and send completion
@@ -473,23 +481,26 @@ def _stream_discovery_response_live(
                 user_run = UserRun(
                     user_id=user.id,
                     run_id=run_id,
-                    inputs=json.dumps(payload),
-                    reports=json.dumps(outputs),
+                    inputs=json_dumps(payload),
+                    reports=json_dumps(outputs),
+                    status=RunStatus.COMPLETED,
                 )
+                apply_run_summary(user_run)
                 db.session.add(user_run)
                 user.increment_discovery_usage()
                 if session:
                     session.last_activity = utcnow()
+                usage_stats.record_run_completed(user_run)
                 db.session.commit()
             except Exception as e:
                 current_app.logger.warning(f"Failed to save run during streaming: {e}")
         
         # Send completion event
         total_time = time.time() - start_time
-        yield f"data: {json.dumps({'event': 'done', 'total_time': round(total_time, 2), 'metadata': metadata})}\n\n"
+        yield sse_event({'event': 'done', 'total_time': round(total_time, 2), 'metadata': metadata})
     
     return Response(
-        stream_with_context(generate()),
+        stream_with_context(metrics.track_stream("discovery", generate())),
         mimetype='text/event-stream',
         headers={
             'Cache-Control': 'no-cache',
@@ -498,51 +509,45 @@ def _stream_discovery_response_live(
     )
 
 
-@bp.post("/api/enhance-report")
-@require_auth
-def enhance_report() -> Any:
-    """Generate enhanced analysis (financial insights, risk radar, competitive analysis, etc.) in parallel."""
-    session = get_current_session()
-    if not session:
-        return jsonify({"success": False, "error": "Not authenticated"}), 401
-    
-    user = session.user
-    data: Dict[str, Any] = request.get_json(force=True, silent=True) or {}
-    run_id = data.get("run_id")
-    
-    if not run_id:
-        return jsonify({"success": False, "error": "run_id required"}), 400
+ENHANCEMENT_SECTIONS = (
+    "financial",
+    "risk_radar",
+    "competitive",
+    "market",
+    "success_metrics",
+    "tool_stack",
+    "validation_plan",
+)
+
+
+def _enhancement_context(user_run: UserRun) -> Tuple[Dict[str, Any], str]:
+    """Parse a run's inputs and pick the idea the enhancements are about."""
+    inputs = json.loads(user_run.inputs) if isinstance(user_run.inputs, str) else user_run.inputs
+    reports = json.loads(user_run.reports) if isinstance(user_run.reports, str) else user_run.reports
+    inputs = inputs or {}
+    reports = reports or {}
     
-    # Get the run data
-    user_run = UserRun.query.filter_by(run_id=run_id, user_id=user.id).first()
-    if not user_run:
-        return jsonify({"success": False, "error": "Run not found"}), 404
+    # Get top idea from recommendations
+    recommendations = reports.get("personalized_recommendations", "")
+    top_idea = ""
+    if recommendations:
+        # Extract first idea from recommendations
+        import re
+        match = re.search(r'1\.\s+\*\*([^*]+)\*\*', recommendations)
+        if match:
+            top_idea = match.group(1)
     
-    try:
-        # Parse inputs and reports
-        inputs = json.loads(user_run.inputs) if isinstance(user_run.inputs, str) else user_run.inputs
-        reports = json.loads(user_run.reports) if isinstance(user_run.reports, str) else user_run.reports
-        
-        # Get top idea from recommendations
-        recommendations = reports.get("personalized_recommendations", "")
-        top_idea = ""
-        if recommendations:
-            # Extract first idea from recommendations
-            import re
-            match = re.search(r'1\.\s+\*\*([^*]+)\*\*', recommendations)
-            if match:
-                top_idea = match.group(1)
-        
-        # If no top idea found, use a default
-        if not top_idea:
-            top_idea = f"{inputs.get('goal_type', 'Startup idea')} in {inputs.get('interest_area', 'your interest area')}"
-        
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        
-        # Define enhancement functions
-        def get_enhanced_financial():
-            """Get enhanced financial insights with unit economics."""
-            prompt = f"""Analyze this startup idea and provide detailed financial insights with unit economics.
+    # If no top idea found, use a default
+    if not top_idea:
+        top_idea = f"{inputs.get('goal_type', 'Startup idea')} in {inputs.get('interest_area', 'your interest area')}"
+    return inputs, top_idea
+
+
+def _enhancement_tasks(client: Any, top_idea: str, inputs: Dict[str, Any]) -> Dict[str, Callable[[], Dict[str, Any]]]:
+    """One LLM call per enhancement section, keyed by section name."""
+    def get_enhanced_financial():
+        """Get enhanced financial insights with unit economics."""
+        prompt = f"""Analyze this startup idea and provide detailed financial insights with unit economics.
 
 Idea: {top_idea}
 User Budget: {inputs.get('budget_range', 'Not specified')}
@@ -558,21 +563,21 @@ Provide:
 - Funding requirements
 
 Format as structured JSON."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a startup financial advisor. Provide specific numbers, not ranges."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            return {"type": "financial", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        def get_enhanced_risk_radar():
-            """Get enhanced risk radar with specific risks."""
-            prompt = f"""Analyze this startup idea and provide specific risk radar.
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a startup financial advisor. Provide specific numbers, not ranges."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1500
+        )
+        return {"type": "financial", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    def get_enhanced_risk_radar():
+        """Get enhanced risk radar with specific risks."""
+        prompt = f"""Analyze this startup idea and provide specific risk radar.
 
 Idea: {top_idea}
 User Budget: {inputs.get('budget_range', 'Not specified')}
@@ -587,21 +592,21 @@ Provide 5-7 SPECIFIC risks (not generic like "market saturation" unless you expl
 - Concrete mitigation steps with specific tools/platforms
 
 Format as JSON array."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a startup risk advisor. Provide specific risks tied to the idea, not generic ones."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500
-            )
-            return {"type": "risk_radar", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        def get_competitive_analysis():
-            """Get deep competitive analysis."""
-            prompt = f"""Provide deep competitive analysis for: {top_idea}
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a startup risk advisor. Provide specific risks tied to the idea, not generic ones."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1500
+        )
+        return {"type": "risk_radar", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    def get_competitive_analysis():
+        """Get deep competitive analysis."""
+        prompt = f"""Provide deep competitive analysis for: {top_idea}
 
 Include:
 - Direct competitor comparison
@@ -611,21 +616,21 @@ Include:
 - Pricing comparison
 
 Format as structured analysis."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a competitive intelligence analyst."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1200
-            )
-            return {"type": "competitive", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        def get_market_intelligence():
-            """Get market intelligence and entry strategy."""
-            prompt = f"""Provide market intelligence and entry strategy for: {top_idea}
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a competitive intelligence analyst."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1200
+        )
+        return {"type": "competitive", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    def get_market_intelligence():
+        """Get market intelligence and entry strategy."""
+        prompt = f"""Provide market intelligence and entry strategy for: {top_idea}
 
 Include:
 - Market entry timing analysis
@@ -635,21 +640,21 @@ Include:
 - Entry strategy recommendations
 
 Format as structured analysis."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a market strategist."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1200
-            )
-            return {"type": "market", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        def get_success_metrics():
-            """Get success metrics and KPIs."""
-            prompt = f"""Define success metrics and KPIs for: {top_idea}
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a market strategist."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1200
+        )
+        return {"type": "market", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    def get_success_metrics():
+        """Get success metrics and KPIs."""
+        prompt = f"""Define success metrics and KPIs for: {top_idea}
 
 Provide KPIs for each phase:
 - Days 0-30: Specific metrics
@@ -659,21 +664,21 @@ Provide KPIs for each phase:
 Include tracking methods and success criteria.
 
 Format as structured JSON."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a startup metrics advisor."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return {"type": "success_metrics", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        def get_tool_stack():
-            """Get tool stack recommendations."""
-            prompt = f"""Recommend specific tool stack for: {top_idea}
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a startup metrics advisor."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1000
+        )
+        return {"type": "success_metrics", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    def get_tool_stack():
+        """Get tool stack recommendations."""
+        prompt = f"""Recommend specific tool stack for: {top_idea}
 
 User Budget: {inputs.get('budget_range', 'Not specified')}
 User Skills: {inputs.get('skill_strength', 'Not specified')}
@@ -686,21 +691,21 @@ Provide:
 - Cost estimates
 
 Format as structured list."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a startup tools advisor."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=800
-            )
-            return {"type": "tool_stack", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        def get_validation_plan():
-            """Get comprehensive validation plan."""
-            prompt = f"""Create comprehensive validation plan for: {top_idea}
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a startup tools advisor."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=800
+        )
+        return {"type": "tool_stack", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    def get_validation_plan():
+        """Get comprehensive validation plan."""
+        prompt = f"""Create comprehensive validation plan for: {top_idea}
 
 Include:
 - Validation prioritization (what to test first)
@@ -710,61 +715,211 @@ Include:
 - Validation tools and methods
 
 Format as structured plan."""
-            
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a startup validation advisor."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
-            return {"type": "validation_plan", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
         
-        # Execute all enhancements in parallel
-        current_app.logger.info("Starting parallel enhancement generation for run_id: %s", run_id)
+        response = client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are a startup validation advisor."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=1000
+        )
+        return {"type": "validation_plan", "content": response.choices[0].message.content, "tokens": response.usage.total_tokens}
+    
+    return {
+        "financial": get_enhanced_financial,
+        "risk_radar": get_enhanced_risk_radar,
+        "competitive": get_competitive_analysis,
+        "market": get_market_intelligence,
+        "success_metrics": get_success_metrics,
+        "tool_stack": get_tool_stack,
+        "validation_plan": get_validation_plan,
+    }
+
+
+def _stored_enhancements(user_run: UserRun) -> Dict[str, Any]:
+    """Previously generated sections for a run ({} if none)."""
+    if not user_run.enhancements:
+        return {}
+    try:
+        stored = json.loads(user_run.enhancements)
+    except (TypeError, ValueError):
+        return {}
+    sections = stored.get("enhancements") if isinstance(stored, dict) else None
+    return {k: v for k, v in (sections or {}).items() if v is not None}
+
+
+def _save_enhancements(user_run: UserRun, enhancements: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+    """Persist generated sections on the run. Failed sections (None) are left out so they are retried."""
+    try:
+        user_run.enhancements = json.dumps({
+            "enhancements": {k: v for k, v in enhancements.items() if v is not None},
+            "metadata": metadata,
+        })
+        user_run.enhanced_at = utcnow()
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        current_app.logger.warning("Failed to save enhancements for %s: %s", user_run.run_id, exc)
+
+
+def _generate_enhancements(
+    tasks: Dict[str, Callable[[], Dict[str, Any]]],
+) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """Run section tasks in parallel, yielding (section, result, error) as each one finishes."""
+    if not tasks:
+        return
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {executor.submit(func): section for section, func in tasks.items()}
+        for future in as_completed(futures):
+            section_name = futures[future]
+            try:
+                yield section_name, future.result(), None
+            except Exception as exc:
+                yield section_name, None, exc
+
+
+@bp.post("/api/enhance-report")
+@require_auth
+def enhance_report() -> Any:
+    """
+    Generate enhanced analysis (financial insights, risk radar, competitive analysis, etc.) in parallel.
+    
+    Generated sections are stored on the UserRun; repeat calls return the
+    stored copy and only generate sections that are missing (or all of them
+    with ``"refresh": true``). With ``?stream=true`` each section is sent as
+    an SSE event as soon as it is ready.
+    """
+    session = get_current_session()
+    if not session:
+        return jsonify({"success": False, "error": "Not authenticated"}), 401
+    
+    user = session.user
+    data: Dict[str, Any] = request.get_json(force=True, silent=True) or {}
+    run_id = data.get("run_id")
+    
+    if not run_id:
+        return jsonify({"success": False, "error": "run_id required"}), 400
+    
+    # Get the run data
+    user_run = UserRun.query.filter_by(run_id=run_id, user_id=user.id).first()
+    if not user_run:
+        return jsonify({"success": False, "error": "Run not found"}), 404
+    
+    stored = {} if data.get("refresh") is True else _stored_enhancements(user_run)
+    missing = [section for section in ENHANCEMENT_SECTIONS if section not in stored]
+    
+    if request.args.get('stream', 'false').lower() == 'true' or data.get("stream") is True:
+        return _stream_enhancements(user_run, stored, missing)
+    
+    if not missing:
+        return jsonify({
+            "success": True,
+            "run_id": run_id,
+            "enhancements": stored,
+            "metadata": {
+                "generation_time": 0,
+                "total_tokens": 0,
+                "cached": True,
+            }
+        })
+    
+    try:
+        inputs, top_idea = _enhancement_context(user_run)
+        tasks = _enhancement_tasks(get_openai_client(), top_idea, inputs)
+        
+        # Execute missing enhancements in parallel
+        current_app.logger.info("Starting parallel enhancement generation for run_id: %s (%d sections)", run_id, len(missing))
         start_time = time.time()
         
-        enhancements = {}
+        enhancements = dict(stored)
         total_tokens = 0
         
-        with ThreadPoolExecutor(max_workers=7) as executor:
-            futures = {
-                executor.submit(get_enhanced_financial): "financial",
-                executor.submit(get_enhanced_risk_radar): "risk_radar",
-                executor.submit(get_competitive_analysis): "competitive",
-                executor.submit(get_market_intelligence): "market",
-                executor.submit(get_success_metrics): "success_metrics",
-                executor.submit(get_tool_stack): "tool_stack",
-                executor.submit(get_validation_plan): "validation_plan",
-            }
-            
-            for future in as_completed(futures):
-                section_name = futures[future]
-                try:
-                    result = future.result()
-                    enhancements[section_name] = result["content"]
-                    total_tokens += result["tokens"]
-                    current_app.logger.info("Completed enhancement: %s (%d tokens)", section_name, result["tokens"])
-                except Exception as exc:
-                    current_app.logger.exception("Failed to generate %s: %s", section_name, exc)
-                    enhancements[section_name] = None
+        for section_name, result, error in _generate_enhancements({s: tasks[s] for s in missing}):
+            if error is None:
+                enhancements[section_name] = result["content"]
+                total_tokens += result["tokens"]
+                current_app.logger.info("Completed enhancement: %s (%d tokens)", section_name, result["tokens"])
+            else:
+                current_app.logger.error("Failed to generate %s: %s", section_name, error)
+                enhancements[section_name] = None
         
         elapsed_time = time.time() - start_time
         current_app.logger.info("Enhancement generation completed in %.2f seconds, total tokens: %d", elapsed_time, total_tokens)
         
+        metadata = {
+            "generation_time": elapsed_time,
+            "total_tokens": total_tokens,
+            "cached": False,
+            "cached_sections": sorted(stored),
+        }
+        _save_enhancements(user_run, enhancements, metadata)
+        
         return jsonify({
             "success": True,
             "run_id": run_id,
             "enhancements": enhancements,
-            "metadata": {
-                "generation_time": elapsed_time,
-                "total_tokens": total_tokens,
-            }
+            "metadata": metadata,
         })
         
     except Exception as exc:
         current_app.logger.exception("Failed to enhance report: %s", exc)
         return jsonify({"success": False, "error": str(exc)}), 500
 
+
+def _stream_enhancements(user_run: UserRun, stored: Dict[str, Any], missing: List[str]) -> Response:
+    """
+    Stream enhancement sections as Server-Sent Events.
+    
+    Stored sections are sent first (``cached: true``); each missing section
+    follows as soon as its LLM call finishes, rather than waiting for the
+    slowest one. Events: start, section, section_error, done, error.
+    """
+    run_id = user_run.run_id
+    
+    def generate():
+        yield sse_event({'event': 'start', 'run_id': run_id, 'sections': list(ENHANCEMENT_SECTIONS), 'pending': missing})
+        
+        enhancements = dict(stored)
+        for section_name, content in stored.items():
+            yield sse_event({'event': 'section', 'section': section_name, 'content': content, 'cached': True})
+        
+        start_time = time.time()
+        total_tokens = 0
+        if missing:
+            try:
+                inputs, top_idea = _enhancement_context(user_run)
+                tasks = _enhancement_tasks(get_openai_client(), top_idea, inputs)
+                for section_name, result, error in _generate_enhancements({s: tasks[s] for s in missing}):
+                    if error is None:
+                        enhancements[section_name] = result["content"]
+                        total_tokens += result["tokens"]
+                        yield sse_event({'event': 'section', 'section': section_name, 'content': result['content'], 'tokens': result['tokens'], 'cached': False})
+                    else:
+                        current_app.logger.error("Failed to generate %s: %s", section_name, error)
+                        enhancements[section_name] = None
+                        yield sse_event({'event': 'section_error', 'section': section_name, 'error': str(error)})
+            except Exception as exc:
+                current_app.logger.exception("Failed to enhance report: %s", exc)
+                yield sse_event({'event': 'error', 'error': str(exc), 'error_type': type(exc).__name__})
+                return
+        
+        metadata = {
+            "generation_time": time.time() - start_time,
+            "total_tokens": total_tokens,
+            "cached": not missing,
+            "cached_sections": sorted(stored),
+        }
+        if missing:
+            _save_enhancements(user_run, enhancements, metadata)
+        yield sse_event({'event': 'done', 'run_id': run_id, 'metadata': metadata})
+    
+    return Response(
+        stream_with_context(metrics.track_stream("enhance_report", generate())),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Disable nginx buffering
+        }
+    )
@@ -3,7 +3,7 @@ from flask import Blueprint, request, current_app
 from typing import Any, Dict, Optional
 import json
 
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, func, literal
 from sqlalchemy.orm import joinedload
 
 from app.models.database import (
@@ -17,12 +17,13 @@ from app.utils.response_helpers import (
     unauthorized_response, internal_error_response
 )
 from app.utils.serialization import serialize_datetime
+from app.utils.pagination import CursorError, paginate, parse_page_args
+from app.services import founder_matching, founder_search
 from app.utils.validators import (
     validate_text_field, sanitize_text, validate_url, 
     validate_string_array, detect_junk_data, validate_founder_psychology
 )
 from app.constants import (
-    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
     ErrorMessages,
 )
 
@@ -369,6 +370,8 @@ def create_founder_profile() -> Any:
         profile.is_public = bool(data.get("is_public", True))
     
     profile.updated_at = utcnow()
+    founder_matching.sync_profile_tags(profile)
+    founder_search.index_profile(profile)
     db.session.commit()
     
     return success_response({
@@ -543,6 +546,9 @@ def create_idea_listing() -> Any:
     )
     
     db.session.add(listing)
+    db.session.flush()
+    founder_matching.sync_listing_tags(listing)
+    founder_search.index_listing(listing)
     db.session.commit()
     
     return success_response({
@@ -601,8 +607,11 @@ def update_idea_listing(listing_id: int) -> Any:
         listing.stage = data.get("stage", "").strip() or None
     if "skills_needed" in data:
         listing.skills_needed = json.dumps(data.get("skills_needed", [])) if data.get("skills_needed") else None
+        founder_matching.sync_listing_tags(listing)
     if "commitment_level" in data:
         listing.commitment_level = data.get("commitment_level", "").strip() or None
+    if "title" in data or "brief_description" in data:
+        founder_search.index_listing(listing)
     
     listing.updated_at = utcnow()
     db.session.commit()
@@ -625,9 +634,8 @@ def browse_idea_listings() -> Any:
     user_profile = FounderProfile.query.filter_by(user_id=user.id).first()
     user_profile_id = user_profile.id if user_profile else None
     
-    # Pagination
-    page = request.args.get("page", 1, type=int)
-    per_page = min(request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    # Pagination (?page=N, or ?cursor=<next_cursor> for newest-first browsing)
+    page_args = parse_page_args(request.args)
     
     # Filters
     industry = request.args.get("industry")
@@ -635,6 +643,8 @@ def browse_idea_listings() -> Any:
     skills_needed = request.args.get("skills_needed")  # Comma-separated or single value
     commitment_level = request.args.get("commitment_level")
     location = request.args.get("location")  # Filter by founder profile location
+    sort = request.args.get("sort", "newest")  # "newest" or "match"
+    q = request.args.get("q")  # Full-text search over title and description
     
     # Build query - only show active, non-deleted listings
     query = IdeaListing.query.filter(
@@ -659,26 +669,45 @@ def browse_idea_listings() -> Any:
     if location:
         query = query.filter(FounderProfile.location.ilike(f"%{location}%"))
     if skills_needed:
-        # Filter by skills_needed (check if any skill in the JSON array matches)
-        skills_list = [s.strip() for s in skills_needed.split(",")]
-        for skill in skills_list:
-            query = query.filter(IdeaListing.skills_needed.ilike(f"%{skill}%"))
-    
-    # Order by newest first
-    query = query.order_by(IdeaListing.created_at.desc())
-    
-    # Paginate
-    total = query.count()
-    listings = query.offset((page - 1) * per_page).limit(per_page).all()
+        # Listing must need a skill containing each requested term (tag table lookups)
+        query = query.filter(*founder_matching.listing_tag_filter(founder_matching.parse_tag_param(skills_needed)))
+    search = founder_search.listing_matches(q)
+    if search is not None:
+        query = query.join(search, search.c.id == IdeaListing.id)
+    
+    # Order: match score (sort=match), then search relevance, then newest first
+    order_by = []
+    match_score = None
+    if sort == "match":
+        viewer = founder_matching.viewer_tags(user_profile)
+        scores = founder_matching.listing_match_scores(viewer)
+        match_score = literal(0) + founder_matching.listing_industry_bonus(viewer)
+        if scores is not None:
+            query = query.outerjoin(scores, scores.c.idea_listing_id == IdeaListing.id)
+            match_score = func.coalesce(scores.c.score, 0) + match_score
+        query = query.add_columns(match_score.label("match_score"))
+        order_by.append(match_score.desc())
+    if search is not None:
+        order_by.append(search.c.rank.desc())
+    try:
+        result = paginate(query, IdeaListing.created_at, IdeaListing.id, page_args, order_by=order_by)
+    except CursorError:
+        return error_response(ErrorMessages.INVALID_CURSOR, 400)
+    rows = result.items if match_score is not None else [(listing, None) for listing in result.items]
+    
+    snippets = founder_search.listing_snippets(q, [listing.id for listing, _ in rows]) if search is not None else {}
+    serialized = []
+    for listing, score in rows:
+        item = _serialize_idea_listing(listing, include_full_details=False)
+        if match_score is not None:
+            item["match_score"] = int(score or 0)
+        if search is not None:
+            item["snippet"] = snippets.get(listing.id, "")
+        serialized.append(item)
     
     return success_response({
-        "listings": [_serialize_idea_listing(listing, include_full_details=False) for listing in listings],
-        "pagination": {
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-            "pages": (total + per_page - 1) // per_page,
-        }
+        "listings": serialized,
+        "pagination": result.to_dict(),
     })
 
 
@@ -695,15 +724,16 @@ def browse_founder_profiles() -> Any:
     user_profile = FounderProfile.query.filter_by(user_id=user.id).first()
     user_profile_id = user_profile.id if user_profile else None
     
-    # Pagination
-    page = request.args.get("page", 1, type=int)
-    per_page = min(request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    # Pagination (?page=N, or ?cursor=<next_cursor> for newest-first browsing)
+    page_args = parse_page_args(request.args)
     
     # Filters
     skills = request.args.get("skills")  # Filter by primary_skills
     industries = request.args.get("industries")  # Filter by industries_of_interest
     commitment_level = request.args.get("commitment_level")
     location = request.args.get("location")
+    sort = request.args.get("sort", "newest")  # "newest" or "match"
+    q = request.args.get("q")  # Full-text search over looking_for and bio
     
     # Build query - only show active, public profiles
     query = FounderProfile.query.filter(
@@ -716,34 +746,54 @@ def browse_founder_profiles() -> Any:
         query = query.filter(FounderProfile.id != user_profile_id)
     
     # Apply filters
+    # Profile must have a skill/industry containing each requested term (tag table lookups)
     if skills:
-        skills_list = [s.strip() for s in skills.split(",")]
-        for skill in skills_list:
-            query = query.filter(FounderProfile.primary_skills.ilike(f"%{skill}%"))
+        query = query.filter(*founder_matching.profile_tag_filter(
+            founder_matching.KIND_SKILL, founder_matching.parse_tag_param(skills)))
     if industries:
-        industries_list = [i.strip() for i in industries.split(",")]
-        for industry in industries_list:
-            query = query.filter(FounderProfile.industries_of_interest.ilike(f"%{industry}%"))
+        query = query.filter(*founder_matching.profile_tag_filter(
+            founder_matching.KIND_INDUSTRY, founder_matching.parse_tag_param(industries)))
     if commitment_level:
         query = query.filter(FounderProfile.commitment_level == commitment_level)
     if location:
         query = query.filter(FounderProfile.location.ilike(f"%{location}%"))
-    
-    # Order by newest first
-    query = query.order_by(FounderProfile.created_at.desc())
-    
-    # Paginate
-    total = query.count()
-    profiles = query.offset((page - 1) * per_page).limit(per_page).all()
+    search = founder_search.profile_matches(q)
+    if search is not None:
+        query = query.join(search, search.c.id == FounderProfile.id)
+    
+    # Order: match score (sort=match), then search relevance, then newest first
+    order_by = []
+    match_score = None
+    if sort == "match":
+        # Complementary co-founders first: skills the viewer's listings need, shared industries
+        scores = founder_matching.profile_match_scores(founder_matching.viewer_tags(user_profile))
+        match_score = literal(0)
+        if scores is not None:
+            query = query.outerjoin(scores, scores.c.founder_profile_id == FounderProfile.id)
+            match_score = func.coalesce(scores.c.score, 0)
+        query = query.add_columns(match_score.label("match_score"))
+        order_by.append(match_score.desc())
+    if search is not None:
+        order_by.append(search.c.rank.desc())
+    try:
+        result = paginate(query, FounderProfile.created_at, FounderProfile.id, page_args, order_by=order_by)
+    except CursorError:
+        return error_response(ErrorMessages.INVALID_CURSOR, 400)
+    rows = result.items if match_score is not None else [(profile, None) for profile in result.items]
+    
+    snippets = founder_search.profile_snippets(q, [profile.id for profile, _ in rows]) if search is not None else {}
+    serialized = []
+    for profile, score in rows:
+        item = _serialize_founder_profile(profile, include_identity=False)
+        if match_score is not None:
+            item["match_score"] = int(score or 0)
+        if search is not None:
+            item["snippet"] = snippets.get(profile.id, "")
+        serialized.append(item)
     
     return success_response({
-        "profiles": [_serialize_founder_profile(profile, include_identity=False) for profile in profiles],
-        "pagination": {
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-            "pages": (total + per_page - 1) // per_page,
-        }
+        "profiles": serialized,
+        "pagination": result.to_dict(),
     })
 
 
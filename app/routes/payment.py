@@ -23,7 +23,7 @@ from app.constants import (
     USER_PAYMENT_HISTORY_LIMIT,
     ErrorMessages,
 )
-from app.services.email_service import email_service
+from app.services.email_outbox import email_outbox
 from app.services.email_templates import (
     subscription_activated_email,
     payment_failed_email,
@@ -229,11 +229,12 @@ def cancel_subscription() -> Any:
                 <p><strong>Access Until:</strong> {user.subscription_expires_at.strftime('%Y-%m-%d') if user.subscription_expires_at else 'N/A'}</p>
                 <p><strong>Date:</strong> {utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}</p>
                 """
-                email_service.send_email(
+                email_outbox.enqueue(
                     to_email=admin_email,
                     subject=f"Subscription Cancelled: {user.email}",
                     html_content=get_base_template(admin_html),
                     text_content=f"Subscription cancelled: {user.email}\nReason: {cancellation_reason}\nPlan: {user.subscription_type}",
+                    dedupe_key=f"subscription_cancelled_admin:{cancellation.id}",
                 )
         except Exception as e:
             current_app.logger.warning(f"Failed to send admin cancellation notification: {e}")
@@ -270,11 +271,12 @@ Resubscribe: https://ideabunch.com/pricing
 """
             
             html_content = get_base_template(content)
-            email_service.send_email(
+            email_outbox.enqueue(
                 to_email=user.email,
                 subject="Subscription Cancelled",
                 html_content=html_content,
                 text_content=text_content,
+                dedupe_key=f"subscription_cancelled:{cancellation.id}",
             )
         except Exception as e:
             current_app.logger.warning(f"Failed to send cancellation email: {e}")
@@ -454,7 +456,7 @@ def activate_subscription_dev() -> Any:
                 user_name=user.email,
                 subscription_type=subscription_type,
             )
-            email_service.send_email(
+            email_outbox.enqueue(
                 to_email=user.email,
                 subject="🎉 Your Subscription is Active! (Dev Mode)",
                 html_content=html_content,
@@ -564,7 +566,7 @@ def create_payment_intent() -> Any:
                     subscription_type=subscription_type,
                     error_message="Payment intent creation failed",
                 )
-                email_service.send_email(
+                email_outbox.enqueue(
                     to_email=user.email,
                     subject="Payment Failed - Idea Bunch",
                     html_content=html_content,
@@ -629,11 +631,12 @@ def confirm_payment() -> Any:
                     subscription_type=subscription_type,
                     error_message=error_message,
                 )
-                email_service.send_email(
+                email_outbox.enqueue(
                     to_email=user.email,
                     subject="Payment Failed - Idea Bunch",
                     html_content=html_content,
                     text_content=text_content,
+                    dedupe_key=f"payment_failed:{payment_intent_id}",
                 )
             except Exception as e:
                 current_app.logger.warning(f"Failed to send payment failure email to {user.email}: {e}")
@@ -672,11 +675,12 @@ def confirm_payment() -> Any:
                 user_name=user.email,
                 subscription_type=subscription_type,
             )
-            email_service.send_email(
+            email_outbox.enqueue(
                 to_email=user.email,
                 subject="🎉 Your Subscription is Active!",
                 html_content=html_content,
                 text_content=text_content,
+                dedupe_key=f"subscription_activated:{payment_intent_id}",
             )
         except Exception as e:
             current_app.logger.warning(f"Failed to send subscription activated email: {e}")
@@ -766,11 +770,13 @@ def stripe_webhook() -> Any:
                             user_name=user.email,
                             subscription_type=subscription_type,
                         )
-                        email_service.send_email(
+                        email_outbox.enqueue(
                             to_email=user.email,
                             subject="🎉 Your Subscription is Active!",
                             html_content=html_content,
                             text_content=text_content,
+                            dedupe_key=f"subscription_activated:{payment_intent_id}",
+                            commit=False,  # Queued in the webhook's transaction below
                         )
                     except Exception as e:
                         current_app.logger.warning(f"Failed to send subscription activated email: {e}")
@@ -797,11 +803,12 @@ def stripe_webhook() -> Any:
                         subscription_type=payment.subscription_type,
                         error_message="Payment failed",
                     )
-                    email_service.send_email(
+                    email_outbox.enqueue(
                         to_email=user.email,
                         subject="Payment Failed - Idea Bunch",
                         html_content=html_content,
                         text_content=text_content,
+                        dedupe_key=f"payment_failed:{payment_intent_id}",
                     )
                 except Exception as e:
                     current_app.logger.warning(f"Failed to send payment failure email: {e}")
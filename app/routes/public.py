@@ -7,8 +7,9 @@ import json
 from datetime import datetime, timezone
 
 from app.models.database import db, User, UserValidation, UserRun, utcnow
-from app.services.email_service import email_service
+from app.services.email_outbox import email_outbox
 from app.services.email_templates import get_base_template
+from app.services.usage_stats import usage_stats, DEFAULT_STATS
 
 bp = Blueprint("public", __name__)
 
@@ -69,7 +70,7 @@ Reply to: {email}
     
     try:
         # Send email to admin
-        email_service.send_email(
+        email_outbox.enqueue(
             to_email=admin_email,
             subject=f"Contact Form: {topic or 'General Inquiry'} - {name}",
             html_content=html_content,
@@ -98,7 +99,7 @@ Your message:
 If you have any urgent questions, feel free to reply to this email.
 """
         
-        email_service.send_email(
+        email_outbox.enqueue(
             to_email=email,
             subject="We've received your message - Idea Bunch",
             html_content=get_base_template(user_confirmation_html),
@@ -118,152 +119,21 @@ If you have any urgent questions, feel free to reply to this email.
 
 @bp.get("/api/public/usage-stats")
 def get_public_usage_stats() -> Any:
-    """Get anonymized usage statistics for social proof."""
+    """
+    Get anonymized usage statistics for social proof.
+    
+    Served from materialized counters held in memory (see
+    app.services.usage_stats); browsers and CDNs may cache the response for
+    the snapshot TTL and revalidate with If-None-Match.
+    """
     try:
-        # Check database connection first
-        try:
-            db.session.execute(db.text("SELECT 1"))
-        except Exception as db_check:
-            current_app.logger.exception("Database connection check failed in usage-stats: %s", db_check)
-            # Return default stats on database error
-            return jsonify({
-                "success": True,
-                "stats": {
-                    "total_users": 0,
-                    "validations_this_month": 0,
-                    "discoveries_this_month": 0,
-                    "total_validations": 0,
-                    "total_discoveries": 0,
-                    "average_score": 0,
-                },
-            })
-        
-        # Count total users (active users who have actually used the service)
-        # Only count users who have completed at least one validation or discovery
-        try:
-            from sqlalchemy import or_
-            # Get distinct user IDs who have completed validations or runs
-            users_with_validations = db.session.query(UserValidation.user_id).filter(
-                UserValidation.is_deleted == False,
-                UserValidation.status == "completed"
-            ).distinct()
-            
-            users_with_runs = db.session.query(UserRun.user_id).filter(
-                UserRun.is_deleted == False,
-                UserRun.status == "completed"
-            ).distinct()
-            
-            # Count active users who appear in either list
-            total_users = User.query.filter(
-                User.is_active == True,
-                or_(
-                    User.id.in_(users_with_validations),
-                    User.id.in_(users_with_runs)
-                )
-            ).count()
-        except Exception as e:
-            current_app.logger.warning(f"Failed to count users: {e}")
-            # Fallback to simple count if the query fails
-            try:
-                total_users = User.query.filter_by(is_active=True).count()
-            except:
-                total_users = 0
-        
-        # Count total validations (this month) - use index on created_at
-        # Only count completed validations that are not deleted
-        this_month_start = utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        try:
-            validations_this_month = UserValidation.query.filter(
-                UserValidation.created_at >= this_month_start,
-                UserValidation.is_deleted == False,
-                UserValidation.status == "completed"
-            ).count()
-        except Exception as e:
-            current_app.logger.warning(f"Failed to count validations this month: {e}")
-            validations_this_month = 0
-        
-        # Count total discoveries (this month) - use index on created_at
-        # Only count completed discoveries that are not deleted
-        try:
-            discoveries_this_month = UserRun.query.filter(
-                UserRun.created_at >= this_month_start,
-                UserRun.is_deleted == False,
-                UserRun.status == "completed"
-            ).count()
-        except Exception as e:
-            current_app.logger.warning(f"Failed to count discoveries this month: {e}")
-            discoveries_this_month = 0
-        
-        # Count total validations (all time) - exclude deleted and only count completed
-        try:
-            total_validations = UserValidation.query.filter(
-                UserValidation.is_deleted == False,
-                UserValidation.status == "completed"
-            ).count()
-        except Exception as e:
-            current_app.logger.warning(f"Failed to count total validations: {e}")
-            total_validations = 0
-        
-        # Count total discoveries (all time) - exclude deleted and only count completed
-        try:
-            total_discoveries = UserRun.query.filter(
-                UserRun.is_deleted == False,
-                UserRun.status == "completed"
-            ).count()
-        except Exception as e:
-            current_app.logger.warning(f"Failed to count total discoveries: {e}")
-            total_discoveries = 0
-        
-        # Calculate average validation score (from last 100 validations) - exclude deleted and only count completed
-        total_score = 0
-        score_count = 0
-        try:
-            recent_validations = UserValidation.query.filter(
-                UserValidation.is_deleted == False,
-                UserValidation.status == "completed"
-            ).order_by(
-                UserValidation.created_at.desc()
-            ).limit(100).all()
-            
-            for validation in recent_validations:
-                if validation.validation_result:
-                    try:
-                        result = json.loads(validation.validation_result)
-                        overall_score = result.get("overall_score")
-                        if overall_score is not None:
-                            total_score += float(overall_score)
-                            score_count += 1
-                    except:
-                        pass
-        except Exception as e:
-            current_app.logger.warning(f"Failed to calculate average score: {e}")
-        
-        avg_score = round(total_score / score_count, 1) if score_count > 0 else 0
-        
-        return jsonify({
-            "success": True,
-            "stats": {
-                "total_users": total_users,
-                "validations_this_month": validations_this_month,
-                "discoveries_this_month": discoveries_this_month,
-                "total_validations": total_validations,
-                "total_discoveries": total_discoveries,
-                "average_score": avg_score,
-            },
-        })
+        stats, etag = usage_stats.get()
     except Exception as exc:
         current_app.logger.exception("Failed to get usage stats: %s", exc)
         # Return default stats on error (so page still loads)
-        return jsonify({
-            "success": True,
-            "stats": {
-                "total_users": 0,
-                "validations_this_month": 0,
-                "discoveries_this_month": 0,
-                "total_validations": 0,
-                "total_discoveries": 0,
-                "average_score": 0,
-            },
-        })
-
+        return jsonify({"success": True, "stats": dict(DEFAULT_STATS)})
+    
+    response = jsonify({"success": True, "stats": stats})
+    response.headers["Cache-Control"] = f"public, max-age={int(usage_stats.ttl)}"
+    response.set_etag(etag)
+    return response.make_conditional(request)
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta, timezone
 from urllib.parse import unquote
 import json
 
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import defer, joinedload
 from sqlalchemy import text
 
 from app.models.database import (
@@ -13,22 +13,23 @@ from app.models.database import (
     SubscriptionTier, ValidationStatus, PaymentStatus, utcnow, normalize_datetime
 )
 from app.utils import get_current_session, require_auth
-from app.utils.json_helpers import safe_json_loads, safe_json_dumps
+from app.utils.json_helpers import RawJSON, safe_json_loads, safe_json_dumps
 from app.utils.response_helpers import (
     success_response, error_response, not_found_response,
-    unauthorized_response, internal_error_response
+    unauthorized_response, internal_error_response, raw_json_response
 )
 from app.utils.serialization import serialize_datetime
+from app.utils.pagination import CursorError, paginate, parse_page_args
 from app.constants import (
-    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE,
     MAX_ACTION_TEXT_LENGTH, MAX_IDEA_ID_LENGTH, MAX_NOTE_CONTENT_LENGTH,
     SMART_RECOMMENDATIONS_LIMIT, RECOMMENDATIONS_VALIDATION_LIMIT,
     INTEREST_AREAS_LIMIT, SIMILAR_IDEAS_LIMIT, HIGH_SCORE_THRESHOLD,
     MIN_VALIDATIONS_FOR_INSIGHTS, MAX_COMPARISON_SESSIONS,
-    INTEREST_AREA_KEYWORDS,
+    INTEREST_AREA_KEYWORDS, STATUS_ACTIVE,
     ErrorMessages,
 )
-from app.services.email_service import email_service
+from app.services.email_outbox import email_outbox
+from app.services.report_summaries import run_summary_dicts, validation_summary_dicts
 from app.services.email_templates import (
     trial_ending_email,
     subscription_expiring_email,
@@ -65,24 +66,23 @@ def get_user_dashboard() -> Any:
     
     try:
         # Get runs with pagination to avoid loading all records
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int)
-        per_page = min(per_page, MAX_PAGE_SIZE)  # Cap at max to prevent excessive loads
+        # (?page=N, or keyset cursors: ?runs_cursor=... / ?validations_cursor=...)
+        runs_args = parse_page_args(request.args, cursor_param="runs_cursor")
+        validations_args = parse_page_args(request.args, cursor_param="validations_cursor")
+        page, per_page = runs_args.page, runs_args.per_page
         
-        runs_query = UserRun.query.filter_by(user_id=user.id, is_deleted=False)
-        runs = runs_query.order_by(UserRun.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
-        total_runs = runs_query.count()
+        # Summary columns only: full reports are loaded lazily via /api/user/run/<run_id>
+        runs_query = UserRun.query.filter_by(user_id=user.id, is_deleted=False).options(defer(UserRun.reports))
+        runs_page = paginate(runs_query, UserRun.created_at, UserRun.id, runs_args)
+        total_runs = runs_page.total
         
         runs_data = []
-        for r in runs:
-            inputs_data = safe_json_loads(r.inputs, logger_context=f"for run {r.run_id} inputs")
-            reports_data = safe_json_loads(r.reports, logger_context=f"for run {r.run_id} reports")
-            
+        for r, summary in zip(runs_page.items, run_summary_dicts(runs_page.items)):
             runs_data.append({
                 "id": r.id,
                 "run_id": r.run_id,
-                "inputs": inputs_data,
-                "reports": reports_data,  # Include reports so frontend can count ideas
+                "inputs": RawJSON(r.inputs),
+                **summary,
                 "created_at": serialize_datetime(r.created_at),
             })
         
@@ -91,22 +91,17 @@ def get_user_dashboard() -> Any:
             user_id=user.id,
             is_deleted=False,
             status=ValidationStatus.COMPLETED
-        )
-        validations = validations_query.order_by(UserValidation.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
-        total_validations = validations_query.count()
+        ).options(defer(UserValidation.validation_result), defer(UserValidation.category_answers))
+        validations_page = paginate(validations_query, UserValidation.created_at, UserValidation.id, validations_args)
+        total_validations = validations_page.total
         
         validations_data = []
-        for v in validations:
-            validation_result = safe_json_loads(v.validation_result, logger_context=f"for validation {v.validation_id}")
-            category_answers = safe_json_loads(v.category_answers, logger_context=f"for validation {v.validation_id} category_answers")
-            
+        for v, summary in zip(validations_page.items, validation_summary_dicts(validations_page.items)):
             validations_data.append({
                 "id": v.id,
                 "validation_id": v.validation_id,
-                "overall_score": validation_result.get("overall_score") if validation_result else None,
+                **summary,
                 "idea_explanation": v.idea_explanation,
-                "category_answers": category_answers,  # Include category_answers for editing
-                "validation_result": validation_result,  # Include full validation result for display
                 "created_at": serialize_datetime(v.created_at),
             })
         
@@ -209,7 +204,7 @@ def get_user_dashboard() -> Any:
                 current_app.logger.error(f"Failed to load notes with raw SQL: {sql_error}")
                 notes_data = []  # Return empty list if all attempts fail
         
-        return success_response({
+        return raw_json_response({
             "activity": {
                 "runs": runs_data,
                 "validations": validations_data,
@@ -217,10 +212,16 @@ def get_user_dashboard() -> Any:
                 "total_validations": total_validations,
                 "page": page,
                 "per_page": per_page,
+                "next_runs_cursor": runs_page.next_cursor,
+                "next_validations_cursor": validations_page.next_cursor,
+                "has_more_runs": runs_page.has_more,
+                "has_more_validations": validations_page.has_more,
             },
             "actions": actions_data,
             "notes": notes_data,
         })
+    except CursorError:
+        return error_response(ErrorMessages.INVALID_CURSOR, 400)
     except Exception as exc:
         current_app.logger.exception("Failed to get user dashboard: %s", exc)
         return internal_error_response(str(exc))
@@ -238,16 +239,17 @@ def get_user_activity() -> Any:
     
     try:
         # Get runs with pagination to avoid loading all records
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", DEFAULT_PAGE_SIZE, type=int)
-        per_page = min(per_page, MAX_PAGE_SIZE)  # Cap at max to prevent excessive loads
+        # (?page=N, or keyset cursors: ?runs_cursor=... / ?validations_cursor=...)
+        runs_args = parse_page_args(request.args, cursor_param="runs_cursor")
+        validations_args = parse_page_args(request.args, cursor_param="validations_cursor")
+        page, per_page = runs_args.page, runs_args.per_page
         
         runs_query = UserRun.query.filter_by(user_id=user.id, is_deleted=False)
-        runs = runs_query.order_by(UserRun.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
-        total_runs = runs_query.count()
+        runs_page = paginate(runs_query, UserRun.created_at, UserRun.id, runs_args)
+        total_runs = runs_page.total
         
         runs_data = []
-        for r in runs:
+        for r in runs_page.items:
             inputs_data = safe_json_loads(r.inputs, logger_context=f"for run {r.run_id} inputs")
             reports_data = safe_json_loads(r.reports, logger_context=f"for run {r.run_id} reports")
             
@@ -268,11 +270,11 @@ def get_user_activity() -> Any:
         )
         if not include_all_statuses:
             validations_query = validations_query.filter_by(status=ValidationStatus.COMPLETED)
-        validations = validations_query.order_by(UserValidation.created_at.desc()).limit(per_page).offset((page - 1) * per_page).all()
-        total_validations = validations_query.count()
+        validations_page = paginate(validations_query, UserValidation.created_at, UserValidation.id, validations_args)
+        total_validations = validations_page.total
         
         validations_data = []
-        for v in validations:
+        for v in validations_page.items:
             validation_result = safe_json_loads(v.validation_result, logger_context=f"for validation {v.validation_id}")
             category_answers = safe_json_loads(v.category_answers, logger_context=f"for validation {v.validation_id} category_answers")
             
@@ -293,7 +295,13 @@ def get_user_activity() -> Any:
             "total_validations": total_validations,
             "page": page,
             "per_page": per_page,
+            "next_runs_cursor": runs_page.next_cursor,
+            "next_validations_cursor": validations_page.next_cursor,
+            "has_more_runs": runs_page.has_more,
+            "has_more_validations": validations_page.has_more,
         })
+    except CursorError:
+        return error_response(ErrorMessages.INVALID_CURSOR, 400)
     except Exception as exc:
         current_app.logger.exception("Failed to get user activity: %s", exc)
         return internal_error_response(str(exc))
@@ -353,13 +361,6 @@ def get_user_run(run_id: str) -> Any:
             current_app.logger.warning(f"Run not found: user_id={user.id}, run_id={run_id}, normalized={normalized_run_id}")
             return not_found_response("Run")
         
-        # Parse inputs and reports from JSON strings (optimized with better error handling)
-        inputs = {}
-        reports = {}
-        
-        inputs = safe_json_loads(user_run.inputs, logger_context=f"for run {run_id} inputs")
-        reports = safe_json_loads(user_run.reports, logger_context=f"for run {run_id} reports")
-        
         # Handle datetime serialization safely
         created_at = None
         updated_at = None
@@ -371,13 +372,13 @@ def get_user_run(run_id: str) -> Any:
         except Exception as e:
             current_app.logger.warning(f"Failed to serialize datetime for run {run_id}: {e}")
         
-        return jsonify({
-            "success": True,
+        # inputs/reports are stored as JSON text and written into the response as-is
+        return raw_json_response({
             "run": {
                 "id": user_run.id,
                 "run_id": user_run.run_id,
-                "inputs": inputs,
-                "reports": reports,
+                "inputs": RawJSON(user_run.inputs),
+                "reports": RawJSON(user_run.reports),
                 "created_at": created_at,
                 "updated_at": updated_at,
             },
@@ -934,18 +935,10 @@ def compare_sessions() -> Any:
         for run_id in run_ids:
             run = runs_dict.get(run_id)
             if run:
-                inputs = {}
-                reports = {}
-                try:
-                    inputs = json.loads(run.inputs) if run.inputs else {}
-                    reports = json.loads(run.reports) if run.reports else {}
-                except:
-                    pass
-                
                 comparison_data["runs"].append({
                     "run_id": run.run_id,
-                    "inputs": inputs,
-                    "reports": reports,
+                    "inputs": RawJSON(run.inputs),
+                    "reports": RawJSON(run.reports),
                     "created_at": run.created_at.isoformat() if run.created_at else None,
                 })
         
@@ -958,23 +951,16 @@ def compare_sessions() -> Any:
         for validation_id in validation_ids:
             validation = validations_dict.get(validation_id)
             if validation:
-                category_answers = {}
-                validation_result = {}
-                try:
-                    category_answers = json.loads(validation.category_answers) if validation.category_answers else {}
-                    validation_result = safe_json_loads(validation.validation_result, logger_context=f"for validation {validation.validation_id}")
-                except:
-                    pass
-                
                 comparison_data["validations"].append({
                     "validation_id": validation.validation_id,
-                    "category_answers": category_answers,
+                    "category_answers": RawJSON(validation.category_answers),
                     "idea_explanation": validation.idea_explanation,
-                    "validation_result": validation_result,
+                    "validation_result": RawJSON(validation.validation_result),
                     "created_at": validation.created_at.isoformat() if validation.created_at else None,
                 })
         
-        return jsonify({"success": True, "comparison": comparison_data})
+        # Stored JSON columns are spliced into the response without parsing
+        return raw_json_response({"comparison": comparison_data})
     except Exception as exc:
         current_app.logger.exception("Failed to compare sessions: %s", exc)
         return internal_error_response(str(exc))
@@ -1088,7 +1074,12 @@ def get_smart_recommendations() -> Any:
 
 @bp.post("/api/emails/check-expiring")
 def check_expiring_subscriptions() -> Any:
-    """Check and send emails for expiring trials/subscriptions (can be called by cron job)."""
+    """
+    Queue emails for expiring trials/subscriptions (can be called by cron job).
+    
+    Emails go through the outbox with one dedupe key per user and expiry
+    date, so running the job several times a day doesn't repeat them.
+    """
     try:
         now = utcnow()
         emails_sent = 0
@@ -1109,20 +1100,22 @@ def check_expiring_subscriptions() -> Any:
                         user_name=user.email,
                         days_remaining=days_remaining,
                     )
-                    email_service.send_email(
+                    if email_outbox.enqueue(
                         to_email=user.email,
                         subject=f"Your Free Trial Ends in {days_remaining} Day{'s' if days_remaining != 1 else ''}",
                         html_content=html_content,
                         text_content=text_content,
-                    )
-                    emails_sent += 1
+                        dedupe_key=f"trial_ending:{user.id}:{user.subscription_expires_at.date().isoformat()}",
+                        commit=False,
+                    ):
+                        emails_sent += 1
                 except Exception as e:
                     current_app.logger.warning(f"Failed to send trial ending email to {user.email}: {e}")
         
         # Check paid subscriptions expiring in 3 days - use index on subscription_type and subscription_expires_at
         paid_expiring = User.query.filter(
             User.subscription_type.in_([SubscriptionTier.STARTER, SubscriptionTier.PRO, "weekly"]),  # weekly is legacy
-            User.payment_status == PaymentStatus.ACTIVE,
+            User.payment_status == STATUS_ACTIVE,
             User.subscription_expires_at <= now + timedelta(days=3),
             User.subscription_expires_at > now,
             User.is_active == True
@@ -1137,19 +1130,24 @@ def check_expiring_subscriptions() -> Any:
                         subscription_type=user.subscription_type,
                         days_remaining=days_remaining,
                     )
-                    email_service.send_email(
+                    if email_outbox.enqueue(
                         to_email=user.email,
                         subject=f"Your Subscription Expires in {days_remaining} Day{'s' if days_remaining != 1 else ''}",
                         html_content=html_content,
                         text_content=text_content,
-                    )
-                    emails_sent += 1
+                        dedupe_key=f"subscription_expiring:{user.id}:{user.subscription_expires_at.date().isoformat()}",
+                        commit=False,
+                    ):
+                        emails_sent += 1
                 except Exception as e:
                     current_app.logger.warning(f"Failed to send subscription expiring email to {user.email}: {e}")
         
+        # All queued emails are inserted in one commit
+        db.session.commit()
+        
         return success_response({
             "emails_sent": emails_sent,
-            "message": f"Checked expiring subscriptions, sent {emails_sent} emails",
+            "message": f"Checked expiring subscriptions, queued {emails_sent} emails",
         })
     except Exception as exc:
         current_app.logger.exception("Failed to check expiring subscriptions: %s", exc)
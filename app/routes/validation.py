@@ -1,11 +1,12 @@
 """Validation routes blueprint - idea validation endpoints."""
-from flask import Blueprint, request, jsonify, current_app
-from typing import Any, Dict, Optional
-from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
 import os
 import json
 import re
 import time
+import uuid
 
 from openai import OpenAI
 try:
@@ -15,11 +16,20 @@ except ImportError:
     ANTHROPIC_AVAILABLE = False
     Anthropic = None
 
-from app.models.database import db, User, UserSession, UserRun, UserValidation, utcnow
+from app.models.database import db, User, UserSession, UserRun, UserValidation, ValidationStatus, normalize_datetime, utcnow
 from app.utils import get_current_session, require_auth
+from app.utils import metrics, tracing
+from app.utils.json_helpers import json_dumps, sse_event
 from app.utils.validators import validate_idea_explanation, validate_text_field, validate_string_array
-from app.services.email_service import email_service
+from app.services.email_outbox import email_outbox
 from app.services.email_templates import validation_ready_email
+from app.services.job_queue import Job, JobStatus, validation_job_queue
+from app.services.llm_clients import get_openai_client, get_anthropic_client
+from app.services import prompt_cache
+from app.services.prompt_cache import PromptLayout
+from app.services.report_summaries import apply_validation_summary
+from app.services.usage_stats import usage_stats
+from app.services.validation_stream_parser import ValidationStreamParser, parse_pillar_rows
 
 bp = Blueprint("validation", __name__)
 
@@ -50,6 +60,12 @@ def apply_rate_limit(limit_string):
 # Validation model configuration - can be "openai", "claude", or "auto" (tries Claude first, falls back to OpenAI)
 VALIDATION_MODEL_PROVIDER = os.environ.get("VALIDATION_MODEL_PROVIDER", "claude").lower()
 
+# Async validation jobs: max seconds an SSE subscriber waits, and DB poll interval when the job ran elsewhere
+VALIDATION_JOB_EVENT_TIMEOUT = float(os.environ.get("VALIDATION_JOB_EVENT_TIMEOUT", "180"))
+VALIDATION_JOB_POLL_SECONDS = float(os.environ.get("VALIDATION_JOB_POLL_SECONDS", "1"))
+# Jobs live in process memory: a row still pending after this long lost its job (restart/crash)
+VALIDATION_JOB_STALE_SECONDS = float(os.environ.get("VALIDATION_JOB_STALE_SECONDS", "900"))
+
 ARCHETYPE_REFERENCE_EXAMPLES = """
 ### Reference Snapshots (non-tech friendly)
 1. **Mumbai vada pav stall (Food & beverage)** — Market is the footfall around the stall, technical feasibility covers kitchen permits, hygiene, and prep capacity. Scalability means extra carts or franchising, not servers. Financials = rent, ingredients, daily break-even plates.
@@ -234,37 +250,22 @@ def _format_archetype_guidance(profile: Dict[str, Any]) -> str:
         ]
     )
 
-def _build_validation_prompt(structured_json: str, business_profile: Dict[str, Any], delivery_channel: str) -> str:
-    guidance_block = _format_archetype_guidance(business_profile)
-    delivery_text = delivery_channel or "Not specified"
-    return f"""You are an experienced, highly critical Venture Capital Partner and Product Analyst. Your sole purpose is to stress-test an early-stage startup or small business idea based on the structured data provided. Your analysis must be ruthless, objective, and focused on identifying the **weakest point** and **riskiest assumptions**. You must generate a structured report in **Markdown format only**.
+# Validation prompt layout: static instructions and output format first, then
+# the archetype's business context, then the user's data, so the provider can
+# cache everything before the JSON (see app.services.prompt_cache)
+VALIDATION_STATIC_PROMPT = f"""You are an experienced, highly critical Venture Capital Partner and Product Analyst. Your sole purpose is to stress-test an early-stage startup or small business idea based on the structured data provided. Your analysis must be ruthless, objective, and focused on identifying the **weakest point** and **riskiest assumptions**. You must generate a structured report in **Markdown format only**.
 
 {ARCHETYPE_REFERENCE_EXAMPLES}
 
-### 1. INPUT DATA STRUCTURE
-
-You will receive the following JSON data. Analyze all fields, especially combining the dropdown categories with the detailed narrative (`description_structured`):
-
-```json
-{structured_json}
-```
-
 **CRITICAL DATA INTEGRITY RULES:**
-- You MUST ONLY use the data provided in the JSON above. Do NOT invent, assume, or fabricate any information not explicitly present in the input data.
+- You MUST ONLY use the data provided in the JSON input data (section 4). Do NOT invent, assume, or fabricate any information not explicitly present in the input data.
 - If a field contains "Not specified", "Unknown", or is empty, treat it as MISSING INFORMATION. Do NOT make assumptions about what it might be.
 - Do NOT add details, examples, or specifics that are not present in the `description_structured` field.
 - Do NOT reference competitors, market data, or industry trends that are not mentioned in the input data.
 - When a field says "Not specified", acknowledge the gap in information rather than assuming a value.
 - Your analysis must be grounded ONLY in what the user has actually provided.
 
-### 2. BUSINESS CONTEXT
-
-- Business type: {business_profile['label']}
-- Delivery channel: {delivery_text}
-- Adapt every parameter to this context. Do **not** assume the business is software by default. Use the following guidance:
-{guidance_block}
-
-### 3. CORE DIRECTIVES
+### 1. CORE DIRECTIVES
 
 1. **DO NOT** repeat the input data or confirm the categories. Jump immediately into the analysis.
 2. **USE ONLY PROVIDED DATA**: Base your analysis EXCLUSIVELY on the JSON data provided. Do NOT add information not present in the input.
@@ -277,7 +278,7 @@ You will receive the following JSON data. Analyze all fields, especially combini
    - **IF `initial_budget` is "Not specified" or empty**: You MUST NOT mention any specific budget amounts (like "$20K", "$10,000", "budget of X", etc.) anywhere in your response. Do NOT assume or invent a budget. Focus on revenue model viability, unit economics, and general feasibility without budget constraints.
 8. **NO FABRICATION**: Do NOT invent customer segments, pricing models, features, or business details not present in the input data.
 
-### 4. REQUIRED OUTPUT STRUCTURE (Markdown Format)
+### 2. REQUIRED OUTPUT STRUCTURE (Markdown Format)
 
 Generate the full report using the exact headings and structure below:
 
@@ -340,7 +341,30 @@ CRITICAL BUDGET RULE:
 2. **Validation Step 2:** [Product/service or market research step - incorporate problem category, solution type, or user type.]
 3. **Validation Step 3:** [Strategic or financial planning task - consider revenue model and delivery channel. Only mention budget if explicitly provided in the input data.]
 
+"""
+
+
+def _build_validation_prompt(structured_json: str, business_profile: Dict[str, Any], delivery_channel: str) -> PromptLayout:
+    guidance_block = _format_archetype_guidance(business_profile)
+    delivery_text = delivery_channel or "Not specified"
+    business_context = f"""### 3. BUSINESS CONTEXT
+
+- Business type: {business_profile['label']}
+- Delivery channel: {delivery_text}
+- Adapt every parameter to this context. Do **not** assume the business is software by default. Use the following guidance:
+{guidance_block}
+
+"""
+    input_data = f"""### 4. INPUT DATA STRUCTURE
+
+This is the JSON data to analyze. Analyze all fields, especially combining the dropdown categories with the detailed narrative (`description_structured`):
+
+```json
+{structured_json}
+```
+
 CRITICAL: Output ONLY the Markdown report in the exact format above. Do not include any preamble, introduction, or closing remarks. Start directly with `## 🎯 Executive Summary & Overall Verdict` and end with the last validation step."""
+    return PromptLayout([VALIDATION_STATIC_PROMPT, business_context], input_data)
 
 VALIDATION_SYSTEM_PROMPT = """You are an experienced, highly critical Venture Capital Partner and Product Analyst. You evaluate ANY business type—software, local services, food stalls, retail, creator businesses, physical products, or marketplaces. Never assume the idea is digital by default. Always adapt to the provided business archetype and delivery channel. Be direct, specific, and brutally honest.
 
@@ -402,9 +426,9 @@ def _get_validation_client():
                 current_app.logger.warning("ANTHROPIC_API_KEY not set. Falling back to OpenAI.")
             except RuntimeError:
                 logger.warning("ANTHROPIC_API_KEY not set. Falling back to OpenAI.")
-            return OpenAI(api_key=os.environ.get("OPENAI_API_KEY")), "gpt-4o", False
+            return get_openai_client(os.environ.get("OPENAI_API_KEY")), "gpt-4o", False
         
-        client = Anthropic(api_key=api_key)
+        client = get_anthropic_client(api_key)
         # Use the latest Claude Sonnet model (2025)
         # Default to Sonnet 4, but allow override via environment variable
         # Available 2025 models:
@@ -418,40 +442,105 @@ def _get_validation_client():
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
-        return OpenAI(api_key=api_key), "gpt-4o", False
+        return get_openai_client(api_key), "gpt-4o", False
 
 
-def _call_ai_validation(client, model_name, is_claude: bool, system_prompt: str, user_prompt: str, temperature: float = 0.7, max_tokens: int = 2500) -> str:
+def _log_validation_usage(usage: Any, is_claude: bool) -> None:
+    """Log prompt/cached token counts reported by the provider."""
+    counts = prompt_cache.usage_from_response(usage, is_claude)
+    metrics.record_token_usage("validation", counts)
+    current_app.logger.info(
+        f"Validation token usage: input={counts['input_tokens']} cached={counts['cached_tokens']} "
+        f"cache_write={counts['cache_write_tokens']} output={counts['output_tokens']}"
+    )
+
+
+@tracing.traced("llm.call", pipeline="validation", stage="validation")
+def _call_ai_validation(client, model_name, is_claude: bool, system_prompt: str, user_prompt: Union[str, PromptLayout], temperature: float = 0.7, max_tokens: int = 2500) -> str:
     """
     Call AI model for validation. Supports both OpenAI and Claude.
+    A PromptLayout user_prompt gets cache breakpoints on Claude.
     Returns: Response text content
     """
+    tracing.current_span().set_attributes(provider="claude" if is_claude else "openai", model=model_name)
+    llm_start = time.time()
     if is_claude:
         # Claude API
         response = client.messages.create(
             model=model_name,
             max_tokens=max_tokens,
             temperature=temperature,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
+            system=prompt_cache.anthropic_system(system_prompt),
+            messages=prompt_cache.anthropic_messages(user_prompt),
         )
+        metrics.LLM_LATENCY.observe(time.time() - llm_start, pipeline="validation", stage="validation", provider="claude")
+        _log_validation_usage(getattr(response, "usage", None), True)
         return response.content[0].text
     else:
         # OpenAI API
         response = client.chat.completions.create(
             model=model_name,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=prompt_cache.openai_messages(system_prompt, user_prompt),
             temperature=temperature,
             max_tokens=max_tokens,
         )
+        metrics.LLM_LATENCY.observe(time.time() - llm_start, pipeline="validation", stage="validation", provider="openai")
+        _log_validation_usage(getattr(response, "usage", None), False)
         return response.choices[0].message.content.strip()
 
 
+@tracing.traced("llm.call", pipeline="validation", stage="validation", streaming=True)
+def _stream_ai_validation(client, model_name, is_claude: bool, system_prompt: str, user_prompt: Union[str, PromptLayout], temperature: float = 0.7, max_tokens: int = 2500) -> Iterator[str]:
+    """
+    Streaming variant of _call_ai_validation. Supports both OpenAI and Claude.
+    Yields: Text deltas as the model produces them
+    """
+    llm_start = time.time()
+    provider = "claude" if is_claude else "openai"
+    tracing.current_span().set_attributes(provider=provider, model=model_name)
+    first_token = True
+    if is_claude:
+        # Claude API
+        with client.messages.stream(
+            model=model_name,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=prompt_cache.anthropic_system(system_prompt),
+            messages=prompt_cache.anthropic_messages(user_prompt),
+        ) as stream:
+            for text in stream.text_stream:
+                if text:
+                    if first_token:
+                        tracing.current_span().add_event("first_token")
+                        metrics.LLM_TTFT.observe(time.time() - llm_start, pipeline="validation", stage="validation", provider=provider)
+                        first_token = False
+                    yield text
+            metrics.LLM_LATENCY.observe(time.time() - llm_start, pipeline="validation", stage="validation", provider=provider)
+            _log_validation_usage(getattr(stream.get_final_message(), "usage", None), True)
+    else:
+        # OpenAI API
+        stream = client.chat.completions.create(
+            model=model_name,
+            messages=prompt_cache.openai_messages(system_prompt, user_prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},  # Final chunk carries usage (incl. cached tokens)
+        )
+        usage = None
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                if first_token:
+                    tracing.current_span().add_event("first_token")
+                    metrics.LLM_TTFT.observe(time.time() - llm_start, pipeline="validation", stage="validation", provider=provider)
+                    first_token = False
+                yield chunk.choices[0].delta.content
+        metrics.LLM_LATENCY.observe(time.time() - llm_start, pipeline="validation", stage="validation", provider=provider)
+        _log_validation_usage(usage, False)
+
+
 def _is_idea_vague_or_nonsensical(idea_explanation: str) -> bool:
     """
     Detect if an idea is too vague, nonsensical, or not a real business concept.
@@ -546,7 +635,7 @@ def _clean_budget_references(content: str, initial_budget: str) -> str:
         cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
     
     # Clean up extra spaces and line breaks that might result from removals
-    cleaned = re.sub(r'\s{2,}', ' ', cleaned)  # Multiple spaces to single space
+    cleaned = re.sub(r'[ \t]{2,}', ' ', cleaned)  # Multiple spaces to single space (keep blank lines)
     cleaned = re.sub(r'\s+\n\s+', '\n', cleaned)  # Spaces around newlines
     cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)  # Multiple newlines to double
     
@@ -585,36 +674,7 @@ def _parse_markdown_validation(markdown_content: str) -> dict:
                 break
         
         if table_match:
-            table_rows = table_match.group(1).strip().split('\n')
-            pillar_mapping = {
-                "Problem-Solution Fit": "problem_solution_fit",
-                "Market Viability & Scope": "market_opportunity",
-                "Competitive Moat": "competitive_landscape",
-                "Financial Viability": "financial_sustainability",
-                "Feasibility & Risk": "risk_assessment"
-            }
-            
-            for row in table_rows:
-                if '|' in row:
-                    # Extract pillar name and score - be more flexible with format
-                    parts = [p.strip() for p in row.split('|') if p.strip()]
-                    if len(parts) >= 2:
-                        # Clean pillar name (remove markdown formatting)
-                        pillar_name = re.sub(r'\*\*|\*|`', '', parts[0]).strip()
-                        score_text = parts[1].strip()
-                        # Extract numeric score (1-5) - look for number in score column
-                        score_match = re.search(r'(\d+)', score_text)
-                        if score_match:
-                            score_1_5 = int(score_match.group(1))
-                            # Convert 1-5 scale to 0-10 scale: (score-1)*2.25+1
-                            # 1→2, 2→5, 3→7, 4→9, 5→10
-                            score_0_10 = max(1, min(10, round((score_1_5 - 1) * 2.25 + 1)))
-                            
-                            # Map to our scoring keys (case-insensitive partial match)
-                            for key, value in pillar_mapping.items():
-                                if key.lower() in pillar_name.lower() or pillar_name.lower() in key.lower():
-                                    pillar_scores[value] = score_0_10
-                                    break
+            pillar_scores = parse_pillar_rows(table_match.group(1).strip().split('\n'))["scores"]
         
         # Calculate overall score as average of pillar scores (convert to 0-10)
         if pillar_scores:
@@ -950,9 +1010,492 @@ def _cap_scores_for_vague_idea(validation_data: dict, idea_explanation: str) ->
     return validation_data
 
 
+def _new_validation_id() -> str:
+    """Generate a unique validation id (``val_<timestamp>_<suffix>``)."""
+    return f"val_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+
+
+def _build_structured_validation_data(user: User, category_answers: Dict[str, Any], idea_explanation: str) -> Dict[str, Any]:
+    """
+    Build the 14-field structured input for the validation prompt.
+    
+    Category answers take precedence; gaps are filled from the user's latest
+    Discovery intake.
+    """
+    # Get user's latest intake data from their most recent run
+    user_intake = {}
+    latest_run = UserRun.query.filter_by(user_id=user.id).order_by(UserRun.created_at.desc()).first()
+    if latest_run and latest_run.inputs:
+        try:
+            if isinstance(latest_run.inputs, str):
+                user_intake = json.loads(latest_run.inputs)
+            else:
+                user_intake = latest_run.inputs
+        except (json.JSONDecodeError, TypeError):
+            current_app.logger.warning(f"Failed to parse user intake data for user {user.id}")
+            user_intake = {}
+    
+    # Build structured data for the 14-field validation system
+    # Map available data to the structured format expected by the new validation prompt
+    
+    def _sanitize_list(value):
+        if not value:
+            return []
+        if isinstance(value, (list, tuple, set)):
+            candidates = list(value)
+        else:
+            candidates = [value]
+        cleaned = []
+        for item in candidates:
+            if not item:
+                continue
+            text = item.strip() if isinstance(item, str) else str(item)
+            if text and text not in cleaned:
+                cleaned.append(text)
+        return cleaned
+    
+    constraint_values = _sanitize_list(category_answers.get("constraints"))
+    intake_constraint_sources = [
+        user_intake.get("time_commitment"),
+        user_intake.get("budget_range"),
+        user_intake.get("work_style"),
+        user_intake.get("skill_strength"),
+    ]
+    for extra in intake_constraint_sources:
+        if not extra:
+            continue
+        text = extra.strip() if isinstance(extra, str) else str(extra)
+        if text and text not in constraint_values:
+            constraint_values.append(text)
+    
+    return {
+        "industry": category_answers.get("industry") or user_intake.get("industry") or user_intake.get("interest_area") or "Not specified",
+        "geography": category_answers.get("geography") or user_intake.get("primary_geography") or "Global",
+        "stage": category_answers.get("stage") or user_intake.get("idea_stage") or "Raw Idea",
+        "commitment": category_answers.get("commitment") or user_intake.get("time_commitment") or "Part-time",
+        "problem_category": category_answers.get("problem_category") or category_answers.get("industry") or user_intake.get("pain_point") or "General",
+        "solution_type": category_answers.get("solution_type") or category_answers.get("solution") or user_intake.get("solution_type") or "Product",
+        "user_type": category_answers.get("user_type") or category_answers.get("target_audience") or user_intake.get("target_audience") or "General users",
+        "revenue_model": category_answers.get("revenue_model") or category_answers.get("business_model") or user_intake.get("revenue_model") or "Subscription",
+        "unique_moat": category_answers.get("unique_moat") or category_answers.get("unique_value") or user_intake.get("differentiator") or "Not specified",
+        "description_structured": idea_explanation,
+        "initial_budget": category_answers.get("initial_budget") or category_answers.get("budget") or user_intake.get("budget_range") or "Not specified",
+        "constraints": constraint_values,
+        "competitors": category_answers.get("competitors") or category_answers.get("competition") or user_intake.get("known_competitors") or "Unknown",
+        "business_archetype": category_answers.get("business_archetype") or user_intake.get("business_archetype") or "Not specified",
+        "delivery_channel": category_answers.get("delivery_channel") or user_intake.get("delivery_channel") or "Not specified",
+    }
+
+
+@tracing.traced("validation.prompt")
+def _build_validation_prompts(structured_data: Dict[str, Any]) -> Tuple[str, PromptLayout]:
+    """Build (system_prompt, user_prompt) for a validation run."""
+    structured_json = json.dumps(structured_data, indent=2)
+    business_profile = _match_archetype_profile(structured_data.get("business_archetype"))
+    delivery_channel_value = structured_data.get("delivery_channel")
+    validation_prompt = _build_validation_prompt(structured_json, business_profile, delivery_channel_value)
+    return VALIDATION_SYSTEM_PROMPT, validation_prompt
+
+
+@tracing.traced("validation.parse")
+def _finalize_validation_content(
+    content: str,
+    structured_data: Dict[str, Any],
+    idea_explanation: str,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], int]:
+    """
+    Clean and parse raw model output into validation data.
+    
+    Returns:
+        (validation_data, None, 200) on success, or
+        (None, error_body, status_code) when the output is unusable
+    """
+    # Clean budget references if budget was not specified
+    initial_budget = structured_data.get("initial_budget", "")
+    if not initial_budget or initial_budget.strip().lower() in ["not specified", "none", ""]:
+        content = _clean_budget_references(content, initial_budget or "")
+    
+    # Parse Markdown response and convert to JSON format
+    validation_data = _parse_markdown_validation(content)
+    
+    if not validation_data:
+        current_app.logger.error(f"Failed to parse validation response. Content length: {len(content) if content else 0}")
+        current_app.logger.error(f"First 1000 chars of content: {content[:1000] if content else 'None'}")
+        # Fallback: try to parse as JSON (backward compatibility)
+        try:
+            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
+            if json_match:
+                content = json_match.group(1)
+            else:
+                json_match = re.search(r'\{.*?\}', content, re.DOTALL)
+                if json_match:
+                    content = json_match.group(0)
+            
+            validation_data = json.loads(content)
+        except:
+            current_app.logger.error(f"Failed to parse validation (both Markdown and JSON failed). Raw content: {content[:500]}")
+            return None, {
+                "success": False,
+                "error": "We couldn't generate a properly structured validation for your idea. Please try again or provide more details about your business concept.",
+                "error_type": "invalid_response",
+                "suggestion": "Make sure your idea description is clear and includes: what problem you're solving, who your customers are, and how your solution works.",
+            }, 422
+    
+    # POST-PROCESSING: Skip capping - let AI scores stand with structured data
+    # if validation_data and isinstance(validation_data, dict):
+    #     validation_data = _cap_scores_for_vague_idea(validation_data, idea_explanation)
+    
+    # Validate that we got meaningful validation results
+    if not validation_data or not isinstance(validation_data, dict):
+        return None, {
+            "success": False,
+            "error": "We couldn't analyze your idea properly. Please provide more details about your idea and try again.",
+            "error_type": "invalid_response",
+        }, 422
+    
+    # Check if we have the essential validation data
+    has_score = "overall_score" in validation_data or "score" in validation_data
+    has_parameters = "parameters" in validation_data or "analysis" in validation_data
+    has_recommendations = "recommendations" in validation_data or "details" in validation_data
+    
+    # Check if the content is meaningful (not just empty/default)
+    content_meaningful = False
+    if has_recommendations:
+        recs = validation_data.get("recommendations", "") or validation_data.get("details", "")
+        if isinstance(recs, str) and len(recs.strip()) > 50:
+            content_meaningful = True
+        elif isinstance(recs, dict) and len(str(recs)) > 50:
+            content_meaningful = True
+    
+    if not has_score and not has_parameters and not content_meaningful:
+        return None, {
+            "success": False,
+            "error": "We couldn't generate a complete validation for your idea. Please provide more specific details about your business idea, target market, and value proposition.",
+            "error_type": "incomplete_validation",
+            "suggestion": "Try including more details about: what problem you're solving, who your target customers are, how your solution works, and what makes it unique.",
+        }, 422
+    
+    # Check if the idea explanation itself is too vague/nonsensical
+    if len(idea_explanation.strip()) < 20:
+        return None, {
+            "success": False,
+            "error": "Your idea description is too brief or unclear. Please provide a more detailed explanation of your business idea, including what problem it solves and how it works.",
+            "error_type": "insufficient_detail",
+            "suggestion": "Aim for at least 50-100 words describing your idea, target customers, and how it works.",
+        }, 400
+    
+    return validation_data, None, 200
+
+
+@tracing.traced("validation.save")
+def _save_validation_result(
+    user: User,
+    validation_id: str,
+    category_answers: Dict[str, Any],
+    idea_explanation: str,
+    validation_data: Dict[str, Any],
+    session: Optional[UserSession] = None,
+    user_validation: Optional[UserValidation] = None,
+    count_usage: bool = True,
+) -> UserValidation:
+    """
+    Persist a completed validation, count usage and send the "ready" email.
+    
+    Updates ``user_validation`` in place when given (a queued job's pending
+    row), otherwise inserts a new row. Queued jobs pass ``count_usage=False``:
+    their usage was reserved at enqueue.
+    """
+    if user_validation is None:
+        user_validation = UserValidation(
+            user_id=user.id,
+            validation_id=validation_id,
+            category_answers=json_dumps(category_answers),
+            idea_explanation=idea_explanation,
+            is_deleted=False,  # Explicitly set is_deleted
+        )
+        db.session.add(user_validation)
+    user_validation.validation_result = json_dumps(validation_data)
+    user_validation.status = ValidationStatus.COMPLETED
+    apply_validation_summary(user_validation)
+    if count_usage:
+        user.increment_validation_usage()
+    # Refresh session activity after long operation completes
+    if session:
+        session.last_activity = utcnow()
+    usage_stats.record_validation_completed(user_validation)
+    db.session.commit()
+    
+    # Send validation ready email
+    try:
+        overall_score = validation_data.get("overall_score", None)
+        html_content, text_content = validation_ready_email(
+            user_name=user.email,
+            validation_id=validation_id,
+            validation_score=overall_score,
+        )
+        email_outbox.enqueue(
+            to_email=user.email,
+            subject="Your Idea Validation is Ready! 📊",
+            html_content=html_content,
+            text_content=text_content,
+            dedupe_key=f"validation_ready:{validation_id}",
+        )
+    except Exception as e:
+        current_app.logger.warning(f"Failed to send validation ready email: {e}")
+    
+    return user_validation
+
+
+def _mark_validation_failed(user_validation: Optional[UserValidation], error_body: Dict[str, Any]) -> bool:
+    """
+    Fail a queued job's pending row and refund the usage reserved for it.
+    
+    The status change is conditional on the row still being pending, so a
+    job failing and the stale sweep racing each other refund only once.
+    The error payload is kept in validation_result.
+    
+    Returns:
+        True if this call failed the row
+    """
+    if user_validation is None:
+        return False
+    try:
+        updated = db.session.execute(
+            db.update(UserValidation)
+            .where(UserValidation.id == user_validation.id, UserValidation.status == ValidationStatus.PENDING)
+            .values(status=ValidationStatus.FAILED, validation_result=json_dumps(error_body))
+        )
+        if updated.rowcount == 1:
+            user = db.session.get(User, user_validation.user_id)
+            if user is not None:
+                user.refund_validation_usage()
+        db.session.commit()
+        return updated.rowcount == 1
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.warning(f"Failed to mark validation {user_validation.validation_id} as failed: {e}")
+        return False
+
+
+def expire_stale_validations(user_validation: Optional[UserValidation] = None) -> int:
+    """
+    Fail queued validations whose job was lost (process restart or crash).
+    
+    Jobs only exist in the memory of the process that queued them, so a row
+    still pending VALIDATION_JOB_STALE_SECONDS after it was created will
+    never finish. Checks one row when given (status polling), otherwise
+    sweeps the table (startup).
+    
+    Returns:
+        Number of rows marked failed
+    """
+    cutoff = utcnow() - timedelta(seconds=VALIDATION_JOB_STALE_SECONDS)
+    if user_validation is not None:
+        if user_validation.status != ValidationStatus.PENDING or normalize_datetime(user_validation.created_at) > cutoff:
+            return 0
+        rows = [user_validation]
+    else:
+        rows = UserValidation.query.filter(
+            UserValidation.status == ValidationStatus.PENDING,
+            UserValidation.created_at < cutoff,
+        ).all()
+    error_body = {"success": False, "error": "Validation was interrupted. Please try again."}
+    expired = sum(1 for row in rows if _mark_validation_failed(row, error_body))
+    if expired:
+        db.session.expire_all()
+    return expired
+
+
+def _run_validation_job(
+    job: Job,
+    app: Any,
+    user_id: int,
+    validation_id: str,
+    category_answers: Dict[str, Any],
+    idea_explanation: str,
+) -> Optional[Dict[str, Any]]:
+    """Worker-pool body of an async validation: LLM call, parse, persist."""
+    with app.app_context(), tracing.span("validation.pipeline", mode="job", validation_id=validation_id):
+        user_validation = None
+        try:
+            user = db.session.get(User, user_id)
+            user_validation = UserValidation.query.filter_by(validation_id=validation_id).first()
+            
+            client, model_name, is_claude = _get_validation_client()
+            structured_data = _build_structured_validation_data(user, category_answers, idea_explanation)
+            system_prompt, validation_prompt = _build_validation_prompts(structured_data)
+            
+            content = _call_ai_validation(
+                client=client,
+                model_name=model_name,
+                is_claude=is_claude,
+                system_prompt=system_prompt,
+                user_prompt=validation_prompt,
+                temperature=0.7,
+                max_tokens=4000  # Increased for Markdown format output
+            )
+            job.publish("status", status="parsing")
+            
+            validation_data, error_body, status_code = _finalize_validation_content(content, structured_data, idea_explanation)
+            if error_body:
+                _mark_validation_failed(user_validation, error_body)
+                job.status = JobStatus.FAILED
+                job.error = error_body.get("error")
+                job.publish("failed", status_code=status_code, **{k: v for k, v in error_body.items() if k != "success"})
+                return None
+            
+            _save_validation_result(
+                user, validation_id, category_answers, idea_explanation, validation_data,
+                user_validation=user_validation, count_usage=False,
+            )
+            job.publish("completed", validation_id=validation_id, validation=validation_data)
+            return validation_data
+        except Exception as exc:
+            app.logger.exception("Idea validation job %s failed: %s", validation_id, exc)
+            _mark_validation_failed(user_validation, {"success": False, "error": str(exc)})
+            raise
+        finally:
+            db.session.remove()
+
+
+def _enqueue_validation(user: User, session: UserSession, category_answers: Dict[str, Any], idea_explanation: str) -> Any:
+    """Reserve usage, create a pending validation row, queue the job and return 202 immediately."""
+    if not user.reserve_validation_usage():
+        _, error_message = user.can_perform_validation()
+        return jsonify({
+            "success": False,
+            "error": error_message or "You've reached your validation limit. Upgrade to continue.",
+            "usage_limit_reached": True,
+            "upgrade_required": True,
+        }), 403
+    validation_id = _new_validation_id()
+    user_validation = UserValidation(
+        user_id=user.id,
+        validation_id=validation_id,
+        category_answers=json_dumps(category_answers),
+        idea_explanation=idea_explanation,
+        status=ValidationStatus.PENDING,
+        is_deleted=False,
+    )
+    db.session.add(user_validation)
+    session.last_activity = utcnow()
+    db.session.commit()
+    
+    try:
+        validation_job_queue.submit(
+            _run_validation_job,
+            current_app._get_current_object(),
+            user.id,
+            validation_id,
+            category_answers,
+            idea_explanation,
+            job_id=validation_id,
+        )
+    except Exception as exc:
+        current_app.logger.exception("Failed to queue validation %s: %s", validation_id, exc)
+        _mark_validation_failed(user_validation, {"success": False, "error": "Could not queue the validation"})
+        return jsonify({"success": False, "error": "Could not queue the validation. Please try again."}), 503
+    
+    return jsonify({
+        "success": True,
+        "validation_id": validation_id,
+        "status": ValidationStatus.PENDING,
+        "status_url": f"/api/validate-idea/{validation_id}/status",
+        "events_url": f"/api/validate-idea/{validation_id}/events",
+    }), 202
+
+
+def _validation_status_payload(user_validation: UserValidation) -> Dict[str, Any]:
+    """Status response body for a (possibly queued) validation."""
+    payload = {
+        "success": True,
+        "validation_id": user_validation.validation_id,
+        "status": user_validation.status,
+    }
+    result = None
+    if user_validation.validation_result:
+        try:
+            result = json.loads(user_validation.validation_result)
+        except (json.JSONDecodeError, TypeError):
+            result = None
+    if user_validation.status == ValidationStatus.COMPLETED:
+        payload["validation"] = result
+    elif user_validation.status == ValidationStatus.FAILED and isinstance(result, dict):
+        payload["error"] = result.get("error")
+        payload["error_type"] = result.get("error_type")
+    return payload
+
+
+def _stream_validation_response(user: User, session: UserSession, category_answers: Dict[str, Any], idea_explanation: str) -> Response:
+    """
+    Stream a validation as Server-Sent Events.
+    
+    Emits ``delta`` events with raw Markdown as it arrives, a
+    ``section_complete`` event as each report section closes (score table,
+    Deep Dive sections, ...), then ``done`` with the parsed validation.
+    """
+    user_id = user.id
+    session_id = session.id if session else None
+    
+    @tracing.traced("validation.pipeline", mode="stream")
+    def generate():
+        validation_id = _new_validation_id()
+        tracing.current_span().set_attribute("validation_id", validation_id)
+        yield sse_event({'event': 'start', 'validation_id': validation_id})
+        
+        try:
+            stream_user = db.session.get(User, user_id)
+            client, model_name, is_claude = _get_validation_client()
+            structured_data = _build_structured_validation_data(stream_user, category_answers, idea_explanation)
+            system_prompt, validation_prompt = _build_validation_prompts(structured_data)
+            
+            parser = ValidationStreamParser()
+            for delta in _stream_ai_validation(
+                client=client,
+                model_name=model_name,
+                is_claude=is_claude,
+                system_prompt=system_prompt,
+                user_prompt=validation_prompt,
+                temperature=0.7,
+                max_tokens=4000  # Increased for Markdown format output
+            ):
+                yield sse_event({'event': 'delta', 'text': delta})
+                for section_event in parser.feed(delta):
+                    yield sse_event(section_event)
+            for section_event in parser.finish():
+                yield sse_event(section_event)
+            
+            validation_data, error_body, status_code = _finalize_validation_content(parser.text, structured_data, idea_explanation)
+            if error_body:
+                yield sse_event({'event': 'error', 'status_code': status_code, **error_body})
+                return
+            
+            stream_session = db.session.get(UserSession, session_id) if session_id else None
+            _save_validation_result(
+                stream_user, validation_id, category_answers, idea_explanation, validation_data,
+                session=stream_session,
+            )
+            yield sse_event({'event': 'done', 'validation_id': validation_id, 'validation': validation_data})
+        
+        except Exception as exc:
+            current_app.logger.exception("Streaming idea validation failed: %s", exc)
+            db.session.rollback()
+            yield sse_event({'event': 'error', 'error': str(exc), 'error_type': type(exc).__name__})
+    
+    return Response(
+        stream_with_context(metrics.track_stream("validation", generate())),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # Disable nginx buffering
+        }
+    )
+
+
 @bp.post("/api/validate-idea")
 @require_auth
 @apply_rate_limit("10 per hour")
+@tracing.traced("validation.request")
 def validate_idea() -> Any:
   """Validate a startup idea across 10 key parameters using OpenAI."""
   # Check usage limits and refresh session activity at start
@@ -1161,80 +1704,27 @@ def validate_idea() -> Any:
   if not idea_explanation or len(idea_explanation.strip()) < 5:
     return jsonify({"success": False, "error": "Please provide category answers or idea explanation"}), 400
   
+  # Streaming mode: deltas + section_complete events as the report is generated
+  if request.args.get('stream', 'false').lower() == 'true':
+    return _stream_validation_response(user, session, category_answers, idea_explanation)
+  
+  async_requested = request.args.get('async', 'false').lower() == 'true' or data.get("async") is True
+  if async_requested:
+    try:
+      return _enqueue_validation(user, session, category_answers, idea_explanation)
+    except Exception as exc:
+      db.session.rollback()
+      current_app.logger.exception("Failed to queue idea validation: %s", exc)
+      return jsonify({
+        "success": False,
+        "error": str(exc),
+      }), 500
+  
   try:
     client, model_name, is_claude = _get_validation_client()
     
-    # Get user's latest intake data from their most recent run
-    user_intake = {}
-    latest_run = UserRun.query.filter_by(user_id=user.id).order_by(UserRun.created_at.desc()).first()
-    if latest_run and latest_run.inputs:
-      try:
-        if isinstance(latest_run.inputs, str):
-          user_intake = json.loads(latest_run.inputs)
-        else:
-          user_intake = latest_run.inputs
-      except (json.JSONDecodeError, TypeError):
-        current_app.logger.warning(f"Failed to parse user intake data for user {user.id}")
-        user_intake = {}
-    
-    # Build structured data for the 14-field validation system
-    # Map available data to the structured format expected by the new validation prompt
-    
-    def _sanitize_list(value):
-      if not value:
-        return []
-      if isinstance(value, (list, tuple, set)):
-        candidates = list(value)
-      else:
-        candidates = [value]
-      cleaned = []
-      for item in candidates:
-        if not item:
-          continue
-        text = item.strip() if isinstance(item, str) else str(item)
-        if text and text not in cleaned:
-          cleaned.append(text)
-      return cleaned
-    
-    constraint_values = _sanitize_list(category_answers.get("constraints"))
-    intake_constraint_sources = [
-      user_intake.get("time_commitment"),
-      user_intake.get("budget_range"),
-      user_intake.get("work_style"),
-      user_intake.get("skill_strength"),
-    ]
-    for extra in intake_constraint_sources:
-      if not extra:
-        continue
-      text = extra.strip() if isinstance(extra, str) else str(extra)
-      if text and text not in constraint_values:
-        constraint_values.append(text)
-    
-    structured_data = {
-      "industry": category_answers.get("industry") or user_intake.get("industry") or user_intake.get("interest_area") or "Not specified",
-      "geography": category_answers.get("geography") or user_intake.get("primary_geography") or "Global",
-      "stage": category_answers.get("stage") or user_intake.get("idea_stage") or "Raw Idea",
-      "commitment": category_answers.get("commitment") or user_intake.get("time_commitment") or "Part-time",
-      "problem_category": category_answers.get("problem_category") or category_answers.get("industry") or user_intake.get("pain_point") or "General",
-      "solution_type": category_answers.get("solution_type") or category_answers.get("solution") or user_intake.get("solution_type") or "Product",
-      "user_type": category_answers.get("user_type") or category_answers.get("target_audience") or user_intake.get("target_audience") or "General users",
-      "revenue_model": category_answers.get("revenue_model") or category_answers.get("business_model") or user_intake.get("revenue_model") or "Subscription",
-      "unique_moat": category_answers.get("unique_moat") or category_answers.get("unique_value") or user_intake.get("differentiator") or "Not specified",
-      "description_structured": idea_explanation,
-      "initial_budget": category_answers.get("initial_budget") or category_answers.get("budget") or user_intake.get("budget_range") or "Not specified",
-      "constraints": constraint_values,
-      "competitors": category_answers.get("competitors") or category_answers.get("competition") or user_intake.get("known_competitors") or "Unknown",
-      "business_archetype": category_answers.get("business_archetype") or user_intake.get("business_archetype") or "Not specified",
-      "delivery_channel": category_answers.get("delivery_channel") or user_intake.get("delivery_channel") or "Not specified",
-    }
-    
-    # Build the structured JSON data string for the prompt
-    structured_json = json.dumps(structured_data, indent=2)
-    business_profile = _match_archetype_profile(structured_data.get("business_archetype"))
-    delivery_channel_value = structured_data.get("delivery_channel")
-    validation_prompt = _build_validation_prompt(structured_json, business_profile, delivery_channel_value)
-    
-    system_prompt = VALIDATION_SYSTEM_PROMPT
+    structured_data = _build_structured_validation_data(user, category_answers, idea_explanation)
+    system_prompt, validation_prompt = _build_validation_prompts(structured_data)
     
     content = _call_ai_validation(
       client=client,
@@ -1246,119 +1736,19 @@ def validate_idea() -> Any:
       max_tokens=4000  # Increased for Markdown format output
     )
     
-    # Clean budget references if budget was not specified
-    initial_budget = structured_data.get("initial_budget", "")
-    if not initial_budget or initial_budget.strip().lower() in ["not specified", "none", ""]:
-        content = _clean_budget_references(content, initial_budget or "")
+    validation_data, error_body, status_code = _finalize_validation_content(content, structured_data, idea_explanation)
+    if error_body:
+      return jsonify(error_body), status_code
     
-    # Parse Markdown response and convert to JSON format
-    validation_data = _parse_markdown_validation(content)
-    
-    if not validation_data:
-        current_app.logger.error(f"Failed to parse validation response. Content length: {len(content) if content else 0}")
-        current_app.logger.error(f"First 1000 chars of content: {content[:1000] if content else 'None'}")
-        # Fallback: try to parse as JSON (backward compatibility)
-        try:
-            json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', content, re.DOTALL)
-            if json_match:
-                content = json_match.group(1)
-            else:
-                json_match = re.search(r'\{.*?\}', content, re.DOTALL)
-                if json_match:
-                    content = json_match.group(0)
-            
-            validation_data = json.loads(content)
-        except:
-            current_app.logger.error(f"Failed to parse validation (both Markdown and JSON failed). Raw content: {content[:500]}")
-            return jsonify({
-                "success": False,
-                "error": "We couldn't generate a properly structured validation for your idea. Please try again or provide more details about your business concept.",
-                "error_type": "invalid_response",
-                "suggestion": "Make sure your idea description is clear and includes: what problem you're solving, who your customers are, and how your solution works.",
-            }), 422
-    
-    # POST-PROCESSING: Skip capping - let AI scores stand with structured data
-    # if validation_data and isinstance(validation_data, dict):
-    #     validation_data = _cap_scores_for_vague_idea(validation_data, idea_explanation)
-    
-    # Validate that we got meaningful validation results
-    if not validation_data or not isinstance(validation_data, dict):
-      return jsonify({
-        "success": False,
-        "error": "We couldn't analyze your idea properly. Please provide more details about your idea and try again.",
-        "error_type": "invalid_response",
-      }), 422
-    
-    # Check if we have the essential validation data
-    has_score = "overall_score" in validation_data or "score" in validation_data
-    has_parameters = "parameters" in validation_data or "analysis" in validation_data
-    has_recommendations = "recommendations" in validation_data or "details" in validation_data
-    
-    # Check if the content is meaningful (not just empty/default)
-    content_meaningful = False
-    if has_recommendations:
-      recs = validation_data.get("recommendations", "") or validation_data.get("details", "")
-      if isinstance(recs, str) and len(recs.strip()) > 50:
-        content_meaningful = True
-      elif isinstance(recs, dict) and len(str(recs)) > 50:
-        content_meaningful = True
-    
-    if not has_score and not has_parameters and not content_meaningful:
-      return jsonify({
-        "success": False,
-        "error": "We couldn't generate a complete validation for your idea. Please provide more specific details about your business idea, target market, and value proposition.",
-        "error_type": "incomplete_validation",
-        "suggestion": "Try including more details about: what problem you're solving, who your target customers are, how your solution works, and what makes it unique.",
-      }), 422
-    
-    # Check if the idea explanation itself is too vague/nonsensical
-    if len(idea_explanation.strip()) < 20:
-      return jsonify({
-        "success": False,
-        "error": "Your idea description is too brief or unclear. Please provide a more detailed explanation of your business idea, including what problem it solves and how it works.",
-        "error_type": "insufficient_detail",
-        "suggestion": "Aim for at least 50-100 words describing your idea, target customers, and how it works.",
-      }), 400
-    
-    validation_id = f"val_{int(time.time())}"
+    validation_id = _new_validation_id()
     
     # Save to database if user is authenticated
     session = get_current_session()
     if session:
-      user = session.user
-      user_validation = UserValidation(
-        user_id=user.id,
-        validation_id=validation_id,
-        category_answers=json.dumps(category_answers),
-        idea_explanation=idea_explanation,
-        validation_result=json.dumps(validation_data),
-        status="completed",  # Explicitly set status
-        is_deleted=False,  # Explicitly set is_deleted
+      _save_validation_result(
+        session.user, validation_id, category_answers, idea_explanation, validation_data,
+        session=session,
       )
-      db.session.add(user_validation)
-      # Increment usage counter
-      user.increment_validation_usage()
-      # Refresh session activity after long operation completes
-      if session:
-        session.last_activity = utcnow()
-      db.session.commit()
-      
-      # Send validation ready email
-      try:
-        overall_score = validation_data.get("overall_score", None)
-        html_content, text_content = validation_ready_email(
-          user_name=user.email,
-          validation_id=validation_id,
-          validation_score=overall_score,
-        )
-        email_service.send_email(
-          to_email=user.email,
-          subject="Your Idea Validation is Ready! 📊",
-          html_content=html_content,
-          text_content=text_content,
-        )
-      except Exception as e:
-        current_app.logger.warning(f"Failed to send validation ready email: {e}")
     
     return jsonify({
       "success": True,
@@ -1374,8 +1764,96 @@ def validate_idea() -> Any:
     }), 500
 
 
+def _find_user_validation(user: User, validation_id: str) -> Optional[UserValidation]:
+  """Look up a user's (non-deleted) validation by its validation_id."""
+  return UserValidation.query.filter_by(
+    user_id=user.id,
+    validation_id=validation_id,
+    is_deleted=False
+  ).first()
+
+
+@bp.get("/api/validate-idea/<validation_id>/status")
+@require_auth
+def get_validation_status(validation_id: str) -> Any:
+  """Poll the status of a queued (async) validation."""
+  session = get_current_session()
+  if not session:
+    return jsonify({"success": False, "error": "Not authenticated"}), 401
+  
+  user_validation = _find_user_validation(session.user, validation_id)
+  if not user_validation:
+    return jsonify({
+      "success": False,
+      "error": "Validation not found or access denied"
+    }), 404
+  
+  job = validation_job_queue.get(validation_id)
+  if job is None:
+    expire_stale_validations(user_validation)
+  payload = _validation_status_payload(user_validation)
+  if job and user_validation.status == ValidationStatus.PENDING:
+    payload["job_status"] = job.status
+  return jsonify(payload)
+
+
+@bp.get("/api/validate-idea/<validation_id>/events")
+@require_auth
+def stream_validation_events(validation_id: str) -> Any:
+  """Subscribe to a queued validation's progress as Server-Sent Events."""
+  session = get_current_session()
+  if not session:
+    return jsonify({"success": False, "error": "Not authenticated"}), 401
+  
+  user_validation = _find_user_validation(session.user, validation_id)
+  if not user_validation:
+    return jsonify({
+      "success": False,
+      "error": "Validation not found or access denied"
+    }), 404
+  
+  row_id = user_validation.id
+  job = validation_job_queue.get(validation_id)
+  
+  def generate():
+    if job:
+      try:
+        for event in job.events(timeout=VALIDATION_JOB_EVENT_TIMEOUT):
+          yield sse_event(event)
+      except TimeoutError:
+        yield sse_event({'event': 'error', 'error': 'Timed out waiting for validation'})
+      return
+    
+    # Job ran in another worker process (or was pruned) - follow the database row instead
+    deadline = time.time() + VALIDATION_JOB_EVENT_TIMEOUT
+    while time.time() < deadline:
+      db.session.expire_all()
+      row = db.session.get(UserValidation, row_id)
+      if row is None:
+        break
+      expire_stale_validations(row)
+      if row.status != ValidationStatus.PENDING:
+        payload = _validation_status_payload(row)
+        event = "completed" if row.status == ValidationStatus.COMPLETED else "failed"
+        yield sse_event({'event': event, **payload})
+        return
+      yield sse_event({'event': 'heartbeat', 'status': row.status})
+      time.sleep(VALIDATION_JOB_POLL_SECONDS)
+    yield sse_event({'event': 'error', 'error': 'Timed out waiting for validation'})
+  
+  return Response(
+    stream_with_context(metrics.track_stream("validation_events", generate())),
+    mimetype='text/event-stream',
+    headers={
+      'Cache-Control': 'no-cache',
+      'X-Accel-Buffering': 'no',  # Disable nginx buffering
+    }
+  )
+
+
 @bp.put("/api/validate-idea/<validation_id>")
 @require_auth
+@tracing.traced("validation.update")
 def update_validation(validation_id: str) -> Any:
   """Update/edit an existing validation with a new idea explanation."""
   session = get_current_session()
@@ -1488,8 +1966,8 @@ def update_validation(validation_id: str) -> Any:
     
     # Update validation record
     user_validation.idea_explanation = idea_explanation
-    user_validation.category_answers = json.dumps(new_category_answers if new_category_answers else user_validation.category_answers or {})
-    user_validation.validation_result = json.dumps(default_validation)
+    user_validation.category_answers = json_dumps(new_category_answers if new_category_answers else user_validation.category_answers or {})
+    user_validation.validation_result = json_dumps(default_validation)
     user_validation.created_at = utcnow()  # Update timestamp
     
     user.increment_validation_usage()
@@ -1601,8 +2079,8 @@ def update_validation(validation_id: str) -> Any:
     
     # Update validation record
     user_validation.idea_explanation = idea_explanation
-    user_validation.category_answers = json.dumps(new_category_answers if new_category_answers else (user_validation.category_answers or {}))
-    user_validation.validation_result = json.dumps(validation_data)
+    user_validation.category_answers = json_dumps(new_category_answers if new_category_answers else (user_validation.category_answers or {}))
+    user_validation.validation_result = json_dumps(validation_data)
     user_validation.created_at = utcnow()  # Update timestamp
     
     user.increment_validation_usage()
@@ -1669,6 +2147,7 @@ def delete_validation(validation_id: str) -> Any:
     
     # Soft delete by setting is_deleted=True
     user_validation.is_deleted = True
+    usage_stats.record_validation_deleted(user_validation)
     db.session.commit()
     
     return jsonify({
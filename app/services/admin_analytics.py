@@ -0,0 +1,272 @@
+"""
+Admin analytics computed with grouped SQL.
+
+- Revenue by month: one GROUP BY (month, subscription_type) query instead of
+  loading every completed payment into Python.
+- Dashboard stats: one GROUP BY subscription_type query over users plus one
+  query of scalar subqueries for the other totals, instead of a COUNT per tier.
+
+Month bucketing uses date_trunc/to_char on PostgreSQL and strftime on SQLite.
+
+With ADMIN_ANALYTICS_ROLLUP=true, results are read from the analytics_rollups
+table instead, so the dashboard costs a handful of indexed row reads no
+matter how large the tables are. Rollups older than
+ADMIN_ANALYTICS_ROLLUP_MAX_AGE seconds are refreshed incrementally: only
+revenue months with payments inserted or updated (payments.updated_at) since
+the last refresh are recomputed, so refunds and other status changes of old
+payments are picked up. ``refresh_rollups(full=True)`` rebuilds everything
+(e.g. after edits made with raw SQL that don't set updated_at).
+"""
+import os
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import and_, case, func, select
+
+from app.models.database import (
+    db, User, UserRun, UserValidation, Payment, AnalyticsRollup,
+    SubscriptionTier, PaymentStatus, utcnow, normalize_datetime,
+)
+from app.constants import STATUS_ACTIVE
+
+ADMIN_ANALYTICS_ROLLUP = os.environ.get("ADMIN_ANALYTICS_ROLLUP", "false").lower() == "true"
+ADMIN_ANALYTICS_ROLLUP_MAX_AGE = float(os.environ.get("ADMIN_ANALYTICS_ROLLUP_MAX_AGE", "300"))
+# Payments committed up to this many seconds before a refresh may still be in flight
+ROLLUP_WATERMARK_SLACK_SECONDS = 120
+
+METRIC_REVENUE = "revenue"
+METRIC_USERS = "users"
+METRIC_ACTIVE = "active_subscriptions"
+METRIC_TOTALS = "totals"
+METRIC_REFRESH = "refresh"
+
+_refresh_lock = threading.Lock()
+
+
+def month_bucket(column: Any) -> Any:
+    """SQL expression for a datetime column's "YYYY-MM" month."""
+    if db.engine.dialect.name == "postgresql":
+        return func.to_char(func.date_trunc("month", column), "YYYY-MM")
+    return func.strftime("%Y-%m", column)
+
+
+def _month_start(period: str) -> datetime:
+    return datetime.strptime(period, "%Y-%m")
+
+
+def _fold_revenue(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """(period, subscription_type, count, total) rows -> one dict per month."""
+    months: Dict[str, Dict[str, Any]] = {}
+    for period, sub_type, count, total in rows:
+        month = months.setdefault(period, {"period": period, "revenue": Decimal("0"), "count": 0, "types": {}})
+        total = Decimal(str(total or 0))
+        month["revenue"] += total
+        month["count"] += int(count or 0)
+        key = sub_type or "unknown"
+        month["types"][key] = month["types"].get(key, Decimal("0")) + total
+    return [months[period] for period in sorted(months)]
+
+
+def _revenue_groups(periods: Optional[Sequence[str]] = None) -> List[Sequence[Any]]:
+    """(period, subscription_type, count, total) for completed payments, one GROUP BY query."""
+    month = month_bucket(Payment.created_at).label("month")
+    stmt = select(
+        month,
+        Payment.subscription_type,
+        func.count(Payment.id),
+        func.coalesce(func.sum(Payment.amount), 0),
+    ).where(
+        Payment.status == PaymentStatus.COMPLETED,
+        Payment.created_at.isnot(None),
+    )
+    if periods is not None:
+        if not periods:
+            return []
+        # Range on created_at keeps the payments index usable
+        stmt = stmt.where(Payment.created_at >= _month_start(min(periods)), month.in_(list(periods)))
+    stmt = stmt.group_by(month, Payment.subscription_type)
+    return db.session.execute(stmt).all()
+
+
+def query_revenue_by_month(periods: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Completed-payment revenue grouped by month and subscription type.
+
+    Args:
+        periods: Restrict to these "YYYY-MM" months (all months if None)
+
+    Returns:
+        Sorted list of {"period", "revenue", "count", "types"}
+    """
+    return _fold_revenue(_revenue_groups(periods))
+
+
+def _stats_from(by_type: Dict[str, int], active: int, totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the /api/admin/stats payload from grouped results."""
+    return {
+        "total_users": sum(by_type.values()),
+        "total_runs": int(totals.get("runs", 0)),
+        "total_validations": int(totals.get("validations", 0)),
+        "total_payments": int(totals.get("payments", 0)),
+        "total_revenue": float(totals.get("revenue", 0) or 0),
+        "active_subscriptions": active,
+        "free_trial_users": by_type.get(SubscriptionTier.FREE_TRIAL, 0),
+        "weekly_subscribers": by_type.get("weekly", 0),  # Legacy
+        "starter_subscribers": by_type.get(SubscriptionTier.STARTER, 0),
+        "pro_subscribers": by_type.get(SubscriptionTier.PRO, 0),
+        "monthly_subscribers": by_type.get("monthly", 0),  # Backward compatibility (migrated to pro)
+    }
+
+
+def _query_stat_groups(now: datetime):
+    """Users per subscription type, active subscriptions, and table totals (two queries)."""
+    active_case = case(
+        (and_(User.payment_status == STATUS_ACTIVE, User.subscription_expires_at > now), 1),
+        else_=0,
+    )
+    user_rows = db.session.execute(
+        select(User.subscription_type, func.count(User.id), func.coalesce(func.sum(active_case), 0))
+        .group_by(User.subscription_type)
+    ).all()
+    by_type = {sub_type or "": int(count) for sub_type, count, _ in user_rows}
+    active = sum(int(active_count) for _, _, active_count in user_rows)
+
+    completed = Payment.status == PaymentStatus.COMPLETED
+    runs, validations, payments, revenue = db.session.execute(select(
+        select(func.count(UserRun.id)).scalar_subquery(),
+        select(func.count(UserValidation.id)).scalar_subquery(),
+        select(func.count(Payment.id)).where(completed).scalar_subquery(),
+        select(func.coalesce(func.sum(Payment.amount), 0)).where(completed).scalar_subquery(),
+    )).one()
+    totals = {"runs": runs, "validations": validations, "payments": payments, "revenue": revenue}
+    return by_type, active, totals
+
+
+def query_admin_stats() -> Dict[str, Any]:
+    """Dashboard stats straight from the base tables (two grouped queries)."""
+    by_type, active, totals = _query_stat_groups(utcnow())
+    return _stats_from(by_type, active, totals)
+
+
+# ---------------------------------------------------------------------------
+# Rollup table
+# ---------------------------------------------------------------------------
+
+def _last_refresh() -> Optional[datetime]:
+    row = AnalyticsRollup.query.filter_by(metric=METRIC_REFRESH, bucket="all", dimension="").first()
+    return normalize_datetime(row.updated_at) if row else None
+
+
+def _replace_rows(metric: str, rows: List[Dict[str, Any]], buckets: Optional[Sequence[str]] = None) -> None:
+    """Delete a metric's rows (optionally only some buckets) and insert fresh ones."""
+    query = AnalyticsRollup.query.filter_by(metric=metric)
+    if buckets is not None:
+        query = query.filter(AnalyticsRollup.bucket.in_(list(buckets)))
+    query.delete(synchronize_session=False)
+    if rows:
+        now = utcnow()
+        db.session.execute(
+            AnalyticsRollup.__table__.insert(),
+            [{"metric": metric, "updated_at": now, **row} for row in rows],
+        )
+
+
+def _dirty_revenue_months(since: datetime) -> List[str]:
+    """Months of payments inserted or updated since ``since``."""
+    month = month_bucket(Payment.created_at)
+    rows = db.session.execute(
+        select(month).distinct().where(
+            Payment.created_at.isnot(None),
+            Payment.updated_at >= since,
+        )
+    ).all()
+    return sorted(r[0] for r in rows if r[0])
+
+
+def refresh_rollups(full: bool = False) -> Dict[str, Any]:
+    """
+    Bring analytics_rollups up to date.
+
+    Args:
+        full: Recompute every revenue month instead of only those touched
+              since the previous refresh
+
+    Returns:
+        Summary with the number of revenue months recomputed
+    """
+    with _refresh_lock:
+        started = utcnow()
+        last = None if full else _last_refresh()
+        try:
+            if last is None:
+                periods = None
+            else:
+                periods = _dirty_revenue_months(last - timedelta(seconds=ROLLUP_WATERMARK_SLACK_SECONDS))
+            revenue_rows = [
+                {"bucket": period, "dimension": sub_type or "unknown", "row_count": int(count), "total": total or 0}
+                for period, sub_type, count, total in _revenue_groups(periods)
+            ]
+            _replace_rows(METRIC_REVENUE, revenue_rows, periods)
+
+            by_type, active, totals = _query_stat_groups(started)
+            _replace_rows(METRIC_USERS, [
+                {"bucket": "all", "dimension": sub_type, "row_count": count, "total": 0}
+                for sub_type, count in by_type.items()
+            ])
+            _replace_rows(METRIC_ACTIVE, [{"bucket": "all", "dimension": "", "row_count": active, "total": 0}])
+            _replace_rows(METRIC_TOTALS, [
+                {"bucket": "all", "dimension": "runs", "row_count": int(totals["runs"]), "total": 0},
+                {"bucket": "all", "dimension": "validations", "row_count": int(totals["validations"]), "total": 0},
+                {"bucket": "all", "dimension": "payments", "row_count": int(totals["payments"]), "total": totals["revenue"] or 0},
+            ])
+            # The watermark is the refresh start, so payments written during the refresh are picked up next time
+            _replace_rows(METRIC_REFRESH, [{"bucket": "all", "dimension": "", "row_count": 0, "total": 0, "updated_at": started}])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return {
+            "full": last is None,
+            "revenue_months_recomputed": len({row["bucket"] for row in revenue_rows}) if periods is None else len(periods),
+            "refreshed_at": started.isoformat(),
+        }
+
+
+def _ensure_fresh_rollups() -> None:
+    last = _last_refresh()
+    if last is None or (normalize_datetime(utcnow()) - last).total_seconds() > ADMIN_ANALYTICS_ROLLUP_MAX_AGE:
+        refresh_rollups()
+
+
+def _rollup_stats() -> Dict[str, Any]:
+    rows = AnalyticsRollup.query.filter(
+        AnalyticsRollup.metric.in_([METRIC_USERS, METRIC_ACTIVE, METRIC_TOTALS])
+    ).all()
+    by_type = {r.dimension: r.row_count for r in rows if r.metric == METRIC_USERS}
+    active = sum(r.row_count for r in rows if r.metric == METRIC_ACTIVE)
+    totals: Dict[str, Any] = {r.dimension: r.row_count for r in rows if r.metric == METRIC_TOTALS}
+    totals["revenue"] = next((r.total for r in rows if r.metric == METRIC_TOTALS and r.dimension == "payments"), 0)
+    return _stats_from(by_type, active, totals)
+
+
+def _rollup_revenue() -> List[Dict[str, Any]]:
+    rows = AnalyticsRollup.query.filter_by(metric=METRIC_REVENUE).all()
+    return _fold_revenue((r.bucket, r.dimension, r.row_count, r.total) for r in rows)
+
+
+def get_admin_stats() -> Dict[str, Any]:
+    """Dashboard stats, from rollups when ADMIN_ANALYTICS_ROLLUP is on."""
+    if ADMIN_ANALYTICS_ROLLUP:
+        _ensure_fresh_rollups()
+        return _rollup_stats()
+    return query_admin_stats()
+
+
+def get_revenue_by_month() -> List[Dict[str, Any]]:
+    """Revenue by month, from rollups when ADMIN_ANALYTICS_ROLLUP is on."""
+    if ADMIN_ANALYTICS_ROLLUP:
+        _ensure_fresh_rollups()
+        return _rollup_revenue()
+    return query_revenue_by_month()
@@ -1,9 +1,214 @@
-"""Audit logging service for security and compliance."""
+"""
+Audit logging service for security and compliance.
+
+Events are buffered in a bounded in-memory queue and written by a background
+thread with multi-row INSERTs (every AUDIT_FLUSH_BATCH_SIZE events or
+AUDIT_FLUSH_INTERVAL_SECONDS, whichever comes first). Writes use their own
+connection, so logging an event never commits the caller's session. If the
+queue is full the event is written synchronously rather than dropped. The
+buffer is drained at interpreter exit (``audit_writer.shutdown()``, also
+usable from a server's worker-exit hook).
+
+Security-critical actions (AUDIT_SYNC_ACTIONS, admin actions, or
+``sync=True``) go through the caller's ``db.session`` instead. If the session
+holds uncommitted changes, the audit row joins that transaction: it is
+committed by the caller's commit and discarded if the caller rolls back.
+Otherwise it is committed before log_action returns.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
 from datetime import datetime
-from typing import Optional, Dict, Any
-from flask import request, g, current_app
+from typing import Optional, Dict, Any, List
+from flask import request, g, current_app, has_app_context, has_request_context
+from sqlalchemy import event
+
+from app.models.database import db, AuditLog, User, Admin, utcnow
 
-from app.models.database import db, AuditLog, User, Admin
+AUDIT_BUFFER_ENABLED = os.environ.get("AUDIT_BUFFER_ENABLED", "true").lower() == "true"
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_FLUSH_BATCH_SIZE = int(os.environ.get("AUDIT_FLUSH_BATCH_SIZE", "100"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.environ.get("AUDIT_FLUSH_INTERVAL_SECONDS", "2"))
+# Written before log_action returns
+AUDIT_SYNC_ACTIONS = frozenset(
+    action.strip() for action in os.environ.get(
+        "AUDIT_SYNC_ACTIONS", "password_reset,subscription_change,payment"
+    ).split(",") if action.strip()
+)
+
+_AUDIT_COLUMNS = (
+    "user_id", "admin_id", "action", "resource_type", "resource_id",
+    "details", "ip_address", "user_agent", "created_at",
+)
+
+
+class AuditWriter:
+    """Bounded audit event buffer flushed with multi-row INSERTs."""
+    
+    def __init__(
+        self,
+        max_queue: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_FLUSH_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        background: bool = AUDIT_BUFFER_ENABLED,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.background = background
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._app: Any = None
+    
+    def buffering(self) -> bool:
+        """Whether events can be left to the background flusher."""
+        return self.background and not self._stopping and (has_app_context() or self._app is not None)
+    
+    def submit(self, row: Dict[str, Any], sync: bool = False) -> None:
+        """
+        Queue an audit row (column -> value).
+        
+        Args:
+            row: AuditLog column values, including created_at
+            sync: Write it (and anything queued before it) before returning
+        """
+        if self._app is None and has_app_context():
+            self._app = current_app._get_current_object()
+        if not sync and not self.buffering():
+            sync = True
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Never drop audit events; pay for one write instead
+            self._write([row])
+            return
+        if sync:
+            self.flush()
+            return
+        self._ensure_worker()
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+    
+    def pending(self) -> int:
+        """Events waiting to be written."""
+        return self._queue.qsize()
+    
+    def flush(self) -> int:
+        """
+        Write every queued event now, in batches of batch_size.
+        
+        Returns:
+            Number of events written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                rows: List[Dict[str, Any]] = []
+                while len(rows) < self.batch_size:
+                    try:
+                        rows.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not rows:
+                    return written
+                self._write(rows)
+                written += len(rows)
+    
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        statement = AuditLog.__table__.insert().values([{c: row.get(c) for c in _AUDIT_COLUMNS} for row in rows])
+        try:
+            if has_app_context():
+                self._execute(statement)
+            elif self._app is not None:
+                with self._app.app_context():
+                    self._execute(statement)
+            else:
+                raise RuntimeError("no application context")
+        except Exception as e:
+            actions = ", ".join(sorted({row.get("action") or "?" for row in rows}))
+            self._log_error(f"Failed to write {len(rows)} audit log(s) ({actions}): {e}")
+    
+    @staticmethod
+    def _execute(statement: Any) -> None:
+        # Own connection and transaction: never commits the request's session
+        with db.engine.begin() as conn:
+            conn.execute(statement)
+    
+    def _log_error(self, message: str) -> None:
+        try:
+            if has_app_context():
+                current_app.logger.error(message)
+            elif self._app is not None:
+                self._app.logger.error(message)
+        except Exception:
+            pass
+    
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or self._app is None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+    
+    def shutdown(self, timeout: float = 5.0) -> int:
+        """Stop the background flusher and write whatever is still buffered."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.flush()
+
+
+audit_writer = AuditWriter()
+atexit.register(audit_writer.shutdown)
+
+# session.info key: the current transaction has flushed writes
+_FLUSHED_WRITES = "audit_flushed_writes"
+
+
+@event.listens_for(db.session, "after_flush")
+def _mark_flushed_writes(session, flush_context) -> None:
+    session.info[_FLUSHED_WRITES] = True
+
+
+@event.listens_for(db.session, "after_commit")
+@event.listens_for(db.session, "after_rollback")
+def _clear_flushed_writes(session, *args) -> None:
+    session.info.pop(_FLUSHED_WRITES, None)
+
+
+def _has_uncommitted_writes(session) -> bool:
+    if session.info.get(_FLUSHED_WRITES) or session.new or session.deleted:
+        return True
+    return any(session.is_modified(obj) for obj in session.dirty)
+
+
+def _write_in_session(row: Dict[str, Any]) -> None:
+    """Add a sync audit row to the caller's transaction, committing it now if there is nothing else to commit."""
+    session = db.session
+    join_caller = _has_uncommitted_writes(session)
+    session.add(AuditLog(**row))
+    if join_caller:
+        # Committed (or rolled back) together with the change it records
+        return
+    try:
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
 
 
 def log_action(
@@ -15,6 +220,7 @@ def log_action(
     details: Optional[Dict[str, Any]] = None,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
+    sync: Optional[bool] = None,
 ) -> AuditLog:
     """
     Log an audit event.
@@ -28,15 +234,18 @@ def log_action(
         details: Additional details as dict (will be JSON encoded)
         ip_address: IP address (defaults to request.remote_addr)
         user_agent: User agent (defaults to request.headers.get('User-Agent'))
+        sync: Write through the caller's session instead of buffering
+              (defaults to True for AUDIT_SYNC_ACTIONS and admin actions)
     
     Returns:
-        Created AuditLog instance
+        AuditLog with the logged values (not attached to the session)
     """
     # Get IP and user agent from request if not provided
-    if ip_address is None:
-        ip_address = getattr(request, 'remote_addr', None)
-    if user_agent is None:
-        user_agent = getattr(request, 'headers', {}).get('User-Agent', None)
+    if has_request_context():
+        if ip_address is None:
+            ip_address = getattr(request, 'remote_addr', None)
+        if user_agent is None:
+            user_agent = getattr(request, 'headers', {}).get('User-Agent', None)
     
     # Get user/admin from g if not provided
     if user_id is None and hasattr(g, 'user_id'):
@@ -47,26 +256,30 @@ def log_action(
     # Encode details as JSON string
     details_json = None
     if details:
-        import json
         try:
             details_json = json.dumps(details)
         except (TypeError, ValueError):
             details_json = str(details)
     
-    audit_log = AuditLog(
-        user_id=user_id,
-        admin_id=admin_id,
-        action=action,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        details=details_json,
-        ip_address=ip_address,
-        user_agent=user_agent,
-    )
+    row = {
+        "user_id": user_id,
+        "admin_id": admin_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": resource_id,
+        "details": details_json,
+        "ip_address": ip_address,
+        "user_agent": user_agent[:255] if user_agent else None,
+        "created_at": utcnow(),
+    }
+    if sync is None:
+        sync = action in AUDIT_SYNC_ACTIONS or admin_id is not None
     
     try:
-        db.session.add(audit_log)
-        db.session.commit()
+        if sync:
+            _write_in_session(row)
+        else:
+            audit_writer.submit(row)
         
         # Log to application logger as well
         request_id = getattr(g, 'request_id', 'unknown')
@@ -75,11 +288,10 @@ def log_action(
             f"Resource: {resource_type}/{resource_id}"
         )
     except Exception as e:
-        db.session.rollback()
         current_app.logger.error(f"Failed to create audit log: {e}")
         # Don't raise - audit logging failure shouldn't break the app
     
-    return audit_log
+    return AuditLog(**row)
 
 
 def log_user_action(action: str, user_id: int, **kwargs) -> AuditLog:
@@ -0,0 +1,267 @@
+"""
+Persistent email outbox.
+
+Request handlers queue emails with ``email_outbox.enqueue(...)``, which only
+inserts an EmailOutbox row. A background sender claims due rows in batches,
+hands them to a small worker pool that calls the provider (Resend's batch API,
+one SMTP connection per batch, ...), and records the outcome:
+
+- sent: ``status=sent``
+- failed: retried with exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS,
+  then ``status=failed`` (the row and last_error are kept for inspection)
+
+A ``dedupe_key`` makes enqueueing idempotent, e.g. the payment confirm
+endpoint and the Stripe webhook both queue
+``subscription_activated:<payment_intent_id>`` and the user gets one email.
+
+Rows are claimed with a per-batch token, so several app processes can run
+senders against the same table. A row left in ``sending`` by a crashed
+process is reclaimed after EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS (delivery is
+at-least-once).
+
+With EMAIL_OUTBOX_BACKGROUND=false no sender thread is started and rows
+are only delivered when ``process_due()`` is called (the test suite does
+this). Set EMAIL_PROVIDER=file or log to deliver locally, or
+EMAIL_OUTBOX_ENABLED=false to send inline as before.
+"""
+import os
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+
+from app.models.database import db, EmailOutbox, EmailStatus, utcnow
+from app.services.email_service import email_service
+
+EMAIL_OUTBOX_ENABLED = os.environ.get("EMAIL_OUTBOX_ENABLED", "true").lower() == "true"
+# Start the background sender; with false, call process_due() yourself
+EMAIL_OUTBOX_BACKGROUND = os.environ.get("EMAIL_OUTBOX_BACKGROUND", "true").lower() == "true"
+EMAIL_OUTBOX_WORKERS = int(os.environ.get("EMAIL_OUTBOX_WORKERS", "4"))
+# Rows claimed per pass; split across the workers, one provider batch call each
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = float(os.environ.get("EMAIL_OUTBOX_RETRY_BASE_SECONDS", "30"))
+EMAIL_OUTBOX_RETRY_MAX_SECONDS = float(os.environ.get("EMAIL_OUTBOX_RETRY_MAX_SECONDS", "3600"))
+EMAIL_OUTBOX_POLL_SECONDS = float(os.environ.get("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS = float(os.environ.get("EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS", "300"))
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retry number ``attempts`` (1-based), with +/-10% jitter."""
+    delay = min(EMAIL_OUTBOX_RETRY_MAX_SECONDS, EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.9, 1.1)
+
+
+class EmailOutboxSender:
+    """Queues emails in the outbox table and delivers them in the background."""
+
+    def __init__(
+        self,
+        workers: int = EMAIL_OUTBOX_WORKERS,
+        batch_size: int = EMAIL_OUTBOX_BATCH_SIZE,
+        background: bool = EMAIL_OUTBOX_BACKGROUND,
+    ):
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.background = background
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="email-outbox")
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._app: Any = None
+
+    def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        text_content: Optional[str] = None,
+        dedupe_key: Optional[str] = None,
+        commit: bool = True,
+    ) -> bool:
+        """
+        Queue an email for background delivery.
+
+        Args:
+            to_email: Recipient email address
+            subject: Email subject
+            html_content: HTML email content
+            text_content: Plain text alternative (optional)
+            dedupe_key: Emails with the same key are only queued once
+            commit: Commit the session; pass False to queue the email in the
+                    caller's transaction (it's sent only if that commits)
+
+        Returns:
+            True if queued (or sent, when the outbox is disabled), False for a duplicate
+        """
+        if not EMAIL_OUTBOX_ENABLED:
+            return email_service.send_email(to_email, subject, html_content, text_content)
+
+        if dedupe_key and self._is_queued(dedupe_key):
+            return False
+        row = EmailOutbox(
+            dedupe_key=dedupe_key,
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            text_content=text_content,
+            status=EmailStatus.PENDING,
+            attempts=0,
+            next_attempt_at=utcnow(),
+        )
+        if not commit:
+            # Insert under a savepoint: a dedupe_key race then rolls back only
+            # this row, never the caller's transaction (e.g. a payment update)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(row)
+            except IntegrityError:
+                return False
+            self.notify()
+            return True
+        db.session.add(row)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request queued the same dedupe_key first
+            db.session.rollback()
+            return False
+        self.notify()
+        return True
+
+    def _is_queued(self, dedupe_key: str) -> bool:
+        # Fast path only: a concurrent insert can still land between this
+        # check and ours, which the unique index on dedupe_key catches
+        return db.session.query(EmailOutbox.id).filter_by(dedupe_key=dedupe_key).first() is not None
+
+    def notify(self) -> None:
+        """Wake the sender (starting it on first use)."""
+        self._ensure_worker()
+        self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _claim(self, limit: int) -> List[EmailOutbox]:
+        now = utcnow()
+        due = or_(
+            and_(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(
+                EmailOutbox.status == EmailStatus.SENDING,
+                EmailOutbox.claimed_at < now - timedelta(seconds=EMAIL_OUTBOX_CLAIM_TIMEOUT_SECONDS),
+            ),
+        )
+        ids = [row_id for (row_id,) in db.session.query(EmailOutbox.id).filter(due).order_by(
+            EmailOutbox.next_attempt_at, EmailOutbox.id
+        ).limit(limit)]
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        # The due condition is repeated so rows claimed by another process in between are skipped
+        EmailOutbox.query.filter(EmailOutbox.id.in_(ids), due).update(
+            {"status": EmailStatus.SENDING, "claim_token": token, "claimed_at": now},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        return EmailOutbox.query.filter_by(claim_token=token).order_by(EmailOutbox.id).all()
+
+    def _deliver(self, rows: List[EmailOutbox]) -> List[bool]:
+        messages = [{
+            "to_email": row.to_email,
+            "subject": row.subject,
+            "html_content": row.html_content,
+            "text_content": row.text_content,
+        } for row in rows]
+        chunk_size = -(-len(messages) // self.workers)
+        chunks = [messages[i:i + chunk_size] for i in range(0, len(messages), chunk_size)]
+        results: List[bool] = []
+        for chunk_results in self._executor.map(email_service.send_batch, chunks):
+            results.extend(chunk_results)
+        return results
+
+    def process_due(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Send one batch of due emails (requires an app context).
+
+        Returns:
+            Counts: claimed, sent, retrying, failed
+        """
+        rows = self._claim(limit or self.batch_size)
+        counts = {"claimed": len(rows), "sent": 0, "retrying": 0, "failed": 0}
+        if not rows:
+            return counts
+
+        if email_service.is_configured:
+            results = self._deliver(rows)
+            error = f"{email_service.provider} send failed"
+        else:
+            # Nothing to retry against; keep the rows for inspection
+            results = [False] * len(rows)
+            error = "Email service disabled or not configured"
+
+        now = utcnow()
+        for row, sent in zip(rows, results):
+            row.claim_token = None
+            if sent:
+                row.status = EmailStatus.SENT
+                row.sent_at = now
+                counts["sent"] += 1
+                continue
+            row.attempts = (row.attempts or 0) + 1
+            row.last_error = error
+            if email_service.is_configured and row.attempts < EMAIL_OUTBOX_MAX_ATTEMPTS:
+                row.status = EmailStatus.PENDING
+                row.next_attempt_at = now + timedelta(seconds=retry_delay(row.attempts))
+                counts["retrying"] += 1
+            else:
+                row.status = EmailStatus.FAILED
+                counts["failed"] += 1
+        db.session.commit()
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Outbox row counts by status."""
+        rows = db.session.query(EmailOutbox.status, db.func.count(EmailOutbox.id)).group_by(EmailOutbox.status).all()
+        return {"workers": self.workers, "batch_size": self.batch_size, "emails": {status: count for status, count in rows}}
+
+    # ------------------------------------------------------------------
+    # Background sender
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or not self.background or not has_app_context():
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._run, name="email-outbox-sender", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(EMAIL_OUTBOX_POLL_SECONDS)
+            self._wake.clear()
+            try:
+                with self._app.app_context():
+                    # Keep going while full batches come back (a backlog after downtime)
+                    while self.process_due()["claimed"] >= self.batch_size:
+                        pass
+                    db.session.remove()
+            except Exception as e:
+                try:
+                    with self._app.app_context():
+                        db.session.rollback()
+                        self._app.logger.warning(f"Email outbox pass failed: {e}")
+                except Exception:
+                    pass
+
+
+email_outbox = EmailOutboxSender()
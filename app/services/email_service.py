@@ -1,11 +1,18 @@
 """
 Email service for sending triggered emails.
-Supports multiple email providers: Resend, SendGrid, SMTP.
+Supports multiple email providers: Resend, SendGrid, SMTP, plus "file"
+(appends each email as a JSON line to EMAIL_FILE_PATH) and "log" for
+offline development and tests.
+
+Request handlers should queue mail with app.services.email_outbox instead
+of calling send_email() directly, so provider latency stays off the request.
 """
 import os
+import json
 import logging
-from typing import Optional, Dict, Any
-from datetime import datetime
+import threading
+from typing import Optional, Dict, Any, List
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +34,12 @@ class EmailService:
             self._init_sendgrid()
         elif self.provider == "smtp":
             self._init_smtp()
+        elif self.provider == "file":
+            self.file_path = os.environ.get("EMAIL_FILE_PATH", os.path.join("instance", "emails.jsonl"))
+            self._file_lock = threading.Lock()
+            self.client = "file"
+        elif self.provider == "log":
+            self.client = "log"
         else:
             logger.warning(f"Unknown email provider: {self.provider}. Emails will be logged only.")
             self.client = None
@@ -94,6 +107,11 @@ class EmailService:
             logger.warning(f"SMTP initialization failed: {e}. Emails will be logged only.")
             self.client = None
     
+    @property
+    def is_configured(self) -> bool:
+        """Whether emails can actually be delivered (enabled and a provider client is set up)."""
+        return self.enabled and self.client is not None
+    
     def send_email(
         self,
         to_email: str,
@@ -129,6 +147,8 @@ class EmailService:
                 return self._send_sendgrid(to_email, subject, html_content, text_content)
             elif self.provider == "smtp":
                 return self._send_smtp(to_email, subject, html_content, text_content)
+            elif self.provider in ("file", "log"):
+                return self._send_local(to_email, subject, html_content, text_content)
             else:
                 logger.warning(f"Unknown provider: {self.provider}")
                 return False
@@ -136,24 +156,55 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {e}", exc_info=True)
             return False
     
+    def send_batch(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send several emails, using the provider's batch API where it has one.
+        
+        Resend sends the whole list in one Batch API call (all succeed or all
+        fail); SMTP reuses one connection; other providers send one by one.
+        
+        Args:
+            messages: Dicts with to_email, subject, html_content, text_content
+            
+        Returns:
+            One success flag per message, in order
+        """
+        if not messages:
+            return []
+        if not self.is_configured:
+            return [self.send_email(**message) for message in messages]
+        if self.provider == "resend" and len(messages) > 1 and hasattr(self.client, "Batch"):
+            try:
+                self.client.Batch.send([self._resend_params(**message) for message in messages])
+                logger.info(f"Batch of {len(messages)} emails sent via Resend")
+                return [True] * len(messages)
+            except Exception as e:
+                logger.error(f"Resend batch send failed: {e}")
+                return [False] * len(messages)
+        if self.provider == "smtp":
+            return self._send_smtp_batch(messages)
+        return [self.send_email(**message) for message in messages]
+    
+    def _resend_params(self, to_email: str, subject: str, html_content: str, text_content: Optional[str] = None) -> Dict[str, Any]:
+        params = {
+            "from": f"{self.from_name} <{self.from_email}>",
+            "to": [to_email],
+            "subject": subject,
+            "html": html_content,
+        }
+        if text_content:
+            params["text"] = text_content
+        
+        # Add Reply-To header if configured
+        reply_to = os.environ.get("REPLY_TO_EMAIL")
+        if reply_to:
+            params["reply_to"] = reply_to
+        return params
+    
     def _send_resend(self, to_email: str, subject: str, html_content: str, text_content: Optional[str]) -> bool:
         """Send email via Resend."""
         try:
-            params = {
-                "from": f"{self.from_name} <{self.from_email}>",
-                "to": [to_email],
-                "subject": subject,
-                "html": html_content,
-            }
-            if text_content:
-                params["text"] = text_content
-            
-            # Add Reply-To header if configured
-            reply_to = os.environ.get("REPLY_TO_EMAIL")
-            if reply_to:
-                params["reply_to"] = reply_to
-                logger.debug(f"Using Reply-To: {reply_to}")
-            
+            params = self._resend_params(to_email, subject, html_content, text_content)
             email = self.client.Emails.send(params)
             logger.info(f"Email sent via Resend to {to_email}: {email.get('id', 'unknown')}")
             return True
@@ -180,31 +231,68 @@ class EmailService:
             logger.error(f"SendGrid send failed: {e}")
             return False
     
+    def _smtp_message(self, to_email: str, subject: str, html_content: str, text_content: Optional[str] = None) -> Any:
+        msg = self.MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = f"{self.from_name} <{self.from_email}>"
+        msg["To"] = to_email
+        
+        if text_content:
+            text_part = self.MIMEText(text_content, "plain")
+            msg.attach(text_part)
+        
+        html_part = self.MIMEText(html_content, "html")
+        msg.attach(html_part)
+        return msg
+    
     def _send_smtp(self, to_email: str, subject: str, html_content: str, text_content: Optional[str]) -> bool:
         """Send email via SMTP."""
+        return self._send_smtp_batch([{
+            "to_email": to_email,
+            "subject": subject,
+            "html_content": html_content,
+            "text_content": text_content,
+        }])[0]
+    
+    def _send_smtp_batch(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """Send emails over a single SMTP connection."""
+        results = [False] * len(messages)
         try:
-            msg = self.MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"{self.from_name} <{self.from_email}>"
-            msg["To"] = to_email
-            
-            if text_content:
-                text_part = self.MIMEText(text_content, "plain")
-                msg.attach(text_part)
-            
-            html_part = self.MIMEText(html_content, "html")
-            msg.attach(html_part)
-            
             with self.smtplib.SMTP(self.client["server"], self.client["port"]) as server:
                 server.starttls()
                 server.login(self.client["username"], self.client["password"])
-                server.send_message(msg)
-            
-            logger.info(f"Email sent via SMTP to {to_email}")
-            return True
+                for i, message in enumerate(messages):
+                    try:
+                        server.send_message(self._smtp_message(**message))
+                        results[i] = True
+                        logger.info(f"Email sent via SMTP to {message['to_email']}")
+                    except Exception as e:
+                        logger.error(f"SMTP send to {message['to_email']} failed: {e}")
         except Exception as e:
             logger.error(f"SMTP send failed: {e}")
-            return False
+        return results
+    
+    def _send_local(self, to_email: str, subject: str, html_content: str, text_content: Optional[str]) -> bool:
+        """Write the email to EMAIL_FILE_PATH ("file") or the log ("log") instead of sending it."""
+        if self.provider == "log":
+            logger.info(f"Email to {to_email}: {subject}")
+            return True
+        record = {
+            "sent_at": datetime.now(timezone.utc).isoformat(),
+            "from": f"{self.from_name} <{self.from_email}>",
+            "to": to_email,
+            "subject": subject,
+            "html": html_content,
+            "text": text_content,
+        }
+        with self._file_lock:
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.file_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        logger.info(f"Email to {to_email} written to {self.file_path}")
+        return True
 
 
 # Global email service instance
@@ -0,0 +1,225 @@
+"""
+Indexed co-founder matching for Founder Connect.
+
+Skills and industries are stored on profiles/listings as JSON text, which
+``ilike('%skill%')`` can only scan. This module mirrors them into the
+normalized founder_profile_tags / idea_listing_tags tables (kept in sync
+whenever a profile or listing is saved), so that:
+
+- skill/industry filters scan the short tag rows of one kind instead of
+  the JSON text of every profile
+- candidates can be ranked by overlap with the viewer in one grouped query:
+  profiles score 2 per skill the viewer's listings need (and the viewer
+  doesn't have) plus 1 per shared industry; listings score 2 per needed
+  skill the viewer has plus 1 if the listing's industry is one of theirs.
+
+Tags are lower-cased and whitespace-collapsed. Filters keep the substring
+semantics of the old ILIKE filters ("design" matches "UI Design"), but a term
+must now fall within one tag rather than anywhere in the JSON text, and every
+comma-separated term must match. Ranking compares whole tags.
+
+Existing rows need a one-off backfill after the tag tables are created:
+``python migrations/add_founder_tag_tables.py`` (runs rebuild_all_tags()).
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, case, func, or_, select
+
+from app.models.database import db, FounderProfile, IdeaListing, FounderProfileTag, IdeaListingTag
+from app.utils.json_helpers import safe_json_loads
+
+KIND_SKILL = "skill"
+KIND_INDUSTRY = "industry"
+
+# Weights of the overlap score
+SKILL_MATCH_WEIGHT = 2
+INDUSTRY_MATCH_WEIGHT = 1
+
+
+def normalize_tag(value: Any) -> str:
+    """Lower-case, trim and collapse whitespace ("  Machine  Learning" -> "machine learning")."""
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()[:200]
+
+
+def normalize_tags(values: Iterable[Any]) -> List[str]:
+    """Normalized, de-duplicated tags in their original order."""
+    seen: Set[str] = set()
+    tags = []
+    for value in values or []:
+        tag = normalize_tag(value)
+        if tag and tag not in seen:
+            seen.add(tag)
+            tags.append(tag)
+    return tags
+
+
+def parse_tag_param(value: Optional[str]) -> List[str]:
+    """Comma-separated query parameter -> normalized tags."""
+    return normalize_tags((value or "").split(","))
+
+
+def _json_tags(value: Optional[str]) -> List[str]:
+    parsed = safe_json_loads(value, default=[])
+    return normalize_tags(parsed if isinstance(parsed, list) else [])
+
+
+# ---------------------------------------------------------------------------
+# Keeping tag tables in sync
+# ---------------------------------------------------------------------------
+
+def sync_profile_tags(profile: FounderProfile) -> None:
+    """Replace a profile's tag rows from its JSON fields (caller commits)."""
+    if profile.id is None:
+        db.session.flush()
+    FounderProfileTag.query.filter_by(founder_profile_id=profile.id).delete(synchronize_session=False)
+    rows = [{"founder_profile_id": profile.id, "kind": KIND_SKILL, "tag": t} for t in _json_tags(profile.primary_skills)]
+    rows += [{"founder_profile_id": profile.id, "kind": KIND_INDUSTRY, "tag": t} for t in _json_tags(profile.industries_of_interest)]
+    if rows:
+        db.session.execute(FounderProfileTag.__table__.insert(), rows)
+
+
+def sync_listing_tags(listing: IdeaListing) -> None:
+    """Replace a listing's skills-needed tag rows (caller commits)."""
+    if listing.id is None:
+        db.session.flush()
+    IdeaListingTag.query.filter_by(idea_listing_id=listing.id).delete(synchronize_session=False)
+    rows = [{"idea_listing_id": listing.id, "tag": t} for t in _json_tags(listing.skills_needed)]
+    if rows:
+        db.session.execute(IdeaListingTag.__table__.insert(), rows)
+
+
+def rebuild_all_tags(batch_size: int = 1000) -> Dict[str, int]:
+    """Rebuild both tag tables from the JSON columns (backfill / repair)."""
+    counts = {"profiles": 0, "listings": 0}
+    db.session.execute(FounderProfileTag.__table__.delete())
+    db.session.execute(IdeaListingTag.__table__.delete())
+
+    last_id = 0
+    while True:
+        batch = db.session.execute(
+            select(FounderProfile.id, FounderProfile.primary_skills, FounderProfile.industries_of_interest)
+            .where(FounderProfile.id > last_id).order_by(FounderProfile.id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        rows = []
+        for profile_id, skills, industries in batch:
+            rows += [{"founder_profile_id": profile_id, "kind": KIND_SKILL, "tag": t} for t in _json_tags(skills)]
+            rows += [{"founder_profile_id": profile_id, "kind": KIND_INDUSTRY, "tag": t} for t in _json_tags(industries)]
+        if rows:
+            db.session.execute(FounderProfileTag.__table__.insert(), rows)
+        counts["profiles"] += len(batch)
+        last_id = batch[-1][0]
+
+    last_id = 0
+    while True:
+        batch = db.session.execute(
+            select(IdeaListing.id, IdeaListing.skills_needed)
+            .where(IdeaListing.id > last_id).order_by(IdeaListing.id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        rows = [{"idea_listing_id": listing_id, "tag": t} for listing_id, skills in batch for t in _json_tags(skills)]
+        if rows:
+            db.session.execute(IdeaListingTag.__table__.insert(), rows)
+        counts["listings"] += len(batch)
+        last_id = batch[-1][0]
+
+    db.session.commit()
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Filters
+# ---------------------------------------------------------------------------
+
+def profile_tag_filter(kind: str, tags: List[str]) -> List[Any]:
+    """WHERE clauses requiring a profile to have, for every term, a tag containing it."""
+    return [
+        FounderProfile.id.in_(
+            select(FounderProfileTag.founder_profile_id).where(
+                FounderProfileTag.kind == kind, FounderProfileTag.tag.contains(tag, autoescape=True)
+            )
+        )
+        for tag in tags
+    ]
+
+
+def listing_tag_filter(tags: List[str]) -> List[Any]:
+    """WHERE clauses requiring a listing to need, for every term, a skill containing it."""
+    return [
+        IdeaListing.id.in_(
+            select(IdeaListingTag.idea_listing_id).where(IdeaListingTag.tag.contains(tag, autoescape=True))
+        )
+        for tag in tags
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Ranking
+# ---------------------------------------------------------------------------
+
+def viewer_tags(profile: Optional[FounderProfile]) -> Dict[str, Set[str]]:
+    """The viewer's skills, industries and the skills their active listings still need."""
+    if profile is None:
+        return {"skills": set(), "industries": set(), "needed": set()}
+    rows = db.session.execute(
+        select(FounderProfileTag.kind, FounderProfileTag.tag).where(FounderProfileTag.founder_profile_id == profile.id)
+    ).all()
+    skills = {tag for kind, tag in rows if kind == KIND_SKILL}
+    industries = {tag for kind, tag in rows if kind == KIND_INDUSTRY}
+    needed = set(db.session.execute(
+        select(IdeaListingTag.tag).join(IdeaListing, IdeaListing.id == IdeaListingTag.idea_listing_id).where(
+            IdeaListing.founder_profile_id == profile.id,
+            IdeaListing.is_active == True,
+        )
+    ).scalars())
+    return {"skills": skills, "industries": industries, "needed": needed - skills}
+
+
+def profile_match_scores(viewer: Dict[str, Set[str]]) -> Optional[Any]:
+    """
+    Subquery (founder_profile_id, score) of profiles overlapping the viewer.
+
+    Returns None when the viewer has nothing to match on.
+    """
+    needed, industries = sorted(viewer["needed"]), sorted(viewer["industries"])
+    conditions = []
+    if needed:
+        conditions.append(and_(FounderProfileTag.kind == KIND_SKILL, FounderProfileTag.tag.in_(needed)))
+    if industries:
+        conditions.append(and_(FounderProfileTag.kind == KIND_INDUSTRY, FounderProfileTag.tag.in_(industries)))
+    if not conditions:
+        return None
+    score = func.sum(case(
+        (FounderProfileTag.kind == KIND_SKILL, SKILL_MATCH_WEIGHT),
+        else_=INDUSTRY_MATCH_WEIGHT,
+    )).label("score")
+    return (
+        select(FounderProfileTag.founder_profile_id.label("founder_profile_id"), score)
+        .where(or_(*conditions))
+        .group_by(FounderProfileTag.founder_profile_id)
+        .subquery("profile_scores")
+    )
+
+
+def listing_match_scores(viewer: Dict[str, Set[str]]) -> Optional[Any]:
+    """Subquery (idea_listing_id, score) of listings needing the viewer's skills."""
+    skills = sorted(viewer["skills"])
+    if not skills:
+        return None
+    return (
+        select(IdeaListingTag.idea_listing_id.label("idea_listing_id"), (func.count() * SKILL_MATCH_WEIGHT).label("score"))
+        .where(IdeaListingTag.tag.in_(skills))
+        .group_by(IdeaListingTag.idea_listing_id)
+        .subquery("listing_scores")
+    )
+
+
+def listing_industry_bonus(viewer: Dict[str, Set[str]]) -> Any:
+    """Score expression: INDUSTRY_MATCH_WEIGHT if the listing's industry is one of the viewer's."""
+    industries = sorted(viewer["industries"])
+    if not industries:
+        return 0
+    return case((func.lower(IdeaListing.industry).in_(industries), INDUSTRY_MATCH_WEIGHT), else_=0)
@@ -0,0 +1,294 @@
+"""
+Full-text search over Founder Connect idea listings and founder profiles.
+
+Backends, picked per database (re-checked every
+FOUNDER_SEARCH_BACKEND_TTL_SECONDS, so a migration applied while the app is
+running is picked up):
+
+- PostgreSQL: the generated ``search_vector`` tsvector columns and their GIN
+  indexes (see app.models.database and
+  migrations/add_founder_search_indexes.sql). The database keeps them current
+  on every write. Ranked with ts_rank_cd, snippets from ts_headline.
+- SQLite: FTS5 tables (idea_listings_fts, founder_profiles_fts) keyed by the
+  row id. index_listing()/index_profile() update them when a listing or
+  profile is saved. If they are missing, the first search creates and
+  backfills them. Ranked with bm25, snippets from snippet().
+- Anything else (or PostgreSQL before the migration): ILIKE per term,
+  unranked.
+
+Every term must match, and the last term also matches as a prefix, so
+results narrow as the user types. Title and looking_for weigh more than
+description and bio. Profile snippets only come from looking_for, because
+bio is not part of the anonymized profile view.
+
+Snippets are HTML-escaped, with matches wrapped in <mark>...</mark>.
+"""
+import html
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import and_, bindparam, column, func, literal, literal_column, or_, select, table, text
+
+from app.models.database import db, FounderProfile, IdeaListing
+
+BACKEND_POSTGRES = "postgresql"
+BACKEND_FTS5 = "fts5"
+BACKEND_LIKE = "like"
+
+# Seconds before the backend choice for a database is probed again
+FOUNDER_SEARCH_BACKEND_TTL_SECONDS = float(os.environ.get("FOUNDER_SEARCH_BACKEND_TTL_SECONDS", "300"))
+
+# Query limits
+MAX_TERMS = 10
+MAX_TERM_LENGTH = 50
+SNIPPET_WORDS = 24
+
+# Unlikely-in-text placeholders, swapped for <mark> tags after escaping
+_MARK_START = "[[mark]]"
+_MARK_END = "[[/mark]]"
+
+LISTINGS_FTS = "idea_listings_fts"
+PROFILES_FTS = "founder_profiles_fts"
+_FTS_TABLES = {
+    LISTINGS_FTS: ("idea_listings", ("title", "brief_description")),
+    PROFILES_FTS: ("founder_profiles", ("looking_for", "bio")),
+}
+
+# Engine URL -> (backend, monotonic time it was probed)
+_backends: Dict[str, Tuple[str, float]] = {}
+_backend_lock = threading.Lock()
+
+
+def parse_terms(q: Optional[str]) -> List[str]:
+    """Search words from user input (letters/digits only; nothing is passed through as syntax)."""
+    words = re.findall(r"\w+", (q or "").lower())
+    return [w[:MAX_TERM_LENGTH] for w in words][:MAX_TERMS]
+
+
+def _log_warning(message: str) -> None:
+    if has_app_context():
+        current_app.logger.warning(message)
+
+
+# ---------------------------------------------------------------------------
+# Backend selection / SQLite index maintenance
+# ---------------------------------------------------------------------------
+
+def _fts_tables_exist() -> bool:
+    names = set(db.session.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (:a, :b)"),
+        {"a": LISTINGS_FTS, "b": PROFILES_FTS},
+    ).scalars())
+    return len(names) == len(_FTS_TABLES)
+
+
+def _postgres_vectors_exist() -> bool:
+    count = db.session.execute(text(
+        "SELECT count(*) FROM information_schema.columns "
+        "WHERE column_name = 'search_vector' AND table_name IN ('idea_listings', 'founder_profiles')"
+    )).scalar()
+    return count == 2
+
+
+def _sqlite_has_fts5() -> bool:
+    try:
+        return bool(db.session.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+    except Exception:
+        return False
+
+
+def _backend(build: bool = False) -> Optional[str]:
+    """
+    Search backend for the current database.
+
+    On SQLite, returns None when the FTS tables don't exist yet, unless
+    ``build`` is set, in which case they are created and backfilled.
+    """
+    key = str(db.engine.url)
+    cached = _fresh_backend(key)
+    if cached is not None:
+        return cached
+    with _backend_lock:
+        cached = _fresh_backend(key)
+        if cached is not None:
+            return cached
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            backend = BACKEND_POSTGRES if _postgres_vectors_exist() else BACKEND_LIKE
+            if backend == BACKEND_LIKE:
+                _log_warning("search_vector columns missing; run migrations/add_founder_search_indexes.sql")
+        elif dialect == "sqlite" and _sqlite_has_fts5():
+            if not _fts_tables_exist():
+                if not build:
+                    return None
+                rebuild_search_index()
+            backend = BACKEND_FTS5
+        else:
+            backend = BACKEND_LIKE
+        _backends[key] = (backend, time.monotonic())
+        return backend
+
+
+def _fresh_backend(key: str) -> Optional[str]:
+    entry = _backends.get(key)
+    if entry is None or time.monotonic() - entry[1] >= FOUNDER_SEARCH_BACKEND_TTL_SECONDS:
+        return None
+    return entry[0]
+
+
+def forget_backend() -> None:
+    """Drop the cached backend choice for the current database, so the next call probes again."""
+    with _backend_lock:
+        _backends.pop(str(db.engine.url), None)
+
+
+def rebuild_search_index() -> None:
+    """(Re)create the SQLite FTS tables from the base tables and commit."""
+    if db.engine.dialect.name != "sqlite":
+        return
+    for fts_name, (source, columns) in _FTS_TABLES.items():
+        cols = ", ".join(columns)
+        db.session.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_name} USING fts5({cols}, tokenize='porter unicode61')"
+        ))
+        db.session.execute(text(f"DELETE FROM {fts_name}"))
+        db.session.execute(text(f"INSERT INTO {fts_name}(rowid, {cols}) SELECT id, {cols} FROM {source}"))
+    db.session.commit()
+
+
+def _index_row(fts_name: str, row_id: int, values: Sequence[Optional[str]]) -> None:
+    if _backend() != BACKEND_FTS5:
+        return  # PostgreSQL maintains its own vectors; SQLite backfills on first search
+    columns = _FTS_TABLES[fts_name][1]
+    params = {"id": row_id, **{f"v{i}": value for i, value in enumerate(values)}}
+    try:
+        db.session.execute(text(f"DELETE FROM {fts_name} WHERE rowid = :id"), {"id": row_id})
+        db.session.execute(text(
+            f"INSERT INTO {fts_name}(rowid, {', '.join(columns)}) VALUES (:id, {', '.join(f':v{i}' for i in range(len(values)))})"
+        ), params)
+    except Exception:
+        # e.g. the FTS table was dropped: probe again next time instead of failing every save
+        forget_backend()
+        raise
+
+
+def index_listing(listing: IdeaListing) -> None:
+    """Update a listing's search entry (caller commits)."""
+    if listing.id is None:
+        db.session.flush()
+    _index_row(LISTINGS_FTS, listing.id, (listing.title, listing.brief_description))
+
+
+def index_profile(profile: FounderProfile) -> None:
+    """Update a profile's search entry (caller commits)."""
+    if profile.id is None:
+        db.session.flush()
+    _index_row(PROFILES_FTS, profile.id, (profile.looking_for, profile.bio))
+
+
+# ---------------------------------------------------------------------------
+# Matching
+# ---------------------------------------------------------------------------
+
+def _tsquery(terms: List[str]) -> Any:
+    expression = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+    return func.to_tsquery("english", expression)
+
+
+def _fts_match(terms: List[str]) -> str:
+    return " ".join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+
+
+def _matches(terms: List[str], model: Any, fts_name: str, fields: Sequence[Any], weights: Sequence[float]) -> Optional[Any]:
+    if not terms:
+        return None
+    backend = _backend(build=True)
+    if backend == BACKEND_POSTGRES:
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        query = _tsquery(terms)
+        stmt = select(model.id.label("id"), func.ts_rank_cd(vector, query).label("rank")).where(vector.op("@@")(query))
+    elif backend == BACKEND_FTS5:
+        fts = table(fts_name, column("rowid"))
+        fts_ref = literal_column(fts_name)
+        stmt = select(
+            fts.c.rowid.label("id"),
+            (-func.bm25(fts_ref, *weights)).label("rank"),
+        ).where(fts_ref.op("MATCH")(bindparam(f"{fts_name}_q", _fts_match(terms))))
+    else:
+        stmt = select(model.id.label("id"), literal(0.0).label("rank")).where(and_(*[
+            or_(*[field.ilike(f"%{term}%") for field in fields]) for term in terms
+        ]))
+    return stmt.subquery(f"{fts_name}_matches")
+
+
+def listing_matches(q: Optional[str]) -> Optional[Any]:
+    """
+    Subquery (id, rank) of idea listings matching ``q``, higher rank first.
+
+    Returns None when ``q`` has no searchable words.
+    """
+    return _matches(parse_terms(q), IdeaListing, LISTINGS_FTS, (IdeaListing.title, IdeaListing.brief_description), (10.0, 1.0))
+
+
+def profile_matches(q: Optional[str]) -> Optional[Any]:
+    """Subquery (id, rank) of founder profiles matching ``q``."""
+    return _matches(parse_terms(q), FounderProfile, PROFILES_FTS, (FounderProfile.looking_for, FounderProfile.bio), (4.0, 1.0))
+
+
+# ---------------------------------------------------------------------------
+# Snippets
+# ---------------------------------------------------------------------------
+
+def _to_html(fragment: Optional[str]) -> str:
+    escaped = html.escape(fragment or "")
+    return escaped.replace(html.escape(_MARK_START), "<mark>").replace(html.escape(_MARK_END), "</mark>")
+
+
+def _highlight(value: Optional[str], terms: List[str]) -> str:
+    """Python fallback: window around the first match, terms marked."""
+    value = value or ""
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    first = pattern.search(value)
+    words = value.split()
+    if first is not None:
+        start_word = max(0, len(value[:first.start()].split()) - SNIPPET_WORDS // 3)
+        words = words[start_word:]
+    fragment = " ".join(words[:SNIPPET_WORDS])
+    return _to_html(pattern.sub(lambda m: f"{_MARK_START}{m.group(0)}{_MARK_END}", fragment))
+
+
+def _snippets(terms: List[str], ids: Sequence[int], model: Any, fts_name: str, field: Any, fts_column: int) -> Dict[int, str]:
+    if not terms or not ids:
+        return {}
+    backend = _backend(build=True)
+    if backend == BACKEND_POSTGRES:
+        options = f"StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"
+        rows = db.session.execute(
+            select(model.id, func.ts_headline("english", func.coalesce(field, ""), _tsquery(terms), options))
+            .where(model.id.in_(list(ids)))
+        ).all()
+        return {row_id: _to_html(fragment) for row_id, fragment in rows}
+    if backend == BACKEND_FTS5:
+        fts = table(fts_name, column("rowid"))
+        fts_ref = literal_column(fts_name)
+        rows = db.session.execute(
+            select(fts.c.rowid, func.snippet(fts_ref, fts_column, _MARK_START, _MARK_END, "…", SNIPPET_WORDS))
+            .where(fts_ref.op("MATCH")(bindparam(f"{fts_name}_q", _fts_match(terms))), fts.c.rowid.in_(list(ids)))
+        ).all()
+        return {row_id: _to_html(fragment) for row_id, fragment in rows}
+    rows = db.session.execute(select(model.id, field).where(model.id.in_(list(ids)))).all()
+    return {row_id: _highlight(value, terms) for row_id, value in rows}
+
+
+def listing_snippets(q: Optional[str], ids: Sequence[int]) -> Dict[int, str]:
+    """Highlighted brief_description excerpts for a page of matched listings."""
+    return _snippets(parse_terms(q), ids, IdeaListing, LISTINGS_FTS, IdeaListing.brief_description, 1)
+
+
+def profile_snippets(q: Optional[str], ids: Sequence[int]) -> Dict[int, str]:
+    """Highlighted looking_for excerpts for a page of matched profiles."""
+    return _snippets(parse_terms(q), ids, FounderProfile, PROFILES_FTS, FounderProfile.looking_for, 0)
@@ -0,0 +1,127 @@
+"""
+In-process background job queue.
+
+Jobs run on a bounded worker pool so long LLM calls don't hold a request
+thread. Each job keeps an event stream (see app.utils.single_flight.InflightRun)
+that any number of SSE subscribers can follow; callers persist the durable
+job state themselves (e.g. UserValidation.status), so status polling keeps
+working from other processes and after a restart.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.utils.single_flight import InflightRun
+
+
+class JobStatus(str):
+    """Job status enum."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job:
+    """A queued unit of work and its event stream."""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = JobStatus.PENDING
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self._events = InflightRun(f"job:{job_id}")
+
+    def publish(self, event: str, **data: Any) -> None:
+        """Append an event (e.g. "status", "completed") to the job's stream."""
+        self._events.publish({"event": event, **data})
+
+    def events(self, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Iterate over the job's events from the beginning, following live ones."""
+        return self._events.subscribe(timeout=timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded worker pool plus a registry of recent jobs."""
+
+    def __init__(self, name: str, max_workers: int = 4, retention_seconds: float = 900):
+        self.name = name
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args: Any, job_id: Optional[str] = None, **kwargs: Any) -> Job:
+        """
+        Queue ``func(job, *args, **kwargs)`` on the worker pool.
+
+        The function receives the Job so it can publish progress events. Its
+        return value becomes ``job.result``; an exception marks the job failed.
+
+        Returns:
+            The queued Job
+        """
+        job = Job(job_id or uuid.uuid4().hex)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.publish("status", status=JobStatus.PENDING)
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.publish("status", status=JobStatus.RUNNING)
+        try:
+            job.result = func(job, *args, **kwargs)
+            if job.status == JobStatus.RUNNING:
+                job.status = JobStatus.COMPLETED
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.publish("failed", error=str(e), error_type=type(e).__name__)
+        finally:
+            job.finished_at = time.time()
+            job._events.finish()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job known to this process (None if unknown or pruned)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job counts by status."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {"name": self.name, "max_workers": self.max_workers, "jobs": counts}
+
+
+# Validation jobs (LLM call + markdown parsing off the request thread)
+VALIDATION_JOB_WORKERS = int(os.environ.get("VALIDATION_JOB_WORKERS", "4"))
+validation_job_queue = JobQueue("validation", max_workers=VALIDATION_JOB_WORKERS)
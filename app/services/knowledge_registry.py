@@ -0,0 +1,303 @@
+"""
+Preloaded registry of static knowledge files.
+
+Discovery reads three sets of per-interest-area JSON files:
+
+    static_data        static_data/<area>.json (StaticToolLoader)
+    static_blocks      src/startup_idea_crew/static_blocks/<area>.json (load_static_blocks)
+    domain_research    app/data/domain_research/<area>.json (domain_research)
+
+They change only on deploy (domain_research also when a tool saves new
+facts), so they are parsed once into read-only structures (MappingProxyType
+for objects, tuples for arrays) and looked up with a dict access: no file
+I/O, JSON parsing or tool_cache query on the request path.
+
+Hot reload: a watcher thread stats the directories every
+KNOWLEDGE_RELOAD_SECONDS and re-parses only files whose mtime or size
+changed. A reload builds new mappings and swaps them in with one reference
+assignment, so readers never see a half-updated source.
+
+Pre-forking servers: ``preload()`` runs while api.py is imported, so with
+gunicorn's --preload the master loads everything and workers inherit it
+copy-on-write (``gc.freeze()`` keeps the collector from touching, and so
+copying, those pages). The watcher thread is started lazily in each worker;
+KNOWLEDGE_RELOAD_SECONDS=0 turns it off (the test suite does).
+"""
+import gc
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+SOURCE_STATIC_DATA = "static_data"
+SOURCE_STATIC_BLOCKS = "static_blocks"
+SOURCE_DOMAIN_RESEARCH = "domain_research"
+
+KNOWLEDGE_RELOAD_SECONDS = float(os.environ.get("KNOWLEDGE_RELOAD_SECONDS", "10"))
+KNOWLEDGE_GC_FREEZE = os.environ.get("KNOWLEDGE_GC_FREEZE", "true").lower() == "true"
+
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def freeze(value: Any) -> Any:
+    """Deep read-only copy of parsed JSON (dicts -> MappingProxyType, lists -> tuples)."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable deep copy of a frozen value (for callers that edit and save it)."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _tool_strings(data: Any) -> Optional[Mapping[str, str]]:
+    # StaticToolLoader: every value as a string (tools return strings)
+    if not isinstance(data, dict):
+        return None
+    return MappingProxyType({k: str(v) for k, v in data.items()})
+
+
+def _block_strings(data: Any) -> Optional[Mapping[str, str]]:
+    # load_static_blocks: scalar values only
+    if not isinstance(data, dict):
+        return None
+    return MappingProxyType({k: str(v) for k, v in data.items() if isinstance(v, (str, int, float))})
+
+
+def _frozen_object(data: Any) -> Optional[Mapping[str, Any]]:
+    return freeze(data) if isinstance(data, dict) else None
+
+
+DEFAULT_SOURCES: Dict[str, Tuple[Path, Callable[[Any], Optional[Mapping]]]] = {
+    SOURCE_STATIC_DATA: (PROJECT_ROOT / "static_data", _tool_strings),
+    SOURCE_STATIC_BLOCKS: (PROJECT_ROOT / "src" / "startup_idea_crew" / "static_blocks", _block_strings),
+    SOURCE_DOMAIN_RESEARCH: (PROJECT_ROOT / "app" / "data" / "domain_research", _frozen_object),
+}
+
+
+class KnowledgeRegistry:
+    """In-memory, read-only view of the static knowledge JSON files."""
+
+    def __init__(
+        self,
+        sources: Optional[Dict[str, Tuple[Path, Callable[[Any], Optional[Mapping]]]]] = None,
+        reload_seconds: float = KNOWLEDGE_RELOAD_SECONDS,
+    ):
+        self.sources = dict(sources or DEFAULT_SOURCES)
+        self.reload_seconds = reload_seconds
+        # source -> {key: frozen data}; replaced wholesale on reload
+        self._data: Dict[str, Mapping[str, Mapping]] = {name: _EMPTY for name in self.sources}
+        # (source, key) -> (mtime_ns, size) of the file the entry was parsed from
+        self._stamps: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._app: Any = None
+        self.stats = {"loads": 0, "reloads": 0, "files_parsed": 0, "errors": 0}
+        if hasattr(os, "register_at_fork"):
+            # Threads don't survive fork; each worker starts its own watcher
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def get(self, source: str, key: str) -> Optional[Mapping]:
+        """
+        Frozen data for ``key`` (a normalized file stem) in ``source``, or None.
+
+        Loads everything on first use if preload() wasn't called.
+        """
+        if not self._loaded:
+            self.load()
+        if self._thread is None:
+            self._ensure_watcher()
+        return self._data[source].get(key)
+
+    def keys(self, source: str) -> Tuple[str, ...]:
+        """Keys available in ``source``."""
+        if not self._loaded:
+            self.load()
+        return tuple(self._data[source])
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self) -> None:
+        """Parse every source from scratch."""
+        with self._lock:
+            data: Dict[str, Mapping[str, Mapping]] = {}
+            stamps: Dict[Tuple[str, str], Tuple[int, int]] = {}
+            for name in self.sources:
+                entries: Dict[str, Mapping] = {}
+                for key, path, stamp in self._scan(name):
+                    parsed = self._parse(name, path)
+                    # Stamp unparseable files too, so they're retried only once changed
+                    stamps[(name, key)] = stamp
+                    if parsed is not None:
+                        entries[key] = parsed
+                data[name] = MappingProxyType(entries)
+            self._data = data
+            self._stamps = stamps
+            self._loaded = True
+            self.stats["loads"] += 1
+
+    def preload(self, freeze_gc: bool = KNOWLEDGE_GC_FREEZE) -> None:
+        """Load at startup (before a pre-forking server forks its workers)."""
+        self.load()
+        if freeze_gc and hasattr(gc, "freeze"):
+            # Move everything allocated so far out of the collector's reach, so
+            # GC passes in the workers don't write to (and un-share) these pages
+            gc.collect()
+            gc.freeze()
+
+    def refresh(self) -> int:
+        """
+        Re-parse files added, changed or removed since the last load.
+
+        Returns:
+            Number of entries that changed
+        """
+        if not self._loaded:
+            self.load()
+            return sum(len(entries) for entries in self._data.values())
+        changed = 0
+        with self._lock:
+            data = dict(self._data)
+            stamps = dict(self._stamps)
+            for name in self.sources:
+                entries = None
+                seen = set()
+                for key, path, stamp in self._scan(name):
+                    seen.add(key)
+                    if stamps.get((name, key)) == stamp:
+                        continue
+                    parsed = self._parse(name, path)
+                    entries = entries if entries is not None else dict(data[name])
+                    stamps[(name, key)] = stamp
+                    if parsed is None:
+                        entries.pop(key, None)
+                    else:
+                        entries[key] = parsed
+                    changed += 1
+                for key in [k for (source, k) in stamps if source == name and k not in seen]:
+                    entries = entries if entries is not None else dict(data[name])
+                    entries.pop(key, None)
+                    del stamps[(name, key)]
+                    changed += 1
+                if entries is not None:
+                    data[name] = MappingProxyType(entries)
+            if changed:
+                self._data = data
+                self._stamps = stamps
+                self.stats["reloads"] += 1
+        return changed
+
+    def put(self, source: str, key: str, value: Any) -> None:
+        """
+        Replace one entry after the process itself wrote its file (e.g.
+        save_domain_research), so the write is visible without waiting for
+        the watcher.
+        """
+        if not self._loaded:
+            self.load()
+        directory, transform = self.sources[source]
+        parsed = transform(value)
+        with self._lock:
+            entries = dict(self._data[source])
+            if parsed is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = parsed
+            data = dict(self._data)
+            data[source] = MappingProxyType(entries)
+            self._data = data
+            try:
+                st = (directory / f"{key}.json").stat()
+                self._stamps[(source, key)] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                self._stamps.pop((source, key), None)
+
+    def _scan(self, source: str):
+        directory = self.sources[source][0]
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".json"):
+                        st = entry.stat()
+                        yield entry.name[:-5], Path(entry.path), (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return
+
+    def _parse(self, source: str, path: Path) -> Optional[Mapping]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                parsed = self.sources[source][1](json.load(f))
+            self.stats["files_parsed"] += 1
+            return parsed
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            self.stats["errors"] += 1
+            self._log_warning(f"Failed to load {source} knowledge from {path}: {e}")
+            return None
+
+    def _log_warning(self, message: str) -> None:
+        if has_app_context():
+            current_app.logger.warning(message)
+        elif self._app is not None:
+            self._app.logger.warning(message)
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    # ------------------------------------------------------------------
+
+    def _ensure_watcher(self) -> None:
+        if self.reload_seconds <= 0 or not has_app_context():
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._watch, name="knowledge-registry", daemon=True)
+            self._thread.start()
+
+    def _after_fork(self) -> None:
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.reload_seconds)
+            try:
+                changed = self.refresh()
+                if changed:
+                    self._app.logger.info(f"Knowledge registry reloaded {changed} changed file(s)")
+            except Exception as e:
+                try:
+                    self._app.logger.warning(f"Knowledge registry reload failed: {e}")
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": {name: len(entries) for name, entries in self._data.items()},
+            "watching": self._thread is not None,
+        }
+
+
+knowledge_registry = KnowledgeRegistry()
@@ -0,0 +1,253 @@
+"""
+Process-wide LLM client registry.
+
+Constructing OpenAI(...) / Anthropic(...) per call throws away the SDK's
+HTTP connection pool, so every request pays a fresh TCP + TLS handshake.
+The registry hands out one shared client per (provider, API key, options);
+SDK clients are thread-safe, so the same instance serves request threads,
+job workers and the discovery tool pool concurrently.
+
+Pool sizes, timeouts and retries are configured through LLM_* environment
+variables. Retries use the SDKs' built-in exponential backoff (honouring
+Retry-After); LLM_MAX_RETRIES sets how many attempts they make.
+
+Tests keep injecting clients through the modules' _MOCK_*_CLIENT hooks;
+those are checked before the registry is consulted.
+"""
+import hashlib
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from openai import OpenAI
+
+try:
+    from anthropic import Anthropic
+    ANTHROPIC_AVAILABLE = True
+except ImportError:
+    ANTHROPIC_AVAILABLE = False
+    Anthropic = None
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    httpx = None
+
+# Total request timeout and connect timeout (seconds)
+LLM_HTTP_TIMEOUT = float(os.environ.get("LLM_HTTP_TIMEOUT", "120"))
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "10"))
+# Retries on connection errors, 408/409/429 and 5xx (SDK exponential backoff)
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+# Connection pool per client
+LLM_POOL_MAX_CONNECTIONS = int(os.environ.get("LLM_POOL_MAX_CONNECTIONS", "20"))
+LLM_POOL_MAX_KEEPALIVE = int(os.environ.get("LLM_POOL_MAX_KEEPALIVE", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", "60"))
+
+PROVIDER_OPENAI = "openai"
+PROVIDER_ANTHROPIC = "anthropic"
+
+
+class ConnectionStats:
+    """Request and connection counters for one pooled client."""
+
+    def __init__(self):
+        self.lookups = 0
+        self.requests = 0
+        self.connections_opened = 0
+        self._lock = threading.Lock()
+
+    def record_lookup(self) -> None:
+        with self._lock:
+            self.lookups += 1
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "lookups": self.lookups,
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+class LLMClientRegistry:
+    """Thread-safe registry of shared LLM SDK clients."""
+
+    def __init__(
+        self,
+        timeout: float = LLM_HTTP_TIMEOUT,
+        connect_timeout: float = LLM_CONNECT_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        max_connections: int = LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive: int = LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry: float = LLM_KEEPALIVE_EXPIRY,
+    ):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        # key -> (client, stats). Replaced, never mutated, under the lock, so
+        # lookups can read it without the lock and see a consistent entry.
+        self._entries: Dict[Tuple, Tuple[Any, ConnectionStats]] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.created = 0
+
+    def get_openai(self, api_key: Optional[str], **options: Any) -> OpenAI:
+        """Shared OpenAI client for ``api_key``."""
+        return self.get(PROVIDER_OPENAI, api_key, **options)
+
+    def get_anthropic(self, api_key: Optional[str], **options: Any) -> "Anthropic":
+        """Shared Anthropic client for ``api_key``."""
+        return self.get(PROVIDER_ANTHROPIC, api_key, **options)
+
+    def get(self, provider: str, api_key: Optional[str], **options: Any) -> Any:
+        """
+        Get (or create once) the client for a provider/key.
+
+        Args:
+            provider: "openai" or "anthropic"
+            api_key: Provider API key
+            **options: Per-client overrides (timeout, max_retries)
+
+        Returns:
+            Shared SDK client instance
+        """
+        self._reset_after_fork()
+        key = self._key(provider, api_key, options)
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    stats = ConnectionStats()
+                    entry = (self._build(provider, api_key, options, stats), stats)
+                    self._entries = {**self._entries, key: entry}
+                    self.created += 1
+        client, stats = entry
+        stats.record_lookup()
+        return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-client and aggregate reuse statistics (keys are fingerprinted)."""
+        clients = []
+        totals = ConnectionStats()
+        for (provider, fingerprint, _), (_, stats) in self._entries.items():
+            entry = stats.to_dict()
+            clients.append({"provider": provider, "key": fingerprint, **entry})
+            totals.lookups += entry["lookups"]
+            totals.requests += entry["requests"]
+            totals.connections_opened += entry["connections_opened"]
+        return {
+            "clients_created": self.created,
+            "clients": clients,
+            **totals.to_dict(),
+            "config": {
+                "timeout": self.timeout,
+                "connect_timeout": self.connect_timeout,
+                "max_retries": self.max_retries,
+                "max_connections": self.max_connections,
+                "max_keepalive": self.max_keepalive,
+                "keepalive_expiry": self.keepalive_expiry,
+                "connection_tracking": HTTPX_AVAILABLE,
+            },
+        }
+
+    def close_all(self) -> None:
+        """Close every pooled client (e.g. on shutdown or in tests)."""
+        with self._lock:
+            entries, self._entries = self._entries, {}
+            self.created = 0
+        for client, _ in entries.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _key(provider: str, api_key: Optional[str], options: Dict[str, Any]) -> Tuple:
+        fingerprint = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:12]
+        return provider, fingerprint, tuple(sorted(options.items()))
+
+    def _reset_after_fork(self) -> None:
+        # Pooled sockets must not be shared with a forked worker
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._entries = {}
+                self.created = 0
+                self._pid = os.getpid()
+
+    def _build(self, provider: str, api_key: Optional[str], options: Dict[str, Any], stats: ConnectionStats) -> Any:
+        timeout = options.get("timeout", self.timeout)
+        max_retries = options.get("max_retries", self.max_retries)
+
+        if provider == PROVIDER_ANTHROPIC:
+            if not ANTHROPIC_AVAILABLE:
+                raise ImportError("anthropic package is not installed")
+            client_class = Anthropic
+            import anthropic as sdk
+        elif provider == PROVIDER_OPENAI:
+            client_class = OpenAI
+            import openai as sdk
+        else:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+
+        kwargs: Dict[str, Any] = {"api_key": api_key, "max_retries": max_retries}
+        http_client = self._build_http_client(sdk, timeout, stats)
+        if http_client is not None:
+            kwargs["http_client"] = http_client
+        else:
+            kwargs["timeout"] = timeout
+        return client_class(**kwargs)
+
+    def _build_http_client(self, sdk: Any, timeout: float, stats: ConnectionStats) -> Any:
+        """HTTP client with our pool limits, counting requests and new connections."""
+        if not HTTPX_AVAILABLE or not hasattr(sdk, "DefaultHttpxClient"):
+            return None
+
+        def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                stats.record_connect()
+
+        def on_request(request: "httpx.Request") -> None:
+            stats.record_request()
+            request.extensions["trace"] = trace
+
+        return sdk.DefaultHttpxClient(
+            timeout=httpx.Timeout(timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            event_hooks={"request": [on_request]},
+        )
+
+
+llm_client_registry = LLMClientRegistry()
+
+
+def get_openai_client(api_key: Optional[str] = None, **options: Any) -> OpenAI:
+    """Shared OpenAI client (defaults to OPENAI_API_KEY)."""
+    return llm_client_registry.get_openai(api_key or os.environ.get("OPENAI_API_KEY"), **options)
+
+
+def get_anthropic_client(api_key: Optional[str] = None, **options: Any) -> "Anthropic":
+    """Shared Anthropic client (defaults to ANTHROPIC_API_KEY)."""
+    return llm_client_registry.get_anthropic(api_key or os.environ.get("ANTHROPIC_API_KEY"), **options)
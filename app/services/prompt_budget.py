@@ -0,0 +1,203 @@
+"""
+Prompt token budgeting for the discovery pipeline.
+
+Token counting:
+- tiktoken encoders are built once per model (``encoding_for_model`` loads
+  and parses the BPE ranks, which dominated prompt assembly time).
+- Counts are memoized per (text, model), so static fragments (system
+  messages, prompt templates, static blocks that repeat across requests)
+  are only encoded once per process.
+
+Packing:
+A prompt is a fixed template plus a set of ``Fragment``s (the profile,
+static blocks, tool summaries). Each fragment offers variants from the
+fullest to the smallest text, and a priority. ``pack()`` picks at most one
+variant per fragment so the total fits the token budget and the summed
+priority-weighted value is maximal (a multiple-choice knapsack over token
+costs), instead of truncating each piece by its own character heuristic
+and shortening the assembled prompt afterwards.
+
+Without tiktoken, counts fall back to ~4 characters per token.
+"""
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+DEFAULT_MODEL = "gpt-4o-mini"
+# Encoding for models tiktoken doesn't know (Claude, newer OpenAI names)
+FALLBACK_ENCODING = "cl100k_base"
+# Packer resolution: costs are rounded up to this many tokens, so the DP
+# table stays small; packed prompts never exceed the budget
+PACK_GRANULARITY = 8
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model: str = DEFAULT_MODEL) -> Any:
+    """The tiktoken encoding for ``model`` (built once), or None without tiktoken."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+    except Exception:
+        # No network for the BPE file, etc.: use the estimate
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _count(text: str, model: str) -> int:
+    encoding = get_encoding(model)
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_tokens(text: Optional[str], model: str = DEFAULT_MODEL) -> int:
+    """Tokens in ``text`` (memoized per text and model)."""
+    if not text:
+        return 0
+    return _count(text, model)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = DEFAULT_MODEL, suffix: str = "...") -> str:
+    """
+    Cut ``text`` to at most ``max_tokens`` tokens, suffix included.
+
+    The cut is made on token boundaries (one encode, one decode) and moved
+    back to the last whitespace so words aren't split.
+    """
+    if not text or max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - count_tokens(suffix, model))
+    encoding = get_encoding(model)
+    if encoding is None:
+        head = text[:keep * 4]
+    else:
+        head = encoding.decode(encoding.encode(text, disallowed_special=())[:keep])
+    cut = head.rstrip()
+    space = max(cut.rfind(" "), cut.rfind("\n"))
+    if space > len(cut) // 2:
+        cut = cut[:space].rstrip()
+    return cut + suffix
+
+
+@dataclass
+class Fragment:
+    """
+    A packable piece of a prompt.
+
+    Attributes:
+        name: Key the chosen text is returned under
+        variants: Candidate texts, fullest first
+        priority: Value of including the fragment at all
+        required: Always include (the smallest variant if nothing else fits)
+        overhead: Extra text emitted with the fragment (a JSON key, a label)
+    """
+    name: str
+    variants: Sequence[str]
+    priority: float = 1.0
+    required: bool = False
+    overhead: str = ""
+    model: str = DEFAULT_MODEL
+    _costs: Optional[List[int]] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Drop empty and duplicate variants, keeping order
+        seen = set()
+        self.variants = [v for v in self.variants if v and not (v in seen or seen.add(v))]
+
+    @property
+    def costs(self) -> List[int]:
+        """Token cost of each variant, overhead included (counted once)."""
+        if self._costs is None:
+            overhead = count_tokens(self.overhead, self.model)
+            self._costs = [count_tokens(v, self.model) + overhead for v in self.variants]
+        return self._costs
+
+    def value(self, index: int) -> float:
+        """
+        Value of variant ``index``: the full priority for the fullest, down to
+        a little over half of it for the smallest, so covering every fragment
+        briefly beats spending the budget on a few in full.
+        """
+        n = len(self.variants)
+        return self.priority * (2 * n - index) / (2 * n)
+
+
+@dataclass
+class PackResult:
+    """Chosen text per fragment name (missing = dropped) and the tokens used."""
+    chosen: Dict[str, str]
+    tokens: int
+    dropped: List[str]
+
+
+def pack(fragments: Sequence[Fragment], budget: int, granularity: int = PACK_GRANULARITY) -> PackResult:
+    """
+    Choose one variant (or none) per fragment within ``budget`` tokens.
+
+    Required fragments are placed first with their smallest variant and may
+    be upgraded like any other; optional fragments are dropped when nothing
+    fits. Fragment order breaks ties.
+
+    Args:
+        fragments: Fragments to pack
+        budget: Token budget for all fragments together
+        granularity: Costs are rounded up to multiples of this
+
+    Returns:
+        PackResult
+    """
+    fragments = [f for f in fragments if f.variants]
+    granularity = max(1, granularity)
+    units = max(0, budget) // granularity
+
+    def cost_units(tokens: int) -> int:
+        return math.ceil(tokens / granularity)
+
+    # Reserve the smallest variant of each required fragment; upgrades cost the difference
+    reserved = sum(cost_units(f.costs[-1]) for f in fragments if f.required)
+    capacity = max(0, units - reserved)
+
+    # best[c] = (value, choices) using at most c units
+    best: List[tuple] = [(0.0, ())] * (capacity + 1)
+    for fragment in fragments:
+        base = cost_units(fragment.costs[-1]) if fragment.required else 0
+        options = [(cost_units(cost) - base, fragment.value(i), i) for i, cost in enumerate(fragment.costs)]
+        next_best: List[tuple] = []
+        for c in range(capacity + 1):
+            if fragment.required:
+                # Smallest variant is free (reserved); keep it unless an upgrade wins
+                value, choices = best[c]
+                candidate = (value + fragment.value(len(fragment.variants) - 1), choices + (len(fragment.variants) - 1,))
+            else:
+                candidate = (best[c][0], best[c][1] + (None,))
+            for extra, value, index in options:
+                if extra <= c:
+                    prev_value, prev_choices = best[c - extra]
+                    if prev_value + value > candidate[0]:
+                        candidate = (prev_value + value, prev_choices + (index,))
+            next_best.append(candidate)
+        best = next_best
+
+    choices = best[capacity][1]
+    chosen: Dict[str, str] = {}
+    dropped: List[str] = []
+    tokens = 0
+    for fragment, index in zip(fragments, choices):
+        if index is None:
+            dropped.append(fragment.name)
+            continue
+        chosen[fragment.name] = fragment.variants[index]
+        tokens += fragment.costs[index]
+    return PackResult(chosen=chosen, tokens=tokens, dropped=dropped)
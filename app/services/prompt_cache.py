@@ -0,0 +1,151 @@
+"""
+Provider prompt caching for Discovery and Validation.
+
+Both providers cache the longest previously seen prompt prefix: OpenAI does
+it automatically for prompts over 1024 tokens, Anthropic for content up to a
+``cache_control`` breakpoint. A hit cuts time-to-first-token and bills the
+cached part at a fraction of the input price, but only if the prefix is
+byte-identical across requests.
+
+Prompt builders therefore return a ``PromptLayout``: static segments first
+(instructions, output format, per-interest-area research blocks, per-archetype
+guidance), each stable across many requests, followed by the per-user
+variable part. ``str(layout)`` is the plain prompt for OpenAI and token
+counting; ``anthropic_messages()``/``anthropic_system()`` add a breakpoint
+after each static segment when the Claude provider is used.
+
+Prefixes shorter than the provider's minimum (1024 tokens for most models)
+are not cached; the layout costs nothing in that case.
+
+``usage_from_response()`` normalizes both providers' usage objects into the
+``{"input_tokens", "cached_tokens", "cache_write_tokens", "output_tokens"}``
+dict reported in the pipeline metadata.
+
+Set PROMPT_CACHE_ENABLED=false to send Claude prompts without breakpoints.
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+PROMPT_CACHE_ENABLED = os.environ.get("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+# Anthropic allows 4 breakpoints per request; one is kept for the system prompt
+MAX_MESSAGE_BREAKPOINTS = 3
+
+USAGE_KEYS = ("input_tokens", "cached_tokens", "cache_write_tokens", "output_tokens")
+
+
+@dataclass
+class PromptLayout:
+    """
+    A prompt split into a cacheable prefix and a per-request suffix.
+
+    Attributes:
+        static: Segments that repeat across requests, most stable first
+        variable: Per-user text appended after the static segments
+    """
+    static: List[str] = field(default_factory=list)
+    variable: str = ""
+
+    @property
+    def text(self) -> str:
+        return "".join(self.static) + self.variable
+
+    @property
+    def static_text(self) -> str:
+        return "".join(self.static)
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def _cache_control() -> Dict[str, str]:
+    return {"type": "ephemeral"}
+
+
+def anthropic_system(system_prompt: str) -> Union[str, List[Dict[str, Any]]]:
+    """The ``system`` argument for messages.create, with a breakpoint when caching is on."""
+    if not PROMPT_CACHE_ENABLED or not system_prompt:
+        return system_prompt
+    return [{"type": "text", "text": system_prompt, "cache_control": _cache_control()}]
+
+
+def anthropic_messages(prompt: Union[str, PromptLayout]) -> List[Dict[str, Any]]:
+    """
+    The ``messages`` argument for a single user turn.
+
+    Each static segment becomes its own text block ending in a breakpoint
+    (the last ones if there are more segments than breakpoints), followed by
+    the variable text.
+    """
+    if not isinstance(prompt, PromptLayout) or not PROMPT_CACHE_ENABLED:
+        return [{"role": "user", "content": str(prompt)}]
+    segments = [s for s in prompt.static if s]
+    if not segments:
+        return [{"role": "user", "content": prompt.variable}]
+    # Merge leading segments so the breakpoints land on the last (largest) prefixes
+    overflow = len(segments) - MAX_MESSAGE_BREAKPOINTS
+    if overflow > 0:
+        segments = ["".join(segments[:overflow + 1])] + segments[overflow + 1:]
+    content: List[Dict[str, Any]] = [
+        {"type": "text", "text": segment, "cache_control": _cache_control()} for segment in segments
+    ]
+    if prompt.variable:
+        content.append({"type": "text", "text": prompt.variable})
+    return [{"role": "user", "content": content}]
+
+
+def openai_messages(system_prompt: str, prompt: Union[str, PromptLayout]) -> List[Dict[str, str]]:
+    """Chat messages for OpenAI (prefix caching is automatic; the static text just has to come first)."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": str(prompt)},
+    ]
+
+
+def _get(obj: Any, name: str) -> Any:
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def _as_int(value: Any) -> int:
+    return value if isinstance(value, int) else 0
+
+
+def usage_from_response(usage: Any, is_claude: bool) -> Dict[str, int]:
+    """
+    Normalized token usage from a response's ``usage`` object.
+
+    Anthropic reports ``input_tokens`` excluding cache reads and writes;
+    ``input_tokens`` here is always the full prompt size, so the cached share
+    is ``cached_tokens / input_tokens`` for both providers.
+    """
+    if usage is None:
+        return {key: 0 for key in USAGE_KEYS}
+    if is_claude:
+        cached = _as_int(_get(usage, "cache_read_input_tokens"))
+        written = _as_int(_get(usage, "cache_creation_input_tokens"))
+        return {
+            "input_tokens": _as_int(_get(usage, "input_tokens")) + cached + written,
+            "cached_tokens": cached,
+            "cache_write_tokens": written,
+            "output_tokens": _as_int(_get(usage, "output_tokens")),
+        }
+    details = _get(usage, "prompt_tokens_details")
+    return {
+        "input_tokens": _as_int(_get(usage, "prompt_tokens")),
+        "cached_tokens": _as_int(_get(details, "cached_tokens")),
+        "cache_write_tokens": 0,
+        "output_tokens": _as_int(_get(usage, "completion_tokens")),
+    }
+
+
+def merge_usage(usages: Iterable[Optional[Dict[str, int]]]) -> Dict[str, int]:
+    """Sum of several normalized usage dicts (None entries are skipped)."""
+    total = {key: 0 for key in USAGE_KEYS}
+    for usage in usages:
+        for key in USAGE_KEYS:
+            total[key] += (usage or {}).get(key, 0)
+    return total
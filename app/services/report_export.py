@@ -0,0 +1,245 @@
+"""
+Streaming CSV export for admin reports.
+
+Rows are read with keyset pagination over primary keys and a column-only
+projection (no ORM objects are hydrated), formatted as CSV in small
+batches and yielded as they are produced, so memory stays flat no matter
+how large the tables are. Output can optionally be gzip-compressed on the
+fly.
+"""
+import csv
+import zlib
+from datetime import datetime, timedelta
+from io import StringIO
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.models.database import (
+    db, User, UserRun, UserValidation, Payment, PaymentStatus,
+    utcnow, normalize_datetime,
+)
+from app.utils.serialization import serialize_datetime
+from app.constants import DEFAULT_SUBSCRIPTION_TYPE, STATUS_ACTIVE
+from app.services.admin_analytics import get_revenue_by_month
+
+# Rows fetched per keyset page
+EXPORT_PAGE_SIZE = 1000
+# Approximate bytes of CSV buffered before a chunk is yielded
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+# Default subscription length used when a paid plan has no expiry recorded
+PAID_PLAN_DURATION_DAYS = {"starter": 30, "pro": 30, "annual": 365}
+
+
+def iter_keyset(
+    columns: Sequence[Any],
+    key_column: Any,
+    filters: Sequence[Any] = (),
+    outerjoin: Optional[tuple] = None,
+    descending: bool = False,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> Iterator[Any]:
+    """
+    Iterate over projected rows in key order, one page per query.
+
+    Each page is ``WHERE key > last_key ORDER BY key LIMIT page_size`` (or
+    ``<`` / DESC), so no query scans past what it returns and no cursor or
+    transaction is held open between pages.
+
+    Args:
+        columns: Columns to select (the key column must be among them)
+        key_column: Unique, indexed column to page on (usually the primary key)
+        filters: Extra WHERE clauses
+        outerjoin: Optional (target, onclause) to LEFT OUTER JOIN
+        descending: Newest-first order
+        page_size: Rows per page
+
+    Yields:
+        Row tuples
+    """
+    key_index = next(i for i, column in enumerate(columns) if column is key_column)
+    last_key = None
+    while True:
+        stmt = select(*columns)
+        if outerjoin is not None:
+            stmt = stmt.outerjoin(*outerjoin)
+        if filters:
+            stmt = stmt.where(*filters)
+        if last_key is not None:
+            stmt = stmt.where(key_column < last_key if descending else key_column > last_key)
+        stmt = stmt.order_by(key_column.desc() if descending else key_column.asc()).limit(page_size)
+        rows = db.session.execute(stmt).all()
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        last_key = rows[-1][key_index]
+
+
+def _days_remaining(expires_at: Optional[datetime], now: datetime) -> int:
+    """Same result as User.days_remaining() for a projected row."""
+    if not expires_at:
+        return 0
+    return max(0, (normalize_datetime(expires_at) - now).days)
+
+
+def _subscription_active(subscription_type: Optional[str], started_at: Optional[datetime], expires_at: Optional[datetime], now: datetime) -> bool:
+    """
+    Same result as User.is_subscription_active() for a projected row.
+
+    The model method also backfills missing expiry dates; an export must not
+    write, so the implied expiry is computed instead.
+    """
+    subscription_type = subscription_type or "free"
+    if subscription_type == "free":
+        return True
+    if not expires_at:
+        if subscription_type == "free_trial" and started_at:
+            expires_at = started_at + timedelta(days=3)
+        elif subscription_type in PAID_PLAN_DURATION_DAYS:
+            if not started_at:
+                return True
+            expires_at = started_at + timedelta(days=PAID_PLAN_DURATION_DAYS[subscription_type])
+        else:
+            return False
+    return now < normalize_datetime(expires_at)
+
+
+def _users_rows(include_subscription_dates: bool = True) -> Iterator[List[Any]]:
+    now = normalize_datetime(utcnow())
+    header = ["ID", "Email", "Subscription Type", "Payment Status", "Days Remaining", "Created At"]
+    columns = [User.id, User.email, User.subscription_type, User.payment_status, User.subscription_expires_at, User.created_at]
+    if include_subscription_dates:
+        header += ["Subscription Started", "Subscription Expires"]
+        columns += [User.subscription_started_at]
+    yield header
+    for row in iter_keyset(columns, User.id):
+        out = [
+            row.id,
+            row.email,
+            row.subscription_type or DEFAULT_SUBSCRIPTION_TYPE,
+            row.payment_status or "inactive",
+            _days_remaining(row.subscription_expires_at, now),
+            serialize_datetime(row.created_at) or "",
+        ]
+        if include_subscription_dates:
+            out += [
+                serialize_datetime(row.subscription_started_at) or "",
+                serialize_datetime(row.subscription_expires_at) or "",
+            ]
+        yield out
+
+
+def _payments_rows(include_extra: bool = True) -> Iterator[List[Any]]:
+    header = ["ID", "User Email", "Amount", "Currency", "Subscription Type", "Status"]
+    if include_extra:
+        header += ["Stripe Payment Intent ID"]
+    header += ["Created At"]
+    if include_extra:
+        header += ["Completed At"]
+    yield header
+    columns = [
+        Payment.id, User.email, Payment.amount, Payment.currency, Payment.subscription_type,
+        Payment.status, Payment.stripe_payment_intent_id, Payment.created_at, Payment.completed_at,
+    ]
+    for row in iter_keyset(columns, Payment.id, outerjoin=(User, User.id == Payment.user_id), descending=True):
+        out = [row.id, row.email or "N/A", row.amount, row.currency, row.subscription_type, row.status]
+        if include_extra:
+            out += [row.stripe_payment_intent_id or ""]
+        out += [serialize_datetime(row.created_at) or ""]
+        if include_extra:
+            out += [serialize_datetime(row.completed_at) or ""]
+        yield out
+
+
+def _activity_rows() -> Iterator[List[Any]]:
+    yield ["Type", "ID", "User Email", "Run/Validation ID", "Created At"]
+    for label, model, id_column in (("Run", UserRun, UserRun.run_id), ("Validation", UserValidation, UserValidation.validation_id)):
+        columns = [model.id, User.email, id_column, model.created_at]
+        for row in iter_keyset(
+            columns, model.id,
+            filters=[model.is_deleted == False],
+            outerjoin=(User, User.id == model.user_id),
+            descending=True,
+        ):
+            yield [label, row[0], row[1] or "N/A", row[2], serialize_datetime(row[3]) or ""]
+
+
+def _subscriptions_rows() -> Iterator[List[Any]]:
+    now = normalize_datetime(utcnow())
+    yield ["User Email", "Subscription Type", "Status", "Started At", "Expires At", "Days Remaining", "Monthly Validations Used", "Monthly Discoveries Used"]
+    columns = [
+        User.id, User.email, User.subscription_type, User.subscription_started_at, User.subscription_expires_at,
+        User.monthly_validations_used, User.monthly_discoveries_used,
+    ]
+    filters = [User.subscription_type.in_(["starter", "pro", "weekly"]), User.is_active == True]
+    for row in iter_keyset(columns, User.id, filters=filters):
+        active = _subscription_active(row.subscription_type, row.subscription_started_at, row.subscription_expires_at, now)
+        yield [
+            row.email,
+            row.subscription_type,
+            STATUS_ACTIVE if active else PaymentStatus.FAILED,  # Using FAILED as expired
+            serialize_datetime(row.subscription_started_at) or "",
+            serialize_datetime(row.subscription_expires_at) or "",
+            _days_remaining(row.subscription_expires_at, now),
+            row.monthly_validations_used,
+            row.monthly_discoveries_used,
+        ]
+
+
+def _revenue_rows() -> Iterator[List[Any]]:
+    yield ["Period", "Total Revenue", "Payment Count", "Average Payment", "Subscription Type Breakdown"]
+    # Grouped in SQL (see app.services.admin_analytics)
+    for data in get_revenue_by_month():
+        avg = data["revenue"] / data["count"] if data["count"] > 0 else 0
+        types_str = ", ".join([f"{k}: ${v:.2f}" for k, v in data["types"].items()])
+        yield [data["period"], f"${data['revenue']:.2f}", data["count"], f"${avg:.2f}", types_str]
+
+
+def _full_rows() -> Iterator[List[Any]]:
+    yield ["Report Type", "Data"]
+    yield ["USERS", ""]
+    yield from _users_rows(include_subscription_dates=False)
+    yield []
+    yield ["PAYMENTS", ""]
+    yield from _payments_rows(include_extra=False)
+
+
+REPORT_ROW_BUILDERS: Dict[str, Callable[[], Iterator[List[Any]]]] = {
+    "users": _users_rows,
+    "payments": _payments_rows,
+    "activity": _activity_rows,
+    "subscriptions": _subscriptions_rows,
+    "revenue": _revenue_rows,
+    "full": _full_rows,
+}
+
+
+def iter_report_rows(report_type: str) -> Iterator[List[Any]]:
+    """CSV rows (header first) for a report type; unknown types get the full report."""
+    return REPORT_ROW_BUILDERS.get(report_type, _full_rows)()
+
+
+def iter_csv(rows: Iterable[List[Any]], chunk_bytes: int = EXPORT_CHUNK_BYTES) -> Iterator[str]:
+    """Format rows as CSV, yielding text in chunks of roughly ``chunk_bytes``."""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_gzip(chunks: Iterable[str]) -> Iterator[bytes]:
+    """Gzip-compress a text stream incrementally."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,256 @@
+"""
+Denormalized summaries of saved runs and validations.
+
+The dashboard only needs a handful of facts per run/validation (how many
+ideas, the top idea, the score, the interest area). They are extracted once
+when a run or validation is saved and stored in summary columns, so listing
+them never has to load or parse the report blobs. Full reports are still
+served by /api/user/run/<id> and /api/validate-idea/<id>.
+
+Idea titles are parsed from the personalized_recommendations markdown:
+numbered items ("1. **Title**"), then ##/### headings, then bold lines.
+parse_ideas() is the source of truth for the ideas shown on the dashboard.
+The frontend's parseTopIdeas() only handles runs the API returned without
+top_ideas (local runs, or rows whose summary is still being backfilled) and
+the full report page.
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.database import db, UserRun, UserValidation
+from app.utils.json_helpers import safe_json_loads
+
+_MISSING = object()
+
+# Ideas stored per run for the dashboard cards
+TOP_IDEAS_LIMIT = 3
+MAX_TITLE_LENGTH = 255
+MAX_SUMMARY_LENGTH = 300
+
+RUN_SUMMARY_COLUMNS = ("idea_count", "top_idea_title", "interest_area", "top_ideas")
+VALIDATION_SUMMARY_COLUMNS = ("overall_score", "idea_title", "interest_area")
+
+_NON_IDEA_HEADINGS = (
+    "recommendation matrix", "financial outlook", "risk radar", "customer persona",
+    "validation questions", "30/60/90", "roadmap", "decision checklist",
+    "comprehensive recommendation report", "profile analysis", "research",
+)
+_NON_IDEA_BOLD = _NON_IDEA_HEADINGS + (
+    "startup costs", "monthly operating", "revenue potential", "breakeven",
+    "primary", "secondary", "days", "mitigation",
+)
+_SUMMARY_PREFIXES = re.compile(
+    r"^(?:[-*]\s*)?(?:\*\*)?(?:why\s+it\s+fits\s+now|execution\s+path|days\s+0[-\s]?30)(?:\*\*)?[:\s]*",
+    re.IGNORECASE,
+)
+
+
+def _clean_title(title: str) -> str:
+    title = re.sub(r"^#+\s*", "", title).replace("**", "").strip().rstrip(":").strip()
+    return title[:MAX_TITLE_LENGTH]
+
+
+def _clean_summary(body: str, fallback: str) -> str:
+    flat = re.sub(r"\s+", " ", body).strip()
+    flat = _SUMMARY_PREFIXES.sub("", flat)
+    sentence = re.match(r"[^.!?]+[.!?]", flat)
+    summary = (sentence.group(0) if sentence else flat).strip()
+    summary = re.sub(r"^(?:[-*]\s*|#+\s*)", "", summary).replace("**", "").strip()
+    return (summary or fallback)[:MAX_SUMMARY_LENGTH]
+
+
+def _idea_headings(markdown: str) -> List[Tuple[Optional[int], str, re.Match]]:
+    """(number, raw title, match) for each idea heading, using the first format that matches."""
+    numbered = [
+        (int(m.group(1)), m.group(2) or m.group(3) or "", m)
+        for m in re.finditer(r"(?:^|\n)(?:###\s*)?(\d+)\.\s*(?:\*\*(.+?)\*\*|([^\n]+))", markdown)
+    ]
+    if numbered:
+        return numbered
+    headers = [
+        (None, m.group(1), m) for m in re.finditer(r"(?:^|\n)#{2,3}\s+([^\n]+)", markdown)
+        if not any(p in m.group(1).lower() for p in _NON_IDEA_HEADINGS)
+    ]
+    if headers:
+        return headers
+    return [
+        (None, m.group(1), m) for m in re.finditer(r"(?:^|\n)\*\*([^*]+?)\*\*", markdown)
+        if 3 < len(m.group(1).strip()) < 100
+        and not re.match(r"^(and|or|the|a|an)\s", m.group(1).strip(), re.IGNORECASE)
+        and not any(p in m.group(1).lower() for p in _NON_IDEA_BOLD)
+    ]
+
+
+def parse_ideas(markdown: Optional[str], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Ideas listed in a recommendations report.
+
+    Returns:
+        [{"index", "title", "summary"}] in report order
+    """
+    if not markdown:
+        return []
+    headings = _idea_headings(markdown)
+    ideas: List[Dict[str, Any]] = []
+    seen_numbers = set()
+    for i, (number, raw_title, match) in enumerate(headings):
+        title = _clean_title(raw_title)
+        if not title:
+            continue
+        if number is not None:
+            # Numbered sub-lists inside an idea restart at 1; count each number once
+            if number in seen_numbers:
+                continue
+            seen_numbers.add(number)
+        end = headings[i + 1][2].start() if i + 1 < len(headings) else len(markdown)
+        body = markdown[match.end():end]
+        index = number if number is not None else len(ideas) + 1
+        ideas.append({"index": index, "title": title, "summary": _clean_summary(body, title)})
+        if limit is not None and len(ideas) >= limit:
+            break
+    return ideas
+
+
+def summarize_run(inputs: Any, reports: Any) -> Dict[str, Any]:
+    """Summary column values for a run's inputs/reports (dicts or JSON strings)."""
+    inputs = safe_json_loads(inputs, default={}) if isinstance(inputs, str) else (inputs or {})
+    reports = safe_json_loads(reports, default={}) if isinstance(reports, str) else (reports or {})
+    recommendations = reports.get("personalized_recommendations") if isinstance(reports, dict) else None
+    ideas = parse_ideas(recommendations if isinstance(recommendations, str) else None)
+    interest_area = (inputs.get("interest_area") or inputs.get("sub_interest_area")) if isinstance(inputs, dict) else None
+    return {
+        "idea_count": len(ideas),
+        "top_idea_title": ideas[0]["title"] if ideas else None,
+        "interest_area": str(interest_area)[:MAX_TITLE_LENGTH] if interest_area else None,
+        "top_ideas": json.dumps(ideas[:TOP_IDEAS_LIMIT]),
+    }
+
+
+def summarize_validation(category_answers: Any, idea_explanation: Optional[str], validation_result: Any) -> Dict[str, Any]:
+    """Summary column values for a validation."""
+    answers = safe_json_loads(category_answers, default={}) if isinstance(category_answers, str) else (category_answers or {})
+    result = safe_json_loads(validation_result, default={}) if isinstance(validation_result, str) else (validation_result or {})
+    score = result.get("overall_score") if isinstance(result, dict) else None
+    try:
+        score = float(score) if score is not None else None
+    except (TypeError, ValueError):
+        score = None
+    explanation = re.sub(r"\s+", " ", idea_explanation or "").strip()
+    first_sentence = re.match(r"[^.!?]+[.!?]?", explanation)
+    interest_area = answers.get("industry") if isinstance(answers, dict) else None
+    return {
+        "overall_score": score,
+        "idea_title": (first_sentence.group(0).strip() if first_sentence else "")[:MAX_TITLE_LENGTH],
+        "interest_area": str(interest_area)[:MAX_TITLE_LENGTH] if interest_area else None,
+    }
+
+
+def apply_run_summary(user_run: UserRun) -> None:
+    """Fill a run's summary columns from its inputs/reports (caller commits)."""
+    for column, value in summarize_run(user_run.inputs, user_run.reports).items():
+        setattr(user_run, column, value)
+
+
+def apply_validation_summary(user_validation: UserValidation) -> None:
+    """Fill a validation's summary columns (caller commits)."""
+    summary = summarize_validation(
+        user_validation.category_answers, user_validation.idea_explanation, user_validation.validation_result,
+    )
+    for column, value in summary.items():
+        setattr(user_validation, column, value)
+
+
+def run_summary_dict(user_run: UserRun, reports: Any = _MISSING) -> Dict[str, Any]:
+    """
+    The dashboard's summary object for a run.
+
+    Rows saved before the summary columns existed (and not yet backfilled)
+    are summarized from their reports without modifying the row. Pass
+    ``reports`` when the column was not loaded (see run_summary_dicts).
+    """
+    if user_run.idea_count is None:
+        summary = summarize_run(user_run.inputs, user_run.reports if reports is _MISSING else reports)
+    else:
+        summary = {column: getattr(user_run, column) for column in RUN_SUMMARY_COLUMNS}
+    summary["top_ideas"] = safe_json_loads(summary["top_ideas"], default=[]) if summary["top_ideas"] else []
+    return summary
+
+
+def validation_summary_dict(user_validation: UserValidation, blobs: Any = _MISSING) -> Dict[str, Any]:
+    """
+    The dashboard's summary object for a validation (see run_summary_dict).
+
+    ``blobs`` is a (category_answers, validation_result) pair for rows whose
+    columns were not loaded.
+    """
+    if user_validation.idea_title is None:
+        if blobs is _MISSING:
+            blobs = (user_validation.category_answers, user_validation.validation_result)
+        return summarize_validation(blobs[0], user_validation.idea_explanation, blobs[1])
+    return {column: getattr(user_validation, column) for column in VALIDATION_SUMMARY_COLUMNS}
+
+
+def run_summary_dicts(user_runs: List[UserRun]) -> List[Dict[str, Any]]:
+    """
+    run_summary_dict for a page of runs loaded with ``defer(UserRun.reports)``.
+
+    Reports are fetched only for unbackfilled rows, in one query for the
+    page, instead of one lazy load per row.
+    """
+    missing = [r.id for r in user_runs if r.idea_count is None]
+    reports = {}
+    if missing:
+        reports = dict(db.session.query(UserRun.id, UserRun.reports).filter(UserRun.id.in_(missing)).all())
+    return [run_summary_dict(r, reports.get(r.id)) for r in user_runs]
+
+
+def validation_summary_dicts(user_validations: List[UserValidation]) -> List[Dict[str, Any]]:
+    """validation_summary_dict for a page loaded with category_answers/validation_result deferred."""
+    missing = [v.id for v in user_validations if v.idea_title is None]
+    blobs = {}
+    if missing:
+        rows = db.session.query(
+            UserValidation.id, UserValidation.category_answers, UserValidation.validation_result,
+        ).filter(UserValidation.id.in_(missing)).all()
+        blobs = {row[0]: (row[1], row[2]) for row in rows}
+    return [validation_summary_dict(v, blobs.get(v.id, (None, None))) for v in user_validations]
+
+
+def backfill_summaries(batch_size: int = 200) -> Dict[str, int]:
+    """
+    Compute summaries for rows saved before the summary columns existed.
+
+    Rows are processed in id order, one committed batch at a time, and only
+    rows whose summary is still NULL are touched, so the backfill can be
+    interrupted and re-run.
+    """
+    counts = {"runs": 0, "validations": 0}
+    last_id = 0
+    while True:
+        runs = UserRun.query.filter(UserRun.idea_count.is_(None), UserRun.id > last_id).order_by(UserRun.id).limit(batch_size).all()
+        if not runs:
+            break
+        for user_run in runs:
+            apply_run_summary(user_run)
+        last_id = runs[-1].id
+        counts["runs"] += len(runs)
+        db.session.commit()
+        for user_run in runs:
+            db.session.expunge(user_run)
+
+    last_id = 0
+    while True:
+        validations = UserValidation.query.filter(
+            UserValidation.idea_title.is_(None), UserValidation.id > last_id,
+        ).order_by(UserValidation.id).limit(batch_size).all()
+        if not validations:
+            break
+        for user_validation in validations:
+            apply_validation_summary(user_validation)
+        last_id = validations[-1].id
+        counts["validations"] += len(validations)
+        db.session.commit()
+        for user_validation in validations:
+            db.session.expunge(user_validation)
+    return counts
@@ -2,18 +2,21 @@
 Static Tool Loader - Loads pre-generated static tool results from JSON files.
 
 These are one-time LLM-generated data files that replace dynamic tool execution.
-Tool execution cost = 0.0 seconds (instant file read).
+Tool execution cost = 0.0 seconds: the files are preloaded into the knowledge
+registry, so a lookup is a dict access.
 """
-import json
 import re
-from pathlib import Path
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Mapping
+
+from app.services.knowledge_registry import SOURCE_STATIC_DATA, knowledge_registry
 
 
 class StaticToolLoader:
     """Loads pre-generated static tool results for interest areas."""
     
     @staticmethod
+    @lru_cache(maxsize=256)
     def normalize_interest_area(interest_area: str) -> str:
         """
         Normalize interest_area to filename format.
@@ -74,7 +77,7 @@ class StaticToolLoader:
         return normalized
     
     @staticmethod
-    def load(interest_area: str) -> Dict[str, str]:
+    def load(interest_area: str) -> Mapping[str, str]:
         """
         Loads pre-generated static JSON for an interest area.
         
@@ -93,7 +96,8 @@ class StaticToolLoader:
             interest_area: Interest area string (e.g., "AI / Automation")
         
         Returns:
-            Dictionary of tool results, or empty dict if file missing
+            Read-only mapping of tool results (copy before modifying),
+            or empty dict if file missing
         """
         if not interest_area:
             return {}
@@ -103,33 +107,5 @@ class StaticToolLoader:
         if not normalized:
             return {}
         
-        # Load from static_data directory
-        static_data_dir = Path(__file__).parent.parent.parent / "static_data"
-        json_file = static_data_dir / f"{normalized}.json"
-        
-        if not json_file.exists():
-            return {}
-        
-        try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Validate structure - ensure it's a dict
-            if not isinstance(data, dict):
-                return {}
-            
-            # Convert all values to strings (tools return strings)
-            result = {k: str(v) for k, v in data.items()}
-            
-            return result
-        
-        except (json.JSONDecodeError, IOError, OSError) as e:
-            # Log error but don't fail - return empty dict
-            try:
-                from flask import current_app, has_app_context
-                if has_app_context():
-                    current_app.logger.warning(f"Failed to load static tools from {json_file}: {e}")
-            except Exception:
-                pass
-            return {}
-
+        # Parsed once at startup (values already strings); read-only mapping
+        return knowledge_registry.get(SOURCE_STATIC_DATA, normalized) or {}
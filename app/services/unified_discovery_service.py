@@ -4,7 +4,9 @@ Replaces CrewAI hierarchical structure with pre-computed tools + single LLM call
 """
 import time
 import re
+import threading
 import json
+from functools import lru_cache
 from typing import Dict, Any, Optional, Iterator, Tuple, Union
 from concurrent.futures import ThreadPoolExecutor, as_completed, Future
 from openai import OpenAI
@@ -19,13 +21,6 @@ except ImportError:
     ANTHROPIC_AVAILABLE = False
     Anthropic = None
 
-# Import tiktoken for accurate token counting
-try:
-    import tiktoken
-    TIKTOKEN_AVAILABLE = True
-except ImportError:
-    TIKTOKEN_AVAILABLE = False
-
 # Import timing logger
 try:
     from app.utils.timing_logger import log_timing, save_timing_log, clear_timing_data
@@ -53,11 +48,18 @@ from startup_idea_crew.tools import (
 )
 # Removed unified_prompt import - using two-stage system instead
 from app.utils.discovery_cache import DiscoveryCache
+from app.utils.single_flight import SingleFlight
 from app.utils.archetype_cache import ArchetypeCache
 # Removed domain_research import - not used in two-stage system
-from app.utils.performance_metrics import record_tool_call, start_metrics_collection
+from app.utils.performance_metrics import record_tool_call, run_in_metrics_context, start_metrics_collection
+from app.utils import metrics, tracing
 from app.services.static_loader import load_static_blocks
+from app.services import prompt_budget
+from app.services.prompt_budget import Fragment
+from app.services import prompt_cache
+from app.services.prompt_cache import PromptLayout
 from app.services.static_tool_loader import StaticToolLoader
+from app.services.llm_clients import get_openai_client, get_anthropic_client
 
 
 # Injectable mock client for testing
@@ -67,6 +69,11 @@ _MOCK_ANTHROPIC_CLIENT = None
 # Discovery model configuration - can be "openai", "claude", or "auto" (tries Claude first, falls back to OpenAI)
 DISCOVERY_MODEL_PROVIDER = os.environ.get("DISCOVERY_MODEL_PROVIDER", "openai").lower()
 
+# Single-flight coalescing: identical concurrent requests share one pipeline run
+DISCOVERY_SINGLE_FLIGHT = os.environ.get("DISCOVERY_SINGLE_FLIGHT", "true").lower() == "true"
+# Max seconds a follower waits for the next chunk (or final result) from the leader
+DISCOVERY_SINGLE_FLIGHT_TIMEOUT = float(os.environ.get("DISCOVERY_SINGLE_FLIGHT_TIMEOUT", "300"))
+
 # Removed CRITICAL_TOOLS - no longer needed with two-stage system using static blocks
 
 # Default static tool fields - ensures Stage 2 always has all required fields
@@ -80,6 +87,32 @@ DEFAULT_STATIC_TOOL_FIELDS = {
 }
 
 
+# Prompt token limits and the budgets the packer fills within them
+STAGE1_MAX_TOKENS = 1500
+STAGE2_MAX_TOKENS = 2000
+STAGE1_PROFILE_BUDGET = int(os.environ.get("DISCOVERY_STAGE1_PROFILE_TOKENS", "150"))
+STAGE2_CONTEXT_BUDGET = int(os.environ.get("DISCOVERY_STAGE2_CONTEXT_TOKENS", "600"))
+STAGE2_PROFILE_TOKENS = 150
+STAGE2_TOOL_SUMMARY_TOKENS = 80
+# Relative value of each tool's data in the Stage 2 prompt (others: 1.0)
+STAGE2_TOOL_PRIORITIES = {
+    "market_trends": 3.0,
+    "competitors": 2.5,
+    "market_size": 2.5,
+    "risks": 2.0,
+    "revenue": 2.0,
+    "costs": 1.5,
+    "persona": 1.5,
+    "viability": 1.0,
+    "validation_questions": 1.0,
+}
+
+
+def _provider_label(is_claude: bool) -> str:
+    """Provider label for LLM metrics."""
+    return "claude" if is_claude else "openai"
+
+
 def _get_llm_client():
     """
     Get the appropriate LLM client for discovery (OpenAI or Anthropic).
@@ -108,7 +141,7 @@ def _get_llm_client():
             current_app.logger.warning("ANTHROPIC_API_KEY not set. Falling back to OpenAI.")
             # Fall through to OpenAI section below
         else:
-            client = Anthropic(api_key=api_key)
+            client = get_anthropic_client(api_key)
             model_name = os.environ.get("CLAUDE_MODEL_NAME", "claude-sonnet-4-20250514")
             return client, model_name, True
     
@@ -119,7 +152,7 @@ def _get_llm_client():
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is not set")
-    return OpenAI(api_key=api_key), "gpt-4o-mini", False
+    return get_openai_client(api_key), "gpt-4o-mini", False
 
 
 def _validate_profile_data(profile_data: Dict[str, Any]) -> None:
@@ -179,6 +212,8 @@ def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
     """
     Count tokens in text using tiktoken (accurate) or fallback estimation.
     
+    Encoders and counts are cached in app.services.prompt_budget.
+    
     Args:
         text: Text to count tokens for
         model: Model name (default: gpt-4o-mini)
@@ -186,19 +221,7 @@ def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
     Returns:
         Token count
     """
-    if not text:
-        return 0
-    
-    if TIKTOKEN_AVAILABLE:
-        try:
-            # Use cl100k_base encoding for gpt-4o-mini and similar models
-            encoding = tiktoken.encoding_for_model(model)
-            return len(encoding.encode(text))
-        except Exception as e:
-            current_app.logger.warning(f"tiktoken encoding failed: {e}, using estimation")
-    
-    # Fallback: ~4 characters per token (conservative estimate)
-    return len(text) // 4
+    return prompt_budget.count_tokens(text, model)
 
 
 def compress_profile(profile_data: Dict[str, Any], max_chars: int = 200) -> str:
@@ -312,14 +335,9 @@ def shorten_prompt(prompt: str, max_tokens: int, model: str = "gpt-4o-mini") ->
     Returns:
         Shortened prompt
     """
-    token_count = count_tokens(prompt, model)
-    
-    if token_count <= max_tokens:
+    if count_tokens(prompt, model) <= max_tokens:
         return prompt
     
-    # Calculate target length (leave 10% buffer)
-    target_chars = int((max_tokens * 0.9) * 4)  # ~4 chars per token
-    
     # Try to preserve structure by truncating from the middle sections
     # Keep beginning (instructions) and end (format requirements)
     lines = prompt.split('\n')
@@ -355,18 +373,13 @@ def shorten_prompt(prompt: str, max_tokens: int, model: str = "gpt-4o-mini") ->
         if available_tokens > 100:
             # Include truncated middle section
             middle_lines = lines[instruction_end + 1:format_start]
-            middle_text = '\n'.join(middle_lines)
-            middle_tokens = count_tokens(middle_text, model)
-            
-            if middle_tokens > available_tokens:
-                # Truncate middle
-                target_middle_chars = int(available_tokens * 4)
-                middle_text = middle_text[:target_middle_chars] + "\n[... truncated ...]"
-            
+            middle_text = prompt_budget.truncate_to_tokens(
+                '\n'.join(middle_lines), available_tokens, model, suffix="\n[... truncated ...]"
+            )
             return '\n'.join([kept_text, middle_text, format_text])
     
     # Fallback: simple truncation
-    return prompt[:target_chars] + "\n[... truncated due to size limit ...]"
+    return prompt_budget.truncate_to_tokens(prompt, max_tokens, model, suffix="\n[... truncated due to size limit ...]")
     
 def summarize_tool_output(text: str, target_tokens: int = 100, aggressive: bool = False) -> str:
     """
@@ -385,18 +398,19 @@ def summarize_tool_output(text: str, target_tokens: int = 100, aggressive: bool
         aggressive: If True, more aggressive summarization (40-60 tokens for non-critical)
     
     Returns:
-        Summarized text (approximately target_tokens)
+        Summarized text (at most target_tokens)
     """
     if not text or len(text.strip()) == 0:
         return text
     
-    # Rough token estimation: ~4 characters per token
-    target_chars = target_tokens * 4
-    
     # If already short enough, return as-is
-    if len(text) <= target_chars:
+    if count_tokens(text) <= target_tokens:
         return text
     
+    # Lines are selected by length (~4 characters per token); the result is
+    # then cut to target_tokens by real token count
+    target_chars = target_tokens * 4
+    
     # Strategy: Extract key information based on mode
     lines = text.split('\n')
     summary_parts = []
@@ -456,10 +470,7 @@ def summarize_tool_output(text: str, target_tokens: int = 100, aggressive: bool
     result = '\n'.join(summary_parts)
     
     # Final truncation if still too long
-    if len(result) > target_chars:
-        result = result[:target_chars - 3] + "..."
-    
-    return result
+    return prompt_budget.truncate_to_tokens(result, target_tokens)
 
 
 def _ensure_all_tool_fields(tool_results: Dict[str, str]) -> Dict[str, str]:
@@ -558,6 +569,13 @@ def load_cached_tools(interest_area: str, sub_interest_area: str = "") -> Dict[s
     return {}
 
 
+def _run_tool_in_span(name: str, func):
+    """Run one precomputed tool in its own span (child of the precompute span)."""
+    with tracing.span("discovery.tool", tool=name):
+        return func()
+
+
+@tracing.traced("discovery.precompute_tools")
 def precompute_all_tools(
     interest_area: str,
     sub_interest_area: str = "",
@@ -587,11 +605,11 @@ def precompute_all_tools(
     if cached_results:
         # Return cached results immediately
         elapsed = time.time() - start_time
-        print(f"[PERF] precompute_all_tools: Cache HIT - returning {len(cached_results)} cached tools in {elapsed:.3f}s")
+        tracing.current_span().set_attributes(cache_hit=True, tool_count=len(cached_results))
         return (cached_results, elapsed) if not return_futures else (cached_results, {}, elapsed)
     
     # Cache miss - generate tools
-    print(f"[PERF] precompute_all_tools: Cache MISS - generating tools for {interest_area}/{sub_interest_area}")
+    tracing.current_span().set_attributes(cache_hit=False, interest_area=interest_area, sub_interest_area=sub_interest_area)
     
     # Use interest_area as base idea concept
     idea_concept = f"{interest_area} {sub_interest_area}".strip() or interest_area or "startup idea"
@@ -619,7 +637,7 @@ def precompute_all_tools(
             current_app.logger.info(f"Skipping tool '{tool_name}' - using static block '{static_key}'")
     
     if static_tools_skipped:
-        print(f"[PERF] precompute_all_tools: Skipping {len(static_tools_skipped)} tools with static blocks: {static_tools_skipped}")
+        tracing.current_span().set_attribute("static_tools", static_tools_skipped)
     
     # Helper function to unwrap CrewAI Tool objects to get the underlying function
     def unwrap_tool(tool_obj):
@@ -715,21 +733,21 @@ def precompute_all_tools(
         )
     
     # Execute all tools in parallel
-    print(f"\n[PERF] precompute_all_tools: Starting execution of {len(tool_calls)} tools at {time.time():.3f}")
+    tracing.current_span().set_attribute("tool_count", len(tool_calls))
     log_timing("precompute_all_tools", "start", timestamp=start_time)
     tool_start_times = {}
     
     with ThreadPoolExecutor(max_workers=10) as executor:
-        executor_start = time.time()
         # Track when each tool actually starts (submit time)
         for name, func in tool_calls.items():
             tool_start_times[name] = time.time()
-            print(f"[PERF] precompute_all_tools: Tool '{name}' START at {tool_start_times[name]:.3f}")
             log_timing(f"tool_{name}", "start", timestamp=tool_start_times[name])
         
-        future_to_tool = {executor.submit(func): name for name, func in tool_calls.items()}
-        executor_ready = time.time()
-        print(f"[PERF] precompute_all_tools: ThreadPoolExecutor ready in {executor_ready - executor_start:.3f}s, submitted {len(future_to_tool)} futures")
+        # Run in a copy of the caller's context (app context, run metrics, current span)
+        future_to_tool = {
+            executor.submit(run_in_metrics_context(_run_tool_in_span, name, func)): name
+            for name, func in tool_calls.items()
+        }
         
         # Store futures if requested
         if return_futures:
@@ -742,19 +760,17 @@ def precompute_all_tools(
         for future in as_completed(future_to_tool):
             tool_name = future_to_tool[future]
             tool_start_time = tool_start_times.get(tool_name, start_time)
-            tool_complete_start = time.time()
             
             try:
                 result = future.result()
                 tool_complete_end = time.time()
                 tool_total_duration = tool_complete_end - tool_start_time
-                tool_result_duration = tool_complete_end - tool_complete_start
                 
                 # Track first completion
                 if first_complete_time is None:
                     first_complete_time = tool_complete_end
                     first_complete_tool = tool_name
-                    print(f"[PERF] precompute_all_tools: FIRST tool completed: '{tool_name}' at {first_complete_time:.3f} (elapsed: {tool_total_duration:.3f}s)")
+                    tracing.current_span().add_event("first_tool_complete", tool=tool_name, elapsed=round(tool_total_duration, 3))
                     log_timing("precompute_all_tools", "first_tool_complete", 
                               timestamp=first_complete_time, 
                               duration=tool_total_duration,
@@ -769,11 +785,6 @@ def precompute_all_tools(
                     (len(result_str) < 500 and "error" not in result_str.lower())
                 )
                 
-                print(f"[PERF] precompute_all_tools: Tool '{tool_name}' END at {tool_complete_end:.3f} - "
-                      f"Elapsed: {tool_total_duration:.3f}s (start: {tool_start_time:.3f}, end: {tool_complete_end:.3f}), "
-                      f"Result retrieval: {tool_result_duration:.3f}s, "
-                      f"Cache: {'YES' if cache_used else 'NO/OpenAI'}")
-                
                 # Log to timing logger
                 log_timing(f"tool_{tool_name}", "end", 
                           timestamp=tool_complete_end,
@@ -797,14 +808,11 @@ def precompute_all_tools(
             except Exception as e:
                 tool_complete_end = time.time()
                 tool_total_duration = tool_complete_end - tool_start_time
-                print(f"[PERF] precompute_all_tools: Tool '{tool_name}' FAILED at {tool_complete_end:.3f} after {tool_total_duration:.3f}s - Error: {e}")
-                current_app.logger.warning(f"Tool {tool_name} failed: {e}")
+                current_app.logger.warning(f"Tool {tool_name} failed after {tool_total_duration:.2f}s: {e}")
                 results[tool_name] = f"Error: {str(e)}"
     
     elapsed = time.time() - start_time
-    first_tool_time_str = f"{first_complete_time:.3f}" if first_complete_time else "N/A"
-    print(f"[PERF] precompute_all_tools: ALL tools completed. Total elapsed: {elapsed:.3f}s, "
-          f"Completed: {len(results)}/{len(tool_calls)}, First tool: {first_complete_tool} at {first_tool_time_str}\n")
+    tracing.current_span().set_attributes(completed=len(results), first_tool=first_complete_tool)
     
     # Cache results for 24 hours
     if results:
@@ -862,24 +870,8 @@ def precompute_all_tools(
     return results, elapsed
 
 
-def _build_profile_analysis_prompt(profile_data: Dict[str, Any]) -> str:
-    """
-    Build prompt for Stage 1: Profile Analysis (no tools, just profile data).
-    MAX INPUT TOKENS: 1500 (hard limit)
-    
-    Args:
-        profile_data: User profile data
-    
-    Returns:
-        Prompt string for profile analysis (compressed to <1500 tokens)
-    """
-    # Compress profile to <200 characters
-    compressed_profile = compress_profile(profile_data, max_chars=200)
-    
-    # Build minimal prompt (removed long instructions and examples)
-    prompt = f"""Analyze user profile and generate profile analysis.
-
-USER PROFILE: {compressed_profile}
+# Static prefix first, user data last, so the provider can cache the prefix (see prompt_cache)
+STAGE1_STATIC_PROMPT = """Analyze the user profile given at the end and generate profile analysis.
 
 Generate 4 sections:
 ## 1. Core Motivation
@@ -894,23 +886,49 @@ Generate 4 sections:
 ## 4. Skill Gaps
 [4-6 bullets on missing skills and why they matter]
 
-Format: Use "You", markdown headings (##), 400-500 words total."""
+Format: Use "You", markdown headings (##), 400-500 words total.
+
+"""
+STAGE1_SYSTEM_MESSAGE = "You are a startup advisor. Generate complete profile analysis in the exact format requested."
+
+
+def _build_profile_analysis_prompt(profile_data: Dict[str, Any]) -> PromptLayout:
+    """
+    Build prompt for Stage 1: Profile Analysis (no tools, just profile data).
+    MAX INPUT TOKENS: 1500 (hard limit)
+    
+    The profile is packed into STAGE1_PROFILE_BUDGET tokens: the full field
+    values if they fit, otherwise the <200 character summary.
+    
+    Args:
+        profile_data: User profile data
+    
+    Returns:
+        PromptLayout: static instructions + the user profile (<1500 tokens)
+    """
+    profile = Fragment(
+        "profile",
+        [compress_profile(profile_data, max_chars=600), compress_profile(profile_data, max_chars=200)],
+        required=True,
+    )
+    packed = prompt_budget.pack([profile], STAGE1_PROFILE_BUDGET)
+    prompt = PromptLayout([STAGE1_STATIC_PROMPT], f"USER PROFILE: {packed.chosen.get('profile', '')}")
     
     # Enforce 1500 token limit
-    STAGE1_MAX_TOKENS = 1500
-    token_count = count_tokens(prompt)
+    token_count = count_tokens(prompt.text)
     
     if token_count > STAGE1_MAX_TOKENS:
         current_app.logger.warning(f"Stage 1 prompt too large: {token_count} tokens, shortening to {STAGE1_MAX_TOKENS}")
-        prompt = shorten_prompt(prompt, STAGE1_MAX_TOKENS)
-        token_count = count_tokens(prompt)
+        prompt = PromptLayout([], shorten_prompt(prompt.text, STAGE1_MAX_TOKENS))
+        token_count = count_tokens(prompt.text)
     
     current_app.logger.info(f"Stage 1 prompt: {token_count} tokens (limit: {STAGE1_MAX_TOKENS})")
-    print(f"[TOKEN] Stage 1 prompt: {token_count} tokens (limit: {STAGE1_MAX_TOKENS})")
+    tracing.current_span().set_attribute("prompt_tokens", token_count)
     
     return prompt
 
 
+@tracing.traced("discovery.stage1")
 def run_profile_analysis(profile_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Stage 1: Run profile analysis (NO TOOLS - just LLM call).
@@ -928,9 +946,11 @@ def run_profile_analysis(profile_data: Dict[str, Any]) -> Dict[str, Any]:
     prompt = _build_profile_analysis_prompt(profile_data)
     
     # Count tokens and log before LLM call
-    system_message = "You are a startup advisor. Generate complete profile analysis in the exact format requested."
-    total_tokens = count_tokens(system_message) + count_tokens(prompt)
-    print(f"[TOKEN] Stage 1 LLM call - Input tokens: {total_tokens} (system: {count_tokens(system_message)}, user: {count_tokens(prompt)})")
+    system_message = STAGE1_SYSTEM_MESSAGE
+    system_tokens = count_tokens(system_message)
+    prompt_tokens = count_tokens(prompt.text)
+    total_tokens = system_tokens + prompt_tokens
+    tracing.current_span().set_attribute("input_tokens", total_tokens)
     current_app.logger.info(f"Stage 1 LLM call - Input tokens: {total_tokens}")
     
     # Abort if >2500 tokens (safety check)
@@ -944,36 +964,32 @@ def run_profile_analysis(profile_data: Dict[str, Any]) -> Dict[str, Any]:
     llm_start = time.time()
     log_timing("run_profile_analysis", "llm_call_start", timestamp=llm_start)
     
-    if is_claude:
-        # Claude API
-        response = client.messages.create(
-            model=model_name,
-            max_tokens=600,
-            temperature=0.3,
-            system=system_message,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        profile_analysis = response.content[0].text
-    else:
-        # OpenAI API
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=600,
-            stream=False,
-        )
-        
-        if not response.choices or not response.choices[0].message:
-            current_app.logger.warning("Profile analysis response has no choices or message")
-            return {"profile_analysis": ""}
-        
-        profile_analysis = response.choices[0].message.content or ""
+    with tracing.span("llm.call", pipeline="discovery", stage="stage1", provider=_provider_label(is_claude), model=model_name):
+        if is_claude:
+            # Claude API
+            response = client.messages.create(
+                model=model_name,
+                max_tokens=600,
+                temperature=0.3,
+                system=prompt_cache.anthropic_system(system_message),
+                messages=prompt_cache.anthropic_messages(prompt),
+            )
+            profile_analysis = response.content[0].text
+        else:
+            # OpenAI API
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=prompt_cache.openai_messages(system_message, prompt),
+                temperature=0.3,
+                max_tokens=600,
+                stream=False,
+            )
+            
+            if not response.choices or not response.choices[0].message:
+                current_app.logger.warning("Profile analysis response has no choices or message")
+                return {"profile_analysis": ""}
+            
+            profile_analysis = response.choices[0].message.content or ""
     
     llm_end = time.time()
     llm_duration = llm_end - llm_start
@@ -983,54 +999,21 @@ def run_profile_analysis(profile_data: Dict[str, Any]) -> Dict[str, Any]:
     
     log_timing("run_profile_analysis", "llm_call_end", timestamp=llm_end, duration=llm_duration, openai_duration=llm_duration)
     log_timing("run_profile_analysis", "end", timestamp=stage1_end, duration=stage1_duration)
-    
-    print(f"[PERF] run_profile_analysis: COMPLETE in {stage1_duration:.3f}s (LLM: {llm_duration:.3f}s)")
+    metrics.LLM_LATENCY.observe(llm_duration, pipeline="discovery", stage="stage1", provider=_provider_label(is_claude))
+    metrics.STAGE_DURATION.observe(stage1_duration, stage="stage1")
+    
+    usage = prompt_cache.usage_from_response(getattr(response, "usage", None), is_claude)
+    tracing.current_span().set_attributes(
+        llm_duration=round(llm_duration, 3),
+        usage_input_tokens=usage["input_tokens"],
+        usage_cached_tokens=usage["cached_tokens"],
+    )
     
     # Return as JSON string for Stage 2
-    return {"profile_analysis": profile_analysis}
-
-
-def _build_idea_research_prompt(
-    profile_analysis_json: str,
-    tool_results: Dict[str, str],
-) -> str:
-    """
-    Build prompt for Stage 2: Idea Research (with static tool blocks).
-    MAX INPUT TOKENS: 2000 (hard limit)
-    
-    Args:
-        profile_analysis_json: JSON string from Stage 1 (short profile)
-        tool_results: Static tool results loaded from JSON files
-    
-    Returns:
-        Prompt string for idea research (compressed to <2000 tokens)
-    """
-    # Compress profile analysis to <200 chars
-    if len(profile_analysis_json) > 200:
-        # Extract key points from profile analysis
-        lines = profile_analysis_json.split('\n')
-        compressed_lines = []
-        for line in lines[:5]:  # First 5 lines usually contain key info
-            if line.strip() and len(line.strip()) > 10:
-                compressed_lines.append(line.strip()[:100])  # Max 100 chars per line
-        profile_analysis_json = ' '.join(compressed_lines)[:200]
-    
-    # Compress ALL tool outputs to <100 chars each
-    compressed_tools = {}
-    for tool_name, tool_output in tool_results.items():
-        compressed_tools[tool_name] = compress_tool_output(str(tool_output), max_chars=100)
-    
-    # Format compressed tool results as compact JSON (no indentation to save tokens)
-    import json
-    static_blocks_json = json.dumps(compressed_tools, ensure_ascii=False, separators=(',', ':')) if compressed_tools else "{}"
-    
-    # Build minimal prompt (removed long instructions, examples, schemas)
-    prompt = f"""Generate idea research and recommendations.
+    return {"profile_analysis": profile_analysis, "usage": usage}
 
-USER PROFILE: {profile_analysis_json}
 
-RESEARCH DATA (summaries only):
-{static_blocks_json}
+STAGE2_STATIC_PROMPT = """Generate idea research and recommendations for the user profile given at the end.
 
 Generate 2 sections:
 
@@ -1045,16 +1028,110 @@ Generate 2 sections:
 ### Comprehensive Recommendation Report
 Include: Profile Fit Summary, Recommendation Matrix (table), Top 3 Ideas Deep Dive, Financial Outlook, Risk Radar, Customer Persona, Validation Questions, 30/60/90 Day Roadmap, Decision Checklist.
 
-Use research data as knowledge, personalize for user. 1500-2000 words total."""
+Use research data as knowledge, personalize for user. 1500-2000 words total.
+
+"""
+STAGE2_SYSTEM_MESSAGE = "You are a startup advisor. Generate complete idea research and recommendations in the exact format requested."
+
+
+def _compress_profile_analysis(profile_analysis: str, max_chars: int = 200) -> str:
+    """Key lines of a Stage 1 profile analysis in <max_chars characters."""
+    if len(profile_analysis) <= max_chars:
+        return profile_analysis
+    # Extract key points from profile analysis
+    lines = profile_analysis.split('\n')
+    compressed_lines = []
+    for line in lines[:5]:  # First 5 lines usually contain key info
+        if line.strip() and len(line.strip()) > 10:
+            compressed_lines.append(line.strip()[:100])  # Max 100 chars per line
+    return ' '.join(compressed_lines)[:max_chars]
+
+
+def _tool_fragment(tool_name: str, tool_output: str) -> Fragment:
+    """Packer fragment for one tool result, as a JSON member of RESEARCH DATA."""
+    variants = [
+        summarize_tool_output(tool_output, target_tokens=STAGE2_TOOL_SUMMARY_TOKENS),
+        summarize_tool_output(tool_output, target_tokens=STAGE2_TOOL_SUMMARY_TOKENS // 2, aggressive=True),
+        compress_tool_output(tool_output, max_chars=100),
+        # compress_tool_output keeps only bullets/metrics after the first line, so
+        # single-paragraph outputs can come back empty; always offer a short prefix
+        prompt_budget.truncate_to_tokens(tool_output, STAGE2_TOOL_SUMMARY_TOKENS // 3),
+    ]
+    return Fragment(
+        tool_name,
+        [json.dumps(v, ensure_ascii=False) for v in variants if v],
+        priority=STAGE2_TOOL_PRIORITIES.get(tool_name, 1.0),
+        overhead=json.dumps(tool_name) + ":,",
+    )
+
+
+@lru_cache(maxsize=64)
+def _research_block(tool_items: Tuple[Tuple[str, str], ...]) -> str:
+    """
+    RESEARCH DATA section for a set of tool results.
+    
+    The tools are packed on their own into STAGE2_CONTEXT_BUDGET minus the
+    profile's share, so the block depends only on the interest area's tool
+    results: it is built once per process and is byte-identical across
+    users, which keeps it inside the provider-cached prefix.
+    """
+    fragments = []
+    seen_outputs = set()
+    # Known tool names first, so a duplicate is kept under the name that has a priority
+    for tool_name, tool_output in sorted(tool_items, key=lambda item: item[0] not in STAGE2_TOOL_PRIORITIES):
+        # _ensure_all_tool_fields keeps the static file's field names next to the mapped ones
+        if not tool_output or tool_output in seen_outputs:
+            continue
+        seen_outputs.add(tool_output)
+        fragments.append(_tool_fragment(tool_name, tool_output))
+    packed = prompt_budget.pack(fragments, STAGE2_CONTEXT_BUDGET - STAGE2_PROFILE_TOKENS)
+    if packed.dropped:
+        current_app.logger.debug(f"Stage 2 research data: dropped {packed.dropped} to fit the token budget")
+    
+    # Compact JSON (no indentation to save tokens); members are already JSON-encoded
+    research = [f"{json.dumps(f.name)}:{packed.chosen[f.name]}" for f in fragments if f.name in packed.chosen]
+    return "RESEARCH DATA (summaries only):\n{" + ",".join(research) + "}\n\n"
+
+
+def _build_idea_research_prompt(
+    profile_analysis_json: str,
+    tool_results: Dict[str, str],
+) -> PromptLayout:
+    """
+    Build prompt for Stage 2: Idea Research (with static tool blocks).
+    MAX INPUT TOKENS: 2000 (hard limit)
+    
+    Layout: instructions and output format, then the interest area's research
+    data (both cacheable), then the user's profile analysis. One summary per
+    tool is packed by priority (see prompt_budget.pack): higher-priority tools
+    get fuller summaries and low-priority tools are dropped when nothing fits.
+    
+    Args:
+        profile_analysis_json: JSON string from Stage 1 (short profile)
+        tool_results: Static tool results loaded from JSON files
+    
+    Returns:
+        PromptLayout for idea research (compressed to <2000 tokens)
+    """
+    profile = Fragment(
+        "profile",
+        [
+            prompt_budget.truncate_to_tokens(profile_analysis_json, STAGE2_PROFILE_TOKENS),
+            _compress_profile_analysis(profile_analysis_json, max_chars=200),
+        ],
+        required=True,
+    )
+    packed = prompt_budget.pack([profile], STAGE2_PROFILE_TOKENS)
+    research = _research_block(tuple((name, str(output) if output else "") for name, output in tool_results.items()))
+    prompt = PromptLayout([STAGE2_STATIC_PROMPT, research], f"USER PROFILE: {packed.chosen.get('profile', '')}")
     
     # Enforce 2000 token limit
-    STAGE2_MAX_TOKENS = 2000
-    token_count = count_tokens(prompt)
+    token_count = count_tokens(prompt.text)
     
     if token_count > STAGE2_MAX_TOKENS:
         current_app.logger.warning(f"Stage 2 prompt too large: {token_count} tokens, shortening to {STAGE2_MAX_TOKENS}")
-        prompt = shorten_prompt(prompt, STAGE2_MAX_TOKENS)
-        token_count = count_tokens(prompt)
+        prompt = PromptLayout([], shorten_prompt(prompt.text, STAGE2_MAX_TOKENS))
+        token_count = count_tokens(prompt.text)
     
     # Abort if still >2500 tokens (safety check)
     if token_count > 2500:
@@ -1062,11 +1139,12 @@ Use research data as knowledge, personalize for user. 1500-2000 words total."""
         raise ValueError(f"Stage 2 prompt exceeds 2500 token limit: {token_count} tokens")
     
     current_app.logger.info(f"Stage 2 prompt: {token_count} tokens (limit: {STAGE2_MAX_TOKENS})")
-    print(f"[TOKEN] Stage 2 prompt: {token_count} tokens (limit: {STAGE2_MAX_TOKENS})")
+    tracing.current_span().set_attribute("prompt_tokens", token_count)
     
     return prompt
 
 
+@tracing.traced("discovery.stage2")
 def run_idea_research(
     profile_analysis_json: str,
     tool_results: Dict[str, str],
@@ -1088,9 +1166,11 @@ def run_idea_research(
     prompt = _build_idea_research_prompt(profile_analysis_json, tool_results)
     
     # Count tokens and log before LLM call
-    system_message = "You are a startup advisor. Generate complete idea research and recommendations in the exact format requested."
-    total_tokens = count_tokens(system_message) + count_tokens(prompt)
-    print(f"[TOKEN] Stage 2 LLM call - Input tokens: {total_tokens} (system: {count_tokens(system_message)}, user: {count_tokens(prompt)})")
+    system_message = STAGE2_SYSTEM_MESSAGE
+    system_tokens = count_tokens(system_message)
+    prompt_tokens = count_tokens(prompt.text)
+    total_tokens = system_tokens + prompt_tokens
+    tracing.current_span().set_attribute("input_tokens", total_tokens)
     current_app.logger.info(f"Stage 2 LLM call - Input tokens: {total_tokens}")
     
     # Abort if >2500 tokens (safety check)
@@ -1104,36 +1184,32 @@ def run_idea_research(
     llm_start = time.time()
     log_timing("run_idea_research", "llm_call_start", timestamp=llm_start)
     
-    if is_claude:
-        # Claude API
-        response = client.messages.create(
-            model=model_name,
-            max_tokens=2000,  # Reduced from 3000 for faster generation
-            temperature=0.3,
-            system=system_message,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        response_text = response.content[0].text
-    else:
-        # OpenAI API
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=2000,  # Reduced from 3000 for faster generation
-            stream=False,
-        )
-        
-        if not response.choices or not response.choices[0].message:
-            current_app.logger.warning("Idea research response has no choices or message")
-            return {"startup_ideas_research": "", "personalized_recommendations": ""}
-        
-        response_text = response.choices[0].message.content or ""
+    with tracing.span("llm.call", pipeline="discovery", stage="stage2", provider=_provider_label(is_claude), model=model_name):
+        if is_claude:
+            # Claude API
+            response = client.messages.create(
+                model=model_name,
+                max_tokens=2000,  # Reduced from 3000 for faster generation
+                temperature=0.3,
+                system=prompt_cache.anthropic_system(system_message),
+                messages=prompt_cache.anthropic_messages(prompt),
+            )
+            response_text = response.content[0].text
+        else:
+            # OpenAI API
+            response = client.chat.completions.create(
+                model=model_name,
+                messages=prompt_cache.openai_messages(system_message, prompt),
+                temperature=0.3,
+                max_tokens=2000,  # Reduced from 3000 for faster generation
+                stream=False,
+            )
+            
+            if not response.choices or not response.choices[0].message:
+                current_app.logger.warning("Idea research response has no choices or message")
+                return {"startup_ideas_research": "", "personalized_recommendations": ""}
+            
+            response_text = response.choices[0].message.content or ""
     
     llm_end = time.time()
     llm_duration = llm_end - llm_start
@@ -1147,6 +1223,7 @@ def run_idea_research(
     outputs = {
         "startup_ideas_research": "",
         "personalized_recommendations": "",
+        "usage": prompt_cache.usage_from_response(getattr(response, "usage", None), is_claude),
     }
     
     # Try multiple marker variations for robustness
@@ -1208,12 +1285,47 @@ def run_idea_research(
     
     log_timing("run_idea_research", "llm_call_end", timestamp=llm_end, duration=llm_duration, openai_duration=llm_duration)
     log_timing("run_idea_research", "end", timestamp=stage2_end, duration=stage2_duration)
+    metrics.LLM_LATENCY.observe(llm_duration, pipeline="discovery", stage="stage2", provider=_provider_label(is_claude))
+    metrics.STAGE_DURATION.observe(stage2_duration, stage="stage2")
     
-    print(f"[PERF] run_idea_research: COMPLETE in {stage2_duration:.3f}s (LLM: {llm_duration:.3f}s)")
+    tracing.current_span().set_attributes(llm_duration=round(llm_duration, 3), response_chars=len(response_text))
     
     return outputs
 
 
+def _record_token_usage(
+    metadata: Dict[str, Any],
+    stage1_usage: Optional[Dict[str, int]],
+    stage2_usage: Optional[Dict[str, int]],
+) -> None:
+    """
+    Add per-stage and total token usage, including provider-cached prompt
+    tokens, to the pipeline metadata.
+    """
+    total = prompt_cache.merge_usage([stage1_usage, stage2_usage])
+    metadata["token_usage"] = {"stage1": stage1_usage, "stage2": stage2_usage, "total": total}
+    metadata["input_tokens"] = total["input_tokens"]
+    metadata["cached_input_tokens"] = total["cached_tokens"]
+    metrics.record_token_usage("discovery", total)
+    current_app.logger.info(
+        f"Discovery token usage: input={total['input_tokens']} cached={total['cached_tokens']} "
+        f"cache_write={total['cache_write_tokens']} output={total['output_tokens']}"
+    )
+
+
+def _token_usage_attributes(metadata: Dict[str, Any]) -> Dict[str, int]:
+    """Span attributes for the token usage _record_token_usage added to ``metadata`` ({} if none)."""
+    total = (metadata.get("token_usage") or {}).get("total")
+    if not total:
+        return {}
+    return {
+        "input_tokens": total["input_tokens"],
+        "cached_input_tokens": total["cached_tokens"],
+        "output_tokens": total["output_tokens"],
+        "total_tokens": total["input_tokens"] + total["output_tokens"],
+    }
+
+
 # Removed parse_unified_response - no longer needed with two-stage system
 
 # Removed old unified system helper functions (no longer used):
@@ -1223,6 +1335,7 @@ def run_idea_research(
 # - _run_unified_discovery_internal
 
 
+@tracing.traced("discovery.pipeline", streaming=True)
 def run_unified_discovery_streaming(
     profile_data: Dict[str, Any],
     use_cache: bool = True,
@@ -1240,9 +1353,6 @@ def run_unified_discovery_streaming(
         Iterator of (chunk, metadata_dict) tuples
     """
     pipeline_start = time.time()
-    print(f"\n{'='*80}")
-    print(f"[PERF] run_unified_discovery_streaming: PIPELINE START at {pipeline_start:.3f}")
-    print(f"{'='*80}")
     log_timing("run_unified_discovery_streaming", "pipeline_start", timestamp=pipeline_start)
     
     start_time = time.time()
@@ -1270,7 +1380,7 @@ def run_unified_discovery_streaming(
         if cached:
             metadata["cache_hit"] = True
             metadata["total_time"] = time.time() - start_time
-            print(f"[PERF] run_unified_discovery_streaming: CACHE HIT - returning cached results in {metadata['total_time']:.3f}s")
+            tracing.current_span().set_attribute("cache_hit", True)
             current_app.logger.info(f"Discovery cache hit - returning cached results")
             # For streaming, yield cached results as chunks
             for section_name, section_content in cached.items():
@@ -1281,7 +1391,6 @@ def run_unified_discovery_streaming(
     # PARALLEL EXECUTION: Stage 1 (Profile Analysis) + Tool Precomputation
     # This removes ~15 seconds of dead time by running both concurrently
     stage1_start = time.time()
-    print(f"[PERF] run_unified_discovery_streaming: STAGE 1 + TOOLS START (PARALLEL) at {stage1_start:.3f}")
     log_timing("run_unified_discovery_streaming", "parallel_start", timestamp=stage1_start)
     
     # Extract interest_area for tool loading
@@ -1292,9 +1401,10 @@ def run_unified_discovery_streaming(
     tool_start = time.time()
     with ThreadPoolExecutor(max_workers=2) as executor:
         # Stage 1: Profile Analysis
-        stage1_future = executor.submit(run_profile_analysis, profile_data)
+        stage1_future = executor.submit(run_in_metrics_context(run_profile_analysis, profile_data))
         
         # Tool loading: Load static tools ONLY (NEVER execute tools if static files exist)
+        @tracing.traced("discovery.load_tools", interest_area=interest_area)
         def load_or_compute_tools():
             """Load static tools, or fallback to precompute_all_tools ONLY if static files completely missing."""
             tool_results = StaticToolLoader.load(interest_area)
@@ -1311,12 +1421,14 @@ def run_unified_discovery_streaming(
                 tool_results, _ = precompute_all_tools(interest_area, sub_interest_area)
                 return _ensure_all_tool_fields(tool_results)
         
-        tool_future = executor.submit(load_or_compute_tools)
+        tool_future = executor.submit(run_in_metrics_context(load_or_compute_tools))
         
         # Wait for Stage 1 to complete (for streaming, we yield it immediately)
+        stage1_usage = None
         try:
             stage1_result = stage1_future.result(timeout=60)
             profile_analysis_json = stage1_result.get("profile_analysis", "")
+            stage1_usage = stage1_result.get("usage")
         except Exception as e:
             current_app.logger.error(f"Stage 1 failed: {e}", exc_info=True)
             profile_analysis_json = ""
@@ -1334,9 +1446,7 @@ def run_unified_discovery_streaming(
     tool_complete = time.time()
     metadata["tool_precompute_time"] = tool_complete - tool_start
     
-    print(f"[PERF] run_unified_discovery_streaming: PARALLEL EXECUTION COMPLETE")
-    print(f"[PERF] run_unified_discovery_streaming: STAGE 1 END (Profile Analysis) - Duration: {stage1_duration:.3f}s")
-    print(f"[PERF] run_unified_discovery_streaming: TOOLS loaded/precomputed - Duration: {metadata['tool_precompute_time']:.3f}s ({len(tool_results)} tools)")
+    tracing.current_span().set_attribute("tool_count", len(tool_results))
     log_timing("run_unified_discovery_streaming", "parallel_end",
               timestamp=stage1_end,
               duration=stage1_duration,
@@ -1347,106 +1457,116 @@ def run_unified_discovery_streaming(
     
     # STAGE 2: Idea Research (with static tool blocks - NEVER executes tools)
     stage2_start = time.time()
-    print(f"[PERF] run_unified_discovery_streaming: STAGE 2 START (Idea Research) at {stage2_start:.3f}")
     log_timing("run_unified_discovery_streaming", "stage2_start", timestamp=stage2_start)
     
-    # Build prompt for idea research
-    prompt = _build_idea_research_prompt(profile_analysis_json, tool_results)
-    
-    # Count tokens and log before LLM call
-    system_message = "You are a startup advisor. Generate complete idea research and recommendations in the exact format requested."
-    total_tokens = count_tokens(system_message) + count_tokens(prompt)
-    print(f"[TOKEN] Stage 2 LLM call (streaming) - Input tokens: {total_tokens} (system: {count_tokens(system_message)}, user: {count_tokens(prompt)})")
-    current_app.logger.info(f"Stage 2 LLM call (streaming) - Input tokens: {total_tokens}")
-    
-    # Abort if >2500 tokens (safety check)
-    if total_tokens > 2500:
-        current_app.logger.error(f"Stage 2 prompt exceeds 2500 token limit: {total_tokens} tokens, aborting")
-        raise ValueError(f"Stage 2 prompt exceeds 2500 token limit: {total_tokens} tokens")
-    
-    # Get LLM client (OpenAI or Claude)
-    client, model_name, is_claude = _get_llm_client()
-    
-    llm_start = time.time()
-    log_timing("run_idea_research", "llm_call_start", timestamp=llm_start)
-    
-    # Note: Claude streaming is different, but for now we'll use OpenAI streaming
-    # If Claude is selected, we'll fall back to non-streaming for now
-    if is_claude:
-        # Claude doesn't support streaming in the same way, use non-streaming
-        current_app.logger.info("Claude selected but streaming requested - using non-streaming mode")
-        response = client.messages.create(
-            model=model_name,
-            max_tokens=2000,  # Reduced from 3000 for faster generation
-            temperature=0.3,
-            system=system_message,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        response_text = response.content[0].text
-        # Yield as single chunk for compatibility
-        yield (response_text, metadata)
-        response_chunks = [response_text]
-    else:
-        # OpenAI API with streaming
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=2000,  # Reduced from 3000 for faster generation
-            stream=True,
-        )
+    with tracing.span("discovery.stage2", streaming=True) as stage2_span:
+        # Build prompt for idea research
+        prompt = _build_idea_research_prompt(profile_analysis_json, tool_results)
         
-        # Stream chunks
-        response_chunks = []
-        last_heartbeat = time.time()
-        HEARTBEAT_INTERVAL = 15.0
+        # Count tokens and log before LLM call
+        system_message = STAGE2_SYSTEM_MESSAGE
+        system_tokens = count_tokens(system_message)
+        prompt_tokens = count_tokens(prompt.text)
+        total_tokens = system_tokens + prompt_tokens
+        stage2_span.set_attribute("input_tokens", total_tokens)
+        current_app.logger.info(f"Stage 2 LLM call (streaming) - Input tokens: {total_tokens}")
         
-        try:
-            last_chunk_time = time.time()
-            for chunk in response:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    chunk_content = chunk.choices[0].delta.content
-                    response_chunks.append(chunk_content)
-                    metadata["llm_time"] = time.time() - llm_start
-                    
-                    # Send heartbeat if needed
-                    current_time = time.time()
-                    if current_time - last_heartbeat >= HEARTBEAT_INTERVAL:
-                        yield ("__HEARTBEAT__", metadata)
-                        last_heartbeat = current_time
-                    
-                    # Yield chunk immediately
-                    yield (chunk_content, metadata)
-                last_chunk_time = time.time()
-        except Exception as e:
-            # Log structured error
-            error_info = {
-                "error_type": type(e).__name__,
-                "error_message": str(e),
-                "tool_precompute_time": metadata.get("tool_precompute_time", 0),
-                "llm_time": time.time() - llm_start,
-                "total_time": time.time() - start_time,
-            }
-            current_app.logger.error(
-                f"Error during streaming: {json.dumps(error_info)}",
-                exc_info=True
-            )
-            # Re-raise to be handled by caller (will send SSE error event)
-            raise
-    
-    # After streaming completes, assemble full response for post-processing
-    response_text = "".join(response_chunks)
-    llm_complete = time.time()
-    stage2_end = time.time()
-    metadata["llm_time"] = llm_complete - llm_start
-    print(f"[PERF] run_unified_discovery_streaming: LLM call COMPLETE at {llm_complete:.3f}")
-    print(f"[PERF] run_unified_discovery_streaming: LLM duration: {metadata['llm_time']:.3f}s")
-    print(f"[PERF] run_unified_discovery_streaming: STAGE 2 END (Idea Research) at {stage2_end:.3f} - Duration: {stage2_end - stage2_start:.3f}s")
+        # Abort if >2500 tokens (safety check)
+        if total_tokens > 2500:
+            current_app.logger.error(f"Stage 2 prompt exceeds 2500 token limit: {total_tokens} tokens, aborting")
+            raise ValueError(f"Stage 2 prompt exceeds 2500 token limit: {total_tokens} tokens")
+        
+        # Get LLM client (OpenAI or Claude)
+        client, model_name, is_claude = _get_llm_client()
+        
+        llm_start = time.time()
+        log_timing("run_idea_research", "llm_call_start", timestamp=llm_start)
+        stage2_usage = None
+        
+        # Note: Claude streaming is different, but for now we'll use OpenAI streaming
+        # If Claude is selected, we'll fall back to non-streaming for now
+        with tracing.span("llm.call", pipeline="discovery", stage="stage2", provider=_provider_label(is_claude), model=model_name) as llm_span:
+            if is_claude:
+                # Claude doesn't support streaming in the same way, use non-streaming
+                current_app.logger.info("Claude selected but streaming requested - using non-streaming mode")
+                response = client.messages.create(
+                    model=model_name,
+                    max_tokens=2000,  # Reduced from 3000 for faster generation
+                    temperature=0.3,
+                    system=prompt_cache.anthropic_system(system_message),
+                    messages=prompt_cache.anthropic_messages(prompt),
+                )
+                response_text = response.content[0].text
+                stage2_usage = prompt_cache.usage_from_response(getattr(response, "usage", None), True)
+                # The whole response arrives at once; that is the client's first token
+                metrics.LLM_TTFT.observe(time.time() - llm_start, pipeline="discovery", stage="stage2", provider="claude")
+                llm_span.add_event("first_token")
+                # Yield as single chunk for compatibility
+                yield (response_text, metadata)
+                response_chunks = [response_text]
+            else:
+                # OpenAI API with streaming
+                response = client.chat.completions.create(
+                    model=model_name,
+                    messages=prompt_cache.openai_messages(system_message, prompt),
+                    temperature=0.3,
+                    max_tokens=2000,  # Reduced from 3000 for faster generation
+                    stream=True,
+                    stream_options={"include_usage": True},  # Final chunk carries usage (incl. cached tokens)
+                )
+                
+                # Stream chunks
+                response_chunks = []
+                last_heartbeat = time.time()
+                HEARTBEAT_INTERVAL = 15.0
+                
+                try:
+                    last_chunk_time = time.time()
+                    for chunk in response:
+                        if getattr(chunk, "usage", None) is not None:
+                            stage2_usage = prompt_cache.usage_from_response(chunk.usage, False)
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            chunk_content = chunk.choices[0].delta.content
+                            if not response_chunks:
+                                llm_span.add_event("first_token")
+                                metrics.LLM_TTFT.observe(time.time() - llm_start, pipeline="discovery", stage="stage2", provider="openai")
+                            response_chunks.append(chunk_content)
+                            metadata["llm_time"] = time.time() - llm_start
+                            
+                            # Send heartbeat if needed
+                            current_time = time.time()
+                            if current_time - last_heartbeat >= HEARTBEAT_INTERVAL:
+                                yield ("__HEARTBEAT__", metadata)
+                                last_heartbeat = current_time
+                            
+                            # Yield chunk immediately
+                            yield (chunk_content, metadata)
+                        last_chunk_time = time.time()
+                except Exception as e:
+                    # Log structured error
+                    error_info = {
+                        "error_type": type(e).__name__,
+                        "error_message": str(e),
+                        "tool_precompute_time": metadata.get("tool_precompute_time", 0),
+                        "llm_time": time.time() - llm_start,
+                        "total_time": time.time() - start_time,
+                    }
+                    current_app.logger.error(
+                        f"Error during streaming: {json.dumps(error_info)}",
+                        exc_info=True
+                    )
+                    # Re-raise to be handled by caller (will send SSE error event)
+                    raise
+        
+        # After streaming completes, assemble full response for post-processing
+        response_text = "".join(response_chunks)
+        llm_complete = time.time()
+        stage2_end = time.time()
+        metadata["llm_time"] = llm_complete - llm_start
+        _record_token_usage(metadata, stage1_usage, stage2_usage)
+        metrics.LLM_LATENCY.observe(metadata["llm_time"], pipeline="discovery", stage="stage2", provider=_provider_label(is_claude))
+        metrics.STAGE_DURATION.observe(stage2_end - stage2_start, stage="stage2")
+        stage2_span.set_attributes(llm_duration=round(metadata["llm_time"], 3), response_chars=len(response_text))
     log_timing("run_unified_discovery_streaming", "stage2_end",
               timestamp=stage2_end,
               duration=stage2_end - stage2_start)
@@ -1495,17 +1615,15 @@ def run_unified_discovery_streaming(
     stage1_duration = (stage1_end - stage1_start) if stage1_start and stage1_end else 0.0
     stage2_duration = (stage2_end - stage2_start) if stage2_start and stage2_end else 0.0
     
-    print(f"\n{'='*80}")
-    print(f"[PERF] run_unified_discovery_streaming: PIPELINE COMPLETE at {pipeline_end:.3f}")
-    print(f"[PERF] run_unified_discovery_streaming: Unified Discovery completed in {total_pipeline_time:.3f} seconds")
-    print(f"[PERF] run_unified_discovery_streaming: BREAKDOWN:")
-    print(f"  - Stage 1 (Profile Analysis): {stage1_duration:.3f}s (start: {stage1_start:.3f}, end: {stage1_end:.3f})")
-    print(f"  - Stage 2 (Idea Research): {stage2_duration:.3f}s (start: {stage2_start:.3f}, end: {stage2_end:.3f})")
-    print(f"  - Tool precompute: {tool_elapsed_safe:.3f}s")
-    print(f"  - LLM generation: {llm_time_safe:.3f}s")
-    print(f"  - Other overhead: {total_pipeline_time - stage1_duration - stage2_duration:.3f}s")
-    print(f"{'='*80}\n")
+    tracing.current_span().set_attributes(
+        stage1_duration=round(stage1_duration, 3),
+        stage2_duration=round(stage2_duration, 3),
+        tool_precompute=round(tool_elapsed_safe, 3),
+        llm_generation=round(llm_time_safe, 3),
+        **_token_usage_attributes(metadata),
+    )
     
+    metrics.STAGE_DURATION.observe(total_pipeline_time, stage="pipeline")
     log_timing("run_unified_discovery_streaming", "pipeline_end",
               timestamp=pipeline_end,
               duration=total_pipeline_time,
@@ -1523,6 +1641,7 @@ def run_unified_discovery_streaming(
     yield (None, {"final": True, "outputs": outputs, "metadata": metadata})
 
 
+@tracing.traced("discovery.pipeline", streaming=False)
 def run_unified_discovery_non_streaming(
     profile_data: Dict[str, Any],
     use_cache: bool = True,
@@ -1540,9 +1659,6 @@ def run_unified_discovery_non_streaming(
         Tuple of (outputs_dict, metadata_dict) - NOT a generator
     """
     pipeline_start = time.time()
-    print(f"\n{'='*80}")
-    print(f"[PERF] run_unified_discovery_non_streaming: PIPELINE START at {pipeline_start:.3f}")
-    print(f"{'='*80}")
     log_timing("run_unified_discovery_non_streaming", "pipeline_start", timestamp=pipeline_start)
     
     start_time = time.time()
@@ -1570,14 +1686,13 @@ def run_unified_discovery_non_streaming(
         if cached:
             metadata["cache_hit"] = True
             metadata["total_time"] = time.time() - start_time
-            print(f"[PERF] run_unified_discovery_non_streaming: CACHE HIT - returning cached results in {metadata['total_time']:.3f}s")
+            tracing.current_span().set_attribute("cache_hit", True)
             current_app.logger.info(f"Discovery cache hit - returning cached results")
             return cached, metadata
     
     # PARALLEL EXECUTION: Stage 1 (Profile Analysis) + Tool Precomputation
     # This removes ~15 seconds of dead time by running both concurrently
     stage1_start = time.time()
-    print(f"[PERF] run_unified_discovery_non_streaming: STAGE 1 + TOOLS START (PARALLEL) at {stage1_start:.3f}")
     log_timing("run_unified_discovery_non_streaming", "parallel_start", timestamp=stage1_start)
     
     # Extract interest_area for tool loading
@@ -1588,9 +1703,10 @@ def run_unified_discovery_non_streaming(
     tool_start = time.time()
     with ThreadPoolExecutor(max_workers=2) as executor:
         # Stage 1: Profile Analysis
-        stage1_future = executor.submit(run_profile_analysis, profile_data)
+        stage1_future = executor.submit(run_in_metrics_context(run_profile_analysis, profile_data))
         
         # Tool loading: Load static tools ONLY (NEVER execute tools if static files exist)
+        @tracing.traced("discovery.load_tools", interest_area=interest_area)
         def load_or_compute_tools():
             """Load static tools, or fallback to precompute_all_tools ONLY if static files completely missing."""
             tool_results = StaticToolLoader.load(interest_area)
@@ -1607,12 +1723,14 @@ def run_unified_discovery_non_streaming(
                 tool_results, _ = precompute_all_tools(interest_area, sub_interest_area)
                 return _ensure_all_tool_fields(tool_results)
         
-        tool_future = executor.submit(load_or_compute_tools)
+        tool_future = executor.submit(run_in_metrics_context(load_or_compute_tools))
         
         # Wait for both to complete
+        stage1_usage = None
         try:
             stage1_result = stage1_future.result(timeout=60)
             profile_analysis_json = stage1_result.get("profile_analysis", "")
+            stage1_usage = stage1_result.get("usage")
         except Exception as e:
             current_app.logger.error(f"Stage 1 failed: {e}", exc_info=True)
             profile_analysis_json = ""
@@ -1629,9 +1747,7 @@ def run_unified_discovery_non_streaming(
     tool_complete = time.time()
     metadata["tool_precompute_time"] = tool_complete - tool_start
     
-    print(f"[PERF] run_unified_discovery_non_streaming: PARALLEL EXECUTION COMPLETE")
-    print(f"[PERF] run_unified_discovery_non_streaming: STAGE 1 END (Profile Analysis) - Duration: {stage1_duration:.3f}s")
-    print(f"[PERF] run_unified_discovery_non_streaming: TOOLS loaded/precomputed - Duration: {metadata['tool_precompute_time']:.3f}s ({len(tool_results)} tools)")
+    tracing.current_span().set_attribute("tool_count", len(tool_results))
     log_timing("run_unified_discovery_non_streaming", "parallel_end",
               timestamp=stage1_end,
               duration=stage1_duration,
@@ -1639,7 +1755,6 @@ def run_unified_discovery_non_streaming(
     
     # STAGE 2: Idea Research (with static tool blocks - NEVER executes tools)
     stage2_start = time.time()
-    print(f"[PERF] run_unified_discovery_non_streaming: STAGE 2 START (Idea Research) at {stage2_start:.3f}")
     log_timing("run_unified_discovery_non_streaming", "stage2_start", timestamp=stage2_start)
     
     # Run idea research (Stage 2 is the ONLY personalization layer)
@@ -1651,7 +1766,7 @@ def run_unified_discovery_non_streaming(
     stage2_end = time.time()
     stage2_duration = stage2_end - stage2_start
     metadata["llm_time"] = stage2_duration  # Stage 2 includes LLM time
-    print(f"[PERF] run_unified_discovery_non_streaming: STAGE 2 END (Idea Research) at {stage2_end:.3f} - Duration: {stage2_duration:.3f}s")
+    _record_token_usage(metadata, stage1_usage, idea_research_outputs.get("usage"))
     log_timing("run_unified_discovery_non_streaming", "stage2_end",
               timestamp=stage2_end,
               duration=stage2_duration)
@@ -1680,17 +1795,15 @@ def run_unified_discovery_non_streaming(
     tool_elapsed_safe = metadata.get('tool_precompute_time', 0.0)
     llm_time_safe = metadata.get('llm_time', 0.0)
     
-    print(f"\n{'='*80}")
-    print(f"[PERF] run_unified_discovery_non_streaming: PIPELINE COMPLETE at {pipeline_end:.3f}")
-    print(f"[PERF] run_unified_discovery_non_streaming: Unified Discovery completed in {total_pipeline_time:.3f} seconds")
-    print(f"[PERF] run_unified_discovery_non_streaming: BREAKDOWN:")
-    print(f"  - Stage 1 (Profile Analysis): {stage1_duration:.3f}s (start: {stage1_start:.3f}, end: {stage1_end:.3f})")
-    print(f"  - Stage 2 (Idea Research): {stage2_duration:.3f}s (start: {stage2_start:.3f}, end: {stage2_end:.3f})")
-    print(f"  - Tool precompute: {tool_elapsed_safe:.3f}s")
-    print(f"  - LLM generation: {llm_time_safe:.3f}s")
-    print(f"  - Other overhead: {total_pipeline_time - stage1_duration - stage2_duration:.3f}s")
-    print(f"{'='*80}\n")
+    tracing.current_span().set_attributes(
+        stage1_duration=round(stage1_duration, 3),
+        stage2_duration=round(stage2_duration, 3),
+        tool_precompute=round(tool_elapsed_safe, 3),
+        llm_generation=round(llm_time_safe, 3),
+        **_token_usage_attributes(metadata),
+    )
     
+    metrics.STAGE_DURATION.observe(total_pipeline_time, stage="pipeline")
     log_timing("run_unified_discovery_non_streaming", "pipeline_end",
               timestamp=pipeline_end,
               duration=total_pipeline_time,
@@ -1727,9 +1840,136 @@ def run_unified_discovery(
         If stream=False: Tuple of (outputs_dict, metadata_dict) - NOT a generator
         If stream=True: Iterator of (chunk, metadata_dict) tuples
     """
+    # Cache bypass is for debugging - always run a fresh pipeline
+    coalesce = DISCOVERY_SINGLE_FLIGHT and use_cache and not cache_bypass
+    
     if stream:
+        if coalesce:
+            return _run_streaming_single_flight(profile_data, use_cache, cache_bypass)
         return run_unified_discovery_streaming(profile_data, use_cache, cache_bypass)
     
     # Non-streaming: return tuple directly (NOT a generator)
+    if coalesce:
+        return _run_non_streaming_single_flight(profile_data, use_cache, cache_bypass)
     return run_unified_discovery_non_streaming(profile_data, use_cache, cache_bypass)
 
+
+def _mark_coalesced(item: Tuple[Optional[str], Dict[str, Any]]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """Flag the final message of a follower's stream as served by another request's run."""
+    chunk, chunk_metadata = item
+    if chunk is None and isinstance(chunk_metadata, dict) and chunk_metadata.get("final"):
+        final_metadata = dict(chunk_metadata.get("metadata") or {})
+        final_metadata["coalesced"] = True
+        return chunk, {**chunk_metadata, "metadata": final_metadata}
+    return item
+
+
+def _run_streaming_single_flight(
+    profile_data: Dict[str, Any],
+    use_cache: bool,
+    cache_bypass: bool,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Streaming pipeline with single-flight coalescing.
+    
+    The first request for a given cache key runs the pipeline and publishes every
+    chunk it yields; concurrent identical requests replay those chunks and then
+    follow the live stream instead of starting their own LLM calls.
+    """
+    key = f"stream:{DiscoveryCache._generate_cache_key(profile_data)}"
+    run, is_leader = SingleFlight.join(key)
+    
+    if not is_leader:
+        current_app.logger.info(f"Discovery single-flight: attaching to in-flight run {key}")
+        try:
+            for item in run.subscribe(timeout=DISCOVERY_SINGLE_FLIGHT_TIMEOUT):
+                yield _mark_coalesced(item)
+        finally:
+            SingleFlight.leave(run)
+        return
+    
+    source = run_unified_discovery_streaming(profile_data, use_cache, cache_bypass)
+    handed_off = False
+    try:
+        for chunk, chunk_metadata in source:
+            run.publish(_published_chunk(chunk, chunk_metadata))
+            yield chunk, chunk_metadata
+        run.finish()
+    except GeneratorExit:
+        # Leader's client disconnected - finish the pipeline off-request for attached followers
+        if SingleFlight.has_followers(run):
+            worker = threading.Thread(
+                target=run_in_metrics_context(
+                    _drain_abandoned_run, current_app._get_current_object(), key, run, source,
+                ),
+                name="discovery-single-flight",
+                daemon=True,
+            )
+            worker.start()
+            handed_off = True
+        else:
+            source.close()
+            run.fail(RuntimeError("Discovery run was abandoned"))
+        raise
+    except Exception as e:
+        run.fail(e)
+        raise
+    finally:
+        if not handed_off:
+            SingleFlight.release(key, run)
+
+
+def _published_chunk(chunk: Optional[str], chunk_metadata: Any) -> Tuple[Optional[str], Any]:
+    """Copy metadata - the pipeline keeps mutating its dict while followers read it."""
+    return chunk, dict(chunk_metadata) if isinstance(chunk_metadata, dict) else chunk_metadata
+
+
+def _drain_abandoned_run(app: Any, key: str, run: Any, source: Iterator[Tuple[str, Dict[str, Any]]]) -> None:
+    """Run the rest of a disconnected leader's pipeline, publishing to its followers."""
+    with app.app_context():
+        try:
+            for chunk, chunk_metadata in source:
+                run.publish(_published_chunk(chunk, chunk_metadata))
+            run.finish()
+        except Exception as e:
+            current_app.logger.exception(f"Discovery single-flight: abandoned run {key} failed: {e}")
+            run.fail(e)
+        finally:
+            source.close()
+            SingleFlight.release(key, run)
+
+
+def _run_non_streaming_single_flight(
+    profile_data: Dict[str, Any],
+    use_cache: bool,
+    cache_bypass: bool,
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Non-streaming pipeline with single-flight coalescing.
+    
+    Concurrent identical requests wait for the leader's (outputs, metadata)
+    instead of starting their own LLM calls.
+    """
+    key = f"sync:{DiscoveryCache._generate_cache_key(profile_data)}"
+    run, is_leader = SingleFlight.join(key)
+    
+    if not is_leader:
+        current_app.logger.info(f"Discovery single-flight: waiting for in-flight run {key}")
+        try:
+            outputs, metadata = run.wait(timeout=DISCOVERY_SINGLE_FLIGHT_TIMEOUT)
+        finally:
+            SingleFlight.leave(run)
+        if isinstance(outputs, dict):
+            outputs = dict(outputs)
+        return outputs, {**(metadata or {}), "coalesced": True}
+    
+    try:
+        outputs, metadata = run_unified_discovery_non_streaming(profile_data, use_cache, cache_bypass)
+        run.finish((outputs, metadata))
+        return outputs, metadata
+    except Exception as e:
+        run.fail(e)
+        raise
+    finally:
+        SingleFlight.release(key, run)
+
@@ -0,0 +1,306 @@
+"""
+Materialized counters for the public usage stats.
+
+The landing page asks for usage stats on every view. Instead of counting
+runs and validations on each hit, counters in the usage_counters table are
+adjusted in the same transaction as the row change (an upsert per counter):
+
+- total_validations / total_discoveries: +1 on completion, -1 on delete
+- validations:YYYY-MM / discoveries:YYYY-MM: the same, for the row's month
+- total_users: +1 on a user's first completion, -1 when they have none left
+- average_score: mean of the last SCORE_WINDOW validation scores, computed
+  by reconciliation only (a window can't be maintained incrementally)
+
+A background reconciliation recomputes every counter from the source tables
+every USAGE_STATS_RECONCILE_SECONDS, which corrects changes made outside
+those code paths (and sets average_score). The endpoint reads from
+an in-process snapshot that is reloaded at most once per
+USAGE_STATS_TTL_SECONDS (one small SELECT), so traffic spikes don't reach
+the database.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.models.database import db, User, UserRun, UserValidation, UsageCounter, utcnow
+
+# Seconds the in-process snapshot is served before reloading counters
+USAGE_STATS_TTL_SECONDS = float(os.environ.get("USAGE_STATS_TTL_SECONDS", "60"))
+# Seconds between full reconciliations against the source tables
+USAGE_STATS_RECONCILE_SECONDS = float(os.environ.get("USAGE_STATS_RECONCILE_SECONDS", "900"))
+# Validations in the average_score window
+SCORE_WINDOW = 100
+
+_INSERT_BY_DIALECT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+DEFAULT_STATS = {
+    "total_users": 0,
+    "validations_this_month": 0,
+    "discoveries_this_month": 0,
+    "total_validations": 0,
+    "total_discoveries": 0,
+    "average_score": 0,
+}
+
+
+def _month_key(prefix: str) -> str:
+    return f"{prefix}:{utcnow().strftime('%Y-%m')}"
+
+
+def _upsert(name: str, value: float, increment: bool) -> Any:
+    """
+    INSERT ... ON CONFLICT (name) DO UPDATE for one counter.
+
+    A single statement, so two writers creating the same counter can't
+    insert it twice or fail on the primary key.
+    """
+    dialect = db.engine.dialect.name
+    if dialect not in _INSERT_BY_DIALECT:
+        raise NotImplementedError(f"Usage counters need ON CONFLICT support (got {dialect})")
+    table = UsageCounter.__table__
+    now = utcnow()
+    stmt = _INSERT_BY_DIALECT[dialect](table).values(name=name, value=value, updated_at=now)
+    new_value = table.c.value + stmt.excluded.value if increment else stmt.excluded.value
+    return stmt.on_conflict_do_update(index_elements=[table.c.name], set_={"value": new_value, "updated_at": now})
+
+
+def _log_warning(message: str) -> None:
+    if has_app_context():
+        current_app.logger.warning(message)
+
+
+class UsageStats:
+    """Counter maintenance, reconciliation and the in-process snapshot."""
+
+    def __init__(self, ttl: float = USAGE_STATS_TTL_SECONDS, reconcile_interval: float = USAGE_STATS_RECONCILE_SECONDS):
+        self.ttl = ttl
+        self.reconcile_interval = reconcile_interval
+        self._snapshot: Optional[Tuple[Dict[str, Any], str]] = None
+        self._loaded_at = 0.0
+        self._load_lock = threading.Lock()
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Increments (called before the caller commits the row change)
+    # ------------------------------------------------------------------
+
+    def record_validation_completed(self, validation: UserValidation) -> None:
+        """Count a validation that was just marked completed."""
+        self._adjust(validation.user_id, "validations", validation.created_at, 1)
+
+    def record_validation_deleted(self, validation: UserValidation) -> None:
+        """Uncount a completed validation that was just soft-deleted."""
+        if validation.status == "completed":
+            self._adjust(validation.user_id, "validations", validation.created_at, -1)
+
+    def record_run_completed(self, run: UserRun) -> None:
+        """Count a discovery run that was just saved as completed."""
+        self._adjust(run.user_id, "discoveries", run.created_at, 1)
+
+    def _adjust(self, user_id: int, kind: str, created_at: Optional[datetime], amount: int) -> None:
+        """
+        Add ``amount`` to a kind's counters in the caller's transaction.
+
+        Runs in a savepoint, so a failed counter write never rolls back the
+        run/validation itself; reconciliation catches up instead.
+        """
+        try:
+            with db.session.begin_nested():
+                # Autoflush puts the caller's pending change in these counts
+                remaining = self._completed_count(user_id)
+                amounts = {
+                    f"total_{kind}": amount,
+                    f"{kind}:{(created_at or utcnow()).strftime('%Y-%m')}": amount,
+                }
+                if (amount > 0 and remaining == 1) or (amount < 0 and remaining == 0):
+                    amounts["total_users"] = amount
+                for name, value in amounts.items():
+                    db.session.execute(_upsert(name, value, increment=True))
+        except Exception as e:
+            _log_warning(f"Usage counter update failed: {e}")
+
+    @staticmethod
+    def _completed_count(user_id: int) -> int:
+        """The user's completed, non-deleted runs and validations."""
+        validations = db.session.query(func.count(UserValidation.id)).filter(
+            UserValidation.user_id == user_id,
+            UserValidation.is_deleted == False,
+            UserValidation.status == "completed",
+        ).scalar() or 0
+        runs = db.session.query(func.count(UserRun.id)).filter(
+            UserRun.user_id == user_id,
+            UserRun.is_deleted == False,
+            UserRun.status == "completed",
+        ).scalar() or 0
+        return validations + runs
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    def reconcile(self) -> Dict[str, Any]:
+        """Recompute every counter from the source tables and store it."""
+        stats = self._compute_from_tables()
+        values = {
+            "total_users": stats["total_users"],
+            "total_validations": stats["total_validations"],
+            "total_discoveries": stats["total_discoveries"],
+            _month_key("validations"): stats["validations_this_month"],
+            _month_key("discoveries"): stats["discoveries_this_month"],
+            "average_score": stats["average_score"],
+        }
+        with db.engine.begin() as conn:
+            for name, value in values.items():
+                conn.execute(_upsert(name, value, increment=False))
+        self._loaded_at = 0.0  # next read picks up the reconciled values
+        return stats
+
+    @staticmethod
+    def _compute_from_tables() -> Dict[str, Any]:
+        completed_validation = (UserValidation.is_deleted == False) & (UserValidation.status == "completed")
+        completed_run = (UserRun.is_deleted == False) & (UserRun.status == "completed")
+        this_month_start = utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        # Active users who have completed at least one validation or discovery
+        users_with_validations = select(UserValidation.user_id).where(completed_validation)
+        users_with_runs = select(UserRun.user_id).where(completed_run)
+        row = db.session.execute(select(
+            select(func.count(User.id)).where(
+                User.is_active == True,
+                or_(User.id.in_(users_with_validations), User.id.in_(users_with_runs)),
+            ).scalar_subquery(),
+            select(func.count(UserValidation.id)).where(completed_validation, UserValidation.created_at >= this_month_start).scalar_subquery(),
+            select(func.count(UserRun.id)).where(completed_run, UserRun.created_at >= this_month_start).scalar_subquery(),
+            select(func.count(UserValidation.id)).where(completed_validation).scalar_subquery(),
+            select(func.count(UserRun.id)).where(completed_run).scalar_subquery(),
+        )).one()
+
+        return {
+            "total_users": row[0] or 0,
+            "validations_this_month": row[1] or 0,
+            "discoveries_this_month": row[2] or 0,
+            "total_validations": row[3] or 0,
+            "total_discoveries": row[4] or 0,
+            "average_score": UsageStats._average_score(),
+        }
+
+    @staticmethod
+    def _average_score() -> float:
+        """Mean overall score of the last SCORE_WINDOW completed validations."""
+        total_score = 0.0
+        score_count = 0
+        recent = db.session.execute(
+            select(UserValidation.overall_score, UserValidation.validation_result)
+            .where(UserValidation.is_deleted == False, UserValidation.status == "completed")
+            .order_by(UserValidation.created_at.desc())
+            .limit(SCORE_WINDOW)
+        ).all()
+        for overall_score, validation_result in recent:
+            if overall_score is None and validation_result:
+                # Not backfilled yet (see report_summaries)
+                try:
+                    overall_score = json.loads(validation_result).get("overall_score")
+                except Exception:
+                    pass
+            try:
+                if overall_score is not None:
+                    total_score += float(overall_score)
+                    score_count += 1
+            except (TypeError, ValueError):
+                pass
+        return total_score / score_count if score_count else 0
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    def get(self) -> Tuple[Dict[str, Any], str]:
+        """
+        Current stats and their ETag, from memory when fresh.
+
+        Only one thread reloads an expired snapshot; the others keep serving
+        the previous one meanwhile.
+        """
+        self._ensure_worker()
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return snapshot
+        if snapshot is not None and not self._load_lock.acquire(blocking=False):
+            return snapshot
+        if snapshot is None:
+            self._load_lock.acquire()
+        try:
+            if self._snapshot is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return self._snapshot
+            self._snapshot = self._load()
+            self._loaded_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._load_lock.release()
+
+    def _load(self) -> Tuple[Dict[str, Any], str]:
+        validations_key, discoveries_key = _month_key("validations"), _month_key("discoveries")
+        names = ["total_users", "total_validations", "total_discoveries", "average_score", validations_key, discoveries_key]
+        counters = dict(db.session.execute(
+            select(UsageCounter.name, UsageCounter.value).where(UsageCounter.name.in_(names))
+        ).all())
+        if "total_validations" not in counters:
+            # First start (or table truncated): build the counters now
+            self.reconcile()
+            counters = dict(db.session.execute(
+                select(UsageCounter.name, UsageCounter.value).where(UsageCounter.name.in_(names))
+            ).all())
+        stats = {
+            "total_users": int(counters.get("total_users", 0)),
+            "validations_this_month": int(counters.get(validations_key, 0)),
+            "discoveries_this_month": int(counters.get(discoveries_key, 0)),
+            "total_validations": int(counters.get("total_validations", 0)),
+            "total_discoveries": int(counters.get("total_discoveries", 0)),
+            "average_score": round(counters.get("average_score", 0), 1),
+        }
+        etag = hashlib.sha1(json.dumps(stats, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return stats, etag
+
+    def invalidate(self) -> None:
+        self._snapshot = None
+        self._loaded_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Background reconciliation
+    # ------------------------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or self.reconcile_interval <= 0 or not has_app_context():
+            return
+        with self._load_lock:
+            if self._thread is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._run, name="usage-stats-reconciler", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.reconcile_interval)
+            try:
+                with self._app.app_context():
+                    self.reconcile()
+                    db.session.remove()
+            except Exception as e:
+                try:
+                    with self._app.app_context():
+                        self._app.logger.warning(f"Usage stats reconciliation failed: {e}")
+                except Exception:
+                    pass
+
+
+usage_stats = UsageStats()
@@ -0,0 +1,188 @@
+"""
+Incremental parser for streamed validation Markdown.
+
+Feeds on text deltas as the model produces them and reports each report
+section (executive summary, 5-pillar score table, Deep Dive sections,
+critical assumptions) as soon as it closes, so the client can render
+structured results long before the full report is done.
+
+The final, authoritative parse is still _parse_markdown_validation on the
+complete text; this parser only drives the ``section_complete`` events.
+Both read the 5-pillar table with parse_pillar_rows, so streamed and final
+scores always agree.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+# Heading line -> section key. Container headings (key None) close the
+# current section without starting a new one.
+SECTION_HEADINGS = [
+    (re.compile(r"^##\s+.*Executive Summary", re.IGNORECASE), "executive_summary"),
+    (re.compile(r"^##\s+.*Deep Dive Analysis", re.IGNORECASE), None),
+    (re.compile(r"^###\s+1\.\s+Core Problem", re.IGNORECASE), "core_problem"),
+    (re.compile(r"^###\s+2\.\s+Business Model", re.IGNORECASE), "business_model"),
+    (re.compile(r"^###\s+3\.\s+Competitive Landscape", re.IGNORECASE), "competitive_landscape"),
+    (re.compile(r"^##\s+.*Critical Assumptions", re.IGNORECASE), None),
+    (re.compile(r"^###\s+1\.\s+Riskiest Assumption", re.IGNORECASE), "riskiest_assumption"),
+    (re.compile(r"^###\s+2\.\s+Actionable Next Steps", re.IGNORECASE), "next_steps"),
+]
+
+TABLE_HEADER = re.compile(r"^\|.*Pillar.*Score", re.IGNORECASE)
+
+# Pillar name as written in the table -> frontend score key
+PILLAR_MAPPING = {
+    "Problem-Solution Fit": "problem_solution_fit",
+    "Market Viability & Scope": "market_opportunity",
+    "Competitive Moat": "competitive_landscape",
+    "Financial Viability": "financial_sustainability",
+    "Feasibility & Risk": "risk_assessment",
+}
+
+# Labeled one-liners pulled out of Deep Dive sections
+LABELED_FIELDS = {
+    "verdict": re.compile(r"\*\*Verdict:\*\*\s*(.*?)(?:\n|$)", re.IGNORECASE),
+    "red_flag": re.compile(r"\*\*Red Flag:\*\*\s*(.*?)(?:\n|$)", re.IGNORECASE),
+    "key_insight": re.compile(r"\*\*Key Insight:\*\*\s*(.*?)(?:\n|$)", re.IGNORECASE),
+}
+
+
+def rescale_pillar_score(score_1_5: int) -> int:
+    """Convert a 1-5 pillar score to the 0-10 scale: (score-1)*2.25+1, so 1→1, 2→3, 3→6, 4→8, 5→10."""
+    return max(1, min(10, round((score_1_5 - 1) * 2.25 + 1)))
+
+
+def parse_pillar_rows(rows: List[str]) -> Dict[str, Any]:
+    """
+    Parse 5-pillar table rows into scores.
+
+    Returns:
+        Dict with ``scores`` (0-10 scale, frontend keys), ``raw_scores``
+        (1-5 as written) and ``reasoning`` per pillar name.
+    """
+    scores: Dict[str, int] = {}
+    raw_scores: Dict[str, int] = {}
+    reasoning: Dict[str, str] = {}
+    for row in rows:
+        parts = [p.strip() for p in row.split("|") if p.strip()]
+        if len(parts) < 2 or set(parts[0]) <= set(":- "):
+            continue
+        pillar_name = re.sub(r"\*\*|\*|`", "", parts[0]).strip()
+        score_match = re.search(r"(\d+)", parts[1])
+        if not score_match:
+            continue
+        score_1_5 = int(score_match.group(1))
+        score_0_10 = rescale_pillar_score(score_1_5)
+        for key, value in PILLAR_MAPPING.items():
+            if key.lower() in pillar_name.lower() or pillar_name.lower() in key.lower():
+                scores[value] = score_0_10
+                raw_scores[key] = score_1_5
+                if len(parts) > 2:
+                    reasoning[key] = parts[2]
+                break
+    return {"scores": scores, "raw_scores": raw_scores, "reasoning": reasoning}
+
+
+class ValidationStreamParser:
+    """Line-oriented incremental parser over streamed validation Markdown."""
+
+    def __init__(self):
+        self.text = ""
+        self._pending = ""
+        self._section: Optional[str] = None
+        self._title = ""
+        self._lines: List[str] = []
+        self._in_table = False
+        self.completed: List[str] = []
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """
+        Add a text delta.
+
+        Returns:
+            ``section_complete`` events for sections closed by this delta
+        """
+        if not delta:
+            return []
+        self.text += delta
+        self._pending += delta
+        events: List[Dict[str, Any]] = []
+        while "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            events.extend(self._consume_line(line))
+        return events
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Flush the trailing partial line and close the last open section."""
+        events: List[Dict[str, Any]] = []
+        if self._pending:
+            line, self._pending = self._pending, ""
+            events.extend(self._consume_line(line))
+        events.extend(self._close_section())
+        return events
+
+    def _consume_line(self, line: str) -> List[Dict[str, Any]]:
+        stripped = line.strip()
+
+        if self._in_table:
+            if stripped.startswith("|"):
+                self._lines.append(stripped)
+                return []
+            # First non-table line closes the score table
+            events = self._close_section()
+            return events + self._consume_line(line)
+
+        if TABLE_HEADER.match(stripped):
+            events = self._close_section()
+            self._start_section("pillar_scores", "5-Pillar Scores")
+            self._in_table = True
+            return events
+
+        for pattern, key in SECTION_HEADINGS:
+            if pattern.match(stripped):
+                events = self._close_section()
+                if key:
+                    self._start_section(key, stripped.lstrip("#").strip())
+                return events
+
+        if stripped == "---":
+            return self._close_section()
+
+        if self._section is not None:
+            self._lines.append(line)
+        return []
+
+    def _start_section(self, key: str, title: str) -> None:
+        self._section = key
+        self._title = title
+        self._lines = []
+
+    def _close_section(self) -> List[Dict[str, Any]]:
+        key = self._section
+        if key is None:
+            return []
+        lines, title = self._lines, self._title
+        self._section = None
+        self._lines = []
+        self._in_table = False
+
+        content = "\n".join(lines).strip()
+        event: Dict[str, Any] = {
+            "event": "section_complete",
+            "section": key,
+            "title": title,
+            "content": content,
+        }
+        if key == "pillar_scores":
+            parsed = parse_pillar_rows(lines)
+            event.update(parsed)
+            if parsed["scores"]:
+                event["overall_score"] = round(sum(parsed["scores"].values()) / len(parsed["scores"]))
+        else:
+            for field, pattern in LABELED_FIELDS.items():
+                match = pattern.search(content)
+                if match:
+                    event[field] = match.group(1).strip()
+            if key == "next_steps":
+                event["steps"] = [l.strip() for l in lines if re.match(r"^\d+\.", l.strip())][:5]
+        self.completed.append(key)
+        return [event]
@@ -3,9 +3,11 @@ import secrets
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Optional
-from flask import request, jsonify
+from flask import request, jsonify, g
 
+from app.constants import INACTIVITY_TIMEOUT_MINUTES
 from app.models.database import db, UserSession, utcnow, normalize_datetime
+from app.utils.session_cache import session_token_cache, session_activity_tracker
 
 OUTPUT_DIR = Path("output")
 
@@ -78,35 +80,68 @@ def create_user_session(user_id: int, ip_address: Optional[str] = None, user_age
 
 
 def get_current_session() -> Optional[UserSession]:
-    """Get current user session from token."""
+    """
+    Get current user session from token.
+    
+    Resolved once per request (memoized on flask.g); across requests a short-TTL
+    token cache turns the token lookup into a primary-key read, and last_activity
+    is recorded in memory and written in batches (see app.utils.session_cache).
+    """
     auth_header = request.headers.get("Authorization", "")
     if not auth_header.startswith("Bearer "):
         return None
     
     token = auth_header.replace("Bearer ", "").strip()
-    session = UserSession.query.filter_by(session_token=token).first()
     
-    if not session or not session.is_valid():
+    # before_request, require_auth and the route body all ask - resolve once per request
+    current_request = request._get_current_object()
+    memo = g.get("_current_session")
+    if memo and memo[0] is current_request and memo[1] == token:
+        return memo[2]
+    
+    session = _resolve_session(token)
+    g._current_session = (current_request, token, session)
+    return session
+
+
+def _resolve_session(token: str) -> Optional[UserSession]:
+    """Look up, validate and touch the session for ``token``."""
+    session = session_token_cache.load(token)
+    if session is None:
+        session = UserSession.query.filter_by(session_token=token).first()
+        if session:
+            session_token_cache.store(token, session)
+    
+    if not session or not session.expires_at:
         return None
     
-    # Check for inactivity timeout (15 minutes - increased for long operations like validation)
-    INACTIVITY_TIMEOUT_MINUTES = 15
-    if session.last_activity:
-        now = normalize_datetime(utcnow())
-        last_activity = normalize_datetime(session.last_activity)
-        time_since_activity = now - last_activity
-        if time_since_activity > timedelta(minutes=INACTIVITY_TIMEOUT_MINUTES):
-            # Session expired due to inactivity
-            db.session.delete(session)
-            db.session.commit()
-            return None
+    now = utcnow()
+    if now >= normalize_datetime(session.expires_at):
+        return None
+    
+    # Check for inactivity timeout (15 minutes - increased for long operations like validation).
+    # Includes activity recorded in this process but not yet flushed to the database.
+    last_activity = session_activity_tracker.effective_last_activity(session)
+    if last_activity and now - last_activity > timedelta(minutes=INACTIVITY_TIMEOUT_MINUTES):
+        # Session expired due to inactivity
+        forget_session(session)
+        db.session.delete(session)
+        db.session.commit()
+        return None
     
-    # Update last activity timestamp
-    session.last_activity = utcnow()
-    db.session.commit()
+    # Update last activity timestamp (written in batches, at most once per session per flush interval)
+    session_activity_tracker.touch(session.id, now)
     return session
 
 
+def forget_session(session: UserSession) -> None:
+    """Drop cached state for a session that is being deleted (e.g. logout)."""
+    session_token_cache.invalidate(session.session_token)
+    session_activity_tracker.forget(session.id)
+    if g.get("_current_session") and g._current_session[2] is session:
+        g._current_session = None
+
+
 def require_auth(f):
     """Decorator to require authentication."""
     from functools import wraps
@@ -36,6 +36,7 @@ if os.path.exists(utils_py_path):
     read_output_file = utils_module.read_output_file
     create_user_session = utils_module.create_user_session
     get_current_session = utils_module.get_current_session
+    forget_session = utils_module.forget_session
     require_auth = utils_module.require_auth
     check_admin_auth = utils_module.check_admin_auth
     _validate_discovery_inputs = utils_module._validate_discovery_inputs
@@ -58,6 +59,7 @@ __all__ = [
     "read_output_file",
     "create_user_session",
     "get_current_session",
+    "forget_session",
     "require_auth",
     "check_admin_auth",
     "_validate_discovery_inputs",
@@ -7,7 +7,8 @@ import hashlib
 from datetime import timedelta
 from typing import Optional, Dict, Any
 from flask import current_app, has_app_context
-from app.models.database import db, utcnow, ToolCacheEntry
+from app.models.database import utcnow
+from app.utils.layered_cache import get_layered_cache
 
 
 class DiscoveryCache:
@@ -101,32 +102,13 @@ class DiscoveryCache:
             cache_key = DiscoveryCache._generate_cache_key(profile_data)
             current_app.logger.debug(f"Discovery cache lookup: {cache_key}")
             
-            # Check if table exists, if not return None (cache miss)
-            try:
-                cached = ToolCacheEntry.query.filter_by(
-                    cache_key=cache_key
-                ).filter(
-                    ToolCacheEntry.expires_at > utcnow()
-                ).first()
-            except Exception as table_error:
-                # Table doesn't exist or column mismatch - log and return None
-                current_app.logger.warning(
-                    f"ToolCacheEntry table error (table may not exist): {table_error}. "
-                    f"Returning cache miss. Run migration: migrations/add_tool_cache_table.sql"
-                )
-                return None
+            cached = get_layered_cache().get(cache_key)
             
-            if cached:
-                cached.hit_count += 1
-                db.session.commit()
-                
+            if cached is not None:
                 # Parse cached result (stored as JSON)
                 try:
-                    result = json.loads(cached.result)
-                    current_app.logger.info(
-                        f"Discovery cache HIT: {cache_key} "
-                        f"(hit_count={cached.hit_count}, expires_at={cached.expires_at})"
-                    )
+                    result = json.loads(cached)
+                    current_app.logger.info(f"Discovery cache HIT: {cache_key}")
                     return result
                 except json.JSONDecodeError as e:
                     current_app.logger.warning(
@@ -185,43 +167,17 @@ class DiscoveryCache:
             # Store outputs as JSON string
             result_json = json.dumps(outputs, ensure_ascii=False, sort_keys=True)
             
-            # Check if table exists, if not skip caching
-            try:
-                existing = ToolCacheEntry.query.filter_by(cache_key=cache_key).first()
-            except Exception as table_error:
-                # Table doesn't exist or column mismatch - log and skip caching
-                current_app.logger.warning(
-                    f"ToolCacheEntry table error (table may not exist): {table_error}. "
-                    f"Skipping cache storage. Run migration: migrations/add_tool_cache_table.sql"
-                )
-                return
-            
-            if existing:
-                # Update existing entry
-                existing.result = result_json
-                existing.expires_at = expires_at
-                existing.hit_count = 0  # Reset hit count on update
-                existing.tool_name = "discovery_unified"  # Update tool name
-                current_app.logger.info(
-                    f"Discovery cache UPDATED: {cache_key} "
-                    f"(TTL: {ttl_days} days, expires_at={expires_at})"
-                )
-            else:
-                # Create new entry
-                cache_entry = ToolCacheEntry(
-                    cache_key=cache_key,
-                    tool_name="discovery_unified",
-                    tool_params=json.dumps(profile_data, sort_keys=True, ensure_ascii=False),
-                    result=result_json,
-                    expires_at=expires_at
-                )
-                db.session.add(cache_entry)
-                current_app.logger.info(
-                    f"Discovery cache STORED: {cache_key} "
-                    f"(TTL: {ttl_days} days, expires_at={expires_at})"
-                )
-            
-            db.session.commit()
+            get_layered_cache().set(
+                cache_key,
+                result_json,
+                ttl_seconds=timedelta(days=ttl_days).total_seconds(),
+                tool_name="discovery_unified",
+                tool_params=json.dumps(profile_data, sort_keys=True, ensure_ascii=False),
+            )
+            current_app.logger.info(
+                f"Discovery cache STORED: {cache_key} "
+                f"(TTL: {ttl_days} days, expires_at={expires_at})"
+            )
             
         except Exception as e:
             if has_app_context():
@@ -229,8 +185,4 @@ class DiscoveryCache:
                     f"Discovery cache storage failed: {e}",
                     exc_info=True
                 )
-            try:
-                db.session.rollback()
-            except Exception:
-                pass
 
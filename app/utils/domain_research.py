@@ -2,13 +2,17 @@
 Domain Research Manager for Layer 1 (Shared Facts)
 Manages reading/writing domain research JSON files per interest_area.
 These files contain objective, non-personalized data that can be cached.
+
+Storage goes through the configured store (see domain_research_store):
+per-area locking, atomic writes, and reads served from memory.
 """
-import json
-import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Mapping
 from flask import current_app
 
+from app.utils.domain_research_store import get_domain_research_store
+
 # Domain research directory path
 DOMAIN_RESEARCH_DIR = Path(__file__).parent.parent / "data" / "domain_research"
 
@@ -18,6 +22,7 @@ def _ensure_directory():
     DOMAIN_RESEARCH_DIR.mkdir(parents=True, exist_ok=True)
 
 
+@lru_cache(maxsize=256)
 def _normalize_interest_area(interest_area: str) -> str:
     """Normalize interest area to a valid filename."""
     # Remove special characters, replace spaces with underscores
@@ -36,7 +41,7 @@ def get_domain_research_file_path(interest_area: str) -> Path:
     return DOMAIN_RESEARCH_DIR / filename
 
 
-def load_domain_research(interest_area: str) -> Optional[Dict[str, Any]]:
+def load_domain_research(interest_area: str) -> Optional[Mapping[str, Any]]:
     """
     Load domain research data for an interest area.
     
@@ -44,23 +49,10 @@ def load_domain_research(interest_area: str) -> Optional[Dict[str, Any]]:
         interest_area: The interest area (e.g., "AI / Automation")
     
     Returns:
-        Dictionary with domain research data, or None if not found
+        Read-only mapping with domain research data (lists become tuples),
+        or None if not found
     """
-    file_path = get_domain_research_file_path(interest_area)
-    
-    if not file_path.exists():
-        return None
-    
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            if current_app:
-                current_app.logger.debug(f"Loaded domain research from {file_path.name}")
-            return data
-    except (json.JSONDecodeError, IOError) as e:
-        if current_app:
-            current_app.logger.warning(f"Failed to load domain research from {file_path.name}: {e}")
-        return None
+    return get_domain_research_store().load(_normalize_interest_area(interest_area))
 
 
 def save_domain_research(interest_area: str, data: Dict[str, Any]) -> bool:
@@ -74,36 +66,30 @@ def save_domain_research(interest_area: str, data: Dict[str, Any]) -> bool:
     Returns:
         True if saved successfully, False otherwise
     """
-    _ensure_directory()
-    file_path = get_domain_research_file_path(interest_area)
-    
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        if current_app:
-            current_app.logger.info(f"Saved domain research to {file_path.name}")
-        return True
-    except IOError as e:
-        if current_app:
-            current_app.logger.error(f"Failed to save domain research to {file_path.name}: {e}")
+    area = _normalize_interest_area(interest_area)
+    if not get_domain_research_store().save(area, data):
         return False
+    if current_app:
+        current_app.logger.info(f"Saved domain research for {area}")
+    return True
 
 
 def update_domain_research_field(interest_area: str, field: str, value: Any) -> bool:
     """
     Update a specific field in domain research data.
-    
+
+    Concurrent updates to the same area are serialized and merged; updates
+    queued behind a write in progress are applied with the next one.
+
     Args:
         interest_area: The interest area
         field: Field name to update (e.g., "market_trends", "competitor_overview")
         value: Value to set
-    
+
     Returns:
         True if updated successfully, False otherwise
     """
-    data = load_domain_research(interest_area) or {}
-    data[field] = value
-    return save_domain_research(interest_area, data)
+    return get_domain_research_store().update_field(_normalize_interest_area(interest_area), field, value)
 
 
 def has_domain_research(interest_area: str, field: Optional[str] = None) -> bool:
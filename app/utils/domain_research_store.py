@@ -0,0 +1,293 @@
+"""
+Storage backends for domain research (Layer 1 shared facts).
+
+The market research tools run concurrently (precompute_all_tools uses a
+10-worker pool, and every gunicorn worker has its own), and each one may add
+a field to the same <area>.json. A plain load -> mutate -> dump loses
+updates and can leave a truncated file behind, which then forces an LLM
+regeneration. Two backends avoid that:
+
+    file (default)  app/data/domain_research/<area>.json
+        - per-area lock: a threading.Lock plus an fcntl.flock on
+          .locks/<area>.lock for other processes (POSIX only)
+        - the file is re-read under the lock, so updates made by other
+          processes are merged, not overwritten
+        - written to a temp file in the same directory, fsynced, then
+          os.replace()d over the old one, so readers never see a partial file
+        - field updates queued while another thread holds the area lock are
+          applied together in a single write
+        - reads are served by the knowledge registry, which is updated
+          after each write
+
+    sqlite          one row per (area, field) in DOMAIN_RESEARCH_DB
+        - WAL journal: readers don't block the writer and vice versa
+        - a field update is a single upsert, so there is no read-modify-write
+        - rows override the shipped JSON files field by field
+        - per-thread read cache, invalidated on that thread's writes and when
+          PRAGMA data_version reports a commit from another connection
+
+Select with DOMAIN_RESEARCH_BACKEND=file|sqlite.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from flask import current_app, has_app_context
+
+from app.services.knowledge_registry import (
+    PROJECT_ROOT,
+    SOURCE_DOMAIN_RESEARCH,
+    KnowledgeRegistry,
+    freeze,
+    knowledge_registry,
+    thaw,
+)
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windows: only threads within one process are serialized
+    FCNTL_AVAILABLE = False
+
+DOMAIN_RESEARCH_BACKEND = os.environ.get("DOMAIN_RESEARCH_BACKEND", "file").lower()
+DOMAIN_RESEARCH_DB = os.environ.get("DOMAIN_RESEARCH_DB", str(PROJECT_ROOT / "instance" / "domain_research.db"))
+SQLITE_BUSY_TIMEOUT_SECONDS = 30
+
+
+def _log(level: str, message: str) -> None:
+    if has_app_context():
+        getattr(current_app.logger, level)(message)
+
+
+class FileDomainResearchStore:
+    """Domain research as one JSON file per area, with locked atomic writes."""
+
+    def __init__(self, directory: Path, registry: KnowledgeRegistry, source: str = SOURCE_DOMAIN_RESEARCH):
+        self.directory = Path(directory)
+        self.registry = registry
+        self.source = source
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # area -> {field: value} waiting for the next write of that area
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._pending_lock = threading.Lock()
+        # area -> result of the last write, for callers whose update it carried
+        self._last_write_ok: Dict[str, bool] = {}
+        self.stats = {"writes": 0, "field_updates": 0, "coalesced": 0, "write_errors": 0}
+
+    def load(self, area: str) -> Optional[Mapping[str, Any]]:
+        return self.registry.get(self.source, area)
+
+    def save(self, area: str, data: Dict[str, Any]) -> bool:
+        with self._area_lock(area):
+            with self._pending_lock:
+                # Queued field updates are newer than the data being replaced
+                data = {**data, **self._pending.pop(area, {})}
+            return self._write(area, data)
+
+    def update_field(self, area: str, field: str, value: Any) -> bool:
+        with self._pending_lock:
+            self._pending.setdefault(area, {})[field] = value
+            self.stats["field_updates"] += 1
+        with self._area_lock(area):
+            with self._pending_lock:
+                updates = self._pending.pop(area, None)
+            if updates is None:
+                # The previous lock holder wrote this update along with its own
+                return self._last_write_ok.get(area, True)
+            data = self._read_file(area)
+            data.update(updates)
+            ok = self._write(area, data)
+            with self._pending_lock:
+                self.stats["coalesced"] += len(updates) - 1
+            return ok
+
+    def path(self, area: str) -> Path:
+        return self.directory / f"{area}.json"
+
+    @contextmanager
+    def _area_lock(self, area: str) -> Iterator[None]:
+        with self._locks_guard:
+            lock = self._locks.setdefault(area, threading.Lock())
+        with lock:
+            if not FCNTL_AVAILABLE:
+                yield
+                return
+            lock_dir = self.directory / ".locks"
+            lock_dir.mkdir(parents=True, exist_ok=True)
+            with open(lock_dir / f"{area}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self, area: str) -> Dict[str, Any]:
+        # Read from disk, not the registry: another process may have written since
+        path = self.path(area)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                return data
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, UnicodeDecodeError, OSError) as e:
+            _log("warning", f"Domain research file {path.name} is unreadable ({e}); using last loaded copy")
+        return thaw(self.registry.get(self.source, area) or {})
+
+    def _write(self, area: str, data: Dict[str, Any]) -> bool:
+        path = self.path(area)
+        tmp_path = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{area}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            tmp_path = None
+            self.registry.put(self.source, area, data)
+            with self._pending_lock:
+                self.stats["writes"] += 1
+            self._last_write_ok[area] = True
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            with self._pending_lock:
+                self.stats["write_errors"] += 1
+            _log("error", f"Failed to save domain research to {path.name}: {e}")
+            # save() may have carried queued field updates too
+            self._last_write_ok[area] = False
+            return False
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+
+class SQLiteDomainResearchStore:
+    """Domain research as (area, field) rows in a WAL-mode SQLite database."""
+
+    def __init__(self, db_path: str, registry: Optional[KnowledgeRegistry] = None, source: str = SOURCE_DOMAIN_RESEARCH):
+        self.db_path = db_path
+        # Shipped JSON files, used as the base that rows override
+        self.registry = registry
+        self.source = source
+        # Per-thread connection and read cache (data_version is per connection)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats = {"writes": 0, "field_updates": 0, "cache_hits": 0, "cache_misses": 0, "write_errors": 0}
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS domain_research ("
+            " area TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL,"
+            " PRIMARY KEY (area, field))"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads; one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.data_version = None
+            self._local.cache = {}
+        return conn
+
+    def _cache(self, conn: sqlite3.Connection) -> Dict[str, Optional[Mapping[str, Any]]]:
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._local.data_version:
+            # Committed by another connection (thread or process)
+            self._local.cache = {}
+            self._local.data_version = version
+        return self._local.cache
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def load(self, area: str) -> Optional[Mapping[str, Any]]:
+        conn = self._conn()
+        cache = self._cache(conn)
+        if area in cache:
+            self._count("cache_hits")
+            return cache[area]
+        self._count("cache_misses")
+        rows = conn.execute("SELECT field, value FROM domain_research WHERE area = ?", (area,)).fetchall()
+        base = self.registry.get(self.source, area) if self.registry is not None else None
+        if rows:
+            data = thaw(base or {})
+            data.update({field: json.loads(value) for field, value in rows})
+            result = freeze(data)
+        else:
+            result = base
+        cache[area] = result
+        return result
+
+    def save(self, area: str, data: Dict[str, Any]) -> bool:
+        now = time.time()
+        rows = [(area, field, json.dumps(value, ensure_ascii=False), now) for field, value in data.items()]
+        return self._execute(area, lambda conn: (
+            conn.execute("DELETE FROM domain_research WHERE area = ?", (area,)),
+            conn.executemany("INSERT INTO domain_research (area, field, value, updated_at) VALUES (?, ?, ?, ?)", rows),
+        ))
+
+    def update_field(self, area: str, field: str, value: Any) -> bool:
+        row = (area, field, json.dumps(value, ensure_ascii=False), time.time())
+        self._count("field_updates")
+        return self._execute(area, lambda conn: conn.execute(
+            "INSERT INTO domain_research (area, field, value, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (area, field) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            row,
+        ))
+
+    def _execute(self, area: str, statements) -> bool:
+        conn = self._conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                statements(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self._count("write_errors")
+            _log("error", f"Failed to save domain research for {area}: {e}")
+            return False
+        # Own commits don't change this connection's data_version
+        self._local.cache.pop(area, None)
+        self._count("writes")
+        return True
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_domain_research_store():
+    """Process-wide store for the configured DOMAIN_RESEARCH_BACKEND."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                directory, _ = knowledge_registry.sources[SOURCE_DOMAIN_RESEARCH]
+                if DOMAIN_RESEARCH_BACKEND == "sqlite":
+                    _store = SQLiteDomainResearchStore(DOMAIN_RESEARCH_DB, knowledge_registry)
+                else:
+                    _store = FileDomainResearchStore(directory, knowledge_registry)
+    return _store
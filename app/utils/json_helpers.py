@@ -1,10 +1,142 @@
 """
 JSON parsing utilities to reduce boilerplate code.
+
+All JSON encoding/decoding in the app goes through json_loads/json_dumps,
+which use orjson when it is installed and the stdlib json module otherwise.
+Stored reports are already JSON text; wrap them in RawJSON and serialize the
+envelope with dumps_with_raw() to splice them into a response as-is instead
+of parsing and re-encoding them. That is safe because report columns are
+written with json_dumps(), whose output is always strict JSON (NaN and
+Infinity become null with either codec).
 """
+import math
 import json
-from typing import Any, Optional
+import secrets
+from typing import Any, Optional, Union
 from flask import current_app
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# Match json.dumps, which stringifies int/float/bool dict keys
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text (raises ValueError on invalid input)."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj: Any, default: Any = None) -> bytes:
+    """
+    Serialize to compact UTF-8 JSON bytes.
+    
+    Args:
+        obj: Object to serialize
+        default: Called for objects the encoder can't handle (as in json.dumps)
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # orjson rejects a few things the stdlib accepts (e.g. ints over 64 bits)
+            pass
+    try:
+        text = json.dumps(obj, default=default, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        # Match orjson, which writes NaN/Infinity as null
+        text = json.dumps(_finite(obj), default=default, ensure_ascii=False, separators=(",", ":"))
+    return text.encode("utf-8")
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of ``obj`` with NaN/Infinity floats replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def json_dumps(obj: Any, default: Any = None) -> str:
+    """Serialize to a compact JSON string."""
+    return json_dumps_bytes(obj, default=default).decode("utf-8")
+
+
+def sse_event(payload: Any) -> str:
+    """Format one Server-Sent Events message carrying ``payload`` as JSON."""
+    return f"data: {json_dumps(payload)}\n\n"
+
+
+class RawJSON:
+    """
+    JSON text that is already serialized (e.g. a stored report column).
+    
+    dumps_with_raw() writes it into the output verbatim. Columns written
+    with json_dumps() are valid JSON, so wrapping only does cheap checks:
+    text that isn't a JSON object/array at all (NULL, empty, truncated
+    before the closing bracket) is replaced by ``default``.
+    
+    Pass ``validate=True`` for text of unknown origin (rows written before
+    json_dumps(), external input): it is then parsed in full, text only
+    the stdlib parser accepts (NaN, Infinity) is re-serialized, and
+    anything else invalid falls back to ``default``.
+    """
+    __slots__ = ("text",)
+    
+    def __init__(self, text: Optional[Union[str, bytes]], default: str = "{}", validate: bool = False):
+        if isinstance(text, bytes):
+            text = text.decode("utf-8")
+        stripped = text.strip() if text else ""
+        self.text = default
+        if not stripped or (stripped[0], stripped[-1]) not in (("{", "}"), ("[", "]")):
+            return
+        if not validate:
+            self.text = stripped
+            return
+        try:
+            json_loads(stripped)
+            self.text = stripped
+            return
+        except ValueError:
+            pass
+        try:
+            value = json.loads(stripped)
+        except ValueError:
+            return
+        if isinstance(value, (dict, list)):
+            self.text = json_dumps(value)
+
+
+def dumps_with_raw(obj: Any) -> bytes:
+    """
+    Serialize ``obj`` to JSON bytes, splicing RawJSON values in without parsing them.
+    
+    Each RawJSON is encoded as a unique placeholder string, which is then
+    replaced by the fragment in the encoded output.
+    """
+    nonce = secrets.token_hex(8)
+    fragments = []
+    
+    def placeholder(value: Any) -> str:
+        if isinstance(value, RawJSON):
+            fragments.append(value.text)
+            return f"__raw_json_{nonce}_{len(fragments) - 1}__"
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    body = json_dumps_bytes(obj, default=placeholder)
+    for i, fragment in enumerate(fragments):
+        body = body.replace(f'"__raw_json_{nonce}_{i}__"'.encode("utf-8"), fragment.encode("utf-8"), 1)
+    return body
+
 
 def safe_json_loads(json_str: Any, default: Optional[Any] = None, logger_context: str = "") -> Any:
     """
@@ -31,8 +163,8 @@ def safe_json_loads(json_str: Any, default: Optional[Any] = None, logger_context
     
     # Try to parse JSON string
     try:
-        return json.loads(json_str)
-    except (json.JSONDecodeError, TypeError) as e:
+        return json_loads(json_str)
+    except (ValueError, TypeError) as e:
         if logger_context and current_app:
             current_app.logger.warning(f"Failed to parse JSON {logger_context}: {e}")
         return default if default is not None else {}
@@ -53,7 +185,7 @@ def safe_json_dumps(obj: Any, default: Optional[str] = None) -> Optional[str]:
         return default
     
     try:
-        return json.dumps(obj)
+        return json_dumps(obj)
     except (TypeError, ValueError) as e:
         if current_app:
             current_app.logger.warning(f"Failed to serialize JSON: {e}")
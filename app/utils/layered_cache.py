@@ -0,0 +1,464 @@
+"""
+Layered cache backend for the tool_cache table.
+
+Lookups go through three tiers, fastest first:
+    1. In-process LRU with TTL (bounded, per worker)
+    2. Redis (optional - enabled when CACHE_REDIS_URL / REDIS_URL is set)
+    3. Database (ToolCacheEntry / tool_cache table)
+
+A hit in a lower tier is copied into the tiers above it. Hit counts are
+recorded in memory and flushed to tool_cache.hit_count in batches by a
+background thread, so a cache hit never costs a database write.
+
+ToolCache, DiscoveryCache and ArchetypeCache all use the shared instance
+returned by get_layered_cache().
+"""
+import atexit
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+# In-process tier configuration
+CACHE_LRU_MAX_ENTRIES = int(os.environ.get("CACHE_LRU_MAX_ENTRIES", "512"))
+CACHE_LRU_TTL_SECONDS = int(os.environ.get("CACHE_LRU_TTL_SECONDS", "300"))
+# Redis tier configuration (falls back to the limiter's REDIS_URL)
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL") or os.environ.get("REDIS_URL")
+CACHE_REDIS_PREFIX = os.environ.get("CACHE_REDIS_PREFIX", "idea:cache:")
+# Seconds between background hit_count flushes
+CACHE_HIT_FLUSH_INTERVAL = float(os.environ.get("CACHE_HIT_FLUSH_INTERVAL", "30"))
+
+
+def _log(level: str, message: str) -> None:
+    """Log through the Flask logger when an app context is available."""
+    if has_app_context():
+        getattr(current_app.logger, level)(message)
+
+
+class TierStats:
+    """Hit/miss/latency counters for a single cache tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.total_latency_ms = 0.0
+
+    def record(self, hit: bool, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.total_latency_ms += elapsed_ms
+
+    def record_error(self) -> None:
+        with self._lock:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "avg_latency_ms": round(self.total_latency_ms / lookups, 3) if lookups else 0.0,
+            }
+
+
+class CacheTier(ABC):
+    """
+    Interface for a cache tier.
+
+    Values are the serialized strings stored in tool_cache.result; ``ttl`` is
+    the remaining lifetime in seconds.
+    """
+
+    name = "tier"
+
+    def __init__(self):
+        self.stats = TierStats()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (value, remaining_ttl_seconds) or None on miss."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float, **entry_fields: Any) -> None:
+        """Store ``value`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+
+    def clear(self) -> None:
+        """Drop all entries held by this tier (no-op for shared tiers)."""
+
+
+class MemoryTier(CacheTier):
+    """Bounded in-process LRU with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_LRU_MAX_ENTRIES, max_ttl: float = CACHE_LRU_TTL_SECONDS):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value, expires - now
+
+    def set(self, key: str, value: str, ttl: float, **entry_fields: Any) -> None:
+        ttl = min(ttl, self.max_ttl)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class RedisTier(CacheTier):
+    """Shared Redis tier, so workers see each other's entries without a DB round-trip."""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = CACHE_REDIS_PREFIX):
+        super().__init__()
+        self.prefix = prefix
+        self._client = redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        pipe = self._client.pipeline()
+        pipe.get(self.prefix + key)
+        pipe.pttl(self.prefix + key)
+        value, pttl = pipe.execute()
+        if value is None:
+            return None
+        ttl = pttl / 1000.0 if pttl and pttl > 0 else 0.0
+        return value.decode("utf-8"), ttl
+
+    def set(self, key: str, value: str, ttl: float, **entry_fields: Any) -> None:
+        if ttl <= 0:
+            return
+        self._client.set(self.prefix + key, value.encode("utf-8"), px=int(ttl * 1000))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.prefix + key)
+
+
+class DatabaseTier(CacheTier):
+    """The tool_cache table - source of truth, survives restarts."""
+
+    name = "database"
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        from app.models.database import db, ToolCacheEntry, normalize_datetime, utcnow
+
+        now = utcnow()
+        try:
+            cached = ToolCacheEntry.query.filter_by(
+                cache_key=key
+            ).filter(
+                ToolCacheEntry.expires_at > now
+            ).first()
+        except Exception as table_error:
+            # Leave the request's session usable (e.g. after a failed transaction on Postgres)
+            try:
+                db.session.rollback()
+            except Exception:
+                pass
+            _log(
+                "warning",
+                f"ToolCacheEntry table error (table may not exist): {table_error}. "
+                f"Returning cache miss. Run migration: migrations/add_tool_cache_table.sql"
+            )
+            raise
+        if not cached:
+            return None
+        ttl = (normalize_datetime(cached.expires_at) - now).total_seconds()
+        return cached.result, ttl
+
+    def set(self, key: str, value: str, ttl: float, tool_name: str = "tool_cache", tool_params: Optional[str] = None, **entry_fields: Any) -> None:
+        from app.models.database import db, ToolCacheEntry, utcnow
+
+        expires_at = utcnow() + timedelta(seconds=ttl)
+        try:
+            existing = ToolCacheEntry.query.filter_by(cache_key=key).first()
+            if existing:
+                existing.result = value
+                existing.expires_at = expires_at
+                existing.hit_count = 0  # Reset hit count on update
+                existing.tool_name = tool_name
+            else:
+                db.session.add(ToolCacheEntry(
+                    cache_key=key,
+                    tool_name=tool_name,
+                    tool_params=tool_params,
+                    result=value,
+                    expires_at=expires_at,
+                ))
+            db.session.commit()
+        except Exception:
+            try:
+                db.session.rollback()
+            except Exception:
+                pass
+            raise
+
+    def delete(self, key: str) -> None:
+        from app.models.database import db, ToolCacheEntry
+
+        try:
+            ToolCacheEntry.query.filter_by(cache_key=key).delete()
+            db.session.commit()
+        except Exception:
+            try:
+                db.session.rollback()
+            except Exception:
+                pass
+            raise
+
+
+class HitCountBuffer:
+    """
+    Accumulates cache hits in memory and flushes them to tool_cache.hit_count.
+
+    Flushes run on a daemon thread every CACHE_HIT_FLUSH_INTERVAL seconds and
+    at interpreter exit, using one executemany UPDATE on a dedicated
+    connection (never the request's db.session).
+    """
+
+    def __init__(self, interval: float = CACHE_HIT_FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.flushed = 0
+        self.flush_errors = 0
+
+    def record(self, key: str) -> None:
+        """Count one hit for ``key`` (cheap, no I/O)."""
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            if self._app is None and has_app_context():
+                self._app = current_app._get_current_object()
+        self._ensure_worker()
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(self._pending.values())
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="cache-hit-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> int:
+        """Write pending hit counts to the database. Returns number of keys updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            app = self._app
+        if not pending or app is None:
+            return 0
+
+        from sqlalchemy import bindparam
+        from app.models.database import db, ToolCacheEntry
+
+        table = ToolCacheEntry.__table__
+        stmt = table.update().where(
+            table.c.cache_key == bindparam("key")
+        ).values(
+            hit_count=table.c.hit_count + bindparam("hits")
+        )
+        rows = [{"key": key, "hits": hits} for key, hits in pending.items()]
+        try:
+            with app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(stmt, rows)
+            self.flushed += len(rows)
+            return len(rows)
+        except Exception as e:
+            # Put the hits back so the next flush retries them
+            with self._lock:
+                self.flush_errors += 1
+                for key, hits in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + hits
+            try:
+                with app.app_context():
+                    app.logger.warning(f"Cache hit_count flush failed: {e}")
+            except Exception:
+                pass
+            return 0
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class LayeredCache:
+    """Read-through / write-through cache over an ordered list of tiers."""
+
+    def __init__(self, tiers: List[CacheTier], hit_counter: Optional[HitCountBuffer] = None):
+        self.tiers = tiers
+        self.hit_counter = hit_counter or HitCountBuffer()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up ``key`` tier by tier.
+
+        Args:
+            key: Cache key (e.g. "discovery:{hash}")
+
+        Returns:
+            Cached value string, or None if no tier has a live entry
+        """
+        for index, tier in enumerate(self.tiers):
+            started = time.perf_counter()
+            try:
+                found = tier.get(key)
+            except Exception as e:
+                tier.stats.record_error()
+                if tier.name != "database":
+                    _log("warning", f"Cache tier '{tier.name}' lookup failed: {e}")
+                continue
+            tier.stats.record(found is not None, started)
+            if found is None:
+                continue
+            value, ttl = found
+            # Promote into the faster tiers we already missed
+            for upper in self.tiers[:index]:
+                try:
+                    upper.set(key, value, ttl)
+                except Exception as e:
+                    upper.stats.record_error()
+                    _log("debug", f"Cache tier '{upper.name}' promote failed: {e}")
+            self.hit_counter.record(key)
+            return value
+        return None
+
+    def set(self, key: str, value: str, ttl_seconds: float, tool_name: str = "tool_cache", tool_params: Optional[str] = None) -> None:
+        """
+        Store ``value`` in every tier, database first.
+
+        Args:
+            key: Cache key
+            value: Serialized value (stored in tool_cache.result)
+            ttl_seconds: Time to live in seconds
+            tool_name: tool_cache.tool_name for the database row
+            tool_params: tool_cache.tool_params (JSON string) for the database row
+        """
+        for tier in reversed(self.tiers):
+            try:
+                tier.set(key, value, ttl_seconds, tool_name=tool_name, tool_params=tool_params)
+            except Exception as e:
+                tier.stats.record_error()
+                _log("warning", f"Cache tier '{tier.name}' storage failed: {e}")
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from every tier."""
+        for tier in self.tiers:
+            try:
+                tier.delete(key)
+            except Exception as e:
+                tier.stats.record_error()
+                _log("warning", f"Cache tier '{tier.name}' delete failed: {e}")
+
+    def clear_local(self) -> None:
+        """Drop this process's in-memory entries."""
+        for tier in self.tiers:
+            tier.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss/latency statistics for each tier."""
+        return {
+            "tiers": {tier.name: tier.stats.to_dict() for tier in self.tiers},
+            "hit_counts": {
+                "pending": self.hit_counter.pending(),
+                "flushed": self.hit_counter.flushed,
+                "flush_errors": self.hit_counter.flush_errors,
+            },
+        }
+
+
+_layered_cache: Optional[LayeredCache] = None
+_layered_cache_lock = threading.Lock()
+
+
+def _build_default_cache() -> LayeredCache:
+    tiers: List[CacheTier] = [MemoryTier()]
+    if REDIS_AVAILABLE and CACHE_REDIS_URL and CACHE_REDIS_URL.startswith(("redis://", "rediss://")):
+        try:
+            tiers.append(RedisTier(CACHE_REDIS_URL))
+        except Exception as e:
+            _log("warning", f"Redis cache tier disabled: {e}")
+    tiers.append(DatabaseTier())
+    return LayeredCache(tiers)
+
+
+def get_layered_cache() -> LayeredCache:
+    """Get the process-wide layered cache, creating it on first use."""
+    global _layered_cache
+    if _layered_cache is None:
+        with _layered_cache_lock:
+            if _layered_cache is None:
+                _layered_cache = _build_default_cache()
+    return _layered_cache
+
+
+def set_layered_cache(cache: Optional[LayeredCache]) -> None:
+    """Replace the process-wide layered cache (None = rebuild default on next use)."""
+    global _layered_cache
+    with _layered_cache_lock:
+        _layered_cache = cache
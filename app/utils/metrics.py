@@ -0,0 +1,477 @@
+"""
+Process-wide metrics exposed in the Prometheus text format on /metrics.
+
+Counters, gauges and histograms live in memory and are updated under a
+per-metric lock (a dict update, no I/O). ``render()`` produces the text
+exposition format (version 0.0.4), so no client library is needed.
+
+Pre-forked workers: set METRICS_MULTIPROC_DIR to a directory shared by the
+workers (empty it on deploy). Each worker then writes a JSON snapshot of its
+metrics to metrics-<pid>-<random id>.json there every METRICS_FLUSH_SECONDS
+(and at exit), so a worker that reuses an exited worker's pid gets its own
+file. The worker serving /metrics merges all snapshots: counters and
+histograms are summed across every file, gauges over live processes only.
+Snapshots of exited workers are folded into metrics-exited.json (under a
+lock file) and deleted, so totals don't go backwards and the directory
+doesn't grow with every worker restart. Without the directory /metrics
+reports the serving process alone.
+"""
+import atexit
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windows: exited workers' snapshots are kept and summed as they are
+    FCNTL_AVAILABLE = False
+
+METRICS_MULTIPROC_DIR = os.environ.get("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.environ.get("METRICS_FLUSH_SECONDS", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0)
+TTFT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0)
+
+# Counters and histograms of exited workers, see MetricsRegistry._retire_exited
+EXITED_SNAPSHOT = "metrics-exited.json"
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def snapshot(self) -> List[Tuple[LabelValues, Any]]:
+        with self._lock:
+            return [(key, self._copy(value)) for key, value in self._values.items()]
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        metrics_registry.touch()
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (summed over live processes)."""
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        metrics_registry.touch()
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+        metrics_registry.touch()
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Histogram(_Metric):
+    """Bucketed observations with sum and count."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+        metrics_registry.touch()
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        return {"buckets": list(value["buckets"]), "sum": value["sum"], "count": value["count"]}
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+
+class MetricsRegistry:
+    """All metrics of this process, plus the multi-process snapshot files."""
+
+    def __init__(self, multiproc_dir: str = METRICS_MULTIPROC_DIR, flush_seconds: float = METRICS_FLUSH_SECONDS):
+        self.multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self.flush_seconds = flush_seconds
+        self._metrics: Dict[str, _Metric] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._instance = uuid.uuid4().hex[:12]
+        if hasattr(os, "register_at_fork"):
+            # Each worker flushes its own snapshot
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def clear(self) -> None:
+        """Reset every value (tests)."""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable values of every metric in this process."""
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "metrics": {
+                name: [[list(key), value] for key, value in metric.snapshot()]
+                for name, metric in self._metrics.items()
+            },
+        }
+
+    def write_snapshot(self) -> None:
+        """Write this process's snapshot to the multi-process directory (atomic replace)."""
+        if self.multiproc_dir is None:
+            return
+        self.multiproc_dir.mkdir(parents=True, exist_ok=True)
+        self._write_json(self.multiproc_dir / f"metrics-{os.getpid()}-{self._instance}.json", self.snapshot())
+
+    def _write_json(self, path: Path, data: Dict[str, Any]) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.multiproc_dir, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _read_snapshots(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        snapshots = []
+        for path in sorted(self.multiproc_dir.glob("metrics-*.json")):
+            if path.name == EXITED_SNAPSHOT:
+                continue
+            snapshot = self._read_json(path)
+            if snapshot is not None:
+                snapshots.append((path, snapshot))
+        return snapshots
+
+    @contextmanager
+    def _directory_lock(self) -> Iterator[bool]:
+        """Serialize retiring snapshots across workers; yields False without flock."""
+        if not FCNTL_AVAILABLE:
+            yield False
+            return
+        with open(self.multiproc_dir / ".metrics.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _alive(pid: int) -> bool:
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, OSError):
+            return True
+        return True
+
+    def _merge(self, merged: Dict[str, Dict[LabelValues, Any]], snapshot: Dict[str, Any], gauges: bool) -> None:
+        for name, series in snapshot.get("metrics", {}).items():
+            metric = self._metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not gauges):
+                continue
+            values = merged.setdefault(name, {})
+            for key, value in series:
+                key = tuple(key)
+                if metric.kind == "histogram":
+                    if len(value.get("buckets", [])) != len(metric.buckets):
+                        continue
+                    total = values.setdefault(key, {"buckets": [0] * len(metric.buckets), "sum": 0.0, "count": 0})
+                    total["buckets"] = [a + b for a, b in zip(total["buckets"], value["buckets"])]
+                    total["sum"] += value["sum"]
+                    total["count"] += value["count"]
+                else:
+                    values[key] = values.get(key, 0.0) + value
+
+    def _retire_exited(self, snapshots: List[Tuple[Path, Dict[str, Any]]]) -> Tuple[Dict[str, Any], List[Tuple[Path, Dict[str, Any]]]]:
+        """
+        Fold exited workers' snapshots into EXITED_SNAPSHOT and delete them.
+        
+        Call with the directory lock held. The exited snapshot lists the files
+        it already contains, so a crash between writing it and deleting them
+        can't count a worker twice.
+        
+        Returns:
+            (exited snapshot, snapshots of live workers)
+        """
+        exited_path = self.multiproc_dir / EXITED_SNAPSHOT
+        exited = self._read_json(exited_path) or {"retired": [], "metrics": {}}
+        live, dead = [], []
+        for path, snapshot in snapshots:
+            (live if self._alive(snapshot.get("pid", 0)) else dead).append((path, snapshot))
+        if not dead:
+            return exited, live
+        # Names only matter while the file is still there (its delete failed)
+        retired = {name for name in exited.get("retired", []) if (self.multiproc_dir / name).exists()}
+        totals: Dict[str, Dict[LabelValues, Any]] = {}
+        self._merge(totals, exited, gauges=False)
+        for path, snapshot in dead:
+            if path.name not in retired:
+                self._merge(totals, snapshot, gauges=False)
+                retired.add(path.name)
+        exited = {
+            "retired": sorted(retired),
+            "metrics": {name: [[list(key), value] for key, value in values.items()] for name, values in totals.items()},
+        }
+        self._write_json(exited_path, exited)
+        for path, _ in dead:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        return exited, live
+
+    def collect(self) -> Dict[str, Dict[LabelValues, Any]]:
+        """Merged values: this process only, or every worker's snapshot in multi-process mode."""
+        if self.multiproc_dir is None:
+            return {name: dict(metric.snapshot()) for name, metric in self._metrics.items()}
+        self.write_snapshot()
+        with self._directory_lock() as locked:
+            snapshots = self._read_snapshots()
+            if locked:
+                exited, snapshots = self._retire_exited(snapshots)
+            else:
+                exited = {}
+        merged: Dict[str, Dict[LabelValues, Any]] = {name: {} for name in self._metrics}
+        self._merge(merged, exited, gauges=False)
+        for _, snapshot in snapshots:
+            self._merge(merged, snapshot, gauges=self._alive(snapshot.get("pid", 0)))
+        return merged
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name, values in self.collect().items():
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key in sorted(values):
+                value = values[key]
+                if metric.kind == "histogram":
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value["buckets"]):
+                        cumulative += count
+                        labels = _label_text(metric.labelnames, key, ("le", _format_value(bound)))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    labels = _label_text(metric.labelnames, key, ("le", "+Inf"))
+                    lines.append(f"{name}_bucket{labels} {value['count']}")
+                    labels = _label_text(metric.labelnames, key)
+                    lines.append(f"{name}_sum{labels} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{labels} {value['count']}")
+                else:
+                    labels = _label_text(metric.labelnames, key)
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    # ------------------------------------------------------------------
+    # Background flush (multi-process mode)
+    # ------------------------------------------------------------------
+
+    def touch(self) -> None:
+        """Called on every update; starts the snapshot writer in multi-process mode."""
+        if self._thread is not None or self.multiproc_dir is None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="metrics-snapshot-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_seconds)
+            try:
+                self.write_snapshot()
+            except Exception:
+                pass
+
+    def _after_fork(self) -> None:
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._instance = uuid.uuid4().hex[:12]
+        for metric in self._metrics.values():
+            # Values inherited from the parent are already in its snapshot
+            metric._lock = threading.Lock()
+            metric._values = {}
+
+    def shutdown(self) -> None:
+        try:
+            self.write_snapshot()
+        except Exception:
+            pass
+
+
+metrics_registry = MetricsRegistry()
+atexit.register(metrics_registry.shutdown)
+
+
+# ----------------------------------------------------------------------
+# Application metrics
+# ----------------------------------------------------------------------
+
+STAGE_DURATION = metrics_registry.histogram(
+    "discovery_stage_duration_seconds",
+    "Discovery stage wall time (stage1 = profile analysis, stage2 = idea research, pipeline = whole run).",
+    ("stage",),
+)
+LLM_LATENCY = metrics_registry.histogram(
+    "llm_request_duration_seconds",
+    "LLM call duration until the full response was received.",
+    ("pipeline", "stage", "provider"),
+)
+LLM_TTFT = metrics_registry.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from sending a streaming LLM request to its first content token.",
+    ("pipeline", "stage", "provider"),
+    buckets=TTFT_BUCKETS,
+)
+TOOL_CALLS = metrics_registry.counter(
+    "tool_calls_total",
+    "Research tool calls by cache outcome (hit, miss, none).",
+    ("tool", "cache"),
+)
+LLM_TOKENS = metrics_registry.counter(
+    "llm_tokens_total",
+    "LLM tokens by kind (input, cached_input, output).",
+    ("pipeline", "kind"),
+)
+SSE_ACTIVE_STREAMS = metrics_registry.gauge(
+    "sse_active_streams",
+    "Server-sent event responses currently streaming.",
+    ("endpoint",),
+)
+
+
+def record_token_usage(pipeline: str, usage: Optional[Dict[str, int]]) -> None:
+    """Add a normalized usage dict (prompt_cache.usage_from_response) to the token counters."""
+    if not usage:
+        return
+    for kind, key in (("input", "input_tokens"), ("cached_input", "cached_tokens"), ("output", "output_tokens")):
+        amount = usage.get(key) or 0
+        if amount > 0:
+            LLM_TOKENS.inc(amount, pipeline=pipeline, kind=kind)
+
+
+def track_stream(endpoint: str, chunks: Iterable[Any]) -> Iterable[Any]:
+    """Yield from ``chunks`` while counting the response in sse_active_streams."""
+    SSE_ACTIVE_STREAMS.inc(endpoint=endpoint)
+    try:
+        yield from chunks
+    finally:
+        SSE_ACTIVE_STREAMS.dec(endpoint=endpoint)
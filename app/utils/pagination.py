@@ -0,0 +1,184 @@
+"""
+Shared pagination for list endpoints.
+
+Lists are ordered newest first on (created_at, id). Two modes are supported:
+
+- Cursor (keyset): ``?cursor=<next_cursor from the previous page>``. The page
+  is ``WHERE (created_at, id) < (last_created_at, last_id)`` on the composite
+  index, so page 1000 costs the same as page 1.
+- Offset (legacy): ``?page=N``. It still works, but deep pages get slower.
+
+Every response carries ``next_cursor`` (None on the last page), so a client
+can start with page 1 and continue with cursors.
+
+Totals are controlled by ``?total=``:
+    exact   COUNT(*) on every request (default in offset mode)
+    cached  COUNT(*) cached in-process for PAGINATION_COUNT_CACHE_SECONDS
+            (default in cursor mode)
+    none    no count at all (total/pages are None)
+
+Ranked orderings (relevance, match score) can't be keyset-paginated on
+(created_at, id); for those, pass ``order_by`` and only offset mode is available.
+"""
+import base64
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import tuple_
+
+from app.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PAGINATION_COUNT_CACHE_SECONDS
+from app.utils.layered_cache import MemoryTier
+
+TOTAL_EXACT = "exact"
+TOTAL_CACHED = "cached"
+TOTAL_NONE = "none"
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_CACHED, TOTAL_NONE)
+
+_CURSOR_VERSION = 1
+
+_count_cache = MemoryTier(max_entries=2048, max_ttl=PAGINATION_COUNT_CACHE_SECONDS)
+
+
+class CursorError(ValueError):
+    """Raised for a malformed or foreign pagination cursor."""
+
+
+@dataclass
+class PageArgs:
+    """Pagination parameters from a request."""
+    page: int = 1
+    per_page: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+    total: Optional[str] = None
+
+
+@dataclass
+class Page:
+    """One page of results."""
+    items: List[Any]
+    page: Optional[int]  # None in cursor mode
+    per_page: int
+    total: Optional[int]
+    next_cursor: Optional[str]
+    has_more: bool
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The "pagination" object returned by list endpoints."""
+        pages = (self.total + self.per_page - 1) // self.per_page if self.total is not None else None
+        return {
+            "page": self.page,
+            "per_page": self.per_page,
+            "total": self.total,
+            "pages": pages,
+            "next_cursor": self.next_cursor,
+            "has_more": self.has_more,
+        }
+
+
+def parse_page_args(args: Any, cursor_param: str = "cursor") -> PageArgs:
+    """
+    Read page/per_page/cursor/total from request args.
+
+    Args:
+        args: request.args
+        cursor_param: Name of the cursor parameter (endpoints with several lists use one per list)
+    """
+    page = max(1, args.get("page", 1, type=int) or 1)
+    per_page = args.get("per_page", DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE
+    per_page = max(1, min(per_page, MAX_PAGE_SIZE))
+    total = (args.get("total") or "").lower() or None
+    if total not in TOTAL_MODES:
+        total = None
+    return PageArgs(page=page, per_page=per_page, cursor=args.get(cursor_param) or None, total=total)
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    """Opaque cursor pointing just after (created_at, id)."""
+    payload = {"v": _CURSOR_VERSION, "c": created_at.isoformat() if created_at else None, "i": row_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """(created_at, id) from a cursor; raises CursorError if it isn't one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload.get("v") != _CURSOR_VERSION or payload.get("c") is None:
+            raise ValueError("unsupported cursor")
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception as e:
+        raise CursorError(str(e)) from e
+
+
+def _count(query: Any, mode: str) -> Optional[int]:
+    if mode == TOTAL_NONE:
+        return None
+    if mode == TOTAL_CACHED:
+        compiled = query.statement.compile()
+        key = hashlib.sha1(f"{compiled}|{sorted(compiled.params.items(), key=str)}".encode("utf-8")).hexdigest()
+        cached = _count_cache.get(key)
+        if cached is not None:
+            return int(cached[0])
+        total = query.order_by(None).count()
+        _count_cache.set(key, str(total), PAGINATION_COUNT_CACHE_SECONDS)
+        return total
+    return query.order_by(None).count()
+
+
+def paginate(
+    query: Any,
+    created_column: Any,
+    id_column: Any,
+    args: PageArgs,
+    order_by: Sequence[Any] = (),
+) -> Page:
+    """
+    Fetch one page of ``query`` newest first.
+
+    Args:
+        query: Filtered ORM query (unordered)
+        created_column: Timestamp column of the sort key (usually Model.created_at)
+        id_column: Unique tiebreaker (usually Model.id); rows are read from it for the cursor
+        args: Parsed request parameters (see parse_page_args)
+        order_by: Ranking expressions that take precedence over (created_at, id).
+                  Cursors are not supported with a ranking; next_cursor is None.
+
+    Returns:
+        Page with the rows as returned by the query (entities or tuples)
+
+    Raises:
+        CursorError: The cursor is malformed, or a cursor was passed with ``order_by``
+    """
+    keyset = not order_by
+    if args.cursor and not keyset:
+        raise CursorError("cursor pagination is not available for ranked results")
+    position = decode_cursor(args.cursor) if args.cursor else None
+    total_mode = args.total or (TOTAL_CACHED if args.cursor else TOTAL_EXACT)
+    total = _count(query, total_mode)
+
+    page_query = query.order_by(*order_by, created_column.desc(), id_column.desc())
+    if position is not None:
+        page_query = page_query.filter(tuple_(created_column, id_column) < tuple_(*position))
+    elif args.page > 1:
+        page_query = page_query.offset((args.page - 1) * args.per_page)
+    rows = page_query.limit(args.per_page + 1).all()
+
+    has_more = len(rows) > args.per_page
+    rows = rows[:args.per_page]
+    next_cursor = None
+    if has_more and keyset:
+        last = rows[-1]
+        entity = last[0] if hasattr(last, "_fields") else last  # Row from add_columns() or an entity
+        next_cursor = encode_cursor(getattr(entity, created_column.key), getattr(entity, id_column.key))
+    return Page(
+        items=rows,
+        page=None if args.cursor else args.page,
+        per_page=args.per_page,
+        total=total,
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
@@ -1,13 +1,24 @@
 """
 Performance metrics collection for Discovery endpoint.
 Tracks timing, cache performance, and bottlenecks.
+
+The current run's DiscoveryMetrics lives in a ContextVar, so concurrent
+Discovery requests each record into their own object. Executor threads don't
+inherit context variables: submit work with ``run_in_metrics_context`` (or
+``contextvars.copy_context().run``) so tool calls land in the caller's run.
+Every tool call is also counted in the process-wide tool_calls_total metric
+(app/utils/metrics.py).
 """
+import contextvars
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
 import json
 
+from app.utils.metrics import TOOL_CALLS
+
 
 @dataclass
 class ToolCallMetric:
@@ -46,6 +57,8 @@ class DiscoveryMetrics:
     total_cache_misses: int = 0
     cache_hit_rate: float = 0.0
     timestamp: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    # Tool calls are recorded from executor threads
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -223,25 +236,38 @@ class DiscoveryMetrics:
         return "\n".join(report_lines)
 
 
-# Global metrics collector (thread-local would be better for production)
-_current_metrics: Optional[DiscoveryMetrics] = None
+# Metrics of the Discovery run in the current context
+_current_metrics: contextvars.ContextVar[Optional[DiscoveryMetrics]] = contextvars.ContextVar(
+    "discovery_metrics", default=None
+)
 
 
 def start_metrics_collection(run_id: Optional[str] = None) -> DiscoveryMetrics:
     """Start collecting metrics for a Discovery run."""
-    global _current_metrics
-    _current_metrics = DiscoveryMetrics(run_id=run_id)
-    return _current_metrics
+    metrics = DiscoveryMetrics(run_id=run_id)
+    _current_metrics.set(metrics)
+    return metrics
 
 
 def get_current_metrics() -> Optional[DiscoveryMetrics]:
     """Get the current metrics collector."""
-    return _current_metrics
+    return _current_metrics.get()
+
+
+def run_in_metrics_context(func: Callable, *args, **kwargs) -> Callable[[], Any]:
+    """
+    A zero-argument callable running ``func`` in a copy of the current context,
+    for ``executor.submit(run_in_metrics_context(func, ...))``.
+    """
+    ctx = contextvars.copy_context()
+    return lambda: ctx.run(func, *args, **kwargs)
 
 
 def record_tool_call(tool_name: str, duration: float, cache_hit: bool = False, cache_miss: bool = False, params: Optional[Dict[str, Any]] = None):
     """Record a tool call metric."""
-    if _current_metrics:
+    TOOL_CALLS.inc(tool=tool_name, cache="hit" if cache_hit else "miss" if cache_miss else "none")
+    metrics = _current_metrics.get()
+    if metrics:
         tool_metric = ToolCallMetric(
             tool_name=tool_name,
             duration_seconds=duration,
@@ -249,46 +275,44 @@ def record_tool_call(tool_name: str, duration: float, cache_hit: bool = False, c
             cache_miss=cache_miss,
             params=params
         )
-        _current_metrics.tool_calls.append(tool_metric)
-        if cache_hit:
-            _current_metrics.total_cache_hits += 1
-        if cache_miss:
-            _current_metrics.total_cache_misses += 1
+        with metrics.lock:
+            metrics.tool_calls.append(tool_metric)
+            if cache_hit:
+                metrics.total_cache_hits += 1
+            if cache_miss:
+                metrics.total_cache_misses += 1
 
 
 def record_task(task_name: str, duration: float, start_time: float, end_time: float):
     """Record a task metric."""
-    if _current_metrics:
+    metrics = _current_metrics.get()
+    if metrics:
         task_metric = TaskMetric(
             task_name=task_name,
             duration_seconds=duration,
             start_time=start_time,
             end_time=end_time
         )
-        _current_metrics.tasks.append(task_metric)
-        
-        # Map to specific task durations
-        if task_name == "profile_analysis_task":
-            _current_metrics.profile_analysis_duration = duration
-        elif task_name == "idea_research_task":
-            _current_metrics.idea_research_duration = duration
-        elif task_name == "recommendation_task":
-            _current_metrics.recommendation_task_duration = duration
+        with metrics.lock:
+            metrics.tasks.append(task_metric)
+            
+            # Map to specific task durations
+            if task_name == "profile_analysis_task":
+                metrics.profile_analysis_duration = duration
+            elif task_name == "idea_research_task":
+                metrics.idea_research_duration = duration
+            elif task_name == "recommendation_task":
+                metrics.recommendation_task_duration = duration
 
 
 def finalize_metrics(total_duration: float):
     """Finalize metrics collection."""
-    if _current_metrics:
-        _current_metrics.total_duration_seconds = total_duration
-        total_tool_calls = _current_metrics.total_cache_hits + _current_metrics.total_cache_misses
-        if total_tool_calls > 0:
-            _current_metrics.cache_hit_rate = (_current_metrics.total_cache_hits / total_tool_calls) * 100
-        return _current_metrics
+    metrics = _current_metrics.get()
+    if metrics:
+        with metrics.lock:
+            metrics.total_duration_seconds = total_duration
+            total_tool_calls = metrics.total_cache_hits + metrics.total_cache_misses
+            if total_tool_calls > 0:
+                metrics.cache_hit_rate = (metrics.total_cache_hits / total_tool_calls) * 100
+        return metrics
     return None
-
-
-
-
-
-
-
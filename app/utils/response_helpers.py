@@ -1,9 +1,11 @@
 """
 Response formatting utilities for consistent API responses.
 """
-from flask import jsonify
+from flask import Response, jsonify
 from typing import Any, Optional, Dict
 
+from app.utils.json_helpers import dumps_with_raw
+
 
 def success_response(data: Optional[Any] = None, message: Optional[str] = None, status_code: int = 200) -> tuple:
     """
@@ -32,6 +34,24 @@ def success_response(data: Optional[Any] = None, message: Optional[str] = None,
     return jsonify(response), status_code
 
 
+def raw_json_response(payload: Dict[str, Any], status_code: int = 200) -> tuple:
+    """
+    Create a success response whose payload may contain RawJSON fragments.
+    
+    Stored JSON columns wrapped in RawJSON are written into the body as-is
+    (no json.loads/jsonify round trip).
+    
+    Args:
+        payload: Response fields (merged with {"success": True})
+        status_code: HTTP status code (default: 200)
+    
+    Returns:
+        Tuple of (Response, status_code)
+    """
+    body = dumps_with_raw({"success": True, **payload})
+    return Response(body, mimetype="application/json"), status_code
+
+
 def error_response(error: str, status_code: int = 400, additional_data: Optional[Dict[str, Any]] = None) -> tuple:
     """
     Create a standardized error response.
@@ -0,0 +1,216 @@
+"""
+Auth session caching and coalesced last_activity writes.
+
+- SessionTokenCache: short-TTL token -> session id map, so most authenticated
+  requests load their session by primary key instead of by token. The row is
+  always re-read, so a session revoked by any worker stops authenticating on
+  its next request.
+- SessionActivityTracker: records activity in memory and writes
+  user_sessions.last_activity in batches, at most once per session per
+  SESSION_ACTIVITY_FLUSH_SECONDS, instead of committing on every request.
+
+Inactivity checks combine the stored last_activity with any activity
+recorded here but not yet flushed, so the timeout behaves exactly as if
+every request had been written through.
+
+With SESSION_ACTIVITY_BACKGROUND=false no flusher thread is started and
+pending writes only reach the database when ``flush()`` (or ``stop()``) is
+called (the test suite does this).
+"""
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from flask import current_app, has_app_context
+
+from app.models.database import db, UserSession, normalize_datetime
+
+# Seconds a token -> session id entry stays valid
+SESSION_CACHE_TTL_SECONDS = float(os.environ.get("SESSION_CACHE_TTL_SECONDS", "30"))
+SESSION_CACHE_MAX_ENTRIES = int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", "10000"))
+# Seconds between batched last_activity writes
+SESSION_ACTIVITY_FLUSH_SECONDS = float(os.environ.get("SESSION_ACTIVITY_FLUSH_SECONDS", "30"))
+# Start the background flusher; with false, call flush() yourself
+SESSION_ACTIVITY_BACKGROUND = os.environ.get("SESSION_ACTIVITY_BACKGROUND", "true").lower() == "true"
+
+
+class SessionTokenCache:
+    """Bounded token -> session id cache with a short TTL."""
+
+    def __init__(self, ttl: float = SESSION_CACHE_TTL_SECONDS, max_entries: int = SESSION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, token: str) -> Optional[UserSession]:
+        """
+        Get the UserSession for ``token`` by primary key.
+
+        Returns:
+            The session instance, or None on miss/expiry or if the row is gone
+        """
+        if self.ttl <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            session_id = entry[0]
+        session = db.session.get(UserSession, session_id)
+        if session is None or session.session_token != token:
+            # Revoked (possibly by another worker)
+            self.invalidate(token)
+            return None
+        return session
+
+    def store(self, token: str, session: UserSession) -> None:
+        """Remember the session id for ``token``."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (session.id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SessionActivityTracker:
+    """In-memory last_activity per session, flushed to the database in batches."""
+
+    def __init__(self, interval: float = SESSION_ACTIVITY_FLUSH_SECONDS, background: bool = SESSION_ACTIVITY_BACKGROUND):
+        self.interval = interval
+        self.background = background
+        self._latest: Dict[int, datetime] = {}
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._app = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.writes = 0
+
+    def touch(self, session_id: int, when: datetime) -> None:
+        """Record activity for a session (no I/O)."""
+        with self._lock:
+            self._latest[session_id] = when
+            self._pending[session_id] = when
+            if self._app is None and has_app_context():
+                self._app = current_app._get_current_object()
+        self._ensure_worker()
+
+    def latest(self, session_id: int) -> Optional[datetime]:
+        """Most recent activity recorded in this process (flushed or not)."""
+        with self._lock:
+            return self._latest.get(session_id)
+
+    def effective_last_activity(self, session: UserSession) -> Optional[datetime]:
+        """The later of the stored last_activity and locally recorded activity."""
+        stored = normalize_datetime(session.last_activity)
+        local = self.latest(session.id)
+        if stored is None:
+            return local
+        if local is None:
+            return stored
+        return max(stored, local)
+
+    def forget(self, session_id: int) -> None:
+        with self._lock:
+            self._latest.pop(session_id, None)
+            self._pending.pop(session_id, None)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or not self.background or self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="session-activity-flusher", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def stop(self) -> int:
+        """
+        Stop the flusher thread (if running) and write what is still pending.
+
+        Call before the database goes away (shutdown, test teardown).
+
+        Returns:
+            Number of sessions updated by the final flush
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout=self.interval)
+        return self.flush()
+
+    def flush(self) -> int:
+        """Write pending last_activity values. Returns number of sessions updated."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            app = self._app
+            # Keep _latest bounded to sessions with recent activity
+            if len(self._latest) > SESSION_CACHE_MAX_ENTRIES:
+                self._latest = {sid: ts for sid, ts in self._latest.items() if sid in pending}
+        if not pending or app is None:
+            return 0
+
+        from sqlalchemy import bindparam
+
+        table = UserSession.__table__
+        stmt = table.update().where(
+            table.c.id == bindparam("session_id")
+        ).values(
+            last_activity=bindparam("ts")
+        )
+        rows = [{"session_id": sid, "ts": ts} for sid, ts in pending.items()]
+        try:
+            with app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(stmt, rows)
+            self.writes += len(rows)
+            return len(rows)
+        except Exception as e:
+            with self._lock:
+                for sid, ts in pending.items():
+                    if sid not in self._pending or self._pending[sid] < ts:
+                        self._pending[sid] = ts
+            try:
+                with app.app_context():
+                    app.logger.warning(f"Session last_activity flush failed: {e}")
+            except Exception:
+                pass
+            return 0
+
+
+session_token_cache = SessionTokenCache()
+session_activity_tracker = SessionActivityTracker()
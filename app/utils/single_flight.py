@@ -0,0 +1,180 @@
+"""
+Single-flight request coalescing for the Discovery pipeline.
+
+When several identical Discovery requests arrive at once, only the first one
+(the leader) runs Stage 1 + Stage 2. The others (followers) attach to the run
+already in progress: streaming followers replay the chunks produced so far and
+then receive new chunks as the leader produces them, non-streaming followers
+wait for the leader's final result.
+
+Runs are keyed by DiscoveryCache._generate_cache_key, so "identical" means
+exactly what the Discovery cache considers identical.
+"""
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class InflightRunError(RuntimeError):
+    """Raised in followers when the leader's run failed or was abandoned."""
+
+
+class InflightRun:
+    """A single in-progress run that any number of subscribers can follow."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.started_at = time.time()
+        self.followers = 0
+        self._items: List[Any] = []
+        self._result: Any = None
+        self._error: Optional[BaseException] = None
+        self._done = False
+        self._cond = threading.Condition()
+
+    @property
+    def done(self) -> bool:
+        """Whether the run has finished (successfully or not)."""
+        with self._cond:
+            return self._done
+
+    def publish(self, item: Any) -> None:
+        """Append an item to the run's stream and wake up all subscribers."""
+        with self._cond:
+            if self._done:
+                return
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def finish(self, result: Any = None) -> None:
+        """Mark the run as successfully completed."""
+        with self._cond:
+            if self._done:
+                return
+            self._result = result
+            self._done = True
+            self._cond.notify_all()
+
+    def fail(self, error: BaseException) -> None:
+        """Mark the run as failed; subscribers will raise InflightRunError."""
+        with self._cond:
+            if self._done:
+                return
+            self._error = error
+            self._done = True
+            self._cond.notify_all()
+
+    def _raise_error(self) -> None:
+        error = self._error
+        raise InflightRunError(f"{type(error).__name__}: {error}") from error
+
+    def subscribe(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Iterate over the run's stream from the beginning.
+
+        Items already published are replayed first, then new items are
+        yielded as they are published.
+
+        Args:
+            timeout: Maximum seconds to wait for the next item (None = no limit)
+
+        Raises:
+            InflightRunError: If the leader's run failed
+            TimeoutError: If no item arrives within ``timeout`` seconds
+        """
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._items) and not self._done:
+                    if not self._cond.wait(timeout):
+                        raise TimeoutError(f"Timed out waiting for in-flight run {self.key}")
+                if index < len(self._items):
+                    item = self._items[index]
+                    index += 1
+                elif self._error is not None:
+                    self._raise_error()
+                else:
+                    return
+            yield item
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """
+        Block until the run finishes and return its result.
+
+        Raises:
+            InflightRunError: If the leader's run failed
+            TimeoutError: If the run does not finish within ``timeout`` seconds
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._done, timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight run {self.key}")
+            if self._error is not None:
+                self._raise_error()
+            return self._result
+
+
+class SingleFlight:
+    """Process-wide registry of in-flight runs."""
+
+    _runs: Dict[str, InflightRun] = {}
+    _lock = threading.Lock()
+    _stats = {"leaders": 0, "followers": 0}
+
+    @staticmethod
+    def join(key: str) -> Tuple[InflightRun, bool]:
+        """
+        Attach to the in-flight run for ``key``, or start a new one.
+
+        Args:
+            key: Run key (e.g. "stream:" + DiscoveryCache key)
+
+        Returns:
+            Tuple of (run, is_leader). The leader must call release() when
+            done; a follower must call leave() when it stops following.
+        """
+        with SingleFlight._lock:
+            run = SingleFlight._runs.get(key)
+            if run is not None and not run.done:
+                run.followers += 1
+                SingleFlight._stats["followers"] += 1
+                return run, False
+            run = InflightRun(key)
+            SingleFlight._runs[key] = run
+            SingleFlight._stats["leaders"] += 1
+            return run, True
+
+    @staticmethod
+    def leave(run: InflightRun) -> None:
+        """Detach a follower from ``run`` (finished, failed or disconnected)."""
+        with SingleFlight._lock:
+            run.followers = max(0, run.followers - 1)
+
+    @staticmethod
+    def has_followers(run: InflightRun) -> bool:
+        """Whether any follower is attached to ``run``."""
+        with SingleFlight._lock:
+            return run.followers > 0
+
+    @staticmethod
+    def release(key: str, run: InflightRun) -> None:
+        """Remove ``run`` from the registry (no-op if it was already replaced)."""
+        with SingleFlight._lock:
+            if SingleFlight._runs.get(key) is run:
+                del SingleFlight._runs[key]
+
+    @staticmethod
+    def get_stats() -> Dict[str, int]:
+        """Get registry statistics."""
+        with SingleFlight._lock:
+            return {
+                "in_flight": len(SingleFlight._runs),
+                "leaders": SingleFlight._stats["leaders"],
+                "followers": SingleFlight._stats["followers"],
+            }
+
+    @staticmethod
+    def clear() -> None:
+        """Forget all runs and reset statistics (for tests)."""
+        with SingleFlight._lock:
+            SingleFlight._runs.clear()
+            SingleFlight._stats = {"leaders": 0, "followers": 0}
@@ -1,44 +1,260 @@
 """
 Timing Logger Utility
 Collects and stores timing logs in a structured format for performance analysis.
+
+Events are appended as JSON lines to rotating files in docs/timing_logs/
+(one file per process, ``timing-<time>-<pid>.jsonl``). log_timing only puts
+the event on a bounded in-memory queue; a background thread drains it every
+TIMING_FLUSH_INTERVAL_SECONDS and appends the batch, so the request thread
+does no file I/O. If the queue is full the event is dropped and counted:
+timing data is best-effort.
+
+Files rotate at TIMING_LOG_MAX_BYTES or TIMING_LOG_MAX_AGE_SECONDS, and only
+the newest TIMING_LOG_MAX_FILES are kept. TIMING_SAMPLE_RATE (0-1) keeps a
+random share of events. Set TIMING_LOG_ECHO=true to also print each event
+with the [TIMING] prefix.
+
+Aggregate the files into per-stage latency percentiles with
+``python scripts/timing_percentiles.py``.
 """
+import atexit
 import json
+import math
+import os
+import queue
+import random
+import threading
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-import threading
-from flask import current_app
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
+from flask import current_app, has_app_context
+
+DEFAULT_TIMING_LOG_DIR = Path(__file__).parent.parent.parent / "docs" / "timing_logs"
+
+TIMING_LOG_ENABLED = os.environ.get("TIMING_LOG_ENABLED", "true").lower() == "true"
+TIMING_LOG_DIR = os.environ.get("TIMING_LOG_DIR", str(DEFAULT_TIMING_LOG_DIR))
+TIMING_SAMPLE_RATE = float(os.environ.get("TIMING_SAMPLE_RATE", "1.0"))
+TIMING_QUEUE_SIZE = int(os.environ.get("TIMING_QUEUE_SIZE", "10000"))
+TIMING_FLUSH_INTERVAL_SECONDS = float(os.environ.get("TIMING_FLUSH_INTERVAL_SECONDS", "1"))
+TIMING_LOG_MAX_BYTES = int(os.environ.get("TIMING_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+TIMING_LOG_MAX_AGE_SECONDS = float(os.environ.get("TIMING_LOG_MAX_AGE_SECONDS", "3600"))
+TIMING_LOG_MAX_FILES = int(os.environ.get("TIMING_LOG_MAX_FILES", "48"))
+TIMING_LOG_ECHO = os.environ.get("TIMING_LOG_ECHO", "false").lower() == "true"
+# Events kept per thread for save_timing_log's session summary
+TIMING_THREAD_EVENTS = 500
 
 # Thread-local storage for timing data
 _timing_data = threading.local()
-_timing_enabled = True
-_output_file = None
+_timing_enabled = TIMING_LOG_ENABLED
+
+
+class TimingSink:
+    """Bounded queue of timing records appended to rotating JSONL files by a background thread."""
+
+    def __init__(
+        self,
+        directory: Path = Path(TIMING_LOG_DIR),
+        max_queue: int = TIMING_QUEUE_SIZE,
+        flush_interval: float = TIMING_FLUSH_INTERVAL_SECONDS,
+        max_bytes: int = TIMING_LOG_MAX_BYTES,
+        max_age: float = TIMING_LOG_MAX_AGE_SECONDS,
+        max_files: int = TIMING_LOG_MAX_FILES,
+        sample_rate: float = TIMING_SAMPLE_RATE,
+    ):
+        self.directory = Path(directory)
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_files = max(1, max_files)
+        self.sample_rate = sample_rate
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, max_queue))
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._file = None
+        self._file_path: Optional[Path] = None
+        self._file_opened = 0.0
+        self.stats = {"submitted": 0, "written": 0, "sampled_out": 0, "dropped": 0, "rotations": 0, "write_errors": 0}
+        if hasattr(os, "register_at_fork"):
+            # The writer thread and open file belong to the parent
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def submit(self, record: Dict[str, Any], sample: bool = True) -> bool:
+        """
+        Queue a record for the next flush.
+
+        Args:
+            record: JSON-serializable dict, written as one line
+            sample: Apply sample_rate (session summaries pass False)
+
+        Returns:
+            True if queued, False if sampled out or dropped
+        """
+        if sample and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.stats["sampled_out"] += 1
+            return False
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["submitted"] += 1
+        self._ensure_worker()
+        return True
+
+    def pending(self) -> int:
+        """Records waiting to be written."""
+        return self._queue.qsize()
+
+    def flush(self) -> int:
+        """
+        Append every queued record to the current file.
+
+        Returns:
+            Number of records written
+        """
+        with self._flush_lock:
+            lines: List[str] = []
+            while True:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    lines.append(json.dumps(record, default=str, separators=(",", ":")))
+                except (TypeError, ValueError):
+                    self.stats["write_errors"] += 1
+            if not lines:
+                return 0
+            try:
+                f = self._current_file()
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                self.stats["written"] += len(lines)
+                return len(lines)
+            except OSError as e:
+                self.stats["write_errors"] += len(lines)
+                self._close()
+                self._log_warning(f"Failed to write {len(lines)} timing record(s): {e}")
+                return 0
 
+    def files(self) -> List[Path]:
+        """Timing files in the directory, oldest first."""
+        try:
+            return sorted(self.directory.glob("timing-*.jsonl"), key=lambda p: (p.stat().st_mtime, p.name))
+        except OSError:
+            return []
+
+    def _current_file(self):
+        if self._file is not None:
+            too_big = self._file.tell() >= self.max_bytes
+            too_old = self.max_age > 0 and time.time() - self._file_opened >= self.max_age
+            if not (too_big or too_old):
+                return self._file
+            self._close()
+            self.stats["rotations"] += 1
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = self.directory / f"timing-{stamp}-{os.getpid()}.jsonl"
+        counter = 1
+        while path.exists():
+            path = self.directory / f"timing-{stamp}-{os.getpid()}-{counter}.jsonl"
+            counter += 1
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_path = path
+        self._file_opened = time.time()
+        self._prune()
+        return self._file
+
+    def _prune(self) -> None:
+        for old in self.files()[:-self.max_files]:
+            if old == self._file_path:
+                continue
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def _close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._file_path = None
+
+    def _log_warning(self, message: str) -> None:
+        try:
+            if has_app_context():
+                current_app.logger.warning(message)
+            else:
+                print(f"[TIMING] {message}")
+        except Exception:
+            pass
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or self._stopping:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="timing-log-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _after_fork(self) -> None:
+        self._thread = None
+        self._file = None
+        self._file_path = None
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
 
-def init_timing_logger(output_file: Optional[str] = None):
-    """Initialize timing logger with output file."""
-    global _output_file
-    if output_file:
-        _output_file = Path(output_file)
-        _output_file.parent.mkdir(parents=True, exist_ok=True)
-    else:
-        # Default to docs/timing_logs.json
-        _output_file = Path(__file__).parent.parent.parent / "docs" / "timing_logs.json"
-        _output_file.parent.mkdir(parents=True, exist_ok=True)
+    def shutdown(self, timeout: float = 5.0) -> int:
+        """Stop the writer thread, write whatever is still queued and close the file."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        written = self.flush()
+        with self._flush_lock:
+            self._close()
+        return written
 
 
-def get_timing_data() -> List[Dict[str, Any]]:
-    """Get timing data for current thread."""
+timing_sink = TimingSink()
+atexit.register(timing_sink.shutdown)
+
+
+def init_timing_logger(output_dir: Optional[str] = None):
+    """Point the timing sink at ``output_dir`` (default docs/timing_logs/)."""
+    directory = Path(output_dir) if output_dir else Path(TIMING_LOG_DIR)
+    if directory != timing_sink.directory:
+        with timing_sink._flush_lock:
+            timing_sink._close()
+            timing_sink.directory = directory
+
+
+def get_timing_data() -> Deque[Dict[str, Any]]:
+    """Get timing data for current thread (the most recent TIMING_THREAD_EVENTS events)."""
     if not hasattr(_timing_data, 'events'):
-        _timing_data.events = []
+        _timing_data.events = deque(maxlen=TIMING_THREAD_EVENTS)
     return _timing_data.events
 
 
 def clear_timing_data():
     """Clear timing data for current thread."""
     if hasattr(_timing_data, 'events'):
-        _timing_data.events = []
+        _timing_data.events.clear()
 
 
 def log_timing(
@@ -51,7 +267,7 @@ def log_timing(
 ):
     """
     Log a timing event.
-    
+
     Args:
         component: Component name (e.g., "run_profile_analysis", "research_market_trends")
         event: Event name (e.g., "start", "openai_call_complete", "tool_complete")
@@ -62,10 +278,10 @@ def log_timing(
     """
     if not _timing_enabled:
         return
-    
+
     if timestamp is None:
         timestamp = time.time()
-    
+
     # Create event dict
     event_data = {
         "component": component,
@@ -73,81 +289,65 @@ def log_timing(
         "timestamp": timestamp,
         "datetime": datetime.fromtimestamp(timestamp).isoformat(),
     }
-    
+
     if duration is not None:
         event_data["duration"] = duration
-    
+
     if details:
         event_data["details"] = details
-    
+
     # Add any additional kwargs
     event_data.update(kwargs)
-    
+
     # Store in thread-local data
-    events = get_timing_data()
-    events.append(event_data)
-    
-    # Also print to console for immediate visibility
-    print(f"[TIMING] {component}: {event}" + 
-          (f" at {timestamp:.3f}" if timestamp else "") +
-          (f" (duration: {duration:.3f}s)" if duration is not None else "") +
-          (f" - {json.dumps(details)}" if details else "") +
-          (f" - {json.dumps(kwargs)}" if kwargs else ""))
+    get_timing_data().append(event_data)
+
+    timing_sink.submit({"type": "event", "pid": os.getpid(), "thread": threading.current_thread().name, **event_data})
+
+    if TIMING_LOG_ECHO:
+        print(f"[TIMING] {component}: {event}" +
+              (f" at {timestamp:.3f}" if timestamp else "") +
+              (f" (duration: {duration:.3f}s)" if duration is not None else "") +
+              (f" - {json.dumps(details, default=str)}" if details else "") +
+              (f" - {json.dumps(kwargs, default=str)}" if kwargs else ""))
 
 
 def save_timing_log():
-    """Save timing log to file."""
-    if not _output_file:
+    """Queue a summary of the current thread's events as a session record and clear them."""
+    if not _timing_enabled:
         return
-    
-    events = get_timing_data()
+
+    events = list(get_timing_data())
     if not events:
         return
-    
-    # Load existing logs if file exists
-    existing_logs = []
-    if _output_file.exists():
-        try:
-            with open(_output_file, 'r') as f:
-                existing_logs = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            existing_logs = []
-    
-    # Create log entry
+
     log_entry = {
+        "type": "session",
         "session_id": f"{int(time.time())}_{threading.current_thread().name}",
+        "pid": os.getpid(),
         "timestamp": datetime.now().isoformat(),
-        "events": events,
-        "summary": _calculate_summary(events)
+        "summary": _calculate_summary(events),
     }
-    
-    # Append to existing logs
-    existing_logs.append(log_entry)
-    
-    # Save back to file
-    try:
-        with open(_output_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-        
-        # Also print summary
-        summary = log_entry["summary"]
-        print(f"\n[TIMING] Log saved to {_output_file}")
-        print(f"[TIMING] Session summary: {json.dumps(summary, indent=2)}\n")
-    except IOError as e:
-        print(f"[TIMING] Failed to save timing log: {e}")
-
-
-def _calculate_summary(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Sessions are rare and carry the summary; don't sample them out
+    timing_sink.submit(log_entry, sample=False)
+    clear_timing_data()
+
+    if TIMING_LOG_ECHO:
+        print(f"[TIMING] Session summary: {json.dumps(log_entry['summary'], indent=2, default=str)}\n")
+
+
+def _calculate_summary(events: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
     """Calculate summary statistics from events."""
     summary = {
-        "total_events": len(events),
+        "total_events": 0,
         "components": {},
         "durations": [],
         "openai_calls": []
     }
-    
+
     # Group by component
     for event in events:
+        summary["total_events"] += 1
         component = event.get("component", "unknown")
         if component not in summary["components"]:
             summary["components"][component] = {
@@ -156,7 +356,7 @@ def _calculate_summary(events: List[Dict[str, Any]]) -> Dict[str, Any]:
             }
         summary["components"][component]["event_count"] += 1
         summary["components"][component]["events"].append(event.get("event"))
-        
+
         # Collect durations
         if "duration" in event:
             summary["durations"].append({
@@ -164,7 +364,7 @@ def _calculate_summary(events: List[Dict[str, Any]]) -> Dict[str, Any]:
                 "event": event.get("event"),
                 "duration": event["duration"]
             })
-        
+
         # Collect OpenAI call info
         if "openai_duration" in event or event.get("event") == "openai_call_complete":
             openai_info = {
@@ -173,17 +373,89 @@ def _calculate_summary(events: List[Dict[str, Any]]) -> Dict[str, Any]:
                 "tokens": event.get("tokens")
             }
             summary["openai_calls"].append(openai_info)
-    
+
     # Calculate totals
     total_duration = sum(d["duration"] for d in summary["durations"] if "duration" in d)
     total_openai_duration = sum(
-        d["duration"] for d in summary["openai_calls"] 
+        d["duration"] for d in summary["openai_calls"]
         if d.get("duration") is not None
     )
-    
+
     summary["total_duration"] = total_duration
     summary["total_openai_duration"] = total_openai_duration
     summary["tool_overhead"] = total_duration - total_openai_duration
-    
+
     return summary
 
+
+def iter_timing_events(paths: Iterable[Path], since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Timing events from JSONL files (and the legacy docs/timing_logs.json array).
+
+    Args:
+        paths: Files to read; unreadable lines are skipped
+        since: Only events with a timestamp at or after this epoch time
+    """
+    for path in paths:
+        path = Path(path)
+        try:
+            if path.suffix == ".json":
+                with open(path, "r", encoding="utf-8") as f:
+                    sessions = json.load(f)
+                records = (event for session in sessions for event in session.get("events", []))
+            else:
+                records = _read_jsonl(path)
+            for record in records:
+                if record.get("type", "event") != "event":
+                    continue
+                if since is not None and (record.get("timestamp") or 0) < since:
+                    continue
+                yield record
+        except (OSError, json.JSONDecodeError, AttributeError, TypeError):
+            continue
+
+
+def _read_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partial last line from a crashed writer
+                continue
+            if isinstance(record, dict):
+                yield record
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def aggregate_percentiles(
+    events: Iterable[Dict[str, Any]],
+    percentiles: Iterable[float] = (50, 90, 95, 99),
+) -> Dict[str, Dict[str, float]]:
+    """
+    Latency percentiles (seconds) per "component:event" for events with a duration.
+
+    Returns:
+        {"run_idea_research:llm_call_end": {"count": 120, "p50": 8.1, ..., "max": 21.4}, ...}
+    """
+    durations: Dict[str, List[float]] = {}
+    for event in events:
+        duration = event.get("duration")
+        if not isinstance(duration, (int, float)):
+            continue
+        key = f"{event.get('component', 'unknown')}:{event.get('event', '?')}"
+        durations.setdefault(key, []).append(float(duration))
+    result: Dict[str, Dict[str, float]] = {}
+    for key, values in sorted(durations.items()):
+        values.sort()
+        stats: Dict[str, float] = {"count": len(values)}
+        for pct in percentiles:
+            stats[f"p{pct:g}"] = _percentile(values, pct)
+        stats["max"] = values[-1]
+        result[key] = stats
+    return result
@@ -4,14 +4,14 @@ Caches tool results to reduce API calls and improve performance.
 """
 import json
 import hashlib
-from datetime import datetime, timedelta, timezone
+from datetime import timedelta
 from typing import Optional, Any, Dict
 from flask import current_app, has_app_context
-from app.models.database import db, utcnow
+from app.utils.layered_cache import get_layered_cache
 
 
 class ToolCache:
-    """Simple cache wrapper for tool results using PostgreSQL."""
+    """Simple cache wrapper for tool results (layered: memory -> Redis -> PostgreSQL)."""
     
     @staticmethod
     def _normalize_value(value: Any) -> str:
@@ -82,25 +82,16 @@ class ToolCache:
         try:
             cache_key = ToolCache._generate_cache_key(tool_name, **params)
             
-            # Import here to avoid circular dependency
-            from app.models.database import ToolCacheEntry
+            cached = get_layered_cache().get(cache_key)
             
-            cached = ToolCacheEntry.query.filter_by(
-                cache_key=cache_key
-            ).filter(
-                ToolCacheEntry.expires_at > utcnow()
-            ).first()
-            
-            if cached:
-                cached.hit_count += 1
-                db.session.commit()
+            if cached is not None:
                 current_app.logger.debug(
-                    f"Tool cache hit: {tool_name} (key: {cache_key}, hit_count={cached.hit_count})"
+                    f"Tool cache hit: {tool_name} (key: {cache_key})"
                 )
                 # Log cache key for diagnosis
                 if has_app_context():
                     current_app.logger.debug(f"tool_cache_key: {cache_key}")
-                return cached.result
+                return cached
             
             return None
             
@@ -127,31 +118,14 @@ class ToolCache:
         
         try:
             cache_key = ToolCache._generate_cache_key(tool_name, **params)
-            expires_at = utcnow() + timedelta(days=ttl_days)
-            
-            # Import here to avoid circular dependency
-            from app.models.database import ToolCacheEntry
             
-            # Check if entry exists
-            existing = ToolCacheEntry.query.filter_by(cache_key=cache_key).first()
-            
-            if existing:
-                # Update existing entry
-                existing.result = result
-                existing.expires_at = expires_at
-                existing.hit_count = 0  # Reset hit count on update
-            else:
-                # Create new entry
-                cache_entry = ToolCacheEntry(
-                    cache_key=cache_key,
-                    tool_name=tool_name,
-                    tool_params=json.dumps(params),
-                    result=result,
-                    expires_at=expires_at
-                )
-                db.session.add(cache_entry)
-            
-            db.session.commit()
+            get_layered_cache().set(
+                cache_key,
+                result,
+                ttl_seconds=timedelta(days=ttl_days).total_seconds(),
+                tool_name=tool_name,
+                tool_params=json.dumps(params),
+            )
             current_app.logger.debug(
                 f"Tool cache stored: {tool_name} (key: {cache_key}, TTL: {ttl_days} days)"
             )
@@ -163,8 +137,3 @@ class ToolCache:
             # Don't fail if cache storage fails
             if has_app_context():
                 current_app.logger.warning(f"Tool cache storage failed: {e}")
-            try:
-                db.session.rollback()
-            except Exception:
-                pass
-
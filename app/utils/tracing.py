@@ -0,0 +1,524 @@
+"""
+Lightweight tracing spans for the Discovery and Validation pipelines.
+
+    with tracing.span("discovery.stage1", provider="openai") as s:
+        ...
+        s.set_attribute("input_tokens", 812)
+
+    @tracing.traced("discovery.tool")
+    def run_tool(...): ...
+
+Spans nest through a context variable: a span opened inside another becomes
+its child, including in executor threads started with
+``run_in_metrics_context`` (which copies the context). A root span opened
+during a request takes its trace id from ``g.request_id``, so every span of
+one request shares a trace id that starts with the request id in the logs.
+
+Tracing is off unless TRACING_ENABLED=true; span() then returns a shared
+no-op span, so instrumented code pays one attribute lookup per span.
+
+Finished spans go to the exporters named in TRACING_EXPORTERS
+(comma-separated):
+
+- ``memory``: ring buffer of the last TRACING_BUFFER_SIZE spans, served by
+  GET /api/admin/traces
+- ``jsonl``: one JSON object per span in TRACING_DIR/spans-<pid>.jsonl
+- ``otlp``: OTLP/JSON ``ExportTraceServiceRequest`` lines in
+  TRACING_DIR/otlp-<pid>.jsonl, readable by the OpenTelemetry Collector's
+  file receiver
+
+File exporters are written by a background thread every
+TRACING_FLUSH_INTERVAL_SECONDS (``tracer.flush()`` writes immediately); spans
+are dropped and counted if the queue is full.
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+from flask import current_app, g, has_app_context, has_request_context
+
+DEFAULT_TRACING_DIR = Path(__file__).parent.parent.parent / "docs" / "traces"
+
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTERS = os.environ.get("TRACING_EXPORTERS", "memory")
+TRACING_DIR = os.environ.get("TRACING_DIR", str(DEFAULT_TRACING_DIR))
+TRACING_BUFFER_SIZE = int(os.environ.get("TRACING_BUFFER_SIZE", "2048"))
+TRACING_QUEUE_SIZE = int(os.environ.get("TRACING_QUEUE_SIZE", "10000"))
+TRACING_FLUSH_INTERVAL_SECONDS = float(os.environ.get("TRACING_FLUSH_INTERVAL_SECONDS", "1"))
+TRACING_FILE_MAX_BYTES = int(os.environ.get("TRACING_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACING_SERVICE_NAME = os.environ.get("TRACING_SERVICE_NAME", "idea-api")
+
+_HEX = frozenset("0123456789abcdef")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def _new_id(length: int) -> str:
+    return uuid.uuid4().hex[:length]
+
+
+def _request_trace_id() -> Optional[str]:
+    """Trace id of the current request: g.request_id padded to 32 hex characters."""
+    if not has_request_context():
+        return None
+    trace_id = getattr(g, "trace_id", None)
+    if trace_id is None:
+        request_id = str(getattr(g, "request_id", "") or "").lower()
+        if not request_id or not set(request_id) <= _HEX:
+            request_id = ""
+        trace_id = (request_id + uuid.uuid4().hex)[:32]
+        g.trace_id = trace_id
+    return trace_id
+
+
+class Span:
+    """One timed operation; use as a context manager."""
+
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id", "attributes", "events",
+        "start_time", "end_time", "_start_perf", "duration", "status", "status_message", "_token",
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        if parent is not None:
+            self.trace_id = parent.trace_id
+            self.parent_id: Optional[str] = parent.span_id
+        else:
+            self.trace_id = _request_trace_id() or _new_id(32)
+            self.parent_id = None
+        self.span_id = _new_id(16)
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self._start_perf = 0.0
+        self.duration = 0.0
+        self.status = "ok"
+        self.status_message: Optional[str] = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        self.events.append({"name": name, "time": time.time(), "attributes": attributes})
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "error"
+        self.status_message = f"{type(exc).__name__}: {exc}"
+        self.add_event("exception", type=type(exc).__name__, message=str(exc))
+
+    def __enter__(self) -> "Span":
+        self.start_time = time.time()
+        self._start_perf = time.perf_counter()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration = time.perf_counter() - self._start_perf
+        self.end_time = self.start_time + self.duration
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.record_exception(exc)
+        try:
+            _current_span.reset(self._token)
+        except ValueError:
+            # Exited in another context (e.g. a generator closed elsewhere)
+            pass
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            "status_message": self.status_message,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is disabled."""
+
+    __slots__ = ()
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, **attributes: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ----------------------------------------------------------------------
+# Exporters
+# ----------------------------------------------------------------------
+
+class SpanExporter:
+    """Receives finished spans. ``synchronous`` exporters are called from the span's thread."""
+
+    synchronous = False
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Ring buffer of the most recent spans."""
+
+    synchronous = True
+
+    def __init__(self, max_spans: int = TRACING_BUFFER_SIZE):
+        self._spans: Deque[Dict[str, Any]] = deque(maxlen=max(1, max_spans))
+
+    def export(self, spans: List[Span]) -> None:
+        self._spans.extend(span.to_dict() for span in spans)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Buffered spans, oldest first, optionally only one trace."""
+        spans = list(self._spans)
+        if trace_id:
+            spans = [s for s in spans if s["trace_id"] == trace_id]
+        return spans
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class _FileSpanExporter(SpanExporter):
+    """Appends lines to ``<prefix>-<pid>.jsonl``; keeps one ``.1`` backup past max_bytes."""
+
+    prefix = "spans"
+
+    def __init__(self, directory: Path = Path(TRACING_DIR), max_bytes: int = TRACING_FILE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._file = None
+
+    @property
+    def path(self) -> Path:
+        return self.directory / f"{self.prefix}-{os.getpid()}.jsonl"
+
+    def _lines(self, spans: List[Span]) -> List[str]:
+        raise NotImplementedError
+
+    def export(self, spans: List[Span]) -> None:
+        lines = self._lines(spans)
+        if not lines:
+            return
+        if self._file is not None and self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._file = None
+            os.replace(self.path, self.path.with_suffix(".jsonl.1"))
+        if self._file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+
+
+class JsonlSpanExporter(_FileSpanExporter):
+    """One JSON object per span (``Span.to_dict``)."""
+
+    prefix = "spans"
+
+    def _lines(self, spans: List[Span]) -> List[str]:
+        return [json.dumps(span.to_dict(), default=str, separators=(",", ":")) for span in spans]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(v) for v in value]}}
+    return {"stringValue": value if isinstance(value, str) else str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def _unix_nano(seconds: float) -> str:
+    return str(int(seconds * 1_000_000_000))
+
+
+class OtlpFileSpanExporter(_FileSpanExporter):
+    """OTLP/JSON trace export requests, one per exported batch (OpenTelemetry file format)."""
+
+    prefix = "otlp"
+
+    def __init__(self, directory: Path = Path(TRACING_DIR), max_bytes: int = TRACING_FILE_MAX_BYTES,
+                 service_name: str = TRACING_SERVICE_NAME):
+        super().__init__(directory, max_bytes)
+        self.service_name = service_name
+
+    @staticmethod
+    def span_to_otlp(span: Span) -> Dict[str, Any]:
+        otlp = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": _unix_nano(span.start_time),
+            "endTimeUnixNano": _unix_nano(span.end_time),
+            "attributes": _otlp_attributes(span.attributes),
+            "events": [
+                {"timeUnixNano": _unix_nano(e["time"]), "name": e["name"], "attributes": _otlp_attributes(e["attributes"])}
+                for e in span.events
+            ],
+            "status": {"code": 2, "message": span.status_message or ""} if span.status == "error" else {"code": 0},
+        }
+        if span.parent_id:
+            otlp["parentSpanId"] = span.parent_id
+        return otlp
+
+    def _lines(self, spans: List[Span]) -> List[str]:
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": self.service_name,
+                    "process.pid": os.getpid(),
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [self.span_to_otlp(span) for span in spans],
+                }],
+            }],
+        }
+        return [json.dumps(request, default=str, separators=(",", ":"))]
+
+
+EXPORTERS: Dict[str, Callable[[], SpanExporter]] = {
+    "memory": InMemorySpanExporter,
+    "jsonl": JsonlSpanExporter,
+    "otlp": OtlpFileSpanExporter,
+}
+
+
+def _exporters_from_names(names: str) -> List[SpanExporter]:
+    exporters = []
+    for name in (n.strip().lower() for n in names.split(",")):
+        if name in EXPORTERS:
+            exporters.append(EXPORTERS[name]())
+    return exporters
+
+
+# ----------------------------------------------------------------------
+# Tracer
+# ----------------------------------------------------------------------
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporters."""
+
+    def __init__(
+        self,
+        enabled: bool = TRACING_ENABLED,
+        exporters: Optional[Iterable[SpanExporter]] = None,
+        max_queue: int = TRACING_QUEUE_SIZE,
+        flush_interval: float = TRACING_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.exporters: List[SpanExporter] = []
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max(1, max_queue))
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.stats = {"spans": 0, "dropped": 0, "export_errors": 0}
+        self.set_exporters(exporters if exporters is not None else _exporters_from_names(TRACING_EXPORTERS))
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def set_exporters(self, exporters: Iterable[SpanExporter]) -> None:
+        self.exporters = list(exporters)
+        self._sync = [e for e in self.exporters if e.synchronous]
+        self._batched = [e for e in self.exporters if not e.synchronous]
+
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        self.set_exporters(self.exporters + [exporter])
+
+    def memory_exporter(self) -> Optional[InMemorySpanExporter]:
+        for exporter in self.exporters:
+            if isinstance(exporter, InMemorySpanExporter):
+                return exporter
+        return None
+
+    def span(self, name: str, **attributes: Any):
+        """A new span (child of the current one), or NOOP_SPAN while disabled."""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def _finish(self, span: Span) -> None:
+        self.stats["spans"] += 1
+        for exporter in self._sync:
+            self._export(exporter, [span])
+        if not self._batched:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return
+        self._ensure_worker()
+
+    def _export(self, exporter: SpanExporter, spans: List[Span]) -> None:
+        try:
+            exporter.export(spans)
+        except Exception as e:
+            self.stats["export_errors"] += 1
+            try:
+                if has_app_context():
+                    current_app.logger.warning(f"Span export to {type(exporter).__name__} failed: {e}")
+            except Exception:
+                pass
+
+    def flush(self) -> int:
+        """Hand every queued span to the batched exporters."""
+        with self._flush_lock:
+            spans: List[Span] = []
+            while True:
+                try:
+                    spans.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if spans:
+                for exporter in self._batched:
+                    self._export(exporter, spans)
+            return len(spans)
+
+    def _ensure_worker(self) -> None:
+        if self._thread is not None or self._stopping:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _after_fork(self) -> None:
+        self._thread = None
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        for exporter in self._batched:
+            if isinstance(exporter, _FileSpanExporter):
+                # Reopened under the child's pid
+                exporter._file = None
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the exporter thread, export what is queued and close the exporters."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+tracer = Tracer()
+atexit.register(tracer.shutdown)
+
+
+def span(name: str, **attributes: Any):
+    """Start a span on the global tracer: ``with span("name", key=value) as s:``."""
+    return tracer.span(name, **attributes)
+
+
+def traced(name: Optional[str] = None, **attributes: Any) -> Callable:
+    """
+    Decorator running the function inside a span (named after the function by default).
+
+    For generator functions the span covers the whole iteration, from the
+    first ``next()`` until the generator finishes or is closed.
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def generator_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return (yield from func(*args, **kwargs))
+                with Span(tracer, span_name, dict(attributes)):
+                    return (yield from func(*args, **kwargs))
+            return generator_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with Span(tracer, span_name, dict(attributes)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span():
+    """The innermost open span, or NOOP_SPAN."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
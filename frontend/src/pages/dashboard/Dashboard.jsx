@@ -218,8 +218,9 @@ export default function DashboardPage() {
       const ideasList = [];
       const seenIds = new Set();
       
+      // The dashboard API returns precomputed top_ideas; only older/local runs need their full report
       const runsNeedingReports = apiRuns.filter(
-        run => !run.reports?.personalized_recommendations && run.run_id
+        run => !run.top_ideas?.length && !run.reports?.personalized_recommendations && run.run_id
       );
       
       const reportsMap = new Map();
@@ -261,8 +262,12 @@ export default function DashboardPage() {
           reports = reportsMap.get(run.run_id);
         }
         
-        if (reports?.personalized_recommendations) {
-          const topIdeas = parseTopIdeas(reports.personalized_recommendations, 3);
+        const topIdeas = run.top_ideas?.length
+          ? run.top_ideas
+          : reports?.personalized_recommendations
+            ? parseTopIdeas(reports.personalized_recommendations, 3)
+            : [];
+        if (topIdeas.length > 0) {
           topIdeas.forEach((idea) => {
             const ideaId = `${run.run_id}-${idea.index}`;
             if (!seenIds.has(ideaId)) {
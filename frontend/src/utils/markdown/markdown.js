@@ -19,6 +19,9 @@ export function trimFromHeading(markdown = "", headingStart = "###") {
   return idx >= 0 ? markdown.slice(idx) : markdown;
 }
 
+// Dashboard idea cards come from the API's top_ideas, parsed server-side by
+// parse_ideas() in app/services/report_summaries.py (the source of truth).
+// This parser is the fallback for runs without top_ideas and for full reports.
 export function parseTopIdeas(markdown = "", limit = 5) {
   const ideas = [];
   if (!markdown) return ideas;
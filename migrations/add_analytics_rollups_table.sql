@@ -0,0 +1,23 @@
+-- Migration: Add analytics_rollups table for the admin dashboard
+-- Pre-aggregated revenue per month/subscription type and dashboard counters,
+-- maintained by app/services/admin_analytics.py when ADMIN_ANALYTICS_ROLLUP=true
+
+CREATE TABLE IF NOT EXISTS analytics_rollups (
+    id SERIAL PRIMARY KEY,
+    metric VARCHAR(50) NOT NULL,  -- revenue, users, totals, refresh
+    bucket VARCHAR(20) NOT NULL DEFAULT 'all',  -- YYYY-MM for revenue
+    dimension VARCHAR(50) NOT NULL DEFAULT '',  -- subscription_type, table name, etc.
+    row_count INTEGER NOT NULL DEFAULT 0,
+    total NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rollup_metric_bucket_dim ON analytics_rollups(metric, bucket, dimension);
+
+-- The incremental refresh recomputes months of payments changed since the last refresh
+ALTER TABLE payments ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+UPDATE payments SET updated_at = COALESCE(completed_at, created_at) WHERE updated_at IS NULL;
+DROP INDEX IF EXISTS idx_payment_completed_at;
+CREATE INDEX IF NOT EXISTS idx_payment_updated_at ON payments(updated_at);
+
+COMMENT ON TABLE analytics_rollups IS 'Admin analytics rollups. Revenue months with payments changed since the last refresh are recomputed; counters are recomputed with grouped queries.';
@@ -0,0 +1,25 @@
+-- Migration: Add email_outbox table
+-- Request handlers queue emails here; app/services/email_outbox.py sends them
+-- in the background with batching and exponential-backoff retries.
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    dedupe_key VARCHAR(255) UNIQUE,  -- e.g. subscription_activated:<payment_intent_id>
+    to_email VARCHAR(255) NOT NULL,
+    subject VARCHAR(500) NOT NULL,
+    html_content TEXT NOT NULL,
+    text_content TEXT,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, sending, sent, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    claim_token VARCHAR(32),
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    sent_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS ix_email_outbox_created_at ON email_outbox (created_at);
+
+COMMENT ON TABLE email_outbox IS 'Outgoing email queue. Sent rows can be pruned; failed rows keep last_error for inspection.';
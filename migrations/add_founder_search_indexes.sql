@@ -0,0 +1,23 @@
+-- Migration: Full-text search for Founder Connect (PostgreSQL 12+)
+-- Adds generated, weighted tsvector columns with GIN indexes. PostgreSQL keeps
+-- them current on every INSERT/UPDATE, so no triggers or backfill jobs are needed.
+-- The expressions must match IDEA_LISTING_SEARCH_VECTOR / FOUNDER_PROFILE_SEARCH_VECTOR
+-- in app/models/database.py.
+
+ALTER TABLE idea_listings ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(brief_description, '')), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_idea_listings_search ON idea_listings USING GIN (search_vector);
+
+ALTER TABLE founder_profiles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(looking_for, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(bio, '')), 'B')
+    ) STORED;
+CREATE INDEX IF NOT EXISTS idx_founder_profiles_search ON founder_profiles USING GIN (search_vector);
+
+-- SQLite (development): nothing to run. app/services/founder_search.py creates
+-- and backfills the FTS5 tables (idea_listings_fts, founder_profiles_fts) on
+-- the first search.
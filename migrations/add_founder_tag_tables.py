@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Migration script to add the Founder Connect tag tables, then backfill them
+from the JSON skill/industry columns of existing profiles and listings.
+Run this script to apply the migration to your database. The backfill
+rebuilds both tables from scratch, so it is safe to re-run.
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import app directly (api.py creates app as module-level variable)
+import api
+from app.models.database import db
+from app.services.founder_matching import rebuild_all_tags
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add and backfill the founder tag tables."""
+    app = api.app
+    
+    with app.app_context():
+        print("Starting migration: Add founder_profile_tags and idea_listing_tags...")
+        
+        try:
+            if db.engine.dialect.name == "postgresql":
+                sql_file = os.path.join(os.path.dirname(__file__), "add_founder_tag_tables.sql")
+                with open(sql_file, 'r', encoding='utf-8') as f:
+                    sql = f.read()
+                db.session.execute(text(sql))
+                db.session.commit()
+            
+            counts = rebuild_all_tags()
+            
+            print("✅ Migration completed successfully!")
+            print(f"   Backfilled tags for {counts['profiles']} profiles and {counts['listings']} listings.")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Migration failed: {e}")
+            print(f"   Error type: {type(e).__name__}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,27 @@
+-- Migration: Add normalized skill/industry tag tables for Founder Connect
+-- Browse filters and match ranking use indexed (kind, tag) lookups instead of
+-- ILIKE over the JSON text columns. Rows are maintained by
+-- app/services/founder_matching.py whenever a profile or listing is saved.
+
+CREATE TABLE IF NOT EXISTS founder_profile_tags (
+    id SERIAL PRIMARY KEY,
+    founder_profile_id INTEGER NOT NULL REFERENCES founder_profiles(id) ON DELETE CASCADE,
+    kind VARCHAR(20) NOT NULL,   -- 'skill' (primary_skills) or 'industry' (industries_of_interest)
+    tag VARCHAR(200) NOT NULL    -- lower-cased, whitespace-collapsed
+);
+
+CREATE INDEX IF NOT EXISTS ix_founder_profile_tags_founder_profile_id ON founder_profile_tags (founder_profile_id);
+CREATE INDEX IF NOT EXISTS idx_profile_tag_lookup ON founder_profile_tags (kind, tag, founder_profile_id);
+
+CREATE TABLE IF NOT EXISTS idea_listing_tags (
+    id SERIAL PRIMARY KEY,
+    idea_listing_id INTEGER NOT NULL REFERENCES idea_listings(id) ON DELETE CASCADE,
+    tag VARCHAR(200) NOT NULL    -- skills_needed, normalized like founder_profile_tags.tag
+);
+
+CREATE INDEX IF NOT EXISTS ix_idea_listing_tags_idea_listing_id ON idea_listing_tags (idea_listing_id);
+CREATE INDEX IF NOT EXISTS idx_listing_tag_lookup ON idea_listing_tags (tag, idea_listing_id);
+
+-- Existing profiles and listings have no tag rows until they are backfilled:
+-- run migrations/add_founder_tag_tables.py, which applies this file and then
+-- rebuilds both tables from the JSON columns.
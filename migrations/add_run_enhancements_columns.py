@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration script to add enhancements columns to user_runs table.
+Run this script to apply the migration to your database.
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import app directly (api.py creates app as module-level variable)
+import api
+from app.models.database import db
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add the enhancements columns."""
+    app = api.app
+    
+    with app.app_context():
+        print("Starting migration: Add enhancements columns to user_runs table...")
+        
+        try:
+            # Read SQL file
+            sql_file = os.path.join(os.path.dirname(__file__), "add_run_enhancements_columns.sql")
+            with open(sql_file, 'r', encoding='utf-8') as f:
+                sql = f.read()
+            
+            # Execute the SQL (it's a DO block that checks if column exists)
+            db.session.execute(text(sql))
+            db.session.commit()
+            
+            print("✅ Migration completed successfully!")
+            print("   Columns 'enhancements' and 'enhanced_at' have been added to the 'user_runs' table.")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Migration failed: {e}")
+            print(f"   Error type: {type(e).__name__}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == "__main__":
+    run_migration()
+
@@ -0,0 +1,26 @@
+-- Migration: Add enhancements / enhanced_at columns to user_runs table
+-- Stores /api/enhance-report sections so repeat calls don't regenerate them
+
+-- For PostgreSQL
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns 
+        WHERE table_name = 'user_runs' AND column_name = 'enhancements'
+    ) THEN
+        ALTER TABLE user_runs ADD COLUMN enhancements TEXT;
+        
+        COMMENT ON COLUMN user_runs.enhancements IS 'JSON: enhance-report sections (financial, risk_radar, competitive, market, success_metrics, tool_stack, validation_plan) plus generation metadata.';
+    END IF;
+    
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns 
+        WHERE table_name = 'user_runs' AND column_name = 'enhanced_at'
+    ) THEN
+        ALTER TABLE user_runs ADD COLUMN enhanced_at TIMESTAMP;
+    END IF;
+END $$;
+
+-- For SQLite (if using SQLite, uncomment and run separately)
+-- ALTER TABLE user_runs ADD COLUMN enhancements TEXT;
+-- ALTER TABLE user_runs ADD COLUMN enhanced_at TIMESTAMP;
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Migration script to add dashboard summary columns to user_runs and
+user_validations, then backfill them for existing rows.
+Run this script to apply the migration to your database. The backfill only
+touches rows whose summary is still empty, so it is safe to re-run.
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import app directly (api.py creates app as module-level variable)
+import api
+from app.models.database import db
+from app.services.report_summaries import backfill_summaries
+from sqlalchemy import text
+
+def run_migration():
+    """Run the migration to add and backfill the summary columns."""
+    app = api.app
+    
+    with app.app_context():
+        print("Starting migration: Add summary columns to user_runs and user_validations...")
+        
+        try:
+            if db.engine.dialect.name == "postgresql":
+                sql_file = os.path.join(os.path.dirname(__file__), "add_summary_columns.sql")
+                with open(sql_file, 'r', encoding='utf-8') as f:
+                    sql = f.read()
+                db.session.execute(text(sql))
+                db.session.commit()
+            
+            counts = backfill_summaries()
+            
+            print("✅ Migration completed successfully!")
+            print(f"   Backfilled {counts['runs']} runs and {counts['validations']} validations.")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"\n❌ Migration failed: {e}")
+            print(f"   Error type: {type(e).__name__}")
+            import traceback
+            traceback.print_exc()
+            sys.exit(1)
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,22 @@
+-- Migration: Add denormalized summary columns to user_runs and user_validations
+-- The dashboard lists these instead of parsing every full report.
+-- Existing rows are filled by migrations/add_summary_columns.py (backfill_summaries).
+
+-- For PostgreSQL
+ALTER TABLE user_runs ADD COLUMN IF NOT EXISTS idea_count INTEGER;
+ALTER TABLE user_runs ADD COLUMN IF NOT EXISTS top_idea_title VARCHAR(255);
+ALTER TABLE user_runs ADD COLUMN IF NOT EXISTS interest_area VARCHAR(255);
+ALTER TABLE user_runs ADD COLUMN IF NOT EXISTS top_ideas TEXT;
+
+ALTER TABLE user_validations ADD COLUMN IF NOT EXISTS overall_score DOUBLE PRECISION;
+ALTER TABLE user_validations ADD COLUMN IF NOT EXISTS idea_title VARCHAR(255);
+ALTER TABLE user_validations ADD COLUMN IF NOT EXISTS interest_area VARCHAR(255);
+
+-- For SQLite (if using SQLite, uncomment and run separately)
+-- ALTER TABLE user_runs ADD COLUMN idea_count INTEGER;
+-- ALTER TABLE user_runs ADD COLUMN top_idea_title VARCHAR(255);
+-- ALTER TABLE user_runs ADD COLUMN interest_area VARCHAR(255);
+-- ALTER TABLE user_runs ADD COLUMN top_ideas TEXT;
+-- ALTER TABLE user_validations ADD COLUMN overall_score FLOAT;
+-- ALTER TABLE user_validations ADD COLUMN idea_title VARCHAR(255);
+-- ALTER TABLE user_validations ADD COLUMN interest_area VARCHAR(255);
@@ -0,0 +1,11 @@
+-- Migration: Add usage_counters table for /api/public/usage-stats
+-- Counters are incremented as runs/validations complete and periodically
+-- reconciled against the source tables by app/services/usage_stats.py
+
+CREATE TABLE IF NOT EXISTS usage_counters (
+    name VARCHAR(100) PRIMARY KEY,  -- total_users, total_validations, validations:YYYY-MM, average_score, ...
+    value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE usage_counters IS 'Materialized public usage stats. Safe to truncate: the next reconciliation rebuilds every counter.';
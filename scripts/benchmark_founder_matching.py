@@ -0,0 +1,154 @@
+"""
+Benchmark: Founder Connect skill filtering and match ranking at scale.
+
+Compares the old browse filter (ILIKE '%skill%' over the primary_skills
+JSON text, a full table scan) with the indexed founder_profile_tags lookup,
+times the "sort=match" ranking query (grouped overlap score over the
+(kind, tag) index, top page only), and compares ILIKE text search over
+looking_for/bio with the FTS5 index (ranked first page plus snippets).
+
+Usage:
+    python scripts/benchmark_founder_matching.py [--profiles 100000] [--repeat 10]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import func, or_
+
+from app.models.database import db, FounderProfile, utcnow
+from app.services import founder_matching, founder_search
+
+SKILLS = [f"skill {i}" for i in range(200)]
+INDUSTRIES = [f"industry {i}" for i in range(40)]
+WORDS = ["marketing", "growth", "hardware", "climate", "payments", "design", "mobile", "robotics", "retail", "logistics"]
+PAGE_SIZE = 20
+
+
+def _make_app() -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def _populate(count: int, seed: int = 42) -> None:
+    rng = random.Random(seed)
+    now = utcnow()
+    batch = []
+    for i in range(1, count + 1):
+        batch.append({
+            "id": i,
+            "user_id": i,
+            "primary_skills": json.dumps(rng.sample(SKILLS, rng.randint(1, 5))),
+            "industries_of_interest": json.dumps(rng.sample(INDUSTRIES, rng.randint(1, 3))),
+            "looking_for": f"Co-founder with {' and '.join(rng.sample(WORDS, 2))} experience",
+            "bio": f"Previously built {rng.choice(WORDS)} products at company {i % 5000}",
+            "is_active": True,
+            "is_public": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+        if len(batch) == 5000:
+            db.session.execute(FounderProfile.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(FounderProfile.__table__.insert(), batch)
+    db.session.commit()
+
+
+def _filter_ilike(skills):
+    query = FounderProfile.query.filter(FounderProfile.is_active == True, FounderProfile.is_public == True)
+    for skill in skills:
+        query = query.filter(FounderProfile.primary_skills.ilike(f"%{skill}%"))
+    query.count()
+    query.order_by(FounderProfile.created_at.desc()).limit(PAGE_SIZE).all()
+
+
+def _filter_tags(skills):
+    query = FounderProfile.query.filter(FounderProfile.is_active == True, FounderProfile.is_public == True)
+    query = query.filter(*founder_matching.profile_tag_filter(founder_matching.KIND_SKILL, skills))
+    query.count()
+    query.order_by(FounderProfile.created_at.desc()).limit(PAGE_SIZE).all()
+
+
+def _rank(viewer):
+    scores = founder_matching.profile_match_scores(viewer)
+    match_score = func.coalesce(scores.c.score, 0)
+    FounderProfile.query.filter(
+        FounderProfile.is_active == True, FounderProfile.is_public == True
+    ).outerjoin(scores, scores.c.founder_profile_id == FounderProfile.id).add_columns(match_score).order_by(
+        match_score.desc(), FounderProfile.created_at.desc()
+    ).limit(PAGE_SIZE).all()
+
+
+def _search_ilike(term):
+    query = FounderProfile.query.filter(
+        or_(FounderProfile.looking_for.ilike(f"%{term}%"), FounderProfile.bio.ilike(f"%{term}%"))
+    )
+    query.count()
+    query.order_by(FounderProfile.created_at.desc()).limit(PAGE_SIZE).all()
+
+
+def _search_fts(term):
+    search = founder_search.profile_matches(term)
+    query = FounderProfile.query.join(search, search.c.id == FounderProfile.id)
+    query.count()
+    profiles = query.order_by(search.c.rank.desc(), FounderProfile.created_at.desc()).limit(PAGE_SIZE).all()
+    founder_search.profile_snippets(term, [p.id for p in profiles])
+
+
+def _measure(func, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        func(arg)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=100000, help="Number of founder profiles")
+    parser.add_argument("--repeat", type=int, default=10, help="Queries measured per case")
+    args = parser.parse_args()
+
+    app = _make_app()
+    with app.app_context():
+        db.create_all()
+        start = time.perf_counter()
+        _populate(args.profiles)
+        counts = founder_matching.rebuild_all_tags(batch_size=5000)
+        print(f"Loaded {counts['profiles']} profiles and built tags in {time.perf_counter() - start:.1f}s\n")
+
+        print(f"{'case':<28} | {'ILIKE ms':>9} | {'tags ms':>9}")
+        print("-" * 52)
+        for label, skills in (("1 skill", ["skill 7"]), ("2 skills", ["skill 7", "skill 11"]), ("rare skill", ["skill 199"])):
+            ilike_ms = _measure(_filter_ilike, skills, args.repeat)
+            tags_ms = _measure(_filter_tags, skills, args.repeat)
+            print(f"{label:<28} | {ilike_ms:>9.2f} | {tags_ms:>9.2f}")
+
+        viewer = {"skills": {"skill 1"}, "industries": {"industry 3", "industry 5"}, "needed": {"skill 7", "skill 11", "skill 42"}}
+        print(f"\nsort=match, top {PAGE_SIZE} of {args.profiles}: {_measure(_rank, viewer, args.repeat):.2f} ms")
+
+        founder_search.rebuild_search_index()
+        print(f"\n{'search':<28} | {'ILIKE ms':>9} | {'FTS ms':>9}")
+        print("-" * 52)
+        for term in ("robotics", "company 4242"):
+            ilike_ms = _measure(_search_ilike, term, args.repeat)
+            fts_ms = _measure(_search_fts, term, args.repeat)
+            print(f"{term:<28} | {ilike_ms:>9.2f} | {fts_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: discovery prompt assembly time per request.
+
+Compares the previous assembly (per-tool 100 character compression, then
+token counts through ``tiktoken.encoding_for_model`` on every call: once in
+the builder and three times around the LLM call) with the prompt_budget
+path (cached encoder, memoized counts, knapsack packing of the profile and
+tool summaries). Each request gets a distinct profile analysis, so only the
+static parts (tool outputs, templates, system message) hit the memo.
+
+Usage:
+    python scripts/benchmark_prompt_budget.py [--requests 200] [--interest-area "AI / Automation"]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from app.services import prompt_budget
+from app.services import unified_discovery_service as discovery
+from app.services.static_tool_loader import StaticToolLoader
+
+SYSTEM_MESSAGE = "You are a startup advisor. Generate complete idea research and recommendations in the exact format requested."
+PROFILE_ANALYSIS = """## 1. Core Motivation
+You want to turn {n} years of operations experience into a product you own, with income that isn't tied to hours worked.
+
+## 2. Constraints
+- About 10 hours a week alongside a full-time job
+- Budget under $5K for the first six months
+- Prefers remote, asynchronous work
+
+## 3. Strengths
+- Deep knowledge of small-business back-office workflows
+- Comfortable with spreadsheets and no-code tools
+
+## 4. Skill Gaps
+- No experience selling to customers directly
+- Limited software development skills"""
+
+
+def _legacy_count(text: str) -> int:
+    if not text:
+        return 0
+    if prompt_budget.TIKTOKEN_AVAILABLE:
+        try:
+            return len(prompt_budget.tiktoken.encoding_for_model(prompt_budget.DEFAULT_MODEL).encode(text))
+        except Exception:
+            # Same fallback as before; without the BPE file this retried the download on every call
+            pass
+    return len(text) // 4
+
+
+def _legacy_request(profile_analysis: str, tool_results: dict) -> None:
+    profile = discovery._compress_profile_analysis(profile_analysis, max_chars=200)
+    compressed = {name: discovery.compress_tool_output(str(output), max_chars=100) for name, output in tool_results.items()}
+    research = json.dumps(compressed, ensure_ascii=False, separators=(",", ":"))
+    prompt = f"{discovery.STAGE2_STATIC_PROMPT}RESEARCH DATA (summaries only):\n{research}\n\nUSER PROFILE: {profile}"
+    _legacy_count(prompt)
+    _legacy_count(SYSTEM_MESSAGE) + _legacy_count(prompt)
+    _legacy_count(SYSTEM_MESSAGE), _legacy_count(prompt)
+
+
+def _budget_request(profile_analysis: str, tool_results: dict) -> None:
+    prompt = discovery._build_idea_research_prompt(profile_analysis, tool_results)
+    discovery.count_tokens(SYSTEM_MESSAGE) + discovery.count_tokens(prompt.text)
+
+
+def _measure(func, tool_results: dict, requests: int) -> list:
+    timings = []
+    for n in range(requests):
+        profile_analysis = PROFILE_ANALYSIS.format(n=n + 3)
+        start = time.perf_counter()
+        func(profile_analysis, tool_results)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Prompts assembled per case")
+    parser.add_argument("--interest-area", default="AI / Automation", help="Static tool file to load")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    with app.app_context():
+        app.logger.disabled = True
+        tool_results = discovery._ensure_all_tool_fields(StaticToolLoader.load(args.interest_area) or {})
+        encoder = "tiktoken" if prompt_budget.get_encoding() is not None else "estimate (len/4)"
+        print(f"{len(tool_results)} tool fields for '{args.interest_area}', token counts: {encoder}\n")
+
+        # The builders print [TOKEN] lines; keep them out of the table
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, "w")
+        try:
+            cold_start = time.perf_counter()
+            _budget_request(PROFILE_ANALYSIS.format(n=0), tool_results)
+            cold_ms = (time.perf_counter() - cold_start) * 1000
+            legacy = _measure(_legacy_request, tool_results, args.requests)
+            budget = _measure(_budget_request, tool_results, args.requests)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        print(f"{'assembly':<24} | {'p50 ms':>8} | {'p95 ms':>8}")
+        print("-" * 46)
+        for label, timings in (("legacy", legacy), ("prompt_budget", budget)):
+            p50 = timings[len(timings) // 2]
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{label:<24} | {p50:>8.3f} | {p95:>8.3f}")
+        print(f"\nFirst prompt_budget request (cold encoder and memo): {cold_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
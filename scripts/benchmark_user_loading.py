@@ -0,0 +1,112 @@
+"""
+Benchmark: per-request cost of loading a User as history grows.
+
+Compares the old eager strategy (lazy="selectin" on User.sessions/runs/
+validations, emulated by loading all three collections) with the current
+dynamic relationships, where loading a User touches only the users row.
+
+For each history size it measures wall time and peak Python memory
+(tracemalloc) of what an authenticated request does: load the session's
+user, then serialize it.
+
+Usage:
+    python scripts/benchmark_user_loading.py [--sizes 0,10,100,500] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from app.models.database import db, User, UserSession, UserRun, UserValidation, utcnow
+
+REPORT_BLOB = json.dumps({"startup_ideas_research": "x" * 20000, "profile_analysis": "y" * 5000})
+VALIDATION_BLOB = json.dumps({"overall_score": 7, "recommendations": "z" * 10000})
+
+
+def _make_app() -> Flask:
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def _create_user(history_size: int) -> int:
+    user = User(
+        email=f"bench_{history_size}_{time.time_ns()}@example.com",
+        subscription_type="pro",
+        payment_status="active",
+        founder_psychology="{}",
+    )
+    user.set_password("benchmark")
+    db.session.add(user)
+    db.session.flush()
+    for i in range(history_size):
+        db.session.add(UserRun(user_id=user.id, run_id=f"run_{user.id}_{i}", inputs="{}", reports=REPORT_BLOB))
+        db.session.add(UserValidation(user_id=user.id, validation_id=f"val_{user.id}_{i}", validation_result=VALIDATION_BLOB))
+        db.session.add(UserSession(
+            user_id=user.id,
+            session_token=f"tok_{user.id}_{i}",
+            expires_at=utcnow() + timedelta(days=7),
+        ))
+    db.session.commit()
+    return user.id
+
+
+def _request_eager(user_id: int) -> None:
+    """What every request paid with lazy="selectin"."""
+    user = db.session.get(User, user_id)
+    UserSession.query.filter_by(user_id=user_id).all()
+    UserRun.query.filter_by(user_id=user_id).all()
+    UserValidation.query.filter_by(user_id=user_id).all()
+    user.to_dict()
+
+
+def _request_dynamic(user_id: int) -> None:
+    """What a request pays with dynamic relationships."""
+    user = db.session.get(User, user_id)
+    user.to_dict()
+
+
+def _measure(func, user_id: int, repeat: int):
+    timings = []
+    peaks = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(user_id)
+        timings.append((time.perf_counter() - start) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+    timings.sort()
+    return timings[len(timings) // 2], max(peaks)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="0,10,100,500", help="Comma-separated history sizes (runs = validations = sessions)")
+    parser.add_argument("--repeat", type=int, default=20, help="Requests measured per size")
+    args = parser.parse_args()
+
+    app = _make_app()
+    with app.app_context():
+        db.create_all()
+        print(f"{'history':>8} | {'eager ms':>9} | {'eager KiB':>10} | {'dynamic ms':>10} | {'dynamic KiB':>11}")
+        print("-" * 62)
+        for size in [int(s) for s in args.sizes.split(",") if s.strip()]:
+            user_id = _create_user(size)
+            eager_ms, eager_kib = _measure(_request_eager, user_id, args.repeat)
+            dynamic_ms, dynamic_kib = _measure(_request_dynamic, user_id, args.repeat)
+            print(f"{size:>8} | {eager_ms:>9.2f} | {eager_kib:>10.0f} | {dynamic_ms:>10.2f} | {dynamic_kib:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
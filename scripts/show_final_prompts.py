@@ -24,7 +24,7 @@ profile_data = {
 print("="*100)
 print("STAGE 1 PROMPT (Profile Analysis)")
 print("="*100)
-prompt1 = _build_profile_analysis_prompt(profile_data)
+prompt1 = _build_profile_analysis_prompt(profile_data).text
 print(prompt1)
 print("\n" + "="*100)
 print(f"Stage 1 Prompt Length: {len(prompt1)} characters")
@@ -60,7 +60,7 @@ You're driven by the desire to create extra income streams while leveraging your
 print("\n" + "="*100)
 print("STAGE 2 PROMPT (Idea Research)")
 print("="*100)
-prompt2 = _build_idea_research_prompt(sample_profile_analysis, tool_results)
+prompt2 = _build_idea_research_prompt(sample_profile_analysis, tool_results).text
 print(prompt2)
 print("\n" + "="*100)
 print(f"Stage 2 Prompt Length: {len(prompt2)} characters")
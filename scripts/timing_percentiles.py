@@ -0,0 +1,69 @@
+"""
+Per-stage latency percentiles from the timing logs.
+
+Reads the JSONL files written by app/utils/timing_logger.py (and the legacy
+docs/timing_logs.json if passed explicitly) and prints count, p50, p90,
+p95, p99 and max duration for every component:event pair that records a
+duration.
+
+Usage:
+    python scripts/timing_percentiles.py [paths ...] [--since-hours 24] [--component run_idea_research] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.timing_logger import TIMING_LOG_DIR, aggregate_percentiles, iter_timing_events
+
+
+def _expand(paths):
+    files = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            files.extend(sorted(path.glob("timing-*.jsonl")))
+        elif path.exists():
+            files.append(path)
+        else:
+            print(f"Skipping missing path: {path}", file=sys.stderr)
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", default=[TIMING_LOG_DIR], help="Timing files or directories")
+    parser.add_argument("--since-hours", type=float, help="Only events from the last N hours")
+    parser.add_argument("--component", help="Only keys containing this text")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    files = _expand(args.paths)
+    since = time.time() - args.since_hours * 3600 if args.since_hours else None
+    stats = aggregate_percentiles(iter_timing_events(files, since=since))
+    if args.component:
+        stats = {key: value for key, value in stats.items() if args.component in key}
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return
+    if not stats:
+        print(f"No timed events in {len(files)} file(s)")
+        return
+
+    width = max(len(key) for key in stats)
+    columns = [c for c in next(iter(stats.values())) if c != "count"]
+    print(f"{'stage':<{width}} | {'count':>6} | " + " | ".join(f"{c + ' s':>8}" for c in columns))
+    print("-" * (width + 11 + 11 * len(columns)))
+    for key, values in stats.items():
+        print(f"{key:<{width}} | {values['count']:>6} | " + " | ".join(f"{values[c]:>8.3f}" for c in columns))
+    print(f"\n{len(files)} file(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -26,6 +26,14 @@ except ImportError:
     METRICS_AVAILABLE = False
     record_tool_call = None
 
+# Shared, pooled OpenAI clients (keeps connections alive across tool calls)
+try:
+    from app.services.llm_clients import get_openai_client
+    LLM_CLIENTS_AVAILABLE = True
+except ImportError:
+    LLM_CLIENTS_AVAILABLE = False
+    get_openai_client = None
+
 
 # Injectable mock client for testing (set via monkeypatch)
 _MOCK_OPENAI_CLIENT = None
@@ -39,6 +47,8 @@ def _get_openai_client() -> OpenAI:
     api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable is not set")
+    if LLM_CLIENTS_AVAILABLE:
+        return get_openai_client(api_key)
     return OpenAI(api_key=api_key)
 
 
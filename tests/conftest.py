@@ -2,6 +2,21 @@
 Pytest configuration and fixtures for testing.
 """
 import os
+
+# Set test environment variables before importing app
+os.environ["FLASK_ENV"] = "testing"
+os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
+os.environ["DATABASE_URL"] = "sqlite:///:memory:"  # Use in-memory SQLite for tests
+os.environ["ADMIN_EMAIL"] = "admin@test.com"
+os.environ["ADMIN_PASSWORD"] = "test-admin-password"
+os.environ["DEV_MFA_CODE"] = "1234"  # Test MFA code
+# No outbox sender thread: tests call process_due()
+os.environ["EMAIL_OUTBOX_BACKGROUND"] = "false"
+# No knowledge file watcher thread
+os.environ["KNOWLEDGE_RELOAD_SECONDS"] = "0"
+# No session last_activity flusher thread: pending writes are flushed at teardown
+os.environ["SESSION_ACTIVITY_BACKGROUND"] = "false"
+
 import pytest
 from flask import Flask
 from app.models.database import db, User, Admin, UserSession
@@ -17,14 +32,6 @@ sys.modules['app_utils_module'] = app_utils_module
 spec.loader.exec_module(app_utils_module)
 create_user_session = app_utils_module.create_user_session
 
-# Set test environment variables before importing app
-os.environ["FLASK_ENV"] = "testing"
-os.environ["SECRET_KEY"] = "test-secret-key-for-testing-only"
-os.environ["DATABASE_URL"] = "sqlite:///:memory:"  # Use in-memory SQLite for tests
-os.environ["ADMIN_EMAIL"] = "admin@test.com"
-os.environ["ADMIN_PASSWORD"] = "test-admin-password"
-os.environ["DEV_MFA_CODE"] = "1234"  # Test MFA code
-
 
 @pytest.fixture(scope="session")
 def app():
@@ -40,6 +47,8 @@ def app():
     with flask_app.app_context():
         db.create_all()
         yield flask_app
+        from app.utils.session_cache import session_activity_tracker
+        session_activity_tracker.stop()
         db.drop_all()
 
 
@@ -0,0 +1,117 @@
+"""
+Unit tests for grouped admin analytics and the rollup table.
+"""
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, Payment, AnalyticsRollup, utcnow
+from app.services import admin_analytics
+
+ADMIN_HEADERS = {"Authorization": "Bearer test-admin-password"}
+
+
+def _at(year, month):
+    return datetime(year, month, 15, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def analytics_data(app):
+    user = User(
+        email="analytics@example.com",
+        subscription_type="pro",
+        payment_status="active",
+        subscription_expires_at=utcnow() + timedelta(days=10),
+        founder_psychology="{}",
+    )
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    for created_at, amount, sub_type, status in [
+        (_at(2001, 1), "10.00", "pro", "completed"),
+        (_at(2001, 1), "5.00", "starter", "completed"),
+        (_at(2001, 2), "20.00", "pro", "completed"),
+        (_at(2001, 2), "99.00", "pro", "failed"),
+    ]:
+        db.session.add(Payment(
+            user_id=user.id, amount=Decimal(amount), subscription_type=sub_type, status=status,
+            created_at=created_at, updated_at=created_at,
+        ))
+    db.session.commit()
+    user_id = user.id
+    yield user
+    AnalyticsRollup.query.delete()
+    Payment.query.filter_by(user_id=user_id).delete()
+    User.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+def _months(revenue):
+    return {m["period"]: m for m in revenue if m["period"].startswith("2001-")}
+
+
+def test_revenue_grouped_by_month_and_type(app, analytics_data):
+    months = _months(admin_analytics.query_revenue_by_month())
+    assert months["2001-01"]["revenue"] == Decimal("15.00")
+    assert months["2001-01"]["count"] == 2
+    assert months["2001-01"]["types"] == {"pro": Decimal("10.00"), "starter": Decimal("5.00")}
+    assert months["2001-02"]["revenue"] == Decimal("20.00")
+
+
+def test_stats_use_two_queries(app, analytics_data):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        stats = admin_analytics.query_admin_stats()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    assert len(statements) == 2
+    assert stats["pro_subscribers"] >= 1
+    assert stats["active_subscriptions"] >= 1
+    assert stats["total_users"] == User.query.count()
+
+
+def test_rollup_refresh_is_incremental(app, analytics_data):
+    full = admin_analytics.refresh_rollups(full=True)
+    assert full["full"] is True
+    assert _months(admin_analytics._rollup_revenue()) == _months(admin_analytics.query_revenue_by_month())
+
+    # An old payment completing now marks its month dirty
+    db.session.add(Payment(
+        user_id=analytics_data.id, amount=Decimal("7.00"), subscription_type="pro",
+        status="completed", created_at=_at(2001, 2), completed_at=utcnow(),
+    ))
+    db.session.commit()
+    incremental = admin_analytics.refresh_rollups()
+    assert incremental["full"] is False
+    assert incremental["revenue_months_recomputed"] == 1
+    months = _months(admin_analytics._rollup_revenue())
+    assert months["2001-02"]["revenue"] == Decimal("27.00")
+    assert months["2001-01"]["revenue"] == Decimal("15.00")
+    assert admin_analytics._rollup_stats() == admin_analytics.query_admin_stats()
+
+    # A status change of an existing payment marks its month dirty too
+    refunded = Payment.query.filter_by(user_id=analytics_data.id, amount=Decimal("10.00")).one()
+    refunded.status = "refunded"
+    db.session.commit()
+    assert admin_analytics.refresh_rollups()["full"] is False
+    assert _months(admin_analytics._rollup_revenue()) == _months(admin_analytics.query_revenue_by_month())
+    assert _months(admin_analytics._rollup_revenue())["2001-01"]["revenue"] == Decimal("5.00")
+
+
+def test_stats_endpoint(client, analytics_data):
+    response = client.get("/api/admin/stats", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert response.get_json()["stats"]["total_users"] >= 1
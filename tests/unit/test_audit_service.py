@@ -0,0 +1,117 @@
+"""
+Unit tests for the buffered audit log writer.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, AuditLog, User, utcnow
+from app.services.audit_service import AuditWriter, audit_writer, log_action
+
+
+def _row(action, user_id=None):
+    return {"action": action, "user_id": user_id, "details": None, "created_at": utcnow()}
+
+
+@pytest.fixture
+def audit_rows(app):
+    AuditLog.query.delete()
+    db.session.commit()
+    yield lambda: [row.action for row in AuditLog.query.order_by(AuditLog.id).all()]
+    AuditLog.query.delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def insert_statements(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO AUDIT_LOGS"):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def writer(app, monkeypatch):
+    writer = AuditWriter(max_queue=5, batch_size=3, background=True)
+    monkeypatch.setattr(writer, "_ensure_worker", lambda: None)
+    return writer
+
+
+def test_buffered_events_flush_as_multi_row_inserts(writer, audit_rows, insert_statements):
+    for i in range(5):
+        writer.submit(_row(f"event_{i}"))
+    assert audit_rows() == []
+    assert writer.pending() == 5
+
+    assert writer.flush() == 5
+    assert audit_rows() == [f"event_{i}" for i in range(5)]
+    assert len(insert_statements) == 2  # batches of 3 + 2
+
+
+def test_sync_event_flushes_buffer_first(writer, audit_rows):
+    writer.submit(_row("login_success"))
+    writer.submit(_row("password_reset"), sync=True)
+    assert audit_rows() == ["login_success", "password_reset"]
+    assert writer.pending() == 0
+
+
+def test_full_queue_writes_instead_of_dropping(writer, audit_rows):
+    for i in range(5):
+        writer.submit(_row(f"queued_{i}"))
+    writer.submit(_row("overflow"))
+    assert audit_rows() == ["overflow"]
+    assert writer.shutdown() == 5
+    assert len(audit_rows()) == 6
+
+
+def test_log_action_does_not_commit_callers_session(app, audit_rows):
+    with app.test_request_context(headers={"User-Agent": "pytest"}):
+        pending = User(email="audit_pending@example.com", founder_psychology="{}")
+        pending.set_password("password123")
+        db.session.add(pending)
+        log_action("login_success", user_id=1, details={"success": True})
+        db.session.rollback()
+
+    assert User.query.filter_by(email="audit_pending@example.com").first() is None
+    audit_writer.flush()
+    logged = AuditLog.query.one()
+    assert (logged.action, logged.user_agent, logged.details) == ("login_success", "pytest", '{"success": true}')
+
+
+def test_sync_event_follows_callers_transaction(app, audit_rows):
+    with app.test_request_context():
+        pending = User(email="audit_rolled_back@example.com", founder_psychology="{}")
+        pending.set_password("password123")
+        db.session.add(pending)
+        log_action("subscription_change", user_id=1)
+        db.session.rollback()
+        assert audit_rows() == []
+
+        committed = User(email="audit_committed@example.com", founder_psychology="{}")
+        committed.set_password("password123")
+        db.session.add(committed)
+        db.session.flush()
+        log_action("payment", user_id=committed.id)
+        db.session.commit()
+        assert audit_rows() == ["payment"]
+
+        db.session.delete(committed)
+        db.session.commit()
+
+
+def test_sync_event_commits_with_clean_session(app, audit_rows):
+    with app.test_request_context():
+        log_action("password_reset", user_id=1)
+        db.session.rollback()
+    assert audit_rows() == ["password_reset"]
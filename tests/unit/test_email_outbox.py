@@ -0,0 +1,104 @@
+"""
+Unit tests for the persistent email outbox (file provider, no network).
+"""
+import json
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, EmailOutbox, EmailStatus, normalize_datetime, utcnow
+from app.services import email_outbox as outbox_module
+from app.services.email_outbox import EmailOutboxSender
+from app.services.email_service import EmailService
+
+
+@pytest.fixture
+def outbox(app, tmp_path, monkeypatch):
+    monkeypatch.setenv("EMAIL_PROVIDER", "file")
+    monkeypatch.setenv("EMAIL_FILE_PATH", str(tmp_path / "emails.jsonl"))
+    service = EmailService()
+    monkeypatch.setattr(outbox_module, "email_service", service)
+    sender = EmailOutboxSender(workers=2, batch_size=10, background=False)
+    yield sender, service
+    EmailOutbox.query.delete()
+    db.session.commit()
+
+
+def _sent_lines(service):
+    path = Path(service.file_path)
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+
+def test_queued_emails_are_sent_in_batches(outbox):
+    sender, service = outbox
+    for i in range(5):
+        assert sender.enqueue(f"user{i}@example.com", f"Subject {i}", "<p>Hi</p>", "Hi")
+    assert _sent_lines(service) == []  # Nothing is sent on the request path
+    assert sender._thread is None
+
+    counts = sender.process_due()
+    assert counts == {"claimed": 5, "sent": 5, "retrying": 0, "failed": 0}
+    assert sorted(line["to"] for line in _sent_lines(service)) == [f"user{i}@example.com" for i in range(5)]
+    assert {row.status for row in EmailOutbox.query.all()} == {EmailStatus.SENT}
+    assert sender.process_due()["claimed"] == 0
+
+
+def test_dedupe_key_queues_once(outbox):
+    sender, service = outbox
+    assert sender.enqueue("a@example.com", "Active", "<p>1</p>", dedupe_key="subscription_activated:pi_1")
+    assert not sender.enqueue("a@example.com", "Active", "<p>2</p>", dedupe_key="subscription_activated:pi_1")
+    sender.process_due()
+    assert len(_sent_lines(service)) == 1
+
+
+def test_dedupe_race_in_callers_transaction_keeps_callers_changes(outbox, monkeypatch):
+    sender, _ = outbox
+    assert sender.enqueue("a@example.com", "Active", "<p>1</p>", dedupe_key="subscription_activated:pi_2")
+    # Another request committed the same key after our check
+    monkeypatch.setattr(sender, "_is_queued", lambda dedupe_key: False)
+
+    db.session.add(EmailOutbox(to_email="b@example.com", subject="Caller's row", html_content="<p>x</p>",
+                               status=EmailStatus.PENDING, attempts=0, next_attempt_at=utcnow()))
+    assert not sender.enqueue("a@example.com", "Active", "<p>2</p>",
+                              dedupe_key="subscription_activated:pi_2", commit=False)
+    db.session.commit()
+
+    assert EmailOutbox.query.filter_by(dedupe_key="subscription_activated:pi_2").count() == 1
+    assert EmailOutbox.query.filter_by(to_email="b@example.com").count() == 1
+
+
+def test_failures_back_off_then_give_up(outbox, tmp_path, monkeypatch):
+    sender, service = outbox
+    service.file_path = str(tmp_path)  # A directory: every write fails
+    monkeypatch.setattr(outbox_module, "EMAIL_OUTBOX_MAX_ATTEMPTS", 2)
+    sender.enqueue("b@example.com", "Retry me", "<p>x</p>")
+
+    assert sender.process_due()["retrying"] == 1
+    row = EmailOutbox.query.one()
+    assert row.attempts == 1
+    assert normalize_datetime(row.next_attempt_at) > utcnow() + timedelta(seconds=20)
+    assert sender.process_due()["claimed"] == 0  # Not due yet
+
+    row.next_attempt_at = utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert sender.process_due()["failed"] == 1
+    row = EmailOutbox.query.one()
+    assert (row.status, row.attempts, row.last_error) == (EmailStatus.FAILED, 2, "file send failed")
+
+
+def test_stale_claims_are_reclaimed(outbox):
+    sender, service = outbox
+    sender.enqueue("c@example.com", "Stuck", "<p>x</p>")
+    row = EmailOutbox.query.one()
+    row.status = EmailStatus.SENDING
+    row.claimed_at = utcnow() - timedelta(hours=1)
+    db.session.commit()
+
+    assert sender.process_due()["sent"] == 1
+    assert len(_sent_lines(service)) == 1
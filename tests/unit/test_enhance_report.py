@@ -0,0 +1,157 @@
+"""
+Route tests for /api/enhance-report: stored sections, partial regeneration,
+refresh and SSE streaming, with a fake LLM client.
+"""
+import json
+import secrets
+import sys
+import threading
+from datetime import timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserRun, UserSession, utcnow
+
+# app.routes.discovery imports the crew pipeline
+pytest.importorskip("crewai", reason="crewai not installed")
+
+ENHANCEMENT_SECTIONS = (
+    "financial", "risk_radar", "competitive", "market", "success_metrics", "tool_stack", "validation_plan",
+)
+
+RECOMMENDATIONS = "1. **Mobile Coffee Cart**\nLow capex."
+
+
+class FakeLLMClient:
+    """chat.completions.create stand-in; sections whose prompt matches ``fail`` raise."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.prompts = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        with self._lock:
+            self.prompts.append(prompt)
+        if any(marker in prompt for marker in self.fail):
+            raise RuntimeError("rate limited")
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=prompt.splitlines()[0]))],
+            usage=SimpleNamespace(total_tokens=10),
+        )
+
+
+@pytest.fixture
+def enhance_run(app):
+    user = User(email=f"enhance_{secrets.token_hex(4)}@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    session = UserSession(user_id=user.id, session_token=secrets.token_urlsafe(32), expires_at=utcnow() + timedelta(days=1))
+    run = UserRun(
+        user_id=user.id, run_id=f"enhance_run_{user.id}",
+        inputs=json.dumps({"budget_range": "$1k"}),
+        reports=json.dumps({"personalized_recommendations": RECOMMENDATIONS}),
+    )
+    db.session.add_all([session, run])
+    db.session.commit()
+    ids = (user.id, run.id)
+    yield SimpleNamespace(run_id=run.run_id, id=run.id, headers={"Authorization": f"Bearer {session.session_token}"})
+    UserRun.query.filter_by(user_id=ids[0]).delete()
+    UserSession.query.filter_by(user_id=ids[0]).delete()
+    User.query.filter_by(id=ids[0]).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    def install(**kwargs):
+        client = FakeLLMClient(**kwargs)
+        monkeypatch.setattr("app.routes.discovery.get_openai_client", lambda: client)
+        return client
+    return install
+
+
+def _stored(run_pk):
+    db.session.expire_all()
+    return json.loads(db.session.get(UserRun, run_pk).enhancements)["enhancements"]
+
+
+def _events(response):
+    return [json.loads(line[len("data: "):]) for line in response.get_data(as_text=True).splitlines() if line.startswith("data: ")]
+
+
+def test_generates_persists_and_serves_stored_sections(client, enhance_run, fake_llm):
+    llm = fake_llm()
+    response = client.post("/api/enhance-report", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers)
+    body = response.get_json()
+    assert response.status_code == 200
+    assert set(body["enhancements"]) == set(ENHANCEMENT_SECTIONS)
+    assert body["metadata"]["total_tokens"] == 10 * len(ENHANCEMENT_SECTIONS)
+    assert all("Mobile Coffee Cart" in prompt for prompt in llm.prompts)
+    assert _stored(enhance_run.id) == body["enhancements"]
+
+    llm = fake_llm()
+    cached = client.post("/api/enhance-report", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers).get_json()
+    assert cached["enhancements"] == body["enhancements"]
+    assert cached["metadata"]["cached"] is True
+    assert llm.prompts == []
+
+
+def test_failed_sections_are_regenerated_alone(client, enhance_run, fake_llm):
+    fake_llm(fail=["market intelligence"])
+    first = client.post("/api/enhance-report", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers).get_json()
+    assert first["enhancements"]["market"] is None
+    assert "market" not in _stored(enhance_run.id)
+
+    llm = fake_llm()
+    second = client.post("/api/enhance-report", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers).get_json()
+    assert len(llm.prompts) == 1
+    assert second["metadata"]["cached_sections"] == sorted(s for s in ENHANCEMENT_SECTIONS if s != "market")
+    assert set(_stored(enhance_run.id)) == set(ENHANCEMENT_SECTIONS)
+
+
+def test_refresh_regenerates_every_section(client, enhance_run, fake_llm):
+    fake_llm()
+    client.post("/api/enhance-report", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers)
+
+    llm = fake_llm()
+    body = client.post(
+        "/api/enhance-report", json={"run_id": enhance_run.run_id, "refresh": True}, headers=enhance_run.headers,
+    ).get_json()
+    assert len(llm.prompts) == len(ENHANCEMENT_SECTIONS)
+    assert body["metadata"]["cached_sections"] == []
+
+
+def test_stream_sends_stored_sections_first_and_persists(client, enhance_run, fake_llm):
+    fake_llm(fail=["tool stack"])
+    client.post("/api/enhance-report", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers)
+
+    llm = fake_llm()
+    response = client.post(
+        "/api/enhance-report?stream=true", json={"run_id": enhance_run.run_id}, headers=enhance_run.headers,
+    )
+    assert response.mimetype == "text/event-stream"
+    events = _events(response)
+    assert events[0]["event"] == "start"
+    assert events[0]["pending"] == ["tool_stack"]
+    sections = [e for e in events if e["event"] == "section"]
+    assert [e["cached"] for e in sections] == [True] * (len(ENHANCEMENT_SECTIONS) - 1) + [False]
+    assert sections[-1]["section"] == "tool_stack"
+    assert events[-1]["event"] == "done"
+    assert len(llm.prompts) == 1
+    assert set(_stored(enhance_run.id)) == set(ENHANCEMENT_SECTIONS)
+
+
+def test_unknown_run_is_404(client, enhance_run, fake_llm):
+    fake_llm()
+    response = client.post("/api/enhance-report", json={"run_id": "missing"}, headers=enhance_run.headers)
+    assert response.status_code == 404
@@ -0,0 +1,142 @@
+"""
+Unit tests for indexed Founder Connect tag matching.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import func
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, FounderProfile, IdeaListing, FounderProfileTag, IdeaListingTag
+from app.services import founder_matching
+
+
+@pytest.fixture
+def founders(app):
+    """Viewer (needs a designer) plus three candidate profiles."""
+    specs = {
+        "viewer": (["Python", "Backend"], ["FinTech"]),
+        "designer": (["UI  Design", "Figma"], ["FinTech", "Health"]),
+        "designer_other": (["ui design"], ["Gaming"]),
+        "engineer": (["python"], ["Health"]),
+    }
+    users, profiles = [], {}
+    for name, (skills, industries) in specs.items():
+        user = User(email=f"matching_{name}@example.com", founder_psychology="{}")
+        user.set_password("password123")
+        db.session.add(user)
+        db.session.flush()
+        profile = FounderProfile(
+            user_id=user.id,
+            primary_skills=json.dumps(skills),
+            industries_of_interest=json.dumps(industries),
+        )
+        db.session.add(profile)
+        db.session.flush()
+        founder_matching.sync_profile_tags(profile)
+        users.append(user)
+        profiles[name] = profile
+    listing = IdeaListing(
+        founder_profile_id=profiles["viewer"].id,
+        source_type="validation",
+        source_id=1,
+        title="Budgeting app",
+        industry="FinTech",
+        skills_needed=json.dumps(["ui design", "Python"]),
+        is_active=True,
+    )
+    db.session.add(listing)
+    db.session.flush()
+    founder_matching.sync_listing_tags(listing)
+    db.session.commit()
+    yield profiles, listing
+
+    profile_ids = [p.id for p in profiles.values()]
+    IdeaListingTag.query.filter_by(idea_listing_id=listing.id).delete()
+    IdeaListing.query.filter_by(id=listing.id).delete()
+    FounderProfileTag.query.filter(FounderProfileTag.founder_profile_id.in_(profile_ids)).delete(synchronize_session=False)
+    FounderProfile.query.filter(FounderProfile.id.in_(profile_ids)).delete(synchronize_session=False)
+    User.query.filter(User.id.in_([u.id for u in users])).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def test_normalize_tags():
+    assert founder_matching.normalize_tag("  Machine \t Learning ") == "machine learning"
+    assert founder_matching.normalize_tags(["Go", "go ", "", None, "Rust"]) == ["go", "rust"]
+    assert founder_matching.parse_tag_param("UI Design, figma,,") == ["ui design", "figma"]
+
+
+def test_sync_replaces_tags(founders):
+    profiles, _ = founders
+    profile = profiles["engineer"]
+    profile.primary_skills = json.dumps(["Go"])
+    founder_matching.sync_profile_tags(profile)
+    db.session.commit()
+
+    tags = {(t.kind, t.tag) for t in FounderProfileTag.query.filter_by(founder_profile_id=profile.id)}
+    assert tags == {("skill", "go"), ("industry", "health")}
+
+
+def test_tag_filter_matches_substrings_case_insensitively(founders):
+    profiles, _ = founders
+    ids = {p.id for p in profiles.values()}
+    query = FounderProfile.query.filter(FounderProfile.id.in_(ids))
+
+    def matching(kind, tags):
+        return {p.id for p in query.filter(*founder_matching.profile_tag_filter(kind, tags))}
+
+    assert matching("skill", ["ui design"]) == {profiles["designer"].id, profiles["designer_other"].id}
+    # Every requested tag must be present
+    assert matching("skill", ["ui design", "figma"]) == {profiles["designer"].id}
+    # Substrings within a tag, like the old ILIKE filters
+    assert matching("skill", ["design"]) == {profiles["designer"].id, profiles["designer_other"].id}
+    assert matching("skill", ["Fig"]) == {profiles["designer"].id}
+    # ...but not across tags, and LIKE wildcards are literal
+    assert matching("skill", ["design, figma"]) == set()
+    assert matching("skill", ["%"]) == set()
+    assert matching("industry", ["health"]) == {profiles["designer"].id, profiles["engineer"].id}
+
+
+def test_viewer_tags_exclude_own_skills_from_needed(founders):
+    profiles, _ = founders
+    viewer = founder_matching.viewer_tags(profiles["viewer"])
+    assert viewer["skills"] == {"python", "backend"}
+    assert viewer["industries"] == {"fintech"}
+    assert viewer["needed"] == {"ui design"}
+
+
+def test_profile_ranking_prefers_complementary_founders(founders):
+    profiles, _ = founders
+    scores = founder_matching.profile_match_scores(founder_matching.viewer_tags(profiles["viewer"]))
+    candidates = [profiles["designer"].id, profiles["designer_other"].id, profiles["engineer"].id]
+    match_score = func.coalesce(scores.c.score, 0)
+    rows = db.session.query(FounderProfile.id, match_score).filter(
+        FounderProfile.id.in_(candidates)
+    ).outerjoin(scores, scores.c.founder_profile_id == FounderProfile.id).order_by(match_score.desc()).all()
+
+    # Needed skill (2) + shared industry (1), needed skill only, nothing
+    assert rows == [(profiles["designer"].id, 3), (profiles["designer_other"].id, 2), (profiles["engineer"].id, 0)]
+
+
+def test_listing_scores(founders):
+    profiles, listing = founders
+    viewer = founder_matching.viewer_tags(profiles["engineer"])
+    scores = founder_matching.listing_match_scores(viewer)
+    score = db.session.query(
+        func.coalesce(scores.c.score, 0) + founder_matching.listing_industry_bonus(viewer)
+    ).select_from(IdeaListing).outerjoin(scores, scores.c.idea_listing_id == IdeaListing.id).filter(
+        IdeaListing.id == listing.id
+    ).scalar()
+    # Needs the engineer's "python"; industry FinTech is not theirs
+    assert score == 2
+
+
+def test_no_scores_without_viewer_tags():
+    empty = founder_matching.viewer_tags(None)
+    assert founder_matching.profile_match_scores(empty) is None
+    assert founder_matching.listing_match_scores(empty) is None
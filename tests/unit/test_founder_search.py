@@ -0,0 +1,137 @@
+"""
+Unit tests for Founder Connect full-text search (SQLite FTS5 backend).
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, FounderProfile, IdeaListing
+from app.services import founder_search
+
+
+@pytest.fixture
+def listings(app):
+    user = User(email="search_owner@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    profile = FounderProfile(
+        user_id=user.id,
+        looking_for="A technical co-founder for budgeting tools",
+        bio="Private bio mentioning budgeting",
+    )
+    db.session.add(profile)
+    db.session.flush()
+    founder_search.index_profile(profile)
+    specs = [
+        ("Budgeting app for students", "Track spending <script>alert(1)</script> easily"),
+        ("Meal planner", "Helps families with grocery budgets and budgeting"),
+        ("Dog walking marketplace", "Connects owners and walkers"),
+    ]
+    created = []
+    for title, description in specs:
+        listing = IdeaListing(
+            founder_profile_id=profile.id,
+            source_type="validation",
+            source_id=1,
+            title=title,
+            brief_description=description,
+        )
+        db.session.add(listing)
+        db.session.flush()
+        founder_search.index_listing(listing)
+        created.append(listing)
+    db.session.commit()
+    yield profile, created
+
+    IdeaListing.query.filter(IdeaListing.id.in_([l.id for l in created])).delete(synchronize_session=False)
+    FounderProfile.query.filter_by(id=profile.id).delete()
+    User.query.filter_by(id=user.id).delete()
+    db.session.commit()
+    founder_search.rebuild_search_index()
+
+
+def _ranked_ids(subquery, ids):
+    rows = db.session.execute(
+        select(subquery.c.id).where(subquery.c.id.in_(ids)).order_by(subquery.c.rank.desc())
+    ).scalars()
+    return list(rows)
+
+
+def test_parse_terms_strips_query_syntax():
+    assert founder_search.parse_terms('Budget "apps" OR NEAR(x*)') == ["budget", "apps", "or", "near", "x"]
+    assert founder_search.parse_terms("  ") == []
+    assert founder_search.listing_matches("!!!") is None
+
+
+def test_backend_is_fts5(listings):
+    # The first search creates and backfills the FTS tables
+    assert founder_search._backend(build=True) == founder_search.BACKEND_FTS5
+    assert founder_search._backend() == founder_search.BACKEND_FTS5
+
+
+def test_backend_choice_is_reprobed_after_ttl(listings, monkeypatch):
+    key = str(db.engine.url)
+    monkeypatch.setitem(founder_search._backends, key, (founder_search.BACKEND_LIKE, time.monotonic()))
+    assert founder_search._backend() == founder_search.BACKEND_LIKE
+
+    monkeypatch.setattr(founder_search, "FOUNDER_SEARCH_BACKEND_TTL_SECONDS", 0)
+    assert founder_search._backend() == founder_search.BACKEND_FTS5
+
+    monkeypatch.setattr(founder_search, "FOUNDER_SEARCH_BACKEND_TTL_SECONDS", 300)
+    founder_search._backends[key] = (founder_search.BACKEND_LIKE, time.monotonic())
+    founder_search.forget_backend()
+    assert founder_search._backend() == founder_search.BACKEND_FTS5
+
+
+def test_title_matches_rank_above_description_matches(listings):
+    _, (budget_app, meal_planner, dog_walking) = listings
+    ids = [budget_app.id, meal_planner.id, dog_walking.id]
+    assert _ranked_ids(founder_search.listing_matches("budgeting"), ids) == [budget_app.id, meal_planner.id]
+
+
+def test_all_terms_required_and_last_term_is_prefix(listings):
+    _, (budget_app, meal_planner, dog_walking) = listings
+    ids = [budget_app.id, meal_planner.id, dog_walking.id]
+    assert _ranked_ids(founder_search.listing_matches("dog walk"), ids) == [dog_walking.id]
+    assert _ranked_ids(founder_search.listing_matches("budgeting stud"), ids) == [budget_app.id]
+    assert _ranked_ids(founder_search.listing_matches("dog budgeting"), ids) == []
+
+
+def test_reindex_on_edit(listings):
+    _, (budget_app, _, dog_walking) = listings
+    dog_walking.title = "Cat sitting marketplace"
+    founder_search.index_listing(dog_walking)
+    db.session.commit()
+
+    ids = [budget_app.id, dog_walking.id]
+    assert _ranked_ids(founder_search.listing_matches("dog"), ids) == []
+    assert _ranked_ids(founder_search.listing_matches("cat"), ids) == [dog_walking.id]
+
+
+def test_snippets_are_escaped_and_highlighted(listings):
+    _, (budget_app, _, _) = listings
+    snippet = founder_search.listing_snippets("spending", [budget_app.id])[budget_app.id]
+    assert "<mark>spending</mark>" in snippet
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+
+
+def test_profile_snippet_only_uses_public_field(listings):
+    profile, _ = listings
+    assert _ranked_ids(founder_search.profile_matches("private"), [profile.id]) == [profile.id]
+    snippet = founder_search.profile_snippets("private", [profile.id])[profile.id]
+    assert "Private" not in snippet
+    assert "co-founder" in snippet
+
+
+def test_python_highlight_fallback():
+    snippet = founder_search._highlight("Tools for <b>budget</b> planning", ["budget"])
+    assert snippet == "Tools for &lt;b&gt;<mark>budget</mark>&lt;/b&gt; planning"
@@ -0,0 +1,62 @@
+"""
+Unit tests for the in-process background job queue used by async validations.
+"""
+import sys
+import threading
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.job_queue import JobQueue, JobStatus
+
+
+def test_job_runs_off_thread_and_streams_events():
+    queue = JobQueue("test", max_workers=1)
+    release = threading.Event()
+
+    def work(job, value):
+        release.wait(5)
+        job.publish("completed", value=value)
+        return value * 2
+
+    job = queue.submit(work, 21, job_id="val_1")
+    assert queue.get("val_1") is job
+    assert job.status in (JobStatus.PENDING, JobStatus.RUNNING)
+
+    release.set()
+    events = [event["event"] for event in job.events(timeout=5)]
+
+    assert events == ["status", "status", "completed"]
+    assert job.status == JobStatus.COMPLETED
+    assert job.result == 42
+
+
+def test_failing_job_publishes_failed_event():
+    queue = JobQueue("test", max_workers=1)
+
+    def work(job):
+        raise ValueError("model unavailable")
+
+    job = queue.submit(work)
+    events = list(job.events(timeout=5))
+
+    assert events[-1]["event"] == "failed"
+    assert events[-1]["error_type"] == "ValueError"
+    assert job.status == JobStatus.FAILED
+    assert job.error == "model unavailable"
+
+
+def test_job_can_mark_itself_failed():
+    queue = JobQueue("test", max_workers=1)
+
+    def work(job):
+        job.status = JobStatus.FAILED
+        job.publish("failed", error="unparseable output")
+
+    job = queue.submit(work)
+    list(job.events(timeout=5))
+
+    assert job.status == JobStatus.FAILED
+    assert queue.get_stats()["jobs"] == {JobStatus.FAILED: 1}
@@ -0,0 +1,66 @@
+"""
+Unit tests for the JSON codec layer and raw fragment splicing.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import json_helpers
+from app.utils.json_helpers import ORJSON_AVAILABLE, RawJSON, dumps_with_raw, json_dumps, json_loads, safe_json_loads, sse_event
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "stdlib"])
+def codec(request, monkeypatch):
+    if request.param and not json_helpers.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_helpers, "ORJSON_AVAILABLE", request.param)
+    return request.param
+
+
+def test_codec_roundtrip(codec):
+    obj = {"text": "café ✓", "n": [1, 2.5, None, True], 3: "int key", "big": 2 ** 70}
+    encoded = json_dumps(obj)
+    assert json_loads(encoded) == json.loads(json.dumps(obj))
+    assert safe_json_loads("{not json", default={"fallback": 1}) == {"fallback": 1}
+    assert sse_event({"event": "delta", "text": "a\nb"}) == 'data: {"event":"delta","text":"a\\nb"}\n\n'
+
+
+def test_raw_fragments_are_spliced_verbatim(codec):
+    stored = json.dumps({"personalized_recommendations": "1. **Idea** \"quoted\" ✓"})
+    body = dumps_with_raw({
+        "run": {"reports": RawJSON(stored), "inputs": RawJSON(None), "ideas": RawJSON("[1, 2]")},
+        # A user string that looks like a placeholder must come through untouched
+        "note": "__raw_json_0000000000000000_0__",
+    })
+    assert stored.encode("utf-8") in body
+    decoded = json.loads(body)
+    assert decoded["run"] == {"reports": json.loads(stored), "inputs": {}, "ideas": [1, 2]}
+    assert decoded["note"] == "__raw_json_0000000000000000_0__"
+
+
+def test_malformed_fragments_fall_back_to_default():
+    assert RawJSON("").text == "{}"
+    assert RawJSON('{"truncated": ').text == "{}"
+    assert RawJSON("null", default="[]").text == "[]"
+    assert RawJSON(b' {"a": 1} ').text == '{"a": 1}'
+    # Only the cheap checks unless asked to validate
+    assert RawJSON('{"a": }').text == '{"a": }'
+    assert RawJSON('{"a": }', validate=True).text == "{}"
+    assert RawJSON('{"a": 1}{"b": 2}', validate=True).text == "{}"
+
+
+def test_non_finite_floats_are_written_as_null(codec):
+    assert json_loads(json_dumps({"score": float("nan"), "ok": [float("inf"), 1.5]})) == {"score": None, "ok": [None, 1.5]}
+
+
+@pytest.mark.skipif(not ORJSON_AVAILABLE, reason="orjson not installed")
+def test_stdlib_only_fragments_are_reserialized():
+    raw = RawJSON('{"score": NaN, "ok": [1]}', validate=True)
+    assert raw.text == '{"score":null,"ok":[1]}'
+    assert json_loads(dumps_with_raw({"r": raw}))["r"] == {"score": None, "ok": [1]}
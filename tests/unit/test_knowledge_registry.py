@@ -0,0 +1,96 @@
+"""
+Unit tests for the preloaded static knowledge registry.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.knowledge_registry import KnowledgeRegistry, _frozen_object, _tool_strings, thaw
+
+
+def _write(path: Path, data: dict, mtime_ns: int = None) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def registry(tmp_path):
+    tools = tmp_path / "static_data"
+    research = tmp_path / "domain_research"
+    tools.mkdir()
+    research.mkdir()
+    _write(tools / "ai.json", {"market_trends": "Agents", "market_size": 12})
+    _write(research / "ai.json", {"market_trends": "Growing", "sources": ["a", "b"]})
+    (research / "broken.json").write_text("{not json", encoding="utf-8")
+    return KnowledgeRegistry(
+        sources={"static_data": (tools, _tool_strings), "domain_research": (research, _frozen_object)},
+        reload_seconds=0,
+    )
+
+
+def test_lookups_are_frozen_and_shared(registry):
+    tools = registry.get("static_data", "ai")
+    assert dict(tools) == {"market_trends": "Agents", "market_size": "12"}
+    assert registry.get("static_data", "ai") is tools
+    with pytest.raises(TypeError):
+        tools["market_trends"] = "changed"
+
+    research = registry.get("domain_research", "ai")
+    assert research["sources"] == ("a", "b")
+    assert thaw(research) == {"market_trends": "Growing", "sources": ["a", "b"]}
+    # Unparseable files are skipped, missing keys return None
+    assert registry.get("domain_research", "broken") is None
+    assert registry.get("static_data", "fintech") is None
+    assert registry.stats["loads"] == 1
+
+
+def test_refresh_reloads_only_changed_files(registry, tmp_path):
+    before = registry.get("static_data", "ai")
+    research = registry.get("domain_research", "ai")
+    parsed = registry.stats["files_parsed"]
+    assert registry.refresh() == 0
+
+    _write(tmp_path / "static_data" / "ai.json", {"market_trends": "Copilots"}, mtime_ns=2_000_000_000_000_000_000)
+    _write(tmp_path / "static_data" / "fintech.json", {"risks": "Regulation"})
+    (tmp_path / "domain_research" / "ai.json").unlink()
+    assert registry.refresh() == 3
+    assert registry.stats["files_parsed"] == parsed + 2
+
+    assert registry.get("static_data", "ai")["market_trends"] == "Copilots"
+    assert registry.get("static_data", "fintech")["risks"] == "Regulation"
+    assert registry.get("domain_research", "ai") is None
+    # Readers holding the old snapshot are unaffected
+    assert before["market_trends"] == "Agents"
+    assert research["market_trends"] == "Growing"
+
+
+def test_put_updates_entry_without_rescan(registry, tmp_path):
+    path = tmp_path / "domain_research" / "ai.json"
+    data = {"market_trends": "Growing", "competitor_overview": "Crowded"}
+    _write(path, data)
+    registry.put("domain_research", "ai", data)
+    assert registry.get("domain_research", "ai")["competitor_overview"] == "Crowded"
+    # The file stamp was recorded, so the watcher doesn't parse it again
+    assert registry.refresh() == 0
+
+
+def test_static_loaders_read_from_registry(app):
+    from app.services.static_tool_loader import StaticToolLoader
+    from app.utils.domain_research import load_domain_research
+
+    with app.app_context():
+        tools = StaticToolLoader.load("AI / Automation")
+        assert tools and all(isinstance(v, str) for v in tools.values())
+        assert StaticToolLoader.load("AI / Automation") is tools
+        assert "market_trends" in tools.copy()
+        assert StaticToolLoader.load("Unknown area") == {}
+        research = load_domain_research("Business Strategy")
+        assert research["market_trends"] and not isinstance(research, dict)
@@ -0,0 +1,118 @@
+"""
+Unit tests for the layered (memory -> Redis -> database) tool cache.
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.layered_cache import (
+    CacheTier, LayeredCache, MemoryTier, DatabaseTier, HitCountBuffer,
+)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(max_entries=2, max_ttl=60)
+    tier.set("a", "1", ttl=60)
+    tier.set("b", "2", ttl=60)
+    assert tier.get("a")[0] == "1"  # "a" is now most recently used
+    tier.set("c", "3", ttl=60)
+
+    assert tier.get("b") is None
+    assert tier.get("a")[0] == "1"
+    assert tier.get("c")[0] == "3"
+
+
+def test_memory_tier_expires_and_caps_ttl():
+    tier = MemoryTier(max_entries=10, max_ttl=0.05)
+    tier.set("a", "1", ttl=3600)
+    assert tier.get("a")[1] <= 0.05
+    time.sleep(0.06)
+    assert tier.get("a") is None
+
+
+@pytest.fixture
+def layered(app):
+    from app.models.database import db, ToolCacheEntry
+    cache = LayeredCache(
+        [MemoryTier(max_entries=10, max_ttl=60), DatabaseTier()],
+        hit_counter=HitCountBuffer(interval=0),
+    )
+    yield cache
+    ToolCacheEntry.query.filter(ToolCacheEntry.cache_key.like("test:%")).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def test_database_hit_is_promoted_and_counted_without_commit(layered):
+    from app.models.database import db, ToolCacheEntry
+
+    layered.set("test:key", '{"x": 1}', ttl_seconds=3600, tool_name="test_tool")
+    layered.clear_local()
+
+    assert layered.get("test:key") == '{"x": 1}'  # database hit
+    assert layered.get("test:key") == '{"x": 1}'  # memory hit
+
+    stats = layered.get_stats()
+    assert stats["tiers"]["memory"]["hits"] == 1
+    assert stats["tiers"]["memory"]["misses"] == 1
+    assert stats["tiers"]["database"]["hits"] == 1
+    assert stats["hit_counts"]["pending"] == 2
+
+    entry = ToolCacheEntry.query.filter_by(cache_key="test:key").first()
+    assert entry.hit_count == 0
+
+    assert layered.hit_counter.flush() == 1
+    db.session.expire_all()
+    entry = ToolCacheEntry.query.filter_by(cache_key="test:key").first()
+    assert entry.hit_count == 2
+    assert layered.get_stats()["hit_counts"]["pending"] == 0
+
+
+def test_expired_database_entry_is_a_miss(layered):
+    layered.set("test:expired", "value", ttl_seconds=-1, tool_name="test_tool")
+    layered.clear_local()
+    assert layered.get("test:expired") is None
+
+
+def test_failing_tier_is_skipped(layered):
+    class BrokenTier(MemoryTier):
+        name = "redis"
+
+        def get(self, key):
+            raise ConnectionError("redis down")
+
+    layered.tiers.insert(1, BrokenTier())
+    layered.set("test:broken", "value", ttl_seconds=3600, tool_name="test_tool")
+
+    layered.clear_local()
+    assert layered.get("test:broken") == "value"
+    assert layered.get_stats()["tiers"]["redis"]["errors"] == 1
+
+
+def test_cache_tier_requires_get_set_delete():
+    class Incomplete(CacheTier):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_database_tier_error_rolls_back_session(app, monkeypatch):
+    from app.models.database import db, ToolCacheEntry
+
+    class BrokenQuery:
+        def filter_by(self, **kwargs):
+            raise RuntimeError("relation tool_cache does not exist")
+
+    rollbacks = []
+    monkeypatch.setattr(ToolCacheEntry, "query", BrokenQuery())
+    monkeypatch.setattr(db.session, "rollback", lambda: rollbacks.append(True))
+    with pytest.raises(RuntimeError):
+        DatabaseTier().get("test:key")
+    assert rollbacks == [True]
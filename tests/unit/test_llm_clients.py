@@ -0,0 +1,97 @@
+"""
+Unit tests for the shared LLM client registry.
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.llm_clients import LLMClientRegistry, ANTHROPIC_AVAILABLE
+
+
+@pytest.fixture
+def registry():
+    reg = LLMClientRegistry(max_retries=1)
+    yield reg
+    reg.close_all()
+
+
+def test_same_key_returns_shared_client(registry):
+    first = registry.get_openai("sk-test-one")
+    assert registry.get_openai("sk-test-one") is first
+    assert registry.get_openai("sk-test-two") is not first
+    assert first.max_retries == 1
+
+    stats = registry.get_stats()
+    assert stats["clients_created"] == 2
+    assert stats["lookups"] == 3
+    assert all("sk-test" not in client["key"] for client in stats["clients"])
+
+
+def test_concurrent_lookups_create_one_client(registry):
+    seen = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        seen.append(registry.get_openai("sk-test-concurrent"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({id(client) for client in seen}) == 1
+    assert registry.created == 1
+
+
+def test_lookups_survive_concurrent_close(registry):
+    errors = []
+    stop = threading.Event()
+
+    def worker():
+        try:
+            while not stop.is_set():
+                registry.get_openai("sk-test-closing")
+                registry.get_stats()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(50):
+        registry.close_all()
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+
+def test_options_get_their_own_client(registry):
+    default = registry.get_openai("sk-test-opts")
+    patient = registry.get_openai("sk-test-opts", max_retries=5)
+    assert patient is not default
+    assert patient.max_retries == 5
+
+
+@pytest.mark.skipif(not ANTHROPIC_AVAILABLE, reason="anthropic not installed")
+def test_providers_are_separate(registry):
+    assert registry.get_anthropic("sk-test-shared") is not registry.get_openai("sk-test-shared")
+
+
+def test_validation_client_reused_across_calls(app, monkeypatch):
+    from app.routes import validation
+
+    monkeypatch.setattr(validation, "VALIDATION_MODEL_PROVIDER", "openai")
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-validation")
+    first, model, is_claude = validation._get_validation_client()
+    second, _, _ = validation._get_validation_client()
+    assert second is first
+    assert (model, is_claude) == ("gpt-4o", False)
@@ -0,0 +1,143 @@
+"""
+Unit tests for the Prometheus metrics registry and context-local run metrics.
+"""
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import metrics
+from app.utils.metrics import MetricsRegistry
+from app.utils.performance_metrics import (
+    get_current_metrics, record_tool_call, run_in_metrics_context, start_metrics_collection,
+)
+
+
+def _registry(directory=None):
+    registry = MetricsRegistry(multiproc_dir=str(directory) if directory else "")
+    requests_total = registry.counter("requests_total", "Requests.", ["route"])
+    active = registry.gauge("active", "Active streams.", ["endpoint"])
+    latency = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=(1.0, 5.0))
+    return registry, requests_total, active, latency
+
+
+def test_render_text_format():
+    registry, requests_total, active, latency = _registry()
+    requests_total.inc(route='a"b')
+    requests_total.inc(2, route='a"b')
+    active.set(3, endpoint="discovery")
+    for value in (0.5, 2.0, 7.0):
+        latency.observe(value, stage="stage1")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="a\\"b"} 3' in text
+    assert 'active{endpoint="discovery"} 3' in text
+    assert 'latency_seconds_bucket{stage="stage1",le="1"} 1' in text
+    assert 'latency_seconds_bucket{stage="stage1",le="5"} 2' in text
+    assert 'latency_seconds_bucket{stage="stage1",le="+Inf"} 3' in text
+    assert 'latency_seconds_sum{stage="stage1"} 9.5' in text
+    assert 'latency_seconds_count{stage="stage1"} 3' in text
+
+
+def _dead_snapshot(pid, requests=4.0):
+    # Snapshot left behind by a worker that has since exited
+    return {
+        "pid": pid,
+        "time": 0,
+        "metrics": {
+            "requests_total": [[["x"], requests]],
+            "active": [[["discovery"], 5.0]],
+            "latency_seconds": [[["stage2"], {"buckets": [1, 0], "sum": 0.5, "count": 1}]],
+        },
+    }
+
+
+def test_multiprocess_merge_drops_dead_worker_gauges(tmp_path):
+    registry, requests_total, active, latency = _registry(tmp_path)
+    requests_total.inc(route="x")
+    active.inc(endpoint="discovery")
+    latency.observe(2.0, stage="stage2")
+
+    dead_pid = 2 ** 22 + 12345
+    (tmp_path / f"metrics-{dead_pid}-0123456789ab.json").write_text(json.dumps(_dead_snapshot(dead_pid)))
+    (tmp_path / "metrics-999-0123456789ab.json").write_text("{\"trunc")
+
+    merged = registry.collect()
+    assert merged["requests_total"][("x",)] == 5.0
+    assert merged["active"][("discovery",)] == 1.0
+    assert merged["latency_seconds"][("stage2",)] == {"buckets": [1, 1], "sum": 2.5, "count": 2}
+    assert list(tmp_path.glob(".metrics-*.tmp")) == []
+
+
+@pytest.mark.skipif(not metrics.FCNTL_AVAILABLE, reason="exited workers are only retired with flock")
+def test_exited_workers_are_folded_into_one_total(tmp_path):
+    registry, requests_total, _, _ = _registry(tmp_path)
+    requests_total.inc(route="x")
+    first, second = 2 ** 22 + 12345, 2 ** 22 + 12346
+    (tmp_path / f"metrics-{first}-0123456789ab.json").write_text(json.dumps(_dead_snapshot(first)))
+    assert registry.collect()["requests_total"][("x",)] == 5.0
+
+    # A later worker exits too; the first one's total is neither lost nor counted twice
+    (tmp_path / f"metrics-{second}-ba9876543210.json").write_text(json.dumps(_dead_snapshot(second, 2.0)))
+    merged = registry.collect()
+    assert merged["requests_total"][("x",)] == 7.0
+    assert ("discovery",) not in merged["active"]
+    assert {p.name for p in tmp_path.glob("metrics-*.json")} == {
+        metrics.EXITED_SNAPSHOT, f"metrics-{os.getpid()}-{registry._instance}.json",
+    }
+    assert registry.collect()["requests_total"][("x",)] == 7.0
+
+
+def test_reused_pid_gets_its_own_snapshot(tmp_path):
+    # A previous worker with this pid exited without its file being retired
+    (tmp_path / f"metrics-{os.getpid()}-0123456789ab.json").write_text(json.dumps(_dead_snapshot(os.getpid())))
+    registry, requests_total, _, _ = _registry(tmp_path)
+    requests_total.inc(route="x")
+    assert registry.collect()["requests_total"][("x",)] == 5.0
+
+
+def test_track_stream_counts_active_streams():
+    before = metrics.SSE_ACTIVE_STREAMS.value(endpoint="test")
+    stream = metrics.track_stream("test", iter(["a", "b"]))
+    assert next(stream) == "a"
+    assert metrics.SSE_ACTIVE_STREAMS.value(endpoint="test") == before + 1
+    stream.close()  # client disconnected
+    assert metrics.SSE_ACTIVE_STREAMS.value(endpoint="test") == before
+
+
+def test_run_metrics_are_context_local():
+    barrier = threading.Barrier(4)
+
+    def run(n):
+        collector = start_metrics_collection(run_id=f"run-{n}")
+        barrier.wait()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(run_in_metrics_context(record_tool_call, f"tool-{n}", 0.1, cache_hit=True)) for _ in range(3)]
+            for future in futures:
+                future.result()
+        assert get_current_metrics() is collector
+        return collector
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        collectors = list(executor.map(run, range(4)))
+
+    for n, collector in enumerate(collectors):
+        assert [call.tool_name for call in collector.tool_calls] == [f"tool-{n}"] * 3
+    assert metrics.TOOL_CALLS.value(tool="tool-0", cache="hit") >= 3
+
+
+def test_metrics_endpoint_requires_admin(client):
+    assert client.get("/metrics").status_code == 403
+    response = client.get("/metrics", headers={"Authorization": "Bearer test-admin-password"})
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert "# TYPE llm_request_duration_seconds histogram" in response.get_data(as_text=True)
@@ -0,0 +1,109 @@
+"""
+Unit tests for shared keyset/offset pagination.
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserRun
+from app.utils import pagination
+from app.utils.pagination import CursorError, PageArgs, decode_cursor, encode_cursor, paginate, parse_page_args
+
+
+@pytest.fixture
+def runs_user(app):
+    user = User(email="pagination@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    # 7 runs, several sharing a created_at so the id tiebreaker matters
+    for i in range(7):
+        db.session.add(UserRun(user_id=user.id, run_id=f"page_run_{user.id}_{i}", created_at=base + timedelta(minutes=i // 3)))
+    db.session.commit()
+    pagination._count_cache.clear()
+    yield user
+    UserRun.query.filter_by(user_id=user.id).delete()
+    User.query.filter_by(id=user.id).delete()
+    db.session.commit()
+
+
+def _query(user):
+    return UserRun.query.filter_by(user_id=user.id, is_deleted=False)
+
+
+def _expected_order(user):
+    runs = _query(user).all()
+    return [r.id for r in sorted(runs, key=lambda r: (r.created_at, r.id), reverse=True)]
+
+
+def test_cursor_roundtrip_and_rejects_garbage():
+    created = datetime(2026, 3, 4, 5, 6, 7, 890)
+    assert decode_cursor(encode_cursor(created, 42)) == (created, 42)
+    for bad in ("not-a-cursor", encode_cursor(None, 1), "e30"):
+        with pytest.raises(CursorError):
+            decode_cursor(bad)
+
+
+def test_parse_page_args_clamps():
+    args = parse_page_args(MultiDict({"page": "0", "per_page": "1000", "total": "bogus", "runs_cursor": "abc"}), cursor_param="runs_cursor")
+    assert args.page == 1
+    assert args.per_page == 100
+    assert args.total is None
+    assert args.cursor == "abc"
+
+
+def test_cursor_walk_visits_every_row_once(runs_user):
+    seen = []
+    args = PageArgs(per_page=3)
+    while True:
+        page = paginate(_query(runs_user), UserRun.created_at, UserRun.id, args)
+        seen += [r.id for r in page.items]
+        if not page.has_more:
+            assert page.next_cursor is None
+            break
+        args = PageArgs(per_page=3, cursor=page.next_cursor)
+    assert seen == _expected_order(runs_user)
+
+
+def test_offset_pages_match_cursor_pages(runs_user):
+    first = paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(per_page=3))
+    by_offset = paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(page=2, per_page=3))
+    by_cursor = paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(per_page=3, cursor=first.next_cursor))
+    assert [r.id for r in by_offset.items] == [r.id for r in by_cursor.items]
+    assert first.to_dict()["total"] == 7
+    assert first.to_dict()["pages"] == 3
+    assert by_cursor.page is None
+
+
+def test_total_modes(runs_user):
+    first = paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(per_page=3))
+    cursor_args = PageArgs(per_page=3, cursor=first.next_cursor)
+
+    # Cursor mode defaults to a cached total: a new row doesn't change it until the entry expires
+    assert paginate(_query(runs_user), UserRun.created_at, UserRun.id, cursor_args).total == 7
+    db.session.add(UserRun(user_id=runs_user.id, run_id=f"page_run_{runs_user.id}_new"))
+    db.session.commit()
+    assert paginate(_query(runs_user), UserRun.created_at, UserRun.id, cursor_args).total == 7
+
+    exact = PageArgs(per_page=3, cursor=first.next_cursor, total="exact")
+    assert paginate(_query(runs_user), UserRun.created_at, UserRun.id, exact).total == 8
+    none = paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(per_page=3, total="none"))
+    assert none.total is None
+    assert none.to_dict()["pages"] is None
+
+
+def test_ranked_order_is_offset_only(runs_user):
+    ranked = [UserRun.run_id.asc()]
+    page = paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(per_page=3), order_by=ranked)
+    assert page.has_more is True
+    assert page.next_cursor is None
+    with pytest.raises(CursorError):
+        paginate(_query(runs_user), UserRun.created_at, UserRun.id, PageArgs(per_page=3, cursor=encode_cursor(datetime.now(), 1)), order_by=ranked)
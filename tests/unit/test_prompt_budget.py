@@ -0,0 +1,68 @@
+"""
+Unit tests for prompt token budgeting and packing.
+"""
+import sys
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services import prompt_budget
+from app.services.prompt_budget import Fragment, count_tokens, pack, truncate_to_tokens
+
+
+def test_count_tokens_is_memoized():
+    prompt_budget._count.cache_clear()
+    text = "Static research block about market trends. " * 20
+    first = count_tokens(text)
+    assert first > 0
+    assert count_tokens(text) == first
+    info = prompt_budget._count.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+    assert count_tokens("") == 0
+    assert count_tokens(None) == 0
+
+
+def test_truncate_to_tokens_fits_budget():
+    text = " ".join(f"word{i}" for i in range(500))
+    for limit in (5, 20, 60):
+        cut = truncate_to_tokens(text, limit)
+        assert count_tokens(cut) <= limit
+        assert cut.endswith("...")
+    assert truncate_to_tokens("short", 50) == "short"
+    assert truncate_to_tokens(text, 0) == ""
+
+
+def test_pack_respects_budget_and_priority():
+    long_text = "x " * 400
+    fragments = [
+        Fragment("profile", [long_text, "short profile"], priority=5, required=True),
+        Fragment("market_trends", ["trend " * 40, "trend " * 10], priority=3),
+        Fragment("competitors", ["rival " * 40, "rival " * 10], priority=2),
+        Fragment("viability", ["viable " * 40], priority=0.5),
+    ]
+    budget = 60
+    result = pack(fragments, budget)
+    assert result.tokens <= budget
+    assert sum(f.costs[f.variants.index(result.chosen[f.name])] for f in fragments if f.name in result.chosen) == result.tokens
+    # The required fragment is kept in its small form; higher-priority tools beat the low one
+    assert result.chosen["profile"] == "short profile"
+    assert "market_trends" in result.chosen
+    assert "viability" in result.dropped
+
+    roomy = pack(fragments, 10000)
+    assert roomy.dropped == []
+    assert roomy.chosen["profile"] == long_text
+
+
+def test_pack_keeps_required_fragment_over_budget():
+    fragments = [
+        Fragment("profile", ["p " * 100], required=True),
+        Fragment("extra", ["e " * 10, ""]),
+    ]
+    result = pack(fragments, 10)
+    assert result.chosen == {"profile": "p " * 100}
+    assert result.dropped == ["extra"]
+    assert fragments[1].variants == ["e " * 10]
@@ -0,0 +1,65 @@
+"""
+Unit tests for provider prompt-caching layout and usage reporting.
+"""
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services import prompt_cache
+from app.services.prompt_cache import PromptLayout, anthropic_messages, anthropic_system, merge_usage, usage_from_response
+
+
+def test_anthropic_breakpoints_follow_static_segments(monkeypatch):
+    monkeypatch.setattr(prompt_cache, "PROMPT_CACHE_ENABLED", True)
+    layout = PromptLayout(["instructions ", "research "], "user data")
+    content = anthropic_messages(layout)[0]["content"]
+    assert [block["text"] for block in content] == ["instructions ", "research ", "user data"]
+    assert [("cache_control" in block) for block in content] == [True, True, False]
+    assert anthropic_system("system")[0]["cache_control"] == {"type": "ephemeral"}
+
+    # More segments than breakpoints: the leading ones are merged
+    many = PromptLayout(["a", "b", "c", "d", "e"], "x")
+    blocks = anthropic_messages(many)[0]["content"]
+    assert [block["text"] for block in blocks] == ["abc", "d", "e", "x"]
+
+    # Plain strings are sent as before
+    assert anthropic_messages("hello") == [{"role": "user", "content": "hello"}]
+
+
+def test_caching_disabled_sends_plain_prompt(monkeypatch):
+    monkeypatch.setattr(prompt_cache, "PROMPT_CACHE_ENABLED", False)
+    layout = PromptLayout(["static "], "variable")
+    assert anthropic_messages(layout) == [{"role": "user", "content": "static variable"}]
+    assert anthropic_system("system") == "system"
+
+
+def test_usage_normalization():
+    claude = usage_from_response(
+        SimpleNamespace(input_tokens=40, cache_read_input_tokens=1500, cache_creation_input_tokens=0, output_tokens=600),
+        is_claude=True,
+    )
+    assert claude == {"input_tokens": 1540, "cached_tokens": 1500, "cache_write_tokens": 0, "output_tokens": 600}
+
+    openai = usage_from_response(
+        {"prompt_tokens": 1800, "completion_tokens": 900, "prompt_tokens_details": {"cached_tokens": 1280}},
+        is_claude=False,
+    )
+    assert openai == {"input_tokens": 1800, "cached_tokens": 1280, "cache_write_tokens": 0, "output_tokens": 900}
+
+    assert usage_from_response(None, is_claude=False)["cached_tokens"] == 0
+    assert merge_usage([claude, None, openai])["cached_tokens"] == 2780
+
+
+def test_validation_prompt_prefix_is_shared_across_users(app):
+    from app.routes.validation import _build_validation_prompts
+
+    data = {"business_archetype": "Local service", "delivery_channel": "In person", "description_structured": "Dog walking"}
+    _, first = _build_validation_prompts(data)
+    _, second = _build_validation_prompts(dict(data, description_structured="Mobile car wash"))
+    assert first.static == second.static
+    assert "Dog walking" in first.variable
+    assert "Dog walking" not in first.static_text
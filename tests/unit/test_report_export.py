@@ -0,0 +1,127 @@
+"""
+Unit tests for the streaming admin CSV export.
+"""
+import csv
+import gzip
+import io
+import sys
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, Payment, UserRun, utcnow
+from app.services.report_export import iter_keyset, iter_report_rows, iter_csv, iter_gzip
+
+ADMIN_HEADERS = {"Authorization": "Bearer test-admin-password"}
+
+
+@pytest.fixture
+def export_data(app):
+    users = []
+    for i in range(5):
+        user = User(
+            email=f"export_{i}@example.com",
+            subscription_type="pro" if i % 2 else "free",
+            payment_status="active",
+            subscription_expires_at=utcnow() + timedelta(days=10),
+            founder_psychology="{}",
+        )
+        user.set_password("password123")
+        db.session.add(user)
+        users.append(user)
+    db.session.flush()
+    for i, user in enumerate(users):
+        db.session.add(Payment(user_id=user.id, amount=Decimal("9.99"), subscription_type="pro", status="completed"))
+        db.session.add(UserRun(user_id=user.id, run_id=f"export_run_{user.id}", inputs="{}", reports="{}"))
+    db.session.commit()
+    user_ids = [u.id for u in users]
+    yield users
+    UserRun.query.filter(UserRun.user_id.in_(user_ids)).delete(synchronize_session=False)
+    Payment.query.filter(Payment.user_id.in_(user_ids)).delete(synchronize_session=False)
+    User.query.filter(User.id.in_(user_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _parse(text):
+    return list(csv.reader(io.StringIO(text)))
+
+
+def test_keyset_pages_cover_every_row_once(app, export_data):
+    ids = [row.id for row in iter_keyset([User.id, User.email], User.id, page_size=2)]
+    assert ids == sorted(ids)
+    assert set(u.id for u in export_data) <= set(ids)
+    assert len(ids) == len(set(ids))
+
+    desc = [row.id for row in iter_keyset([User.id], User.id, descending=True, page_size=2)]
+    assert desc == sorted(ids, reverse=True)
+
+
+def test_users_report_matches_model_values(app, export_data):
+    rows = _parse("".join(iter_csv(iter_report_rows("users"), chunk_bytes=64)))
+    assert rows[0][:5] == ["ID", "Email", "Subscription Type", "Payment Status", "Days Remaining"]
+    by_email = {row[1]: row for row in rows[1:]}
+    for user in export_data:
+        assert by_email[user.email][4] == str(user.days_remaining())
+
+
+def test_payments_and_activity_project_user_email(app, export_data):
+    payments = _parse("".join(iter_csv(iter_report_rows("payments"))))
+    assert {row[1] for row in payments[1:]} >= {u.email for u in export_data}
+
+    activity = _parse("".join(iter_csv(iter_report_rows("activity"))))
+    runs = [row for row in activity[1:] if row[0] == "Run" and row[3].startswith("export_run_")]
+    assert len(runs) == len(export_data)
+
+
+def test_subscriptions_report_status(app, export_data):
+    rows = _parse("".join(iter_csv(iter_report_rows("subscriptions"))))
+    pro = [row for row in rows[1:] if row[0].startswith("export_")]
+    assert len(pro) == 2
+    assert all(row[1] == "pro" and row[2] == "active" for row in pro)
+
+
+def test_endpoint_streams_gzip(client, export_data):
+    response = client.get("/api/admin/reports/export?type=revenue&gzip=true", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers["Content-Disposition"].endswith(".csv.gz")
+    rows = _parse(gzip.decompress(response.data).decode("utf-8"))
+    assert rows[0][0] == "Period"
+    assert int(rows[-1][2]) >= len(export_data)
+
+
+def test_endpoint_fails_before_streaming_when_first_page_fails(client, monkeypatch):
+    def broken(report_type):
+        raise RuntimeError("no such table")
+        yield
+
+    monkeypatch.setattr("app.routes.admin.iter_report_rows", broken)
+    response = client.get("/api/admin/reports/export?type=users", headers=ADMIN_HEADERS)
+    assert response.status_code == 500
+
+
+def test_endpoint_aborts_stream_on_later_error(app, client, monkeypatch):
+    # In DEBUG the after_request logger reads (and buffers) the response body
+    monkeypatch.setitem(app.config, "DEBUG", False)
+
+    def flaky(report_type):
+        yield ["ID", "Email"]
+        yield [1, "x" * 70000]
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr("app.routes.admin.iter_report_rows", flaky)
+    response = client.get("/api/admin/reports/export?type=users", headers=ADMIN_HEADERS)
+    assert response.status_code == 200
+    with pytest.raises(RuntimeError):
+        response.get_data()
+
+
+def test_gzip_stream_round_trips():
+    chunks = ["a,b\r\n", "1,2\r\n" * 1000]
+    assert gzip.decompress(b"".join(iter_gzip(chunks))).decode("utf-8") == "".join(chunks)
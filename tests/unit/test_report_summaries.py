@@ -0,0 +1,144 @@
+"""
+Unit tests for denormalized run/validation summaries.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import defer
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserRun, UserValidation
+from app.services.report_summaries import (
+    apply_run_summary, backfill_summaries, parse_ideas, run_summary_dict, run_summary_dicts, summarize_run,
+    summarize_validation, validation_summary_dicts,
+)
+
+RECOMMENDATIONS = """### Comprehensive Recommendation Report
+
+1. **AI Bookkeeping for Freelancers**
+Why it fits now: Freelancers lose hours to invoices. Tools are cheap.
+
+2. **Local Pet Care Marketplace**
+Connects owners with vetted sitters.
+   1. Start in one city
+   2. Expand later
+
+3. **Climate Reporting SaaS** - for SMEs
+Regulation is coming.
+
+4. **Tutoring Co-op**
+Group sessions.
+"""
+
+
+@pytest.fixture
+def summary_user(app):
+    user = User(email="summaries@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.commit()
+    yield user
+    UserRun.query.filter_by(user_id=user.id).delete()
+    UserValidation.query.filter_by(user_id=user.id).delete()
+    User.query.filter_by(id=user.id).delete()
+    db.session.commit()
+
+
+def test_parse_ideas_numbered_list():
+    ideas = parse_ideas(RECOMMENDATIONS)
+    assert [i["title"] for i in ideas] == [
+        "AI Bookkeeping for Freelancers", "Local Pet Care Marketplace", "Climate Reporting SaaS", "Tutoring Co-op",
+    ]
+    assert ideas[0]["summary"] == "Freelancers lose hours to invoices."
+    assert [i["index"] for i in parse_ideas(RECOMMENDATIONS, limit=2)] == [1, 2]
+
+
+def test_parse_ideas_heading_fallback_skips_report_sections():
+    markdown = "## Recommendation Matrix\ntable\n## Mobile Coffee Cart\nLow capex. Start now.\n### Risk Radar\nnone"
+    assert [i["title"] for i in parse_ideas(markdown)] == ["Mobile Coffee Cart"]
+    assert parse_ideas("") == []
+
+
+def test_summarize_run_and_validation():
+    summary = summarize_run(json.dumps({"interest_area": "Fintech"}), {"personalized_recommendations": RECOMMENDATIONS})
+    assert summary["idea_count"] == 4
+    assert summary["top_idea_title"] == "AI Bookkeeping for Freelancers"
+    assert summary["interest_area"] == "Fintech"
+    assert len(json.loads(summary["top_ideas"])) == 3
+    assert summarize_run(None, "not json")["idea_count"] == 0
+
+    validation = summarize_validation(
+        json.dumps({"industry": "Health"}), "A clinic booking app. It reminds patients.", json.dumps({"overall_score": "7.5"}),
+    )
+    assert validation == {"overall_score": 7.5, "idea_title": "A clinic booking app.", "interest_area": "Health"}
+
+
+def test_backfill_fills_only_missing_summaries(summary_user):
+    reports = json.dumps({"personalized_recommendations": RECOMMENDATIONS})
+    old_run = UserRun(user_id=summary_user.id, run_id=f"summary_old_{summary_user.id}", inputs="{}", reports=reports)
+    new_run = UserRun(user_id=summary_user.id, run_id=f"summary_new_{summary_user.id}", inputs="{}", reports=reports)
+    apply_run_summary(new_run)
+    new_run.top_idea_title = "Kept"
+    validation = UserValidation(
+        user_id=summary_user.id, validation_id=f"summary_val_{summary_user.id}",
+        category_answers="{}", idea_explanation="Solar kiosks", validation_result=json.dumps({"overall_score": 6}),
+    )
+    db.session.add_all([old_run, new_run, validation])
+    db.session.commit()
+    ids = (old_run.id, new_run.id, validation.id)
+
+    # Unbackfilled rows are summarized for display without being modified
+    assert run_summary_dict(old_run)["top_ideas"][0]["title"] == "AI Bookkeeping for Freelancers"
+    assert old_run.idea_count is None
+
+    counts = backfill_summaries(batch_size=1)
+    assert counts["runs"] >= 1 and counts["validations"] >= 1
+    assert db.session.get(UserRun, ids[0]).idea_count == 4
+    assert db.session.get(UserRun, ids[1]).top_idea_title == "Kept"
+    filled = db.session.get(UserValidation, ids[2])
+    assert (filled.overall_score, filled.idea_title) == (6.0, "Solar kiosks")
+    assert backfill_summaries() == {"runs": 0, "validations": 0}
+
+
+def test_page_summaries_load_deferred_blobs_in_one_query(summary_user):
+    user_id = summary_user.id
+    reports = json.dumps({"personalized_recommendations": RECOMMENDATIONS})
+    runs = [UserRun(user_id=summary_user.id, run_id=f"summary_page_{summary_user.id}_{i}", inputs="{}", reports=reports) for i in range(4)]
+    apply_run_summary(runs[0])
+    validations = [
+        UserValidation(
+            user_id=summary_user.id, validation_id=f"summary_page_val_{summary_user.id}_{i}",
+            category_answers="{}", idea_explanation=f"Idea {i}.", validation_result=json.dumps({"overall_score": i}),
+        )
+        for i in range(3)
+    ]
+    db.session.add_all(runs + validations)
+    db.session.commit()
+    db.session.expunge_all()
+    db.session.add(summary_user)
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    run_page = UserRun.query.filter_by(user_id=user_id).options(defer(UserRun.reports)).order_by(UserRun.id).all()
+    validation_page = UserValidation.query.filter_by(user_id=user_id).options(
+        defer(UserValidation.validation_result), defer(UserValidation.category_answers),
+    ).order_by(UserValidation.id).all()
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        run_summaries = run_summary_dicts(run_page)
+        validation_summaries = validation_summary_dicts(validation_page)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert len(statements) == 2
+    assert [s["idea_count"] for s in run_summaries] == [4] * 4
+    assert [s["overall_score"] for s in validation_summaries] == [0.0, 1.0, 2.0]
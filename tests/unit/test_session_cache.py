@@ -0,0 +1,141 @@
+"""
+Unit tests for memoized session resolution and coalesced last_activity writes.
+"""
+import sys
+import secrets
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, UserSession, utcnow, normalize_datetime
+from app.utils.session_cache import session_token_cache, session_activity_tracker
+
+
+@pytest.fixture
+def user_session(app):
+    session = UserSession(
+        user_id=987654,
+        session_token=secrets.token_urlsafe(32),
+        expires_at=utcnow() + timedelta(days=7),
+        last_activity=utcnow() - timedelta(minutes=5),
+    )
+    db.session.add(session)
+    db.session.commit()
+    session_id = session.id
+    session_token_cache.clear()
+    yield session
+    session_activity_tracker.forget(session_id)
+    session_token_cache.clear()
+    UserSession.query.filter_by(id=session_id).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def select_counter(app):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "user_sessions" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", count)
+
+
+def _headers(session):
+    return {"Authorization": f"Bearer {session.session_token}"}
+
+
+def test_session_resolved_once_per_request_and_cached_across_requests(app, user_session, select_counter):
+    from app.utils import get_current_session
+
+    headers, session_id = _headers(user_session), user_session.id
+    db.session.expunge_all()
+    with app.test_request_context(headers=headers):
+        first = get_current_session()
+        assert first is not None
+        assert get_current_session() is first
+        assert get_current_session() is first
+    assert len(select_counter) == 1
+    assert "session_token" in select_counter[0]
+
+    db.session.expunge_all()
+    with app.test_request_context(headers=headers):
+        assert get_current_session().id == session_id
+    # Later requests re-read the row by primary key
+    assert len(select_counter) == 2
+    assert "session_token =" not in select_counter[1]
+
+
+def test_session_revoked_elsewhere_stops_authenticating(app, user_session):
+    from app.utils import get_current_session
+
+    headers = _headers(user_session)
+    with app.test_request_context(headers=headers):
+        assert get_current_session() is not None
+
+    # Deleted by another worker: this process's token cache still has the entry
+    with db.engine.begin() as conn:
+        conn.execute(UserSession.__table__.delete().where(UserSession.__table__.c.id == user_session.id))
+    db.session.expunge_all()
+    with app.test_request_context(headers=headers):
+        assert get_current_session() is None
+    assert session_token_cache.get_stats()["entries"] == 0
+
+
+def test_last_activity_written_in_batches(app, user_session):
+    from app.utils import get_current_session
+
+    stored_before = normalize_datetime(user_session.last_activity)
+    for _ in range(3):
+        with app.test_request_context(headers=_headers(user_session)):
+            assert get_current_session() is not None
+
+    db.session.expire_all()
+    assert normalize_datetime(db.session.get(UserSession, user_session.id).last_activity) == stored_before
+
+    assert session_activity_tracker.flush() >= 1
+    db.session.expire_all()
+    assert normalize_datetime(db.session.get(UserSession, user_session.id).last_activity) > stored_before
+
+
+def test_inactivity_timeout_unchanged(app, user_session):
+    from app.utils import get_current_session
+
+    user_session.last_activity = utcnow() - timedelta(minutes=16)
+    db.session.commit()
+    session_id = user_session.id
+    with app.test_request_context(headers=_headers(user_session)):
+        assert get_current_session() is None
+    assert db.session.get(UserSession, session_id) is None
+
+
+def test_unflushed_activity_keeps_session_alive(app, user_session):
+    from app.utils import get_current_session
+
+    user_session.last_activity = utcnow() - timedelta(minutes=16)
+    db.session.commit()
+    session_activity_tracker.touch(user_session.id, utcnow() - timedelta(minutes=1))
+    with app.test_request_context(headers=_headers(user_session)):
+        assert get_current_session() is not None
+
+
+def test_no_flusher_thread_when_background_disabled(app, user_session):
+    from app.utils import get_current_session
+
+    stored_before = normalize_datetime(user_session.last_activity)
+    with app.test_request_context(headers=_headers(user_session)):
+        assert get_current_session() is not None
+    assert session_activity_tracker._thread is None
+
+    # stop() is the synchronous flush hook
+    assert session_activity_tracker.stop() >= 1
+    db.session.expire_all()
+    assert normalize_datetime(db.session.get(UserSession, user_session.id).last_activity) > stored_before
@@ -0,0 +1,198 @@
+"""
+Unit tests for single-flight coalescing of identical Discovery runs.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils.single_flight import SingleFlight, InflightRun, InflightRunError
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    SingleFlight.clear()
+    yield
+    SingleFlight.clear()
+
+
+def test_second_join_attaches_to_running_leader():
+    run, is_leader = SingleFlight.join("stream:abc")
+    follower_run, follower_is_leader = SingleFlight.join("stream:abc")
+
+    assert is_leader is True
+    assert follower_is_leader is False
+    assert follower_run is run
+    assert SingleFlight.get_stats() == {"in_flight": 1, "leaders": 1, "followers": 1}
+
+
+def test_released_or_finished_run_is_not_joined():
+    run, _ = SingleFlight.join("sync:abc")
+    run.finish(({"profile_analysis": "x"}, {}))
+    _, is_leader = SingleFlight.join("sync:abc")
+    assert is_leader is True
+
+    SingleFlight.clear()
+    run, _ = SingleFlight.join("sync:abc")
+    SingleFlight.release("sync:abc", run)
+    _, is_leader = SingleFlight.join("sync:abc")
+    assert is_leader is True
+
+
+def test_late_subscriber_replays_then_follows_live_stream():
+    run = InflightRun("stream:abc")
+    run.publish(("Hello ", {}))
+    received = []
+    subscribed = threading.Event()
+
+    def follow():
+        for item in run.subscribe(timeout=5):
+            received.append(item[0])
+            subscribed.set()
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    assert subscribed.wait(5)
+    run.publish(("world", {}))
+    run.publish((None, {"final": True}))
+    run.finish()
+    follower.join(5)
+
+    assert received == ["Hello ", "world", None]
+
+
+def test_fan_out_to_many_subscribers():
+    run = InflightRun("stream:abc")
+    results = [[] for _ in range(5)]
+
+    def follow(index):
+        results[index] = [chunk for chunk, _ in run.subscribe(timeout=5)]
+
+    threads = [threading.Thread(target=follow, args=(i,)) for i in range(5)]
+    for thread in threads:
+        thread.start()
+    for i in range(20):
+        run.publish((str(i), {}))
+    run.finish()
+    for thread in threads:
+        thread.join(5)
+
+    expected = [str(i) for i in range(20)]
+    assert all(result == expected for result in results)
+
+
+def test_leader_failure_propagates_to_followers():
+    run = InflightRun("sync:abc")
+    run.publish(("partial", {}))
+    run.fail(ValueError("boom"))
+
+    with pytest.raises(InflightRunError):
+        list(run.subscribe(timeout=1))
+    with pytest.raises(InflightRunError):
+        run.wait(timeout=1)
+
+
+def test_wait_returns_leader_result_and_times_out():
+    run = InflightRun("sync:abc")
+    with pytest.raises(TimeoutError):
+        run.wait(timeout=0.01)
+
+    run.finish(({"profile_analysis": "x"}, {"cache_hit": False}))
+    assert run.wait(timeout=1) == ({"profile_analysis": "x"}, {"cache_hit": False})
+
+
+def test_leave_detaches_follower():
+    run, _ = SingleFlight.join("sync:abc")
+    follower_run, _ = SingleFlight.join("sync:abc")
+    assert SingleFlight.has_followers(run)
+    SingleFlight.leave(follower_run)
+    assert not SingleFlight.has_followers(run)
+
+
+@pytest.fixture
+def discovery(app, monkeypatch):
+    # unified_discovery_service imports the crew tools
+    pytest.importorskip("crewai", reason="crewai not installed")
+    from app.services import unified_discovery_service as service
+
+    monkeypatch.setattr(service, "DISCOVERY_SINGLE_FLIGHT", True)
+    return service
+
+
+def test_concurrent_identical_runs_make_one_pipeline_call(app, discovery, monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_pipeline(profile_data, use_cache, cache_bypass):
+        calls.append(profile_data)
+        release.wait(5)
+        return {"profile_analysis": "x"}, {"cache_hit": False}
+
+    monkeypatch.setattr(discovery, "run_unified_discovery_non_streaming", fake_pipeline)
+    profile = {"goal_type": "side income", "interest_area": "fintech"}
+    results = []
+
+    def request():
+        with app.app_context():
+            results.append(discovery.run_unified_discovery(profile, use_cache=True))
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    threads[0].start()
+    while not calls:
+        time.sleep(0.01)
+    threads[1].start()
+    while not SingleFlight.get_stats()["followers"]:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(bool(metadata.get("coalesced")) for _, metadata in results) == [False, True]
+    assert SingleFlight.get_stats()["in_flight"] == 0
+
+
+def test_disconnected_leader_hands_pipeline_to_worker(app, discovery, monkeypatch):
+    release = threading.Event()
+    pipeline_threads = []
+
+    def fake_stream(profile_data, use_cache, cache_bypass):
+        yield "first ", {}
+        release.wait(5)
+        pipeline_threads.append(threading.current_thread().name)
+        yield "second", {}
+        yield None, {"final": True, "metadata": {}}
+
+    monkeypatch.setattr(discovery, "run_unified_discovery_streaming", fake_stream)
+    profile = {"goal_type": "side income", "interest_area": "climate"}
+
+    leader = discovery.run_unified_discovery(profile, use_cache=True, stream=True)
+    assert next(leader)[0] == "first "
+    follower = discovery.run_unified_discovery(profile, use_cache=True, stream=True)
+    received = []
+
+    def follow():
+        with app.app_context():
+            received.extend(chunk for chunk, _ in follower)
+
+    follower_thread = threading.Thread(target=follow)
+    follower_thread.start()
+    while not received:
+        time.sleep(0.01)
+
+    leader.close()  # returns immediately; the pipeline continues elsewhere
+    release.set()
+    follower_thread.join(5)
+
+    assert received == ["first ", "second", None]
+    assert pipeline_threads == ["discovery-single-flight"]
+    deadline = time.monotonic() + 5
+    while SingleFlight.get_stats()["in_flight"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert SingleFlight.get_stats()["in_flight"] == 0
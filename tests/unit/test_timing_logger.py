@@ -0,0 +1,89 @@
+"""
+Unit tests for the JSONL timing log sink and percentile aggregation.
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.utils import timing_logger
+from app.utils.timing_logger import TimingSink, aggregate_percentiles, iter_timing_events
+
+
+def _records(directory: Path):
+    files = TimingSink(directory=directory).files()
+    return [json.loads(line) for path in files for line in path.read_text().splitlines()]
+
+
+def test_background_writer_appends_jsonl(tmp_path):
+    sink = TimingSink(directory=tmp_path, flush_interval=0.05)
+    for i in range(20):
+        assert sink.submit({"component": "stage", "event": "end", "duration": i})
+    deadline = time.time() + 5
+    while sink.pending() and time.time() < deadline:
+        time.sleep(0.02)
+    sink.shutdown()
+    assert sink._thread is not None
+    assert [r["duration"] for r in _records(tmp_path)] == list(range(20))
+    assert sink.stats["written"] == 20
+
+
+def test_rotation_and_retention(tmp_path):
+    sink = TimingSink(directory=tmp_path, max_bytes=200, max_files=3)
+    for batch in range(6):
+        for i in range(5):
+            sink.submit({"component": "stage", "event": "end", "duration": batch, "pad": "x" * 20})
+        sink.flush()
+    sink.shutdown()
+    files = sink.files()
+    assert len(files) == 3
+    assert sink.stats["rotations"] >= 3
+    # The newest records survive pruning
+    assert _records(tmp_path)[-1]["duration"] == 5
+
+
+def test_sampling_and_bounded_queue(tmp_path):
+    sampled = TimingSink(directory=tmp_path, sample_rate=0.0)
+    assert not sampled.submit({"event": "x"})
+    assert sampled.submit({"event": "session"}, sample=False)
+    assert sampled.stats["sampled_out"] == 1
+
+    full = TimingSink(directory=tmp_path, max_queue=2)
+    full._ensure_worker = lambda: None  # keep the queue from draining
+    results = [full.submit({"event": i}) for i in range(5)]
+    assert results == [True, True, False, False, False]
+    assert full.stats["dropped"] == 3
+
+
+def test_log_timing_and_session_summary(tmp_path, monkeypatch):
+    sink = TimingSink(directory=tmp_path)
+    monkeypatch.setattr(timing_logger, "timing_sink", sink)
+    timing_logger.clear_timing_data()
+    timing_logger.log_timing("run_idea_research", "llm_call_end", duration=2.5, openai_duration=2.5)
+    timing_logger.log_timing("run_idea_research", "end", duration=3.0)
+    timing_logger.save_timing_log()
+    assert len(timing_logger.get_timing_data()) == 0
+    sink.shutdown()
+
+    records = _records(tmp_path)
+    assert [r["type"] for r in records] == ["event", "event", "session"]
+    assert records[-1]["summary"]["total_openai_duration"] == 2.5
+
+
+def test_percentiles_from_jsonl_and_legacy_json(tmp_path):
+    lines = [{"type": "event", "component": "stage2", "event": "end", "duration": d, "timestamp": 100 + d} for d in range(1, 101)]
+    lines.append({"type": "session", "summary": {}})
+    (tmp_path / "timing-a.jsonl").write_text("\n".join(json.dumps(r) for r in lines) + "\n{\"trunc")
+    legacy = [{"events": [{"component": "stage1", "event": "end", "duration": 4.0}]}]
+    (tmp_path / "timing_logs.json").write_text(json.dumps(legacy))
+
+    stats = aggregate_percentiles(iter_timing_events([tmp_path / "timing-a.jsonl", tmp_path / "timing_logs.json"]))
+    assert stats["stage2:end"] == {"count": 100, "p50": 50.0, "p90": 90.0, "p95": 95.0, "p99": 99.0, "max": 100.0}
+    assert stats["stage1:end"]["count"] == 1
+
+    recent = aggregate_percentiles(iter_timing_events([tmp_path / "timing-a.jsonl"], since=191))
+    assert recent["stage2:end"]["count"] == 10
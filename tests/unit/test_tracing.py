@@ -0,0 +1,143 @@
+"""
+Unit tests for the tracing span API and exporters.
+"""
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from flask import g
+
+from app.utils import tracing
+from app.utils.performance_metrics import run_in_metrics_context
+from app.utils.tracing import (
+    NOOP_SPAN, InMemorySpanExporter, JsonlSpanExporter, OtlpFileSpanExporter, Tracer,
+)
+
+
+@pytest.fixture
+def memory(monkeypatch):
+    exporter = InMemorySpanExporter(max_spans=100)
+    monkeypatch.setattr(tracing, "tracer", Tracer(enabled=True, exporters=[exporter]))
+    return exporter
+
+
+def test_disabled_tracer_is_a_noop(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracing, "tracer", Tracer(enabled=False, exporters=[exporter]))
+
+    @tracing.traced("work")
+    def work():
+        return tracing.current_span()
+
+    with tracing.span("outer", a=1) as s:
+        assert s is NOOP_SPAN
+        s.set_attribute("b", 2)
+    assert work() is NOOP_SPAN
+    assert exporter.spans() == []
+
+
+def test_spans_nest_across_executor_threads(memory):
+    @tracing.traced("tool")
+    def tool(n):
+        tracing.current_span().set_attribute("n", n)
+        return n
+
+    with tracing.span("pipeline", streaming=False) as root:
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(run_in_metrics_context(tool, n)) for n in range(3)]
+            assert [f.result() for f in futures] == [0, 1, 2]
+        with pytest.raises(ValueError):
+            with tracing.span("llm.call"):
+                raise ValueError("boom")
+
+    spans = {s["name"] + str(s["attributes"].get("n", "")): s for s in memory.spans()}
+    assert spans["pipeline"]["parent_id"] is None
+    for n in range(3):
+        assert spans[f"tool{n}"]["parent_id"] == root.span_id
+        assert spans[f"tool{n}"]["trace_id"] == root.trace_id
+    assert spans["llm.call"]["status"] == "error"
+    assert spans["llm.call"]["status_message"] == "ValueError: boom"
+    assert len(root.trace_id) == 32 and len(root.span_id) == 16
+    assert tracing.current_span() is NOOP_SPAN
+
+
+def test_traced_generator_covers_iteration(memory):
+    @tracing.traced("stream")
+    def stream():
+        with tracing.span("chunk"):
+            yield 1
+        yield 2
+
+    gen = stream()
+    assert memory.spans() == []
+    assert next(gen) == 1
+    gen.close()  # client went away
+
+    names = [s["name"] for s in memory.spans()]
+    assert names == ["chunk", "stream"]
+    assert all(s["status"] == "ok" for s in memory.spans())
+    assert memory.spans()[0]["parent_id"] == memory.spans()[1]["span_id"]
+
+
+def test_root_span_uses_request_id(app, memory):
+    with app.test_request_context("/api/run"):
+        g.request_id = "1a2b3c4d"
+        with tracing.span("discovery.pipeline") as first:
+            pass
+        with tracing.span("validation.pipeline") as second:
+            pass
+    assert first.trace_id.startswith("1a2b3c4d")
+    assert second.trace_id == first.trace_id
+    assert len(memory.spans(trace_id=first.trace_id)) == 2
+
+
+def test_file_exporters(tmp_path):
+    jsonl = JsonlSpanExporter(directory=tmp_path)
+    otlp = OtlpFileSpanExporter(directory=tmp_path, service_name="test")
+    tracer = Tracer(enabled=True, exporters=[jsonl, otlp])
+    with tracer.span("discovery.pipeline", cache_hit=False) as root:
+        with tracer.span("llm.call", provider="openai", input_tokens=812, duration=1.5) as child:
+            child.add_event("first_token")
+    tracer.shutdown()
+
+    records = [json.loads(line) for line in jsonl.path.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["llm.call", "discovery.pipeline"]
+    assert records[0]["parent_id"] == root.span_id
+
+    batches = [json.loads(line) for line in otlp.path.read_text().splitlines()]
+    spans = [s for b in batches for rs in b["resourceSpans"] for ss in rs["scopeSpans"] for s in ss["spans"]]
+    resource = batches[0]["resourceSpans"][0]["resource"]["attributes"]
+    assert {"key": "service.name", "value": {"stringValue": "test"}} in resource
+    llm = next(s for s in spans if s["name"] == "llm.call")
+    assert llm["parentSpanId"] == root.span_id
+    assert llm["traceId"] == root.trace_id
+    assert int(llm["endTimeUnixNano"]) >= int(llm["startTimeUnixNano"])
+    attributes = {a["key"]: a["value"] for a in llm["attributes"]}
+    assert attributes["input_tokens"] == {"intValue": "812"}
+    assert attributes["duration"] == {"doubleValue": 1.5}
+    assert llm["events"][0]["name"] == "first_token"
+    assert "parentSpanId" not in next(s for s in spans if s["name"] == "discovery.pipeline")
+
+
+def test_discovery_span_token_attributes(app):
+    # unified_discovery_service imports the crew tools
+    pytest.importorskip("crewai", reason="crewai not installed")
+    from app.services.unified_discovery_service import _record_token_usage, _token_usage_attributes
+
+    metadata = {}
+    assert _token_usage_attributes(metadata) == {}
+    _record_token_usage(
+        metadata,
+        {"input_tokens": 900, "cached_tokens": 600, "cache_write_tokens": 0, "output_tokens": 300},
+        {"input_tokens": 1200, "cached_tokens": 0, "cache_write_tokens": 1000, "output_tokens": 1500},
+    )
+    assert _token_usage_attributes(metadata) == {
+        "input_tokens": 2100, "cached_input_tokens": 600, "output_tokens": 1800, "total_tokens": 3900,
+    }
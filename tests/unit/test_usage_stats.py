@@ -0,0 +1,136 @@
+"""
+Unit tests for materialized public usage stats.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserValidation, UsageCounter
+from app.services.usage_stats import UsageStats, _upsert, usage_stats
+
+
+@pytest.fixture
+def stats(app):
+    UsageCounter.query.delete()
+    db.session.commit()
+    instance = UsageStats(ttl=60, reconcile_interval=0)
+    yield instance
+    UsageCounter.query.delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def stats_user(app):
+    user = User(email="usage_stats@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.commit()
+    user_id = user.id
+    yield user
+    UserValidation.query.filter_by(user_id=user_id).delete()
+    User.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+def _complete_validation(stats, user, n, score):
+    validation = UserValidation(
+        user_id=user.id,
+        validation_id=f"val_usage_{user.id}_{n}",
+        validation_result=json.dumps({"overall_score": score}),
+        overall_score=score,
+        status="completed",
+    )
+    db.session.add(validation)
+    stats.record_validation_completed(validation)
+    db.session.commit()
+    return validation
+
+
+def test_increments_match_reconciliation(app, stats, stats_user, monkeypatch):
+    baseline, _ = stats.get()
+    # The write path only touches counters, never the full recompute
+    monkeypatch.setattr(stats, "reconcile", lambda: pytest.fail("reconcile on the write path"))
+    first = _complete_validation(stats, stats_user, 1, 8)
+    _complete_validation(stats, stats_user, 2, 6)
+
+    stats.invalidate()
+    incremental, _ = stats.get()
+    assert incremental["total_validations"] == baseline["total_validations"] + 2
+    assert incremental["validations_this_month"] == baseline["validations_this_month"] + 2
+    assert incremental["total_users"] == baseline["total_users"] + 1
+
+    first.is_deleted = True
+    stats.record_validation_deleted(first)
+    db.session.commit()
+    stats.invalidate()
+    after_delete, _ = stats.get()
+    assert after_delete["total_validations"] == baseline["total_validations"] + 1
+    assert after_delete["total_users"] == baseline["total_users"] + 1
+
+    monkeypatch.undo()
+    reconciled = stats.reconcile()
+    assert reconciled["total_validations"] == after_delete["total_validations"]
+    assert reconciled["total_users"] == after_delete["total_users"]
+
+
+def test_rolled_back_change_is_not_counted(app, stats, stats_user):
+    baseline, _ = stats.get()
+    validation = UserValidation(user_id=stats_user.id, validation_id=f"val_usage_{stats_user.id}_rb", status="completed")
+    db.session.add(validation)
+    stats.record_validation_completed(validation)
+    db.session.rollback()
+
+    stats.invalidate()
+    assert stats.get()[0]["total_validations"] == baseline["total_validations"]
+
+
+def test_first_write_of_a_counter_is_an_upsert(app, stats):
+    for _ in range(2):
+        db.session.execute(_upsert("validations:2001-01", 1, increment=True))
+    db.session.commit()
+    assert db.session.get(UsageCounter, "validations:2001-01").value == 2
+
+
+def test_snapshot_served_from_memory(app, stats):
+    stats.get()
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        for _ in range(20):
+            stats.get()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    assert statements == []
+
+
+def test_endpoint_sets_cache_headers_and_etag(client, stats):
+    usage_stats.invalidate()
+    response = client.get("/api/public/usage-stats")
+    assert response.status_code == 200
+    assert "max-age" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    cached = client.get("/api/public/usage-stats", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_average_score_comes_from_reconciliation(app, stats, stats_user):
+    stats.reconcile()
+    for n, score in enumerate((9, 3, 6), start=1):
+        _complete_validation(stats, stats_user, n, score)
+
+    reconciled = stats.reconcile()
+    live, _ = stats.get()
+    assert live["average_score"] == round(reconciled["average_score"], 1)
+    assert reconciled["average_score"] == UsageStats._average_score()
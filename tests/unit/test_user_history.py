@@ -0,0 +1,86 @@
+"""
+Unit tests for the dynamic User.runs/validations/sessions relationships and
+the *_query helpers.
+"""
+import secrets
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserRun, UserSession, UserValidation, utcnow
+
+
+@pytest.fixture
+def user_with_history(app):
+    user = User(email=f"history_{secrets.token_hex(4)}@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    now = utcnow()
+    for i, deleted in enumerate([False, True, False]):
+        created_at = now - timedelta(days=3 - i)
+        db.session.add(UserRun(user_id=user.id, run_id=f"run_{user.id}_{i}", status="completed",
+                               created_at=created_at, is_deleted=deleted))
+        db.session.add(UserValidation(user_id=user.id, validation_id=f"val_{user.id}_{i}",
+                                      status="completed" if i else "failed",
+                                      created_at=created_at, is_deleted=deleted))
+        db.session.add(UserSession(user_id=user.id, session_token=secrets.token_urlsafe(16),
+                                   created_at=created_at, expires_at=now + timedelta(days=1)))
+    db.session.commit()
+    user_id = user.id
+    db.session.expunge_all()
+    yield user_id
+    UserRun.query.filter_by(user_id=user_id).delete()
+    UserValidation.query.filter_by(user_id=user_id).delete()
+    UserSession.query.filter_by(user_id=user_id).delete()
+    User.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def history_selects(app):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if any(table in statement for table in ("user_runs", "user_validations", "user_sessions")):
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+def test_loading_user_does_not_load_history(user_with_history, history_selects):
+    user = db.session.get(User, user_with_history)
+    assert user.email.startswith("history_")
+    # Relationships are query objects, not loaded collections
+    assert not isinstance(user.runs, list)
+    assert not isinstance(user.validations, list)
+    assert history_selects == []
+
+    assert user.runs_query().count() == 2
+    assert len(history_selects) == 1
+
+
+def test_query_helpers_exclude_deleted_newest_first(user_with_history):
+    user = db.session.get(User, user_with_history)
+
+    runs = user.runs_query().all()
+    assert [run.run_id for run in runs] == [f"run_{user.id}_2", f"run_{user.id}_0"]
+    assert len(user.runs_query(include_deleted=True).all()) == 3
+
+    validations = user.validations_query().all()
+    assert [v.validation_id for v in validations] == [f"val_{user.id}_2", f"val_{user.id}_0"]
+    assert [v.validation_id for v in user.validations_query(status="completed")] == [f"val_{user.id}_2"]
+    assert len(user.validations_query(include_deleted=True).all()) == 3
+
+    sessions = user.sessions_query().all()
+    assert len(sessions) == 3
+    assert sessions == sorted(sessions, key=lambda s: s.created_at, reverse=True)
@@ -0,0 +1,175 @@
+"""
+Route tests for async validations: enqueue -> status -> SSE events.
+"""
+import json
+import secrets
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserSession, UserValidation, utcnow
+
+REPORT = """## 🎯 Executive Summary & Overall Verdict
+
+A bike repair van for office parks.
+
+| Pillar | Score (1-5) | Reasoning |
+| :--- | :--- | :--- |
+| **Problem-Solution Fit** | 4 | Commuters lack time for repairs. |
+| **Market Viability & Scope** | 3 | Limited to dense office parks. |
+| **Competitive Moat** | 2 | Easy to copy. |
+| **Financial Viability** | 3 | Service margins are decent. |
+| **Feasibility & Risk** | 4 | One van to start. |
+
+---
+"""
+
+
+def _auth_headers(email_prefix):
+    user = User(email=f"{email_prefix}_{secrets.token_hex(4)}@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    session = UserSession(user_id=user.id, session_token=secrets.token_urlsafe(32), expires_at=utcnow() + timedelta(days=1))
+    db.session.add(session)
+    db.session.commit()
+    return user.id, {"Authorization": f"Bearer {session.session_token}"}
+
+
+@pytest.fixture
+def two_users(app):
+    owner_id, owner = _auth_headers("jobs_owner")
+    other_id, other = _auth_headers("jobs_other")
+    yield owner, other
+    for user_id in (owner_id, other_id):
+        UserValidation.query.filter_by(user_id=user_id).delete()
+        UserSession.query.filter_by(user_id=user_id).delete()
+        User.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    calls = []
+
+    def call(**kwargs):
+        calls.append(kwargs)
+        return REPORT
+
+    monkeypatch.setattr("app.routes.validation._get_validation_client", lambda: (None, "test-model", False))
+    monkeypatch.setattr("app.routes.validation._call_ai_validation", call)
+    return calls
+
+
+def _events(response):
+    return [json.loads(line[len("data: "):]) for line in response.get_data(as_text=True).splitlines() if line.startswith("data: ")]
+
+
+def _enqueue(client, headers):
+    return client.post(
+        "/api/validate-idea?async=true",
+        json={"idea_explanation": "A bike repair van for office parks.", "category_answers": {"industry": "Mobility"}},
+        headers=headers,
+    )
+
+
+def test_enqueue_then_follow_events_and_status(client, two_users, fake_model):
+    owner, _ = two_users
+    response = _enqueue(client, owner)
+    assert response.status_code == 202
+    body = response.get_json()
+    assert body["status"] == "pending"
+    validation_id = body["validation_id"]
+
+    events = _events(client.get(body["events_url"], headers=owner))
+    assert events[-1]["event"] == "completed"
+    assert events[-1]["validation_id"] == validation_id
+    assert "parsing" in [e.get("status") for e in events]
+    assert len(fake_model) == 1
+
+    status = client.get(body["status_url"], headers=owner).get_json()
+    assert status["status"] == "completed"
+    assert status["validation"]["overall_score"] == events[-1]["validation"]["overall_score"]
+
+
+def test_unknown_validation_id_is_404(client, two_users):
+    owner, _ = two_users
+    assert client.get("/api/validate-idea/val_missing/status", headers=owner).status_code == 404
+    assert client.get("/api/validate-idea/val_missing/events", headers=owner).status_code == 404
+
+
+def test_other_users_validation_is_404(client, two_users, fake_model):
+    owner, other = two_users
+    body = _enqueue(client, owner).get_json()
+    _events(client.get(body["events_url"], headers=owner))
+
+    assert client.get(body["status_url"], headers=other).status_code == 404
+    assert client.get(body["events_url"], headers=other).status_code == 404
+
+
+def _usage(client, headers):
+    user = UserSession.query.filter_by(session_token=headers["Authorization"].split()[1]).first().user
+    db.session.refresh(user)
+    return user
+
+
+def test_usage_is_reserved_at_enqueue_and_counted_once(client, two_users, fake_model):
+    owner, _ = two_users
+    body = _enqueue(client, owner).get_json()
+    assert _usage(client, owner).free_validations_used == 1
+
+    _events(client.get(body["events_url"], headers=owner))
+    assert _usage(client, owner).free_validations_used == 1
+
+
+def test_enqueue_over_quota_is_rejected(client, two_users, fake_model):
+    owner, _ = two_users
+    user = _usage(client, owner)
+    user.free_validations_used = 2
+    db.session.commit()
+
+    response = _enqueue(client, owner)
+    assert response.status_code == 403
+    assert response.get_json()["usage_limit_reached"] is True
+    assert UserValidation.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_failed_job_refunds_usage(client, two_users, monkeypatch):
+    owner, _ = two_users
+
+    def fail(**kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr("app.routes.validation._get_validation_client", lambda: (None, "test-model", False))
+    monkeypatch.setattr("app.routes.validation._call_ai_validation", fail)
+    body = _enqueue(client, owner).get_json()
+    events = _events(client.get(body["events_url"], headers=owner))
+
+    assert events[-1]["event"] == "failed"
+    assert client.get(body["status_url"], headers=owner).get_json()["status"] == "failed"
+    assert _usage(client, owner).free_validations_used == 0
+
+
+def test_stale_pending_validation_is_expired_on_status(client, two_users):
+    owner, _ = two_users
+    user = _usage(client, owner)
+    user.free_validations_used = 1
+    row = UserValidation(
+        user_id=user.id,
+        validation_id="val_stale_job",
+        idea_explanation="A bike repair van for office parks.",
+        status="pending",
+        created_at=utcnow() - timedelta(hours=1),
+    )
+    db.session.add(row)
+    db.session.commit()
+
+    status = client.get("/api/validate-idea/val_stale_job/status", headers=owner).get_json()
+    assert status["status"] == "failed"
+    assert _usage(client, owner).free_validations_used == 0
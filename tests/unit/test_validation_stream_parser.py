@@ -0,0 +1,163 @@
+"""
+Unit tests for incremental parsing of streamed validation Markdown.
+"""
+import json
+import secrets
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+# Add project root to path for imports
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.database import db, User, UserSession, UserValidation, utcnow
+from app.services.validation_stream_parser import ValidationStreamParser, parse_pillar_rows, rescale_pillar_score
+
+SAMPLE_REPORT = """## 🎯 Executive Summary & Overall Verdict
+
+A meal-kit service for busy parents with a clear pain point but thin margins.
+
+| Pillar | Score (1-5) | Reasoning |
+| :--- | :--- | :--- |
+| **Problem-Solution Fit** | 4 | Parents consistently report weeknight dinner stress. |
+| **Market Viability & Scope** | 3 | Crowded but large regional market. |
+| **Competitive Moat** | 2 | Easy to copy recipes and logistics. |
+| **Financial Viability** | 3 | Subscription revenue with high food costs. |
+| **Feasibility & Risk** | 3 | Cold-chain logistics are hard part-time. |
+
+---
+
+## 🔎 Deep Dive Analysis
+
+### 1. Core Problem & User Urgency
+* **Analysis:** Weeknight dinners are a recurring pain.
+* **Verdict:** Painkiller for dual-income households.
+
+### 2. Business Model Stress Test
+* **Analysis:** Weekly subscription.
+* **Red Flag:** Food costs eat the margin.
+
+### 3. Competitive Landscape
+* **Analysis:** Competitors not specified.
+* **Key Insight:** Local sourcing is the only angle.
+
+---
+
+## 🛑 Critical Assumptions & Next Steps
+
+### 1. Riskiest Assumption (The 'Kill Switch')
+
+Parents will pay a premium over grocery delivery.
+
+### 2. Actionable Next Steps (Prioritized)
+
+1. **Validation Step 1:** Interview 20 parents.
+2. **Validation Step 2:** Run a pre-order page.
+3. **Validation Step 3:** Price a 4-meal box."""
+
+
+def _feed_in_chunks(parser, text, size=7):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+def test_sections_complete_in_report_order():
+    parser = ValidationStreamParser()
+    events = _feed_in_chunks(parser, SAMPLE_REPORT) + parser.finish()
+
+    assert [e["section"] for e in events] == [
+        "executive_summary",
+        "pillar_scores",
+        "core_problem",
+        "business_model",
+        "competitive_landscape",
+        "riskiest_assumption",
+        "next_steps",
+    ]
+    assert all(e["event"] == "section_complete" for e in events)
+    assert parser.text == SAMPLE_REPORT
+
+
+def test_score_table_emitted_before_deep_dive_streams():
+    parser = ValidationStreamParser()
+    cutoff = SAMPLE_REPORT.index("### 1. Core Problem")
+    events = _feed_in_chunks(parser, SAMPLE_REPORT[:cutoff])
+
+    table = next(e for e in events if e["section"] == "pillar_scores")
+    assert table["raw_scores"]["Problem-Solution Fit"] == 4
+    assert table["scores"] == {
+        "problem_solution_fit": 8,
+        "market_opportunity": 6,
+        "competitive_landscape": 3,
+        "financial_sustainability": 6,
+        "risk_assessment": 6,
+    }
+    assert table["overall_score"] == 6
+    assert "core_problem" not in parser.completed
+
+
+def test_deep_dive_fields_and_next_steps_extracted():
+    parser = ValidationStreamParser()
+    events = {e["section"]: e for e in _feed_in_chunks(parser, SAMPLE_REPORT) + parser.finish()}
+
+    assert events["core_problem"]["verdict"] == "Painkiller for dual-income households."
+    assert events["business_model"]["red_flag"] == "Food costs eat the margin."
+    assert events["competitive_landscape"]["key_insight"] == "Local sourcing is the only angle."
+    assert len(events["next_steps"]["steps"]) == 3
+    assert events["executive_summary"]["content"].startswith("A meal-kit service")
+
+
+def test_pillar_rescale():
+    assert [rescale_pillar_score(score) for score in range(1, 6)] == [1, 3, 6, 8, 10]
+    assert parse_pillar_rows(["| Pillar | Score |", "| :--- | :--- |", "| Competitive Moat | 9 |"])["scores"] == {
+        "competitive_landscape": 10,
+    }
+
+
+@pytest.fixture
+def stream_user(app):
+    user = User(email=f"stream_{secrets.token_hex(4)}@example.com", founder_psychology="{}")
+    user.set_password("password123")
+    db.session.add(user)
+    db.session.flush()
+    session = UserSession(user_id=user.id, session_token=secrets.token_urlsafe(32), expires_at=utcnow() + timedelta(days=1))
+    db.session.add(session)
+    db.session.commit()
+    user_id = user.id
+    yield {"Authorization": f"Bearer {session.session_token}"}
+    UserValidation.query.filter_by(user_id=user_id).delete()
+    UserSession.query.filter_by(user_id=user_id).delete()
+    User.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+def test_stream_endpoint_sections_match_final_parse(client, stream_user, monkeypatch):
+    def fake_stream(**kwargs):
+        for i in range(0, len(SAMPLE_REPORT), 40):
+            yield SAMPLE_REPORT[i:i + 40]
+
+    monkeypatch.setattr("app.routes.validation._get_validation_client", lambda: (None, "test-model", False))
+    monkeypatch.setattr("app.routes.validation._stream_ai_validation", fake_stream)
+
+    response = client.post(
+        "/api/validate-idea?stream=true",
+        json={"idea_explanation": "A meal-kit service for busy parents.", "category_answers": {"industry": "Food"}},
+        headers=stream_user,
+    )
+    assert response.mimetype == "text/event-stream"
+    events = [json.loads(line[len("data: "):]) for line in response.get_data(as_text=True).splitlines() if line.startswith("data: ")]
+
+    assert events[0]["event"] == "start"
+    assert "".join(e["text"] for e in events if e["event"] == "delta") == SAMPLE_REPORT
+    table = next(e for e in events if e.get("section") == "pillar_scores")
+    done = events[-1]
+    assert done["event"] == "done"
+    # Streamed and final scores come from the same table parser
+    assert done["validation"]["overall_score"] == table["overall_score"] == 6
+    assert done["validation"]["scores"]["competitive_landscape"] == table["scores"]["competitive_landscape"]
+    assert UserValidation.query.filter_by(validation_id=done["validation_id"]).one().status == "completed"